@@ -1,5 +1,6 @@
 from resqdb.Connection import Connection
 from resqdb.functions import save_file
+from resqdb.Rollup import get_runs, rollup_counts, rollup_runs, get_medians, get_quantiles
 
 from datetime import datetime
 import logging
@@ -100,17 +101,10 @@ class AfricaReport():
 
         self._columns_to_be_deleted = []
 
-        # Add all data into dataframe again, this data will be set as country results, therefore we have to modify beofre appending SITE_ID, FACILITY_NAME and REGION
-        country_df = self.preprocessed_data.copy()
-        country_df['SITE_ID'] = self.country_name
-        country_df['FACILITY_NAME'] = self.country_name
-        country_df['REGION'] = self.country_name
-        self.preprocessed_data = self.preprocessed_data.append(country_df, ignore_index=True)
-
         ###########################
         # Generate country report #
-        # Calculate statistic
-        self.calculate_statistics(self.preprocessed_data)
+        # Calculate statistic, the results for the country are rolled up from the results of the sites
+        self.calculate_statistics(self.preprocessed_data, levels=[None, self._get_country])
         # generate formatted statistic
         if self.report_type == 'all' and self.period_name == 'all':
             filename = self.country_code
@@ -123,16 +117,13 @@ class AfricaReport():
         logging.info('The country report has been generated.')
 
         if region_reports:
-            region_preprocessed_data = self.preprocessed_data.copy()
-            region_preprocessed_data['SITE_ID'] = region_preprocessed_data['REGION']
-            region_preprocessed_data['FACILITY_NAME'] = region_preprocessed_data['REGION']
-
-            self.calculate_statistics(region_preprocessed_data)
+            # The results for the regions and the country are rolled up from the results of the sites
+            self.calculate_statistics(self.preprocessed_data, levels=[self._get_region, self._get_country])
             if self.report_type == 'all' and self.period_name == 'all':
                 filename = f'{self.country_code}_regions'
             else:
                 filename = f'{self.report_type}_{self.country_code}_{self.period_name}_regions'
-            self._generate_formatted_preprocessed_data(region_preprocessed_data, filename)
+            self._generate_formatted_preprocessed_data(self.preprocessed_data, filename)
             self._generate_formatted_stats(self.stats, filename)
             # Generate presetation
             self._generate_presentation(self.stats, filename)
@@ -140,33 +131,22 @@ class AfricaReport():
 
         if site_reports:
             # Get list of site ids in the filtered preprocessed data
-            site_ids = [x for x in set(self.preprocessed_data['SITE_ID'].tolist()) if x != self.country_name]
+            site_ids = set(self.preprocessed_data['SITE_ID'].tolist())
             # Iterate over site ID and for each site ID generate report
             for site_id in site_ids:
                 self.region_name = self._get_region(site_id)
-                # Filter data for site and country
-                site_preprocessed_data = self.preprocessed_data.loc[
-                    (self.preprocessed_data['SITE_ID'] == site_id) |
-                    (self.preprocessed_data['SITE_ID'] == self.country_name)
-                ].copy()
-                print(site_preprocessed_data)
-                site_name = site_preprocessed_data.loc[site_preprocessed_data['SITE_ID'] == site_id]['FACILITY_NAME'].iloc[0]
-                # Append data for region to the site preprocessed data
-                region_preprocessed_data = self.preprocessed_data.loc[
-                    self.preprocessed_data['REGION'] == self.region_name
-                ].copy()
-                region_preprocessed_data['SITE_ID'] = self.region_name
-                region_preprocessed_data['FACILITY_NAME'] = self.region_name
-                site_preprocessed_data = site_preprocessed_data.append(
-                    region_preprocessed_data, ignore_index=True
-                )
-
-                self.calculate_statistics(site_preprocessed_data)
+                site_name = self.preprocessed_data.loc[self.preprocessed_data['SITE_ID'] == site_id]['FACILITY_NAME'].iloc[0]
+                # Calculate statistic for the site, the results for the region of the site and the country are rolled up from the results of all sites
+                region_sites = {x: self.region_name for x in site_ids if self._get_region(x) == self.region_name}
+                self.calculate_statistics(self.preprocessed_data, levels=[{site_id: site_id}, region_sites, self._get_country])
+                # The preprocessed data of the region including the site
+                region_preprocessed_data = self.preprocessed_data.loc[self.preprocessed_data['SITE_ID'].isin(region_sites)]
+
                 if self.report_type == 'all' and self.period_name == 'all':
                     filename = site_id
                 else:
                     filename = f'{self.report_type}_{site_id}_{self.period_name}'
-                self._generate_formatted_preprocessed_data(site_preprocessed_data, filename, exclude_country=True)
+                self._generate_formatted_preprocessed_data(region_preprocessed_data, filename)
                 self._generate_formatted_stats(self.stats, filename)
                 # Generate presetation
                 self._generate_presentation(self.stats, filename, site_name)
@@ -226,6 +206,16 @@ class AfricaReport():
         else:
             return 'Demo'
 
+    def _get_country(self, site_id):
+        ''' Get country name for the Site ID, used to roll up the results of the sites to the country. 
+
+        :param site_id: the site ID
+        :type site_id: str
+        :returns: the name of the country
+        :rtype: str
+        '''
+        return self.country_name
+
 
     def _filter_by_date(self, df, start_date, end_date):
         ''' Filter data by DISCHARGE DATE where discharge date is between start and end date. 
@@ -261,6 +251,30 @@ class AfricaReport():
         self.stats = self.stats.merge(df, how="outer")
         self.stats.fillna(0, inplace=True)
 
+    def _get_counts(self, df):
+        ''' Get numbers of patients grouped by SITE_ID and rolled up to the levels of the statistics. 
+
+        :param df: the filtered dataframe
+        :type df: DataFrame
+        :returns: the numbers of patients indexed by the site ID or by the name of the group
+        :rtype: Series
+        '''
+        counts = df.groupby(['SITE_ID']).size()
+        return pd.concat([counts if level is None else rollup_counts(counts, level) for level in self._levels])
+
+    def _get_runs(self, df, column):
+        ''' Get sorted values of the column grouped by SITE_ID and rolled up to the levels of the statistics. 
+
+        :param df: the filtered dataframe
+        :type df: DataFrame
+        :param column: the name of the column
+        :type column: str
+        :returns: the list of runs, one for each level
+        :rtype: list
+        '''
+        runs = get_runs(df, ['SITE_ID'], column)
+        return [runs if level is None else rollup_runs(runs, level) for level in self._levels]
+
     def _get_numbers(self, df, column_name, denominator):
         ''' Get numbers of patients for dataframe grouped by SITE_ID column and merge data with already calculated statistics. 
         The % column is calculated as well. 
@@ -279,7 +293,7 @@ class AfricaReport():
             self.stats[column_name] = 0
             self.stats[column_name_perc] = 0
         else:
-            grouped_df = df.groupby(['SITE_ID']).size().reset_index(name=column_name)
+            grouped_df = self._get_counts(df).rename_axis('SITE_ID').reset_index(name=column_name)
             self._merge_stats(grouped_df)
             
             self.stats[column_name_perc] = self.stats.apply(lambda x: round(
@@ -302,7 +316,8 @@ class AfricaReport():
         if df.empty:
             self.stats[new_column] = 0
         else:
-            median_df = df[['SITE_ID', column]].groupby(['SITE_ID']).median().reset_index().rename(columns={column: new_column})
+            medians = pd.concat([get_medians(runs) for runs in self._get_runs(df, column)])
+            median_df = medians.rename_axis('SITE_ID').reset_index(name=new_column)
             self._merge_stats(median_df)
 
     def _get_iqr(self, df, column, new_column):
@@ -315,12 +330,11 @@ class AfricaReport():
         :param new_column: the name of column that will be created and merged with stats
         :type new_column: str
         '''
-        from scipy.stats import iqr
-
         if df.empty:
             self.stats[new_column] = 0
         else:
-            iqr_df = df.groupby(['SITE_ID']).agg({column: iqr}).reset_index().rename(columns={column: new_column})
+            iqrs = pd.concat([get_quantiles(runs, 0.75) - get_quantiles(runs, 0.25) for runs in self._get_runs(df, column)])
+            iqr_df = iqrs.rename_axis('SITE_ID').reset_index(name=new_column)
             self._merge_stats(iqr_df)
 
     def _get_total_patients(self, df, column_name, to_be_deleted=False):
@@ -339,20 +353,30 @@ class AfricaReport():
         if df.empty:
             self.stats[column_name] = 0
         else:
-            tmp_df = df.groupby(['SITE_ID']).size().reset_index(name=column_name)
+            tmp_df = self._get_counts(df).rename_axis('SITE_ID').reset_index(name=column_name)
             self._merge_stats(tmp_df)
 
-    def calculate_statistics(self, df=None):
-        ''' Calculate statistics for the South Africa. The changes are made directly in stats dataframe. 
+    def calculate_statistics(self, df=None, levels=(None,)):
+        ''' Calculate statistics for the South Africa. The changes are made directly in stats dataframe. The statistics are calculated per site and rolled up to the levels, eg. to the regions or the country, so the patients don't have to be copied for each level. 
         
         :param df: the preprocessed data that can be filtered (default is None)
         :type df: DataFrame
+        :param levels: the list of the mappings of the site IDs to the groups (dictionary or function), the group is added as a row of the statistics, None adds the rows of all sites (default is sites only)
+        :type levels: list
         '''
         # Check if argument is provided
         if df is None:
             df = self.preprocessed_data.copy()
+        self._levels = levels
 
-        self.stats = df.groupby(['SITE_ID', 'FACILITY_NAME']).size().reset_index(name='Total Patients')
+        # The groups are named by the group, the sites by the facility name
+        names = df.drop_duplicates('SITE_ID').set_index('SITE_ID')['FACILITY_NAME']
+        total_patients = self._get_counts(df)
+        self.stats = pd.DataFrame({
+            'SITE_ID': total_patients.index,
+            'FACILITY_NAME': [names.get(x, x) for x in total_patients.index],
+            'Total Patients': total_patients.to_numpy(),
+        }).sort_values(['SITE_ID', 'FACILITY_NAME']).reset_index(drop=True)
 
         # Get patients with stroke
         tmp_df = df.loc[df['STROKE_TYPE'] != 6].copy() 
@@ -1167,19 +1191,14 @@ class AfricaReport():
         tmp['header'] = x
         return tmp
 
-    def _generate_formatted_preprocessed_data(self, df, filename, exclude_country=False):
+    def _generate_formatted_preprocessed_data(self, df, filename):
         ''' Generate formatted preprocessed data. 
 
         :param df: the preprocessed data (filtered)
         :type df: DataFrame
         :param filename: the name of file without suffix
         :type filename: str
-        :param exclude_country: if True the data for country that are appended in the beginning will be excluded, applies for site preprocessed data
-        :type exclude_country: bool
         '''
-        if exclude_country:
-            df = df.loc[df['SITE_ID'] != self.country_name]
-
         workbook = xlsxwriter.Workbook(f'{filename}_preprocessed_data.xlsx')
         worksheet = workbook.add_worksheet('Preprocessed data')
 
@@ -15,6 +15,7 @@ from dateutil.relativedelta import relativedelta
 import logging
 import xlsxwriter
 from xlsxwriter.utility import xl_rowcol_to_cell, xl_col_to_name
+from resqdb.Awards import get_awards, ATALAIA_ANGELS_AWARDS_INDICATORS
 
 class CheckTimes():
     """
@@ -456,156 +457,6 @@ class Calculation(Filtration):
         except:
             logging.info('Atalaia: Hospitalized in stroke unit: ERROR')
 
-    def _get_final_award(self, x):
-        """ The function calculating the final award. The results are merged with the dataframe containing resulted statistic! 
-        
-        :param x: the row with the values to calculate proposed award
-        :type x: pandas series
-        :returns: proposed award
-        """        
-        if x['Total Patients'] == False:
-            award = "STROKEREADY"
-        else:
-            award = "TRUE"
-
-        thrombolysis_pts = x['# patients eligible thrombolysis']
-        
-        # Calculate award for thrombolysis, if no patients were eligible for thrombolysis and number of total patients was greater than minimum than the award is set to DIAMOND 
-        thrombolysis_therapy_lt_60min = x['% patients treated with door to thrombolysis < 60 minutes']
-        if award == "TRUE":
-            if thrombolysis_pts == 0:
-                award = "DIAMOND"
-            else:
-                if (float(thrombolysis_therapy_lt_60min) >= 50 and float(thrombolysis_therapy_lt_60min) <= 74.99):
-                    award = "GOLD"
-                elif (float(thrombolysis_therapy_lt_60min) >= 75):
-                    award = "DIAMOND"
-                else: 
-                    award = "STROKEREADY"
-
-        thrombolysis_therapy_lt_45min = x['% patients treated with door to thrombolysis < 45 minutes']
-        if award != "STROKEREADY":
-            if thrombolysis_pts == 0:
-                award = "DIAMOND"
-            else:
-                if (float(thrombolysis_therapy_lt_45min) <= 49.99):
-                    if (award != "GOLD" or award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(thrombolysis_therapy_lt_45min) >= 50):
-                    if (award != "GOLD"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-        # Calculate award for thrombectomy, if no patients were eligible for thrombectomy and number of total patients was greater than minimum than the award is set to the possible proposed award (eg. if in thrombolysis step award was set to GOLD then the award will be GOLD)
-        thrombectomy_pts = x['# patients eligible thrombectomy']
-        if thrombectomy_pts != 0:
-            thrombectomy_therapy_lt_90min = x['% patients treated with door to thrombectomy < 90 minutes']
-            if award != "STROKEREADY":
-                if (float(thrombectomy_therapy_lt_90min) >= 50 and float(thrombectomy_therapy_lt_90min) <= 74.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(thrombectomy_therapy_lt_90min) >= 75):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else: 
-                    award = "STROKEREADY"
-
-            thrombectomy_therapy_lt_60min = x['% patients treated with door to thrombectomy < 60 minutes']
-            if award != "STROKEREADY":
-                if (float(thrombectomy_therapy_lt_60min) <= 49.99):
-                    if (award != "GOLD" or award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(thrombectomy_therapy_lt_60min) >= 50):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-        recan_rate = x['% recanalization rate out of total ischemic incidence']
-        if award != "STROKEREADY":
-            if (float(recan_rate) >= 5 and float(recan_rate) <= 14.99):
-                if (award == "PLATINUM" or award == "DIAMOND"):
-                    award = "GOLD"
-            elif (float(recan_rate) >= 15 and float(recan_rate) <= 24.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(recan_rate) >= 25):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        ct_mri = x['% suspected stroke patients undergoing CT/MRI']
-        if award != "STROKEREADY":
-            if (float(ct_mri) >= 80 and float(ct_mri) <= 84.99):
-                if (award == "PLATINUM" or award == "DIAMOND"):
-                    award = "GOLD"
-            elif (float(ct_mri) >= 85 and float(ct_mri) <= 89.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(ct_mri) >= 90):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        dysphagia_screening = x['% all stroke patients undergoing dysphagia screening']
-        if award != "STROKEREADY":
-            if (float(dysphagia_screening) >= 80 and float(dysphagia_screening) <= 84.99):
-                if (award == "PLATINUM" or award == "DIAMOND"):
-                    award = "GOLD"
-            elif (float(dysphagia_screening) >= 85 and float(dysphagia_screening) <= 89.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(dysphagia_screening) >= 90):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        discharged_with_antiplatelets_final = x['% ischemic stroke patients discharged (home) with antiplatelets']
-        if award != "STROKEREADY":
-            if (float(discharged_with_antiplatelets_final) >= 80 and float(discharged_with_antiplatelets_final) <= 84.99):
-                if (award == "PLATINUM" or award == "DIAMOND"):
-                    award = "GOLD"
-            elif (float(discharged_with_antiplatelets_final) >= 85 and float(discharged_with_antiplatelets_final) <= 89.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(discharged_with_antiplatelets_final) >= 90):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        discharged_with_anticoagulants_final = x['% afib patients discharged (home) with anticoagulants']
-        if award != "STROKEREADY":
-            if (float(discharged_with_anticoagulants_final) >= 80 and float(discharged_with_anticoagulants_final) <= 84.99):
-                if (award == "PLATINUM" or award == "DIAMOND"):
-                    award = "GOLD"
-            elif (float(discharged_with_anticoagulants_final) >= 85 and float(discharged_with_anticoagulants_final) <= 89.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(discharged_with_anticoagulants_final) >= 90):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        stroke_unit = x['% stroke patients treated in a dedicated stroke unit / ICU']
-        if award != "STROKEREADY":
-            if (float(stroke_unit) <= 0.99):
-                if (award == "DIAMOND"):
-                    award = "PLATINUM"
-            elif (float(stroke_unit) >= 1):
-                if (award == "DIAMOND"):
-                    award = "DIAMOND"
-            else:
-                award = "STROKEREADY"
-
-        return award
-
-
     def get_stats_df(self):
         """ The function calculating the statistics. 
         
@@ -626,7 +477,7 @@ class Calculation(Filtration):
             self.get_patients_discharged_with_antiplatelets()
             self.get_afib_discharged_with_anticoagulants()
             self.get_hospitalized_in()
-            self.stats_df['Proposed Award'] = self.stats_df.apply(lambda x: self._get_final_award(x), axis=1)
+            self.stats_df['Proposed Award'], self.awards_capped_by = get_awards(self.stats_df, ATALAIA_ANGELS_AWARDS_INDICATORS, 'Total Patients')
             # Delete redundant columns
             columns_to_delete = ['# patients eligible thrombectomy', '# patients eligible thrombolysis']
             for i in columns_to_delete:
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Awards.py
+Package: resq
+Version comment: Threshold tables of the ESO Angels Awards evaluated over whole columns of the statistics.
+"""
+
+import collections
+import numpy as np
+import pandas as pd
+from resqdb.Harmonization import _get_condition
+
+# The award levels from the lowest to the highest
+AWARDS = ['STROKEREADY', 'GOLD', 'PLATINUM', 'DIAMOND']
+
+# The indicator limits the award to the level of the band (low, high, award) including its value, the values out of all bands limit the award to STROKEREADY. If `when` is set, the indicator is evaluated only for the sites matching the condition (column, operator, operand), eg. only if some patients were eligible for the treatment.
+Indicator = collections.namedtuple('Indicator', ['column', 'bands', 'when'])
+Indicator.__new__.__defaults__ = (None,)
+
+# The bands of the door to treatment times
+DOOR_TO_TREATMENT_60 = ((50, 74.99, 'GOLD'), (75, np.inf, 'DIAMOND'))
+DOOR_TO_TREATMENT_45 = ((-np.inf, 49.99, 'PLATINUM'), (50, np.inf, 'DIAMOND'))
+# The bands of the recanalization rate
+RECANALIZATION_RATE = ((5, 14.99, 'GOLD'), (15, 24.99, 'PLATINUM'), (25, np.inf, 'DIAMOND'))
+# The bands of the processes (CT/MRI, dysphagia screening, antiplatelets and anticoagulants)
+PROCESSES = ((80, 84.99, 'GOLD'), (85, 89.99, 'PLATINUM'), (90, np.inf, 'DIAMOND'))
+# The bands of the stroke unit, the sites without stroke unit can't get DIAMOND
+STROKE_UNIT = ((-np.inf, 0.99, 'PLATINUM'), (1, np.inf, 'DIAMOND'))
+
+# The indicators evaluated after the door to treatment times
+QUALITY_INDICATORS = [
+    Indicator('% recanalization rate out of total ischemic incidence', RECANALIZATION_RATE),
+    Indicator('% suspected stroke patients undergoing CT/MRI', PROCESSES),
+    Indicator('% all stroke patients undergoing dysphagia screening', PROCESSES),
+    Indicator('% ischemic stroke patients discharged (home) with antiplatelets', PROCESSES),
+    Indicator('% afib patients discharged (home) with anticoagulants', PROCESSES),
+    Indicator('% stroke patients treated in a dedicated stroke unit / ICU', STROKE_UNIT),
+]
+
+# The thrombectomy is evaluated only if more than 3 patients were eligible for the thrombectomy
+ANGELS_AWARDS_INDICATORS = [
+    Indicator('% patients treated with door to thrombolysis < 60 minutes', DOOR_TO_TREATMENT_60),
+    Indicator('% patients treated with door to thrombolysis < 45 minutes', DOOR_TO_TREATMENT_45),
+    Indicator('% patients treated with door to thrombectomy < 120 minutes', DOOR_TO_TREATMENT_60, ('# patients eligible thrombectomy', '>', 3)),
+    Indicator('% patients treated with door to thrombectomy < 90 minutes', DOOR_TO_TREATMENT_45, ('# patients eligible thrombectomy', '>', 3)),
+] + QUALITY_INDICATORS
+
+# The old calculation uses the door to recanalization therapy (thrombolysis or thrombectomy alone)
+OLD_ANGELS_AWARDS_INDICATORS = [
+    Indicator('% patients treated with door to recanalization therapy < 60 minutes', DOOR_TO_TREATMENT_60),
+    Indicator('% patients treated with door to recanalization therapy < 45 minutes', DOOR_TO_TREATMENT_45),
+] + QUALITY_INDICATORS
+
+# Atalaia evaluates the thrombolysis only if some patients were eligible for the thrombolysis and the thrombectomy if some patients were eligible for the thrombectomy
+ATALAIA_ANGELS_AWARDS_INDICATORS = [
+    Indicator('% patients treated with door to thrombolysis < 60 minutes', DOOR_TO_TREATMENT_60, ('# patients eligible thrombolysis', 'not isin', (0,))),
+    Indicator('% patients treated with door to thrombolysis < 45 minutes', DOOR_TO_TREATMENT_45, ('# patients eligible thrombolysis', 'not isin', (0,))),
+    Indicator('% patients treated with door to thrombectomy < 90 minutes', DOOR_TO_TREATMENT_60, ('# patients eligible thrombectomy', 'not isin', (0,))),
+    Indicator('% patients treated with door to thrombectomy < 60 minutes', DOOR_TO_TREATMENT_45, ('# patients eligible thrombectomy', 'not isin', (0,))),
+] + QUALITY_INDICATORS
+
+
+def get_level(values, bands):
+    """ The function returning the award level of the values for the bands.
+
+    :param values: the values of the indicator
+    :type values: numpy array
+    :param bands: the tuple of bands (low, high, award)
+    :type bands: tuple
+    :returns: the array of the indexes of the awards in AWARDS
+    :rtype: numpy array
+    """
+    conditions = [(values >= low) & (values <= high) for low, high, award in bands]
+    choices = [AWARDS.index(award) for low, high, award in bands]
+
+    return np.select(conditions, choices, default=AWARDS.index('STROKEREADY'))
+
+
+def get_awards(stats, indicators, total_patients_column):
+    """ The function calculating the proposed awards of all sites. The award is the lowest level of all indicators, the sites with the value False in the total patients column get STROKEREADY.
+
+    :param stats: the dataframe with the statistics
+    :type stats: pandas dataframe
+    :param indicators: the list of indicators
+    :type indicators: list
+    :param total_patients_column: the name of the column saying if the site had enough patients
+    :type total_patients_column: str
+    :returns: the proposed awards and the names of the columns which capped the awards (empty for DIAMOND)
+    :rtype: tuple of pandas series
+    """
+    levels = np.full(len(stats), AWARDS.index('DIAMOND'))
+    capped_by = np.full(len(stats), '', dtype=object)
+
+    for indicator in indicators:
+        values = pd.to_numeric(stats[indicator.column], errors='coerce').to_numpy(dtype=float)
+        level = get_level(values, indicator.bands)
+        if indicator.when is not None:
+            level = np.where(_get_condition(stats, indicator.when), level, AWARDS.index('DIAMOND'))
+        # The indicator which lowered the award last is the first indicator with the final level
+        capped = level < levels
+        capped_by[capped] = indicator.column
+        levels = np.minimum(levels, level)
+
+    not_enough_patients = (stats[total_patients_column] == False).to_numpy()
+    levels[not_enough_patients] = AWARDS.index('STROKEREADY')
+    capped_by[not_enough_patients] = total_patients_column
+
+    awards = pd.Series(np.array(AWARDS, dtype=object)[levels], index=stats.index)
+    return awards, pd.Series(capped_by, index=stats.index)
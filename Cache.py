@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Cache.py
+Package: resq
+Version comment: Typed columnar cache (Parquet or Feather) of the exported and preprocessed data.
+"""
+
+import os
+import re
+import logging
+from datetime import datetime, date
+import pandas as pd
+
+
+class Cache:
+    """ The class storing the dataframes in the columnar format. Unlike csv, the datetimes, dates, times and categorical columns are stored with their types, so the data don't have to be parsed again when they are loaded. The files are named by the source and the export date, eg. `preprocessed_data_2020-09-14.parquet`. The cache requires the `pyarrow` package.
+
+    :param path: the folder with the cached files (default: cache folder in the working directory)
+    :type path: str
+    :param fmt: the format of the files, `parquet` or `feather`
+    :type fmt: str
+    """
+
+    def __init__(self, path=None, fmt='parquet'):
+
+        if fmt not in ['parquet', 'feather']:
+            raise ValueError('Unknown cache format {0}, use parquet or feather.'.format(fmt))
+
+        self.path = path if path is not None else os.path.join(os.getcwd(), 'cache')
+        self.fmt = fmt
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def _get_file(self, source, export_date):
+        """ The function returning the path to the cached file.
+
+        :param source: the name of the data (eg. preprocessed_data, raw_data, resq_raw_data)
+        :type source: str
+        :param export_date: the date of the export
+        :type export_date: date
+        :returns: the path to the file
+        :rtype: str
+        """
+        return os.path.join(self.path, '{0}_{1}.{2}'.format(source, export_date.strftime('%Y-%m-%d'), self.fmt))
+
+    def get_dates(self, source):
+        """ The function returning the export dates available in the cache for the source.
+
+        :param source: the name of the data
+        :type source: str
+        :returns: the sorted list of dates
+        :rtype: list
+        """
+        pattern = re.compile(r'^{0}_(\d{{4}}-\d{{2}}-\d{{2}})\.{1}$'.format(re.escape(source), self.fmt))
+        dates = []
+        for filename in os.listdir(self.path):
+            match = pattern.match(filename)
+            if match:
+                dates.append(datetime.strptime(match.group(1), '%Y-%m-%d').date())
+        return sorted(dates)
+
+    def _to_arrow(self, df):
+        """ The function preparing the dataframe to be stored. The object columns with mixed types (eg. numbers and strings) can't be stored in the columnar format, so they are converted to strings.
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :returns: the dataframe which can be stored
+        :rtype: DataFrame
+        """
+        import pyarrow as pa
+
+        df = df.reset_index(drop=True)
+        for column in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[column] = df[column].where(df[column].isnull(), df[column].astype(str))
+                logging.warning('Cache: Column {0} has mixed types and it has been converted to string.'.format(column))
+        # The column names have to be strings
+        df.columns = [str(c) for c in df.columns]
+        return df
+
+    def save(self, df, source, export_date=None):
+        """ The function saving the dataframe into the cache.
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :param source: the name of the data (eg. preprocessed_data, raw_data, resq_raw_data)
+        :type source: str
+        :param export_date: the date of the export (default: today)
+        :type export_date: date
+        :returns: the path to the file
+        :rtype: str
+        """
+        if export_date is None:
+            export_date = date.today()
+
+        path = self._get_file(source, export_date)
+        df = self._to_arrow(df)
+        if self.fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_feather(path)
+        logging.info('Cache: {0} rows of {1} have been saved into {2}.'.format(len(df), source, path))
+        return path
+
+    def load(self, source, export_date=None, columns=None):
+        """ The function loading the dataframe from the cache. Only the selected columns are read from the file.
+
+        :param source: the name of the data
+        :type source: str
+        :param export_date: the date of the export (default: the latest export)
+        :type export_date: date
+        :param columns: the list of columns to be read (default: all columns)
+        :type columns: list
+        :returns: the dataframe or None if the data are not in the cache
+        :rtype: DataFrame
+        """
+        if export_date is None:
+            dates = self.get_dates(source)
+            if not dates:
+                return None
+            export_date = dates[-1]
+
+        path = self._get_file(source, export_date)
+        if not os.path.exists(path):
+            return None
+
+        if self.fmt == 'parquet':
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = pd.read_feather(path, columns=columns)
+        logging.info('Cache: {0} rows of {1} have been loaded from {2}.'.format(len(df), source, path))
+        return df
+
+    def save_connection(self, connection, export_date=None, cube=False, country_code=''):
+        """ The function saving the data exported by the Connection object, the raw data of each table (`dictdb_df`), the merged raw data (`df`) and the preprocessed data (`preprocessed_data`).
+
+        :param connection: the connection object
+        :type connection: Connection
+        :param export_date: the date of the export (default: today)
+        :type export_date: date
+        :param cube: the partial aggregates of the checked data are calculated and saved too (see :class:`resqdb.Cube.Cube`)
+        :type cube: bool
+        :param country_code: the country code of the aggregates, the populations are adjusted for some countries (eg. CZ)
+        :type country_code: str
+        """
+        for k, v in connection.dictdb_df.items():
+            self.save(v, '{0}_raw_data'.format(k), export_date)
+        if hasattr(connection, 'df'):
+            self.save(connection.df, 'raw_data', export_date)
+        self.save(connection.preprocessed_data, 'preprocessed_data', export_date)
+        if cube:
+            from resqdb.Cube import Cube
+            Cube(connection.preprocessed_data, country_code=country_code).save(self, export_date)
@@ -16,6 +16,10 @@ import logging
 import scipy.stats as st
 from scipy.stats import sem, t
 from scipy import mean
+from resqdb.Metrics import MetricRegistry, MaskCache, Any, METRICS, ANGELS_AWARDS, get_site_values, get_percentage, get_columns, get_median_intervals
+from resqdb.Rollup import get_runs
+from resqdb.Awards import get_awards, ANGELS_AWARDS_INDICATORS, OLD_ANGELS_AWARDS_INDICATORS
+from resqdb.Schema import apply_schema
 
 class FilterDataset:
     """ The class filtrating the dataframe by date or by country. 
@@ -105,6 +109,64 @@ class FilterDataset:
         return df
 
 
+class ComputePeriodStats:
+    """ The class calculating the statistics for more periods in one pass. Each patient is assigned to all periods including the date of the patient (eg. the month and the whole year), so the data are not filtered and calculated again for each period. The metrics from the metric registry are calculated grouped by the period and the site and the results are returned in one long-form dataframe with one row per period and site.
+
+    :param df: the dataframe containing preprocessed data
+    :type df: dataframe
+    :param periods: the periods as the dictionary {name: (date1, date2)}, the first and the last date are included in the period
+    :type periods: dict
+    :param metrics: the list of the metrics to be calculated from the metric registry (default: all metrics)
+    :type metrics: list
+    :param country_code: the country code, the populations are adjusted for some countries (eg. CZ)
+    :type country_code: str
+    :param column: the column used as main for filtration (DISCHARGE_DATE or HOSPITAL_DATE)
+    :type column: str
+    """
+
+    def __init__(self, df, periods, metrics=None, country_code='', column='DISCHARGE_DATE'):
+
+        self.periods = periods
+        self.df = self._get_period_data(df, column, country_code)
+
+        self.statsDf = self.df.groupby(['Period', 'Protocol ID', 'Site Name'], sort=False).size().reset_index(name='Total Patients')
+        # Keep the order of the periods, the names of the periods can be of different types (eg. months and year)
+        order = {name: i for i, name in enumerate(self.periods.keys())}
+        self.statsDf['order'] = self.statsDf['Period'].map(order)
+        self.statsDf = self.statsDf.sort_values(['order', 'Protocol ID']).drop(['order'], axis=1).reset_index(drop=True)
+
+        if metrics is None:
+            metrics = [metric.name for metric in METRICS]
+        self.statsDf = MetricRegistry(self.df, self.statsDf, country_code=country_code, keys=('Period', 'Protocol ID'), partition='Period').compute(metrics)
+        logging.info('ComputePeriodStats: Statistics have been calculated for {0} periods!'.format(len(self.periods)))
+
+    def _get_period_data(self, df, column, country_code):
+        """ The function assigning the patients to the periods. The patient included in more periods is repeated for each period, only the columns used by the metric registry are kept.
+
+        :param df: the dataframe containing preprocessed data
+        :type df: dataframe
+        :param column: the date column
+        :type column: str
+        :param country_code: the country code
+        :type country_code: str
+        :returns: the dataframe with the column Period
+        :rtype: dataframe
+        """
+        names = list(self.periods.keys())
+        starts = pd.to_datetime([self.periods[name][0] for name in names]).to_numpy()
+        ends = pd.to_datetime([self.periods[name][1] for name in names]).to_numpy()
+        dates = pd.to_datetime(df[column]).to_numpy()
+
+        # The matrix of memberships, the rows are the patients and the columns are the periods
+        membership = (dates[:, None] >= starts[None, :]) & (dates[:, None] <= ends[None, :])
+        rows, periods = np.nonzero(membership)
+
+        columns = ['Protocol ID', 'Site Name'] + [x for x in get_columns(country_code) if x in df.columns and x not in ['Protocol ID', 'Site Name']]
+        period_df = df[columns].take(rows).reset_index(drop=True)
+        period_df.insert(0, 'Period', pd.Series(np.array(names, dtype=object)[periods]))
+
+        return period_df
+
 
 class ComputeStats:
     """ The class calculating the general statistics from the preprocessed and filtered data. 
@@ -121,16 +183,26 @@ class ComputeStats:
     :type patiet_limit: int
     :param period: the name of the period (default is None)
     :type period: str
+    :param metrics: the list of the metrics to be calculated from the metric registry, eg. `['Proposed Award']` calculates only the Angels Awards (default: all statistics are calculated). Only the columns used by the registry are kept, the missing values are not replaced and the results for whole country are calculated by grouping the patients by the country, so the data are not duplicated.
+    :type metrics: list
     """
 
 
-    def __init__(self, df, country = False, country_code = "", comparison=False, patient_limit=30, period=None, raw_data=None):
+    def __init__(self, df, country = False, country_code = "", comparison=False, patient_limit=30, period=None, raw_data=None, metrics=None):
 
-        self.df = df.copy()
-        self.df.fillna(0, inplace=True)
+        if metrics is not None:
+            # Only the columns used by the metric registry are kept, the missing values are handled by the conditions
+            columns = ['Protocol ID', 'Site Name', 'ESO Angels name', 'Country'] + get_columns(country_code)
+            self.df = df.loc[:, [x for x in dict.fromkeys(columns) if x in df.columns]]
+        else:
+            self.df = df.copy()
+            self.df.fillna(0, inplace=True)
+        # The coded answers are compared with the numeric codes
+        apply_schema(self.df)
         self.patient_limit = patient_limit
         self.period = period
         self.raw_data = raw_data
+        self._crosstab = None
 
         # Rename 'RES-Q reports name' column to 'Site Name'
         if 'ESO Angels name' in self.df.columns:
@@ -160,7 +232,10 @@ class ComputeStats:
             #if self.df['Protocol ID'].dtype == np.object:
                 #self.df['Site Name'] = self.df.apply(lambda x: get_country_name(x['Protocol ID']) if get_country_name(x['Protocol ID']) != "" else x['Protocol ID'], axis=1)
         
-        if (country):
+        if country and metrics is not None:
+            # The country is calculated from the same rows grouped by the country instead of the site
+            self._country_name = self.df['Country'].iloc[0]
+        elif (country):
             country_df = self.df.copy()
             #self.country_name = pytz.country_names[country_code]
            # country['Protocol ID'] = self.country_name
@@ -173,62 +248,79 @@ class ComputeStats:
             self._country_name = ""
         
         self.statsDf = self.df.groupby(['Protocol ID', 'Site Name']).size().reset_index(name="Total Patients")
+        if country and metrics is not None:
+            country_stats = self.df.groupby(['Country']).size().reset_index(name="Total Patients")
+            country_stats['Protocol ID'] = country_stats['Country']
+            country_stats['Site Name'] = country_stats['Country']
+            self.statsDf = pd.concat([self.statsDf, country_stats]).sort_values(['Protocol ID', 'Site Name']).reset_index(drop=True)
         # self.statsDf['Site Name'] = 
 
         self.statsDf = self.statsDf[['Protocol ID', 'Site Name', 'Total Patients']]
+
+        # The subsets of the patients are defined by the conditions and evaluated from the cached masks
+        self._masks = MaskCache(self.df)
+
+        # Calculate only the selected metrics
+        if metrics is not None:
+            self._compute_metrics(metrics, country_code, totals='Country' if country else None)
+            self.statsDf.rename(columns={"Protocol ID": "Site ID"}, inplace=True)
+            self.statsDf.drop_duplicates(inplace=True)
+            self.sites = self._get_sites(self.statsDf)
+            return
+
         self.statsDf['Median patient age'] = self.df.groupby(['Protocol ID']).AGE.agg(['median']).rename(columns={'median': 'Median patient age'})['Median patient age'].tolist()
 
         # get patietns with ischemic stroke (ISch) (1)
-        isch = self.df[self.df['STROKE_TYPE'].isin([1])]
-        self.statsDf['isch_patients'] = self._count_patients(dataframe=isch)
+        isch = (('STROKE_TYPE', 'isin', (1,)),)
+        self.statsDf['isch_patients'] = self._count_population(isch)
 
         # get patietns with ischemic stroke (IS), intracerebral hemorrhage (ICH), transient ischemic attack (TIA) or cerebral venous thrombosis (CVT) (1, 2, 3, 5)
-        is_ich_tia_cvt = self.df[self.df['STROKE_TYPE'].isin([1, 2, 3, 5])]
-        self.statsDf['is_ich_tia_cvt_patients'] = self._count_patients(dataframe=is_ich_tia_cvt)
+        is_ich_tia_cvt = (('STROKE_TYPE', 'isin', (1, 2, 3, 5)),)
+        self.statsDf['is_ich_tia_cvt_patients'] = self._count_population(is_ich_tia_cvt)
 
         # get patietns with ischemic stroke (IS), intracerebral hemorrhage (ICH), or cerebral venous thrombosis (CVT) (1, 2, 5)
-        is_ich_cvt = self.df[self.df['STROKE_TYPE'].isin([1, 2, 5])]
-        self.statsDf['is_ich_cvt_patients'] = self._count_patients(dataframe=is_ich_cvt)
+        is_ich_cvt = (('STROKE_TYPE', 'isin', (1, 2, 5)),)
+        self.statsDf['is_ich_cvt_patients'] = self._count_population(is_ich_cvt)
 
         # Get dataframe with patients who had ischemic stroke (IS) or intracerebral hemorrhage (ICH)
-        is_ich = self.df[self.df['STROKE_TYPE'].isin([1,2])]
-        self.statsDf['is_ich_patients'] = self._count_patients(dataframe=is_ich)
+        is_ich = (('STROKE_TYPE', 'isin', (1, 2)),)
+        self.statsDf['is_ich_patients'] = self._count_population(is_ich)
 
         # get patietns with ischemic stroke (IS) and transient ischemic attack (TIA) (1, 3)
-        is_tia = self.df[self.df['STROKE_TYPE'].isin([1, 3])]
-        self.statsDf['is_tia_patients'] = self._count_patients(dataframe=is_tia)
+        is_tia = (('STROKE_TYPE', 'isin', (1, 3)),)
+        self.statsDf['is_tia_patients'] = self._count_population(is_tia)
 
         # get patietns with ischemic stroke (IS), intracerebral hemorrhage (ICH), subarrachnoid hemorrhage (SAH) or cerebral venous thrombosis (CVT) (1, 2, 4, 5)
-        is_ich_sah_cvt = self.df[self.df['STROKE_TYPE'].isin([1, 2, 4, 5])]
-        self.statsDf['is_ich_sah_cvt_patients'] = self._count_patients(dataframe=is_ich_sah_cvt)
+        is_ich_sah_cvt = (('STROKE_TYPE', 'isin', (1, 2, 4, 5)),)
+        self.statsDf['is_ich_sah_cvt_patients'] = self._count_population(is_ich_sah_cvt)
 
         # get patietns with ischemic stroke (IS), transient ischemic attack (TIA) or cerebral venous thrombosis (CVT) (1, 3, 5)
-        is_tia_cvt = self.df[self.df['STROKE_TYPE'].isin([1, 3, 5])]
-        self.statsDf['is_tia_cvt_patients'] = self._count_patients(dataframe=is_tia_cvt)
+        is_tia_cvt = (('STROKE_TYPE', 'isin', (1, 3, 5)),)
+        self.statsDf['is_tia_cvt_patients'] = self._count_population(is_tia_cvt)
 
         # get patients with cerebral venous thrombosis (CVT) (5)
-        cvt = self.df[self.df['STROKE_TYPE'].isin([5])]
-        self.statsDf['cvt_patients'] = self._count_patients(dataframe=cvt)
+        cvt = (('STROKE_TYPE', 'isin', (5,)),)
+        self.statsDf['cvt_patients'] = self._count_population(cvt)
 
         # get patietns with intracerebral hemorrhage (ICH) and subarrachnoid hemorrhage (SAH) (2, 4)
-        ich_sah = self.df[self.df['STROKE_TYPE'].isin([2, 4])]
-        self.statsDf['ich_sah_patients'] = self._count_patients(dataframe=ich_sah)
+        ich_sah = (('STROKE_TYPE', 'isin', (2, 4)),)
+        self.statsDf['ich_sah_patients'] = self._count_population(ich_sah)
         
         # get patietns with intracerebral hemorrhage (ICH) (2)
-        ich = self.df[self.df['STROKE_TYPE'].isin([2])]
-        self.statsDf['ich_patients'] = self._count_patients(dataframe=ich)
+        ich = (('STROKE_TYPE', 'isin', (2,)),)
+        self.statsDf['ich_patients'] = self._count_population(ich)
 
         # get patietns with subarrachnoid hemorrhage (SAH) (4)
-        sah = self.df[self.df['STROKE_TYPE'].isin([4])]
-        self.statsDf['sah_patients'] = self._count_patients(dataframe=sah)
+        sah = (('STROKE_TYPE', 'isin', (4,)),)
+        self.statsDf['sah_patients'] = self._count_population(sah)
 
         # create subset with no referrals (RECANALIZATION_PROCEDURE != [5,6]) AND (HEMICRANIECTOMY != 3)
-        discharge_subset = self.df[~self.df['RECANALIZATION_PROCEDURES'].isin([5, 6]) & ~self.df['HEMICRANIECTOMY'].isin([3])]
-        self.statsDf['discharge_subset_patients'] = self._count_patients(dataframe=discharge_subset)
+        discharge_subset = (('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)), ('HEMICRANIECTOMY', 'not isin', (3,)))
+        self.statsDf['discharge_subset_patients'] = self._count_population(discharge_subset)
 
         # Create discharge subset alive
-        discharge_subset_alive = self.df[~self.df['DISCHARGE_DESTINATION'].isin([5])]
-        self.statsDf['discharge_subset_alive_patients'] = self._count_patients(dataframe=discharge_subset_alive)
+        discharge_subset_alive = (('DISCHARGE_DESTINATION', 'not isin', (5,)),)
+        self.statsDf['discharge_subset_alive_patients'] = self._count_population(discharge_subset_alive)
 
 
         ##########
@@ -236,28 +328,28 @@ class ComputeStats:
         ##########
         self.tmp = self.df.groupby(['Protocol ID', 'GENDER']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="GENDER", value=2, new_column_name='# patients female')
-        self.statsDf['% patients female'] = self.statsDf.apply(lambda x: round(((x['# patients female']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients female'] = self._get_percentage(self.statsDf['# patients female'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="GENDER", value=1, new_column_name='# patients male')
-        self.statsDf['% patients male'] = self.statsDf.apply(lambda x: round(((x['# patients male']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients male'] = self._get_percentage(self.statsDf['# patients male'], self.statsDf['Total Patients'])
 
         # tag::prenotification[]
         ####################
         # PRE-NOTIFICATION #
         ####################
-        pt_3_form_version = self.df.loc[self.df['crf_parent_name'] == 'F_RESQV20DEV_PT_3'].copy()
-        self.statsDf['pt_3_form_total_patients'] = self._count_patients(dataframe=pt_3_form_version)
-        if not pt_3_form_version.empty:
+        pt_3_form_version = (('crf_parent_name', '==', 'F_RESQV20DEV_PT_3'),)
+        self.statsDf['pt_3_form_total_patients'] = self._count_population(pt_3_form_version)
+        if not self._masks.is_empty(pt_3_form_version):
             if country_code == 'PT': 
                 # prenotification
                 column = 'PRENOTIFICATION'
                 if column in df.columns:
-                    self.tmp = pt_3_form_version.groupby(['Protocol ID', column]).size().to_frame('count').reset_index()
+                    self.tmp = self._get_population_values(pt_3_form_version, column)
                     self.statsDf = self._get_values_for_factors(column_name=column, value=1, new_column_name='# pre-notification - Yes')
-                    self.statsDf['% pre-notification - Yes'] = self.statsDf.apply(lambda x: round(((x['# pre-notification - Yes']/x['pt_3_form_total_patients']) * 100), 2) if x['pt_3_form_total_patients'] > 0 else 0, axis=1)
+                    self.statsDf['% pre-notification - Yes'] = self._get_percentage(self.statsDf['# pre-notification - Yes'], self.statsDf['pt_3_form_total_patients'])
                     self.statsDf = self._get_values_for_factors(column_name=column, value=2, new_column_name='# pre-notification - No')
-                    self.statsDf['% pre-notification - No'] = self.statsDf.apply(lambda x: round(((x['# pre-notification - No']/x['pt_3_form_total_patients']) * 100), 2) if x['pt_3_form_total_patients'] > 0 else 0, axis=1)
+                    self.statsDf['% pre-notification - No'] = self._get_percentage(self.statsDf['# pre-notification - No'], self.statsDf['pt_3_form_total_patients'])
                     self.statsDf = self._get_values_for_factors(column_name=column, value=3, new_column_name='# pre-notification - Not known')
-                    self.statsDf['% pre-notification - Not known'] = self.statsDf.apply(lambda x: round(((x['# pre-notification - Not known']/x['pt_3_form_total_patients']) * 100), 2) if x['pt_3_form_total_patients'] > 0 else 0, axis=1)
+                    self.statsDf['% pre-notification - Not known'] = self._get_percentage(self.statsDf['# pre-notification - Not known'], self.statsDf['pt_3_form_total_patients'])
                 del column
             # end::prenotification[]
 
@@ -269,11 +361,11 @@ class ComputeStats:
                 # MRS prior to stroke
                 column = 'MRS_PRIOR_STROKE'
                 if column in df.columns:
-                    # modify values to represent real values of mRS eg. 1 -> 0 etc.
-                    pt_3_form_version.loc[:, 'ADJUSTED_MRS_PRIOR_STROKE'] = pt_3_form_version[column] - 1
                     # now our unknown is 7
-                    prior_mrs_known = pt_3_form_version.loc[~pt_3_form_version[column].isin([7])].copy()
-                    self.statsDf = self.statsDf.merge(prior_mrs_known.groupby(['Protocol ID']).ADJUSTED_MRS_PRIOR_STROKE.agg(['median']).rename(columns={'median': 'Median mRS prior to stroke'})['Median mRS prior to stroke'].reset_index(), how='outer')
+                    prior_mrs_known = self._get_population(pt_3_form_version + ((column, 'not isin', (7,)),), ['Protocol ID', column])
+                    # modify values to represent real values of mRS eg. 1 -> 0 etc.
+                    prior_mrs_known['ADJUSTED_MRS_PRIOR_STROKE'] = prior_mrs_known[column] - 1
+                    self.statsDf['Median mRS prior to stroke'] = self._get_median(prior_mrs_known, 'ADJUSTED_MRS_PRIOR_STROKE')
                 del column
             # end::mrs_prior_stroke[]
         del pt_3_form_version
@@ -285,9 +377,9 @@ class ComputeStats:
         ######################
         self.tmp = self.df.groupby(['Protocol ID', 'HOSPITAL_STROKE']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="HOSPITAL_STROKE", value=1, new_column_name='# patients having stroke in the hospital - Yes')
-        self.statsDf['% patients having stroke in the hospital - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients having stroke in the hospital - Yes']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients having stroke in the hospital - Yes'] = self._get_percentage(self.statsDf['# patients having stroke in the hospital - Yes'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="HOSPITAL_STROKE", value=2, new_column_name='# patients having stroke in the hospital - No')
-        self.statsDf['% patients having stroke in the hospital - No'] = self.statsDf.apply(lambda x: round(((x['# patients having stroke in the hospital - No']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients having stroke in the hospital - No'] = self._get_percentage(self.statsDf['# patients having stroke in the hospital - No'], self.statsDf['Total Patients'])
 
         ####################
         # RECURRENT STROKE #
@@ -295,9 +387,9 @@ class ComputeStats:
         self.tmp = self.df.groupby(['Protocol ID', 'RECURRENT_STROKE']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="RECURRENT_STROKE", value=-999, new_column_name='tmp')
         self.statsDf = self._get_values_for_factors(column_name="RECURRENT_STROKE", value=1, new_column_name='# recurrent stroke - Yes')
-        self.statsDf['% recurrent stroke - Yes'] = self.statsDf.apply(lambda x: round(((x['# recurrent stroke - Yes']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% recurrent stroke - Yes'] = self._get_percentage(self.statsDf['# recurrent stroke - Yes'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="RECURRENT_STROKE", value=2, new_column_name='# recurrent stroke - No')
-        self.statsDf['% recurrent stroke - No'] = self.statsDf.apply(lambda x: round(((x['# recurrent stroke - No']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% recurrent stroke - No'] = self._get_percentage(self.statsDf['# recurrent stroke - No'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ###################
@@ -307,17 +399,17 @@ class ComputeStats:
         # Get patients from old version
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=-999, new_column_name='tmp')
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=1, new_column_name='# department type - neurology')
-        self.statsDf['% department type - neurology'] = self.statsDf.apply(lambda x: round(((x['# department type - neurology']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - neurology'] = self._get_percentage(self.statsDf['# department type - neurology'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=2, new_column_name='# department type - neurosurgery')
-        self.statsDf['% department type - neurosurgery'] = self.statsDf.apply(lambda x: round(((x['# department type - neurosurgery']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - neurosurgery'] = self._get_percentage(self.statsDf['# department type - neurosurgery'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=3, new_column_name='# department type - anesthesiology/resuscitation/critical care')
-        self.statsDf['% department type - anesthesiology/resuscitation/critical care'] = self.statsDf.apply(lambda x: round(((x['# department type - anesthesiology/resuscitation/critical care']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - anesthesiology/resuscitation/critical care'] = self._get_percentage(self.statsDf['# department type - anesthesiology/resuscitation/critical care'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=4, new_column_name='# department type - internal medicine')
-        self.statsDf['% department type - internal medicine'] = self.statsDf.apply(lambda x: round(((x['# department type - internal medicine']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - internal medicine'] = self._get_percentage(self.statsDf['# department type - internal medicine'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=5, new_column_name='# department type - geriatrics')
-        self.statsDf['% department type - geriatrics'] = self.statsDf.apply(lambda x: round(((x['# department type - geriatrics']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - geriatrics'] = self._get_percentage(self.statsDf['# department type - geriatrics'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors(column_name="DEPARTMENT_TYPE", value=6, new_column_name='# department type - Other')
-        self.statsDf['% department type - Other'] = self.statsDf.apply(lambda x: round(((x['# department type - Other']/(x['Total Patients'] - x['tmp'])) * 100), 2) if (x['Total Patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department type - Other'] = self._get_percentage(self.statsDf['# department type - Other'], self.statsDf['Total Patients'] - self.statsDf['tmp'])
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ###################
@@ -325,82 +417,82 @@ class ComputeStats:
         ###################
         self.tmp = self.df.groupby(['Protocol ID', 'HOSPITALIZED_IN']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="HOSPITALIZED_IN", value=1, new_column_name='# patients hospitalized in stroke unit / ICU')
-        self.statsDf['% patients hospitalized in stroke unit / ICU'] = self.statsDf.apply(lambda x: round(((x['# patients hospitalized in stroke unit / ICU']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients hospitalized in stroke unit / ICU'] = self._get_percentage(self.statsDf['# patients hospitalized in stroke unit / ICU'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="HOSPITALIZED_IN", value=2, new_column_name='# patients hospitalized in monitored bed with telemetry')
-        self.statsDf['% patients hospitalized in monitored bed with telemetry'] = self.statsDf.apply(lambda x: round(((x['# patients hospitalized in monitored bed with telemetry']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients hospitalized in monitored bed with telemetry'] = self._get_percentage(self.statsDf['# patients hospitalized in monitored bed with telemetry'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="HOSPITALIZED_IN", value=3, new_column_name='# patients hospitalized in standard bed')
-        self.statsDf['% patients hospitalized in standard bed'] = self.statsDf.apply(lambda x: round(((x['# patients hospitalized in standard bed']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients hospitalized in standard bed'] = self._get_percentage(self.statsDf['# patients hospitalized in standard bed'], self.statsDf['Total Patients'])
 
         self.statsDf['# patients hospitalized in stroke unit / ICU or monitored bed'] = self.statsDf['# patients hospitalized in stroke unit / ICU'] + self.statsDf['# patients hospitalized in monitored bed with telemetry']
-        self.statsDf['% patients hospitalized in stroke unit / ICU or monitored bed'] = self.statsDf.apply(lambda x: round(((x['# patients hospitalized in stroke unit / ICU or monitored bed']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients hospitalized in stroke unit / ICU or monitored bed'] = self._get_percentage(self.statsDf['# patients hospitalized in stroke unit / ICU or monitored bed'], self.statsDf['Total Patients'])
 
                 
         ###############################
         # ASSESSED FOR REHABILITATION #
         ###############################
-        self.tmp = is_ich_sah_cvt.groupby(['Protocol ID', 'ASSESSED_FOR_REHAB']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(is_ich_sah_cvt, 'ASSESSED_FOR_REHAB')
         self.statsDf = self._get_values_for_factors(column_name="ASSESSED_FOR_REHAB", value=3, new_column_name='# patients assessed for rehabilitation - Not known')
-        self.statsDf['% patients assessed for rehabilitation - Not known'] = self.statsDf.apply(lambda x: round(((x['# patients assessed for rehabilitation - Not known']/x['is_ich_sah_cvt_patients']) * 100), 2) if x['is_ich_sah_cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% patients assessed for rehabilitation - Not known'] = self._get_percentage(self.statsDf['# patients assessed for rehabilitation - Not known'], self.statsDf['is_ich_sah_cvt_patients'])
         self.statsDf = self._get_values_for_factors(column_name="ASSESSED_FOR_REHAB", value=1, new_column_name='# patients assessed for rehabilitation - Yes')
-        self.statsDf['% patients assessed for rehabilitation - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients assessed for rehabilitation - Yes']/(x['is_ich_sah_cvt_patients'] - x['# patients assessed for rehabilitation - Not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# patients assessed for rehabilitation - Not known']) > 0 else 0, axis=1)
+        self.statsDf['% patients assessed for rehabilitation - Yes'] = self._get_percentage(self.statsDf['# patients assessed for rehabilitation - Yes'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# patients assessed for rehabilitation - Not known'])
         self.statsDf = self._get_values_for_factors(column_name="ASSESSED_FOR_REHAB", value=2, new_column_name='# patients assessed for rehabilitation - No')
-        self.statsDf['% patients assessed for rehabilitation - No'] = self.statsDf.apply(lambda x: round(((x['# patients assessed for rehabilitation - No']/(x['is_ich_sah_cvt_patients'] - x['# patients assessed for rehabilitation - Not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# patients assessed for rehabilitation - Not known']) > 0 else 0, axis=1)
+        self.statsDf['% patients assessed for rehabilitation - No'] = self._get_percentage(self.statsDf['# patients assessed for rehabilitation - No'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# patients assessed for rehabilitation - Not known'])
 
         ###############
         # STROKE TYPE #
         ###############
         self.tmp = self.df.groupby(['Protocol ID', 'STROKE_TYPE']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=1, new_column_name='# stroke type - ischemic stroke')
-        self.statsDf['% stroke type - ischemic stroke'] = self.statsDf.apply(lambda x: round(((x['# stroke type - ischemic stroke']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - ischemic stroke'] = self._get_percentage(self.statsDf['# stroke type - ischemic stroke'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=2, new_column_name='# stroke type - intracerebral hemorrhage')
-        self.statsDf['% stroke type - intracerebral hemorrhage'] = self.statsDf.apply(lambda x: round(((x['# stroke type - intracerebral hemorrhage']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - intracerebral hemorrhage'] = self._get_percentage(self.statsDf['# stroke type - intracerebral hemorrhage'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=3, new_column_name='# stroke type - transient ischemic attack')
-        self.statsDf['% stroke type - transient ischemic attack'] = self.statsDf.apply(lambda x: round(((x['# stroke type - transient ischemic attack']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - transient ischemic attack'] = self._get_percentage(self.statsDf['# stroke type - transient ischemic attack'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=4, new_column_name='# stroke type - subarrachnoid hemorrhage')
-        self.statsDf['% stroke type - subarrachnoid hemorrhage'] = self.statsDf.apply(lambda x: round(((x['# stroke type - subarrachnoid hemorrhage']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - subarrachnoid hemorrhage'] = self._get_percentage(self.statsDf['# stroke type - subarrachnoid hemorrhage'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=5, new_column_name='# stroke type - cerebral venous thrombosis')
-        self.statsDf['% stroke type - cerebral venous thrombosis'] = self.statsDf.apply(lambda x: round(((x['# stroke type - cerebral venous thrombosis']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - cerebral venous thrombosis'] = self._get_percentage(self.statsDf['# stroke type - cerebral venous thrombosis'], self.statsDf['Total Patients'])
         self.statsDf = self._get_values_for_factors(column_name="STROKE_TYPE", value=6, new_column_name='# stroke type - undetermined stroke')
-        self.statsDf['% stroke type - undetermined stroke'] = self.statsDf.apply(lambda x: round(((x['# stroke type - undetermined stroke']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+        self.statsDf['% stroke type - undetermined stroke'] = self._get_percentage(self.statsDf['# stroke type - undetermined stroke'], self.statsDf['Total Patients'])
 
         #######################
         # CONSCIOUSNESS LEVEL #
         #######################
-        self.tmp = is_ich_sah_cvt.groupby(['Protocol ID', 'CONSCIOUSNESS_LEVEL']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(is_ich_sah_cvt, 'CONSCIOUSNESS_LEVEL')
         self.statsDf = self._get_values_for_factors(column_name="CONSCIOUSNESS_LEVEL", value=5, new_column_name='# level of consciousness - not known')
-        self.statsDf['% level of consciousness - not known'] = self.statsDf.apply(lambda x: round(((x['# level of consciousness - not known']/x['is_ich_sah_cvt_patients']) * 100), 2) if x['is_ich_sah_cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% level of consciousness - not known'] = self._get_percentage(self.statsDf['# level of consciousness - not known'], self.statsDf['is_ich_sah_cvt_patients'])
         self.statsDf = self._get_values_for_factors(column_name="CONSCIOUSNESS_LEVEL", value=1, new_column_name='# level of consciousness - alert')
-        self.statsDf['% level of consciousness - alert'] = self.statsDf.apply(lambda x: round(((x['# level of consciousness - alert']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['% level of consciousness - alert'] = self._get_percentage(self.statsDf['# level of consciousness - alert'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         self.statsDf = self._get_values_for_factors(column_name="CONSCIOUSNESS_LEVEL", value=2, new_column_name='# level of consciousness - drowsy')
-        self.statsDf['% level of consciousness - drowsy'] = self.statsDf.apply(lambda x: round(((x['# level of consciousness - drowsy']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['% level of consciousness - drowsy'] = self._get_percentage(self.statsDf['# level of consciousness - drowsy'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         self.statsDf = self._get_values_for_factors(column_name="CONSCIOUSNESS_LEVEL", value=3, new_column_name='# level of consciousness - comatose')
-        self.statsDf['% level of consciousness - comatose'] = self.statsDf.apply(lambda x: round(((x['# level of consciousness - comatose']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['% level of consciousness - comatose'] = self._get_percentage(self.statsDf['# level of consciousness - comatose'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         self.statsDf = self._get_values_for_factors(column_name="CONSCIOUSNESS_LEVEL", value=4, new_column_name='# level of consciousness - GCS')
-        self.statsDf['% level of consciousness - GCS'] = self.statsDf.apply(lambda x: round(((x['# level of consciousness - GCS']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['% level of consciousness - GCS'] = self._get_percentage(self.statsDf['# level of consciousness - GCS'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
 
         #######
         # GCS #
         #######
         # Get temporary dataframe with the level of consciousness - GCS
-        gcs = is_ich_sah_cvt[is_ich_sah_cvt['CONSCIOUSNESS_LEVEL'].isin([4])].copy()
+        gcs = is_ich_sah_cvt + (('CONSCIOUSNESS_LEVEL', 'isin', (4,)),)
         # Calculate total number of patients with GCS level of consciousness per site
-        self.statsDf['gcs_patients'] = self._count_patients(dataframe=gcs)
-        self.tmp = gcs.groupby(['Protocol ID', 'GCS']).size().to_frame('count').reset_index()
+        self.statsDf['gcs_patients'] = self._count_population(gcs)
+        self.tmp = self._get_population_values(gcs, 'GCS')
         self.statsDf = self._get_values_for_factors(column_name="GCS", value=1, new_column_name='# GCS - 15-13')
-        self.statsDf['% GCS - 15-13'] = self.statsDf.apply(lambda x: round(((x['# GCS - 15-13']/x['gcs_patients']) * 100), 2) if x['gcs_patients'] > 0 else 0, axis=1)
+        self.statsDf['% GCS - 15-13'] = self._get_percentage(self.statsDf['# GCS - 15-13'], self.statsDf['gcs_patients'])
         self.statsDf = self._get_values_for_factors(column_name="GCS", value=2, new_column_name='# GCS - 12-8')
-        self.statsDf['% GCS - 12-8'] = self.statsDf.apply(lambda x: round(((x['# GCS - 12-8']/x['gcs_patients']) * 100), 2) if x['gcs_patients'] > 0 else 0, axis=1)
+        self.statsDf['% GCS - 12-8'] = self._get_percentage(self.statsDf['# GCS - 12-8'], self.statsDf['gcs_patients'])
         self.statsDf = self._get_values_for_factors(column_name="GCS", value=3, new_column_name='# GCS - <8')
-        self.statsDf['% GCS - <8'] = self.statsDf.apply(lambda x: round(((x['# GCS - <8']/x['gcs_patients']) * 100), 2) if x['gcs_patients'] > 0 else 0, axis=1)
+        self.statsDf['% GCS - <8'] = self._get_percentage(self.statsDf['# GCS - <8'], self.statsDf['gcs_patients'])
         self.statsDf.drop(['gcs_patients'], inplace=True, axis=1)
 
         # GCS is mapped to the consciousness level. GCS 15-13 is mapped to alert, GCS 12-8 to drowsy and GCS < 8 to comatose
         self.statsDf['alert_all'] = self.statsDf['# level of consciousness - alert'] + self.statsDf['# GCS - 15-13']
-        self.statsDf['alert_all_perc'] = self.statsDf.apply(lambda x: round(((x['alert_all']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['alert_all_perc'] = self._get_percentage(self.statsDf['alert_all'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         self.statsDf['drowsy_all'] = self.statsDf['# level of consciousness - drowsy'] + self.statsDf['# GCS - 12-8']
-        self.statsDf['drowsy_all_perc'] = self.statsDf.apply(lambda x: round(((x['drowsy_all']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['drowsy_all_perc'] = self._get_percentage(self.statsDf['drowsy_all'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         self.statsDf['comatose_all'] = self.statsDf['# level of consciousness - comatose'] + self.statsDf['# GCS - <8']
-        self.statsDf['comatose_all_perc'] = self.statsDf.apply(lambda x: round(((x['comatose_all']/(x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known'])) * 100), 2) if (x['is_ich_sah_cvt_patients'] - x['# level of consciousness - not known']) > 0 else 0, axis=1)
+        self.statsDf['comatose_all_perc'] = self._get_percentage(self.statsDf['comatose_all'], self.statsDf['is_ich_sah_cvt_patients'] - self.statsDf['# level of consciousness - not known'])
         del gcs
 
         #########
@@ -408,60 +500,54 @@ class ComputeStats:
         #########
         # Seperate calculation for CZ 
         if country_code == 'CZ':
-            self.tmp = is_ich.groupby(['Protocol ID', 'NIHSS']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich, 'NIHSS')
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=1, new_column_name='# NIHSS - Not performed')
-            self.statsDf['% NIHSS - Not performed'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Not performed']/x['is_ich_patients']) * 100), 2) if x['is_ich_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Not performed'] = self._get_percentage(self.statsDf['# NIHSS - Not performed'], self.statsDf['is_ich_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=2, new_column_name='# NIHSS - Performed')
-            self.statsDf['% NIHSS - Performed'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Performed']/x['is_ich_patients']) * 100), 2) if x['is_ich_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Performed'] = self._get_percentage(self.statsDf['# NIHSS - Performed'], self.statsDf['is_ich_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=3, new_column_name='# NIHSS - Not known')
-            self.statsDf['% NIHSS - Not known'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Not known']/x['is_ich_patients']) * 100), 2) if x['is_ich_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Not known'] = self._get_percentage(self.statsDf['# NIHSS - Not known'], self.statsDf['is_ich_patients'])
             # Create temporary dataframe with patient who had performed NIHSS (NIHSS = 2)
-            nihss = is_ich[is_ich['NIHSS'].isin([2])]
-            tmpDf = nihss.groupby(['Protocol ID']).NIHSS_SCORE.agg(['median']).rename(columns={'median': 'NIHSS median score'})
-            factorDf = self.statsDf.merge(tmpDf, how='outer', left_on='Protocol ID', right_on='Protocol ID')
-            factorDf.fillna(0, inplace=True)
-            self.statsDf['NIHSS median score'] = factorDf['NIHSS median score']
+            nihss = is_ich + (('NIHSS', 'isin', (2,)),)
+            self.statsDf['NIHSS median score'] = self._get_median(self._get_population(nihss, ['Protocol ID', 'NIHSS_SCORE']), 'NIHSS_SCORE')
             
             del nihss
         else:
-            self.tmp = is_ich_cvt.groupby(['Protocol ID', 'NIHSS']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich_cvt, 'NIHSS')
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=1, new_column_name='# NIHSS - Not performed')
-            self.statsDf['% NIHSS - Not performed'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Not performed']/x['is_ich_cvt_patients']) * 100), 2) if x['is_ich_cvt_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Not performed'] = self._get_percentage(self.statsDf['# NIHSS - Not performed'], self.statsDf['is_ich_cvt_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=2, new_column_name='# NIHSS - Performed')
-            self.statsDf['% NIHSS - Performed'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Performed']/x['is_ich_cvt_patients']) * 100), 2) if x['is_ich_cvt_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Performed'] = self._get_percentage(self.statsDf['# NIHSS - Performed'], self.statsDf['is_ich_cvt_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NIHSS", value=3, new_column_name='# NIHSS - Not known')
-            self.statsDf['% NIHSS - Not known'] = self.statsDf.apply(lambda x: round(((x['# NIHSS - Not known']/x['is_ich_cvt_patients']) * 100), 2) if x['is_ich_cvt_patients'] > 0 else 0, axis=1)
+            self.statsDf['% NIHSS - Not known'] = self._get_percentage(self.statsDf['# NIHSS - Not known'], self.statsDf['is_ich_cvt_patients'])
             # Create temporary dataframe with patient who had performed NIHSS (NIHSS = 2)
-            nihss = is_ich_cvt[is_ich_cvt['NIHSS'].isin([2])]
-            tmpDf = nihss.groupby(['Protocol ID']).NIHSS_SCORE.agg(['median']).rename(columns={'median': 'NIHSS median score'})
-            factorDf = self.statsDf.merge(tmpDf, how='outer', left_on='Protocol ID', right_on='Protocol ID')
-            factorDf.fillna(0, inplace=True)
-            self.statsDf['NIHSS median score'] = factorDf['NIHSS median score']
+            nihss = is_ich_cvt + (('NIHSS', 'isin', (2,)),)
+            self.statsDf['NIHSS median score'] = self._get_median(self._get_population(nihss, ['Protocol ID', 'NIHSS_SCORE']), 'NIHSS_SCORE')
 
             del nihss
 
         ##########
         # CT/MRI #
         ##########
-        is_ich_tia_cvt_not_referred = is_ich_tia_cvt.loc[~(is_ich_tia_cvt['STROKE_TYPE'].isin([1]) & is_ich_tia_cvt['RECANALIZATION_PROCEDURES'].isin([5,6,7,8]))].copy()
-        self.statsDf['is_ich_tia_cvt_not_referred_patients'] = self._count_patients(dataframe=is_ich_tia_cvt_not_referred)
+        is_ich_tia_cvt_not_referred = is_ich_tia_cvt + (Any((('STROKE_TYPE', 'not isin', (1,)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6, 7, 8)))),)
+        self.statsDf['is_ich_tia_cvt_not_referred_patients'] = self._count_population(is_ich_tia_cvt_not_referred)
 
-        self.tmp = is_ich_tia_cvt_not_referred.groupby(['Protocol ID', 'CT_MRI']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(is_ich_tia_cvt_not_referred, 'CT_MRI')
         self.statsDf = self._get_values_for_factors(column_name="CT_MRI", value=1, new_column_name='# CT/MRI - Not performed')
-        self.statsDf['% CT/MRI - Not performed'] = self.statsDf.apply(lambda x: round(((x['# CT/MRI - Not performed']/x['is_ich_tia_cvt_not_referred_patients']) * 100), 2) if x['is_ich_tia_cvt_not_referred_patients'] > 0 else 0, axis=1)
+        self.statsDf['% CT/MRI - Not performed'] = self._get_percentage(self.statsDf['# CT/MRI - Not performed'], self.statsDf['is_ich_tia_cvt_not_referred_patients'])
         self.statsDf = self._get_values_for_factors(column_name="CT_MRI", value=2, new_column_name='# CT/MRI - performed')
-        self.statsDf['% CT/MRI - performed'] = self.statsDf.apply(lambda x: round(((x['# CT/MRI - performed']/x['is_ich_tia_cvt_not_referred_patients']) * 100), 2) if x['is_ich_tia_cvt_not_referred_patients'] > 0 else 0, axis=1)
+        self.statsDf['% CT/MRI - performed'] = self._get_percentage(self.statsDf['# CT/MRI - performed'], self.statsDf['is_ich_tia_cvt_not_referred_patients'])
         self.statsDf = self._get_values_for_factors(column_name="CT_MRI", value=3, new_column_name='# CT/MRI - Not known')
-        self.statsDf['% CT/MRI - Not known'] = self.statsDf.apply(lambda x: round(((x['# CT/MRI - Not known']/x['is_ich_tia_cvt_not_referred_patients']) * 100), 2) if x['is_ich_tia_cvt_not_referred_patients'] > 0 else 0, axis=1)
+        self.statsDf['% CT/MRI - Not known'] = self._get_percentage(self.statsDf['# CT/MRI - Not known'], self.statsDf['is_ich_tia_cvt_not_referred_patients'])
 
         # Create temporary dataframe with patients who had performed CT/MRI (CT_MRI = 2)
-        ct_mri = is_ich_tia_cvt_not_referred[is_ich_tia_cvt_not_referred['CT_MRI'].isin([2])]
+        ct_mri = self._get_population(is_ich_tia_cvt_not_referred + (('CT_MRI', 'isin', (2,)),), ['Protocol ID', 'CT_TIME'])
         ct_mri['CT_TIME'] = pd.to_numeric(ct_mri['CT_TIME'])
         self.tmp = ct_mri.groupby(['Protocol ID', 'CT_TIME']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="CT_TIME", value=1, new_column_name='# CT/MRI - Performed within 1 hour after admission')
-        self.statsDf['% CT/MRI - Performed within 1 hour after admission'] = self.statsDf.apply(lambda x: round(((x['# CT/MRI - Performed within 1 hour after admission']/x['# CT/MRI - performed']) * 100), 2) if x['# CT/MRI - performed'] > 0 else 0, axis=1)
+        self.statsDf['% CT/MRI - Performed within 1 hour after admission'] = self._get_percentage(self.statsDf['# CT/MRI - Performed within 1 hour after admission'], self.statsDf['# CT/MRI - performed'])
         self.statsDf = self._get_values_for_factors(column_name="CT_TIME", value=2, new_column_name='# CT/MRI - Performed later than 1 hour after admission')
-        self.statsDf['% CT/MRI - Performed later than 1 hour after admission'] = self.statsDf.apply(lambda x: round(((x['# CT/MRI - Performed later than 1 hour after admission']/x['# CT/MRI - performed']) * 100), 2) if x['# CT/MRI - performed'] > 0 else 0, axis=1)
+        self.statsDf['% CT/MRI - Performed later than 1 hour after admission'] = self._get_percentage(self.statsDf['# CT/MRI - Performed later than 1 hour after admission'], self.statsDf['# CT/MRI - performed'])
 
         self.statsDf.drop(['is_ich_tia_cvt_not_referred_patients'], inplace=True, axis=1)
         del ct_mri, is_ich_tia_cvt_not_referred
@@ -469,17 +555,17 @@ class ComputeStats:
         ####################
         # VASCULAR IMAGING #
         ####################
-        self.tmp = ich_sah.groupby(['Protocol ID', 'CTA_MRA_DSA']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(ich_sah, 'CTA_MRA_DSA')
         self.statsDf = self._get_values_for_factors_more_values(column_name="CTA_MRA_DSA", value={'1', '1,2', '1,3'}, new_column_name='# vascular imaging - CTA')
-        self.statsDf['% vascular imaging - CTA'] = self.statsDf.apply(lambda x: round(((x['# vascular imaging - CTA']/x['ich_sah_patients']) * 100), 2) if x['ich_sah_patients'] > 0 else 0, axis=1)
+        self.statsDf['% vascular imaging - CTA'] = self._get_percentage(self.statsDf['# vascular imaging - CTA'], self.statsDf['ich_sah_patients'])
         self.statsDf = self._get_values_for_factors_more_values(column_name="CTA_MRA_DSA", value={'2', '1,2', '2,3'}, new_column_name='# vascular imaging - MRA')
-        self.statsDf['% vascular imaging - MRA'] = self.statsDf.apply(lambda x: round(((x['# vascular imaging - MRA']/x['ich_sah_patients']) * 100), 2) if x['ich_sah_patients'] > 0 else 0, axis=1)
+        self.statsDf['% vascular imaging - MRA'] = self._get_percentage(self.statsDf['# vascular imaging - MRA'], self.statsDf['ich_sah_patients'])
         self.statsDf = self._get_values_for_factors_more_values(column_name="CTA_MRA_DSA", value={'3', '1,3', '2,3'}, new_column_name='# vascular imaging - DSA')
-        self.statsDf['% vascular imaging - DSA'] = self.statsDf.apply(lambda x: round(((x['# vascular imaging - DSA']/x['ich_sah_patients']) * 100), 2) if x['ich_sah_patients'] > 0 else 0, axis=1)
+        self.statsDf['% vascular imaging - DSA'] = self._get_percentage(self.statsDf['# vascular imaging - DSA'], self.statsDf['ich_sah_patients'])
         self.statsDf = self._get_values_for_factors_more_values(column_name="CTA_MRA_DSA", value={'4'}, new_column_name='# vascular imaging - None')
-        self.statsDf['% vascular imaging - None'] = self.statsDf.apply(lambda x: round(((x['# vascular imaging - None']/x['ich_sah_patients']) * 100), 2) if x['ich_sah_patients'] > 0 else 0, axis=1)
+        self.statsDf['% vascular imaging - None'] = self._get_percentage(self.statsDf['# vascular imaging - None'], self.statsDf['ich_sah_patients'])
         self.statsDf = self._get_values_for_factors_more_values(column_name="CTA_MRA_DSA", value={'1,2', '1,3', '2,3'}, new_column_name='# vascular imaging - two modalities')
-        self.statsDf['% vascular imaging - two modalities'] = self.statsDf.apply(lambda x: round(((x['# vascular imaging - two modalities']/x['ich_sah_patients']) * 100), 2) if x['ich_sah_patients'] > 0 else 0, axis=1)
+        self.statsDf['% vascular imaging - two modalities'] = self._get_percentage(self.statsDf['# vascular imaging - two modalities'], self.statsDf['ich_sah_patients'])
 
         ### DATA NORMLAIZATION
         norm_tmp = self.statsDf[['% vascular imaging - CTA', '% vascular imaging - MRA', '% vascular imaging - DSA', '% vascular imaging - None']].copy()
@@ -495,59 +581,59 @@ class ComputeStats:
         ##############
         # Seperate calculation for CZ (difference in the stroke types)
         if country_code == 'CZ':
-            self.tmp = is_ich.groupby(['Protocol ID', 'VENTILATOR']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich, 'VENTILATOR')
             # Get number of patients from the old version
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=-999, new_column_name='tmp')
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=3, new_column_name='# patients put on ventilator - Not known')
-            self.statsDf['% patients put on ventilator - Not known'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - Not known']/(x['is_ich_patients'] - x['tmp'])) * 100), 2) if (x['is_ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - Not known'] = self._get_percentage(self.statsDf['# patients put on ventilator - Not known'], self.statsDf['is_ich_patients'] - self.statsDf['tmp'])
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=1, new_column_name='# patients put on ventilator - Yes')
-            self.statsDf['% patients put on ventilator - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - Yes']/(x['is_ich_patients'] - x['tmp'] - x['# patients put on ventilator - Not known'])) * 100), 2) if (x['is_ich_patients'] - x['tmp'] - x['# patients put on ventilator - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - Yes'] = self._get_percentage(self.statsDf['# patients put on ventilator - Yes'], self.statsDf['is_ich_patients'] - self.statsDf['tmp'] - self.statsDf['# patients put on ventilator - Not known'])
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=2, new_column_name='# patients put on ventilator - No')
-            self.statsDf['% patients put on ventilator - No'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - No']/(x['is_ich_patients'] - x['tmp'] - x['# patients put on ventilator - Not known'])) * 100), 2) if (x['is_ich_patients'] - x['tmp'] - x['# patients put on ventilator - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - No'] = self._get_percentage(self.statsDf['# patients put on ventilator - No'], self.statsDf['is_ich_patients'] - self.statsDf['tmp'] - self.statsDf['# patients put on ventilator - Not known'])
             self.statsDf.drop(['tmp'], inplace=True, axis=1)
         else:
-            self.tmp = is_ich_cvt.groupby(['Protocol ID', 'VENTILATOR']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich_cvt, 'VENTILATOR')
             # Get number of patients from the old version
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=-999, new_column_name='tmp')
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=3, new_column_name='# patients put on ventilator - Not known')
-            self.statsDf['% patients put on ventilator - Not known'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - Not known']/(x['is_ich_cvt_patients'] - x['tmp'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - Not known'] = self._get_percentage(self.statsDf['# patients put on ventilator - Not known'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['tmp'])
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=1, new_column_name='# patients put on ventilator - Yes')
-            self.statsDf['% patients put on ventilator - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - Yes']/(x['is_ich_cvt_patients'] - x['tmp'] - x['# patients put on ventilator - Not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['tmp'] - x['# patients put on ventilator - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - Yes'] = self._get_percentage(self.statsDf['# patients put on ventilator - Yes'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['tmp'] - self.statsDf['# patients put on ventilator - Not known'])
             self.statsDf = self._get_values_for_factors(column_name="VENTILATOR", value=2, new_column_name='# patients put on ventilator - No')
-            self.statsDf['% patients put on ventilator - No'] = self.statsDf.apply(lambda x: round(((x['# patients put on ventilator - No']/(x['is_ich_cvt_patients'] - x['tmp'] - x['# patients put on ventilator - Not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['tmp'] - x['# patients put on ventilator - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% patients put on ventilator - No'] = self._get_percentage(self.statsDf['# patients put on ventilator - No'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['tmp'] - self.statsDf['# patients put on ventilator - Not known'])
             self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         #############################
         # RECANALIZATION PROCEDURES #
         #############################
-        self.tmp = isch.groupby(['Protocol ID', 'RECANALIZATION_PROCEDURES']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(isch, 'RECANALIZATION_PROCEDURES')
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=1, new_column_name='# recanalization procedures - Not done')
-        self.statsDf['% recanalization procedures - Not done'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Not done']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Not done'] = self._get_percentage(self.statsDf['# recanalization procedures - Not done'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=2, new_column_name='# recanalization procedures - IV tPa')
-        self.statsDf['% recanalization procedures - IV tPa'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - IV tPa']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - IV tPa'] = self._get_percentage(self.statsDf['# recanalization procedures - IV tPa'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=3, new_column_name='# recanalization procedures - IV tPa + endovascular treatment')
-        self.statsDf['% recanalization procedures - IV tPa + endovascular treatment'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - IV tPa + endovascular treatment']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - IV tPa + endovascular treatment'] = self._get_percentage(self.statsDf['# recanalization procedures - IV tPa + endovascular treatment'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=4, new_column_name='# recanalization procedures - Endovascular treatment alone')
-        self.statsDf['% recanalization procedures - Endovascular treatment alone'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Endovascular treatment alone']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Endovascular treatment alone'] = self._get_percentage(self.statsDf['# recanalization procedures - Endovascular treatment alone'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=5, new_column_name='# recanalization procedures - IV tPa + referred to another centre for endovascular treatment')
-        self.statsDf['% recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] = self._get_percentage(self.statsDf['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=6, new_column_name='# recanalization procedures - Referred to another centre for endovascular treatment')
-        self.statsDf['% recanalization procedures - Referred to another centre for endovascular treatment'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Referred to another centre for endovascular treatment']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Referred to another centre for endovascular treatment'] = self._get_percentage(self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=7, new_column_name='# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre')
-        self.statsDf['% recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] = self._get_percentage(self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=8, new_column_name='# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre')
-        self.statsDf['% recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] = self._get_percentage(self.statsDf['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="RECANALIZATION_PROCEDURES", value=9, new_column_name='# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre')
-        self.statsDf['% recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] = self.statsDf.apply(lambda x: round(((x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] = self._get_percentage(self.statsDf['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'], self.statsDf['isch_patients'])
 
         # tag::recanalized_patients[]
-        recanalized_df = isch.loc[isch['IVT_DONE'].isin([1]) | isch['TBY_DONE'].isin([1])]
-        self.statsDf['# patients recanalized'] = self._count_patients(dataframe=recanalized_df)
+        recanalized_df = isch + (Any((('IVT_DONE', 'isin', (1,)), ('TBY_DONE', 'isin', (1,)))),)
+        self.statsDf['# patients recanalized'] = self._count_population(recanalized_df)
 
-        recanalized_denominator_df = isch.loc[isch['IVT_DONE'].isin([1]) | isch['TBY_DONE'].isin([1]) | isch['RECANALIZATION_PROCEDURES'].isin([1])]
-        self.statsDf['denominator'] =self._count_patients(dataframe=recanalized_denominator_df)
+        recanalized_denominator_df = isch + (Any((('IVT_DONE', 'isin', (1,)), ('TBY_DONE', 'isin', (1,)), ('RECANALIZATION_PROCEDURES', 'isin', (1,)))),)
+        self.statsDf['denominator'] = self._count_population(recanalized_denominator_df)
 
-        self.statsDf['% patients recanalized'] = self.statsDf.apply(lambda x: round(((x['# patients recanalized']/x['denominator']) * 100), 2) if x['denominator'] > 0 else 0, axis=1)
+        self.statsDf['% patients recanalized'] = self._get_percentage(self.statsDf['# patients recanalized'], self.statsDf['denominator'])
         self.statsDf.drop(['denominator'], inplace=True, axis=1)
         
         del recanalized_df
@@ -568,71 +654,44 @@ class ComputeStats:
             #self.statsDf['% patients recanalized'] = self.statsDf.apply(lambda x: round(((x['# patients recanalized']/(x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'])) * 100), 2) if (x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre']) > 0 else 0, axis=1)
 
             #self.statsDf['% patients recanalized'] = self.statsDf.apply(lambda x: round(((x['# patients recanalized']/(x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] - x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'])) * 100), 2) if (x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] - x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre']) > 0 else 0, axis=1)
-            self.statsDf['% patients recanalized'] = self.statsDf.apply(lambda x: round(((x['# patients recanalized']/x['denominator']) * 100), 2) if x['denominator'] > 0 else 0, axis=1)
+            self.statsDf['% patients recanalized'] = self._get_percentage(self.statsDf['# patients recanalized'], self.statsDf['denominator'])
             self.statsDf.drop(['denominator'], inplace=True, axis=1)
         else:
-            self.statsDf['# patients recanalized'] = self.statsDf.apply(lambda x: x['# recanalization procedures - IV tPa'] + x['# recanalization procedures - IV tPa + endovascular treatment'] + x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] +  x['# recanalization procedures - Endovascular treatment alone'], axis=1)
+            self.statsDf['# patients recanalized'] = self.statsDf['# recanalization procedures - IV tPa'] + self.statsDf['# recanalization procedures - IV tPa + endovascular treatment'] + self.statsDf['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + self.statsDf['# recanalization procedures - Endovascular treatment alone']
 
-            self.statsDf['% patients recanalized'] = self.statsDf.apply(lambda x: round(((x['# patients recanalized']/(x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] - x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'])) * 100), 2) if (x['isch_patients'] - x['# recanalization procedures - Referred to another centre for endovascular treatment'] - x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] - x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre']) > 0 else 0, axis=1)
+            self.statsDf['% patients recanalized'] = self._get_percentage(self.statsDf['# patients recanalized'], self.statsDf['isch_patients'] - self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment'] - self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] - self.statsDf['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'] - self.statsDf['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'])
         """
 
         ##############
         # MEDIAN DTN #
         ##############
-        def _median_confidence_interval(data, confidence=0.95):
-            """ The function calculating median confidence interval. 
-
-            :param confidence: the value of confidence interval
-            :type confidence: int/float
-            :returns: rv.median(), rv.interval(confidence)
-            """
-            a = np.array(data)
-            w = a + 1
-
-            # create custom discrete random variable from data set
-            rv = st.rv_discrete(values=(data, w/w.sum()))
-
-            return rv.median(), rv.interval(confidence)
-            
-        def _mean_confidence_interval(data, confidence=0.95):
-            """ The function calculating mean confidence interval. 
-
-            :param confidence: the value of confidence interval
-            :type confidence: int/float
-            :returns: m, m-h, m+h
-            """
-
-            n = len(data)
-            m = mean(data)
-            std_err = sem(data)
-            h = std_err * t.ppf((1 + confidence) / 2, n - 1)
-            return m, m-h, m+h
-
         # tag::median_dtn[]
         # Calculate number of patients who underwent IVT
-        self.tmp = isch.loc[~isch['HOSPITAL_STROKE_IVT_TIMESTAMPS'].isin([1])].groupby(['Protocol ID', 'IVT_DONE']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(isch + (('HOSPITAL_STROKE_IVT_TIMESTAMPS', 'not isin', (1,)),), 'IVT_DONE')
         self.statsDf = self._get_values_for_factors(column_name="IVT_DONE", value=1, new_column_name='# IV tPa')
-        self.statsDf['% IV tPa'] = self.statsDf.apply(lambda x: round(((x['# IV tPa']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% IV tPa'] = self._get_percentage(self.statsDf['# IV tPa'], self.statsDf['isch_patients'])
         
         # Create temporary dataframe with the patients who has been treated with thrombolysis
-        recanalization_procedure_iv_tpa = isch.loc[(isch['IVT_DONE'].isin([1])) & (~isch['HOSPITAL_STROKE_IVT_TIMESTAMPS'].isin([1]))].copy()
+        recanalization_procedure_iv_tpa = isch + (('IVT_DONE', 'isin', (1,)), ('HOSPITAL_STROKE_IVT_TIMESTAMPS', 'not isin', (1,)))
         # recanalization_procedure_iv_tpa = isch.loc[isch['IVT_DONE'].isin([1])].copy()
-        recanalization_procedure_iv_tpa.fillna(0, inplace=True)
         # Create one column with times of door to thrombolysis 
-        thrombolysis = recanalization_procedure_iv_tpa[(recanalization_procedure_iv_tpa['IVTPA'] > 0) & (recanalization_procedure_iv_tpa['IVTPA'] <= 400)].copy()
+        thrombolysis = recanalization_procedure_iv_tpa + (('IVTPA', '>', 0), ('IVTPA', '<=', 400))
 
-        tmp = thrombolysis.groupby(['Protocol ID']).IVTPA.agg(['median']).rename(columns={'median': 'Median DTN (minutes)'}).reset_index()
-        self.statsDf = self.statsDf.merge(tmp, how='outer')
-        self.statsDf.fillna(0, inplace=True)
+        dtn = self._get_population(thrombolysis, ['Protocol ID', 'IVTPA'])
+        self.statsDf['Median DTN (minutes)'] = self._get_median(dtn, 'IVTPA')
+        # The confidence interval of the median DTN is calculated for all sites at once
+        intervals = get_median_intervals(get_runs(dtn, ['Protocol ID'], 'IVTPA'))
+        self.statsDf['Median DTN CI low'] = self._get_site_values(intervals['low'])
+        self.statsDf['Median DTN CI high'] = self._get_site_values(intervals['high'])
 
-        del thrombolysis
+        del thrombolysis, dtn, intervals
         # end::median_dtn[]
 
         """
         if country_code == 'CZ':
             self.tmp = isch.groupby(['Protocol ID', 'IVT_DONE']).size().to_frame('count').reset_index()
             self.statsDf = self._get_values_for_factors(column_name="IVT_DONE", value=1, new_column_name='# IV tPa')
-            self.statsDf['% IV tPa'] = self.statsDf.apply(lambda x: round(((x['# IV tPa']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+            self.statsDf['% IV tPa'] = self._get_percentage(self.statsDf['# IV tPa'], self.statsDf['isch_patients'])
             
             # Create temporary dataframe with the patients who has been treated with thrombolysis
             recanalization_procedure_iv_tpa = isch[isch['IVT_DONE'].isin([1])].copy()
@@ -640,13 +699,11 @@ class ComputeStats:
             # Create one column with times of door to thrombolysis 
             thrombolysis = recanalization_procedure_iv_tpa[(recanalization_procedure_iv_tpa['IVTPA'] > 0) & (recanalization_procedure_iv_tpa['IVTPA'] <= 400)].copy()
 
-            tmp = thrombolysis.groupby(['Protocol ID']).IVTPA.agg(['median']).rename(columns={'median': 'Median DTN (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median DTN (minutes)'] = self._get_median(thrombolysis, 'IVTPA')
 
         else:
-            self.statsDf.loc[:, '# IV tPa'] = self.statsDf.apply(lambda x: x['# recanalization procedures - IV tPa'] + x['# recanalization procedures - IV tPa + endovascular treatment'] + x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'], axis=1)
-            self.statsDf['% IV tPa'] = self.statsDf.apply(lambda x: round(((x['# IV tPa']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+            self.statsDf.loc[:, '# IV tPa'] = self.statsDf['# recanalization procedures - IV tPa'] + self.statsDf['# recanalization procedures - IV tPa + endovascular treatment'] + self.statsDf['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment']
+            self.statsDf['% IV tPa'] = self._get_percentage(self.statsDf['# IV tPa'], self.statsDf['isch_patients'])
 
             # Create temporary dataframe with the patients who has been treated with thrombolysis
             recanalization_procedure_iv_tpa = isch[isch['RECANALIZATION_PROCEDURES'].isin([2, 3, 5])].copy()
@@ -667,9 +724,7 @@ class ComputeStats:
         # #print(interval_vals)
         # interval_vals_df = pd.DataFrame.from_dict(interval_vals, orient='index', columns=['Protocol ID', 'Confidence interval DTN (Mean)', 'Confidence interval DTN (Median)'])
         
-            tmp = recanalization_procedure_iv_tpa.groupby(['Protocol ID']).IVTPA.agg(['median']).rename(columns={'median': 'Median DTN (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median DTN (minutes)'] = self._get_median(recanalization_procedure_iv_tpa, 'IVTPA')
 
         # self.statsDf = self.statsDf.merge(interval_vals_df, how='outer')
         """
@@ -678,20 +733,17 @@ class ComputeStats:
         # MEDIAN DTG #
         ##############
         # tag::median_dtg[]
-        self.tmp = isch.loc[~isch['HOSPITAL_STROKE_TBY_TIMESTAMPS'].isin([1])].groupby(['Protocol ID', 'TBY_DONE']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(isch + (('HOSPITAL_STROKE_TBY_TIMESTAMPS', 'not isin', (1,)),), 'TBY_DONE')
         self.statsDf = self._get_values_for_factors(column_name="TBY_DONE", value=1, new_column_name='# TBY')
-        self.statsDf['% TBY'] = self.statsDf.apply(lambda x: round(((x['# TBY']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% TBY'] = self._get_percentage(self.statsDf['# TBY'], self.statsDf['isch_patients'])
         
         # Create temporary dataframe with the patients who has been treated with thrombolysis
-        recanalization_procedure_tby_dtg = isch.loc[(isch['TBY_DONE'].isin([1])) & (~isch['HOSPITAL_STROKE_TBY_TIMESTAMPS'].isin([1]))].copy()
+        recanalization_procedure_tby_dtg = isch + (('TBY_DONE', 'isin', (1,)), ('HOSPITAL_STROKE_TBY_TIMESTAMPS', 'not isin', (1,)))
         # recanalization_procedure_tby_dtg = isch.loc[isch['TBY_DONE'].isin([1])].copy()
-        recanalization_procedure_tby_dtg.fillna(0, inplace=True)
         # Create one column with times of door to thrombolysis 
-        thrombectomy = recanalization_procedure_tby_dtg[(recanalization_procedure_tby_dtg['TBY'] > 0) & (recanalization_procedure_tby_dtg['TBY'] <= 700)].copy()
+        thrombectomy = recanalization_procedure_tby_dtg + (('TBY', '>', 0), ('TBY', '<=', 700))
 
-        tmp = thrombectomy.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes)'}).reset_index()
-        self.statsDf = self.statsDf.merge(tmp, how='outer')
-        self.statsDf.fillna(0, inplace=True)
+        self.statsDf['Median DTG (minutes)'] = self._get_median(self._get_population(thrombectomy, ['Protocol ID', 'TBY']), 'TBY')
 
         del thrombectomy
         # end::median_dtg[]
@@ -701,7 +753,7 @@ class ComputeStats:
         if country_code == 'CZ':
             self.tmp = isch.groupby(['Protocol ID', 'TBY_DONE']).size().to_frame('count').reset_index()
             self.statsDf = self._get_values_for_factors(column_name="TBY_DONE", value=1, new_column_name='# TBY')
-            self.statsDf['% TBY'] = self.statsDf.apply(lambda x: round(((x['# TBY']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+            self.statsDf['% TBY'] = self._get_percentage(self.statsDf['# TBY'], self.statsDf['isch_patients'])
             
             # Create temporary dataframe with the patients who has been treated with thrombolysis
             recanalization_procedure_tby_dtg = isch[isch['TBY_DONE'].isin([1])].copy()
@@ -709,15 +761,13 @@ class ComputeStats:
             # Create one column with times of door to thrombolysis 
             thrombectomy = recanalization_procedure_tby_dtg[(recanalization_procedure_tby_dtg['TBY'] > 0) & (recanalization_procedure_tby_dtg['TBY'] <= 700)].copy()
 
-            tmp = thrombectomy.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median DTG (minutes)'] = self._get_median(thrombectomy, 'TBY')
         """
 
             # self.statsDf.loc[:, '# TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - Endovascular treatment alone'] + x['# recanalization procedures - IV tPa + endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] + x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'], axis=1)
         """
-            self.statsDf.loc[:, '# TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - Endovascular treatment alone'] + x['# recanalization procedures - IV tPa + endovascular treatment'], axis=1)
-            self.statsDf['% TBY'] = self.statsDf.apply(lambda x: round(((x['# TBY']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+            self.statsDf.loc[:, '# TBY'] = self.statsDf['# recanalization procedures - Endovascular treatment alone'] + self.statsDf['# recanalization procedures - IV tPa + endovascular treatment']
+            self.statsDf['% TBY'] = self._get_percentage(self.statsDf['# TBY'], self.statsDf['isch_patients'])
 
             # Create temporary dataframe with the patients who has been treated with thrombectomy
             # recanalization_procedure_tby_dtg = isch[isch['RECANALIZATION_PROCEDURES'].isin([4, 3, 6, 7, 8])].copy()
@@ -742,8 +792,8 @@ class ComputeStats:
             # recanalization_procedure_tby['TBY'] = recanalization_procedure_tby.loc[:, ['TBY_ONLY_GROIN_PUNCTURE_TIME', 'TBY_ONLY_GROIN_PUNCTURE_TIME_MIN', 'IVT_TBY_GROIN_TIME', 'IVT_TBY_GROIN_TIME_MIN']].sum(1).reset_index()[0].tolist()
         """
         else:
-            self.statsDf.loc[:, '# TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - Endovascular treatment alone'] + x['# recanalization procedures - IV tPa + endovascular treatment'], axis=1)
-            self.statsDf['% TBY'] = self.statsDf.apply(lambda x: round(((x['# TBY']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+            self.statsDf.loc[:, '# TBY'] = self.statsDf['# recanalization procedures - Endovascular treatment alone'] + self.statsDf['# recanalization procedures - IV tPa + endovascular treatment']
+            self.statsDf['% TBY'] = self._get_percentage(self.statsDf['# TBY'], self.statsDf['isch_patients'])
             # Create temporary dataframe with the patients who has been treated with thrombectomy
             recanalization_procedure_tby_dtg = isch[isch['RECANALIZATION_PROCEDURES'].isin([4, 3])].copy()
             recanalization_procedure_tby_dtg.fillna(0, inplace=True)
@@ -762,9 +812,7 @@ class ComputeStats:
             
             # recanalization_procedure_tby['TBY'] = recanalization_procedure_tby.loc[:, ['TBY_ONLY_GROIN_PUNCTURE_TIME', 'TBY_ONLY_GROIN_PUNCTURE_TIME_MIN', 'IVT_TBY_GROIN_TIME', 'IVT_TBY_GROIN_TIME_MIN']].sum(1).reset_index()[0].tolist()
 
-            tmp = recanalization_procedure_tby_dtg.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median DTG (minutes)'] = self._get_median(recanalization_procedure_tby_dtg, 'TBY')
 
         # self.statsDf = self.statsDf.merge(interval_vals_df, how='outer')
         """
@@ -772,19 +820,16 @@ class ComputeStats:
         # MEDIAN DIDO #
         ###############
         # tag::median_dido[]
-        self.tmp = isch.groupby(['Protocol ID', 'REFERRED_DONE']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(isch, 'REFERRED_DONE')
         self.statsDf = self._get_values_for_factors(column_name="REFERRED_DONE", value=1, new_column_name='# DIDO TBY')
-        self.statsDf['% DIDO TBY'] = self.statsDf.apply(lambda x: round(((x['# DIDO TBY']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% DIDO TBY'] = self._get_percentage(self.statsDf['# DIDO TBY'], self.statsDf['isch_patients'])
         
         # Create temporary dataframe with the patients who has been treated with thrombolysis
-        recanalization_procedure_tby_dido = isch[isch['REFERRED_DONE'].isin([1])].copy()
-        recanalization_procedure_tby_dido.fillna(0, inplace=True)
+        recanalization_procedure_tby_dido = isch + (('REFERRED_DONE', 'isin', (1,)),)
         # Create one column with times of door to thrombolysis 
-        dido = recanalization_procedure_tby_dido[(recanalization_procedure_tby_dido['DIDO'] > 0)].copy()
+        dido = recanalization_procedure_tby_dido + (('DIDO', '>', 0),)
 
-        tmp = dido.groupby(['Protocol ID']).DIDO.agg(['median']).rename(columns={'median': 'Median TBY DIDO (minutes)'}).reset_index()
-        self.statsDf = self.statsDf.merge(tmp, how='outer')
-        self.statsDf.fillna(0, inplace=True)
+        self.statsDf['Median TBY DIDO (minutes)'] = self._get_median(self._get_population(dido, ['Protocol ID', 'DIDO']), 'DIDO')
 
         del recanalization_procedure_tby_dido, dido
         # end::median_dido[]
@@ -792,7 +837,7 @@ class ComputeStats:
         """
         if country_code == 'CZ':
             # self.statsDf.loc[:, '# DIDO TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment'], axis=1)
-            self.statsDf.loc[:, '# DIDO TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] + x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'], axis=1)
+            self.statsDf.loc[:, '# DIDO TBY'] = self.statsDf['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment'] + self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] + self.statsDf['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre']
 
             # self.statsDf['% DIDO TBY'] = self.statsDf.apply(lambda x: round(((x['# DIDO TBY']/(x['isch_patients'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] - x['# recanalization procedures - Not done'])) * 100), 2) if (x['isch_patients'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] - x['# recanalization procedures - Not done']) > 0 else 0, axis=1)
             
@@ -813,11 +858,9 @@ class ComputeStats:
             # Create one column with times of door-in door-out time 
             recanalization_procedure_tby_dido['DIDO'] = recanalization_procedure_tby_dido['IVT_TBY_REFER_DIDO_TIME'] + recanalization_procedure_tby_dido['IVT_TBY_REFER_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_ALL_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_ALL_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_LIM_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_LIM_DIDO_TIME_MIN']
 
-            tmp = recanalization_procedure_tby_dido.groupby(['Protocol ID']).DIDO.agg(['median']).rename(columns={'median': 'Median TBY DIDO (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median TBY DIDO (minutes)'] = self._get_median(recanalization_procedure_tby_dido, 'DIDO')
         else:
-            self.statsDf.loc[:, '# DIDO TBY'] = self.statsDf.apply(lambda x: x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment'] + x['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] + x['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre'], axis=1)
+            self.statsDf.loc[:, '# DIDO TBY'] = self.statsDf['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment'] + self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment'] + self.statsDf['# recanalization procedures - Referred to another centre for endovascular treatment and hospitalization continues at the referred to centre'] + self.statsDf['# recanalization procedures - Referred for endovascular treatment and patient is returned to the initial centre']
             # self.statsDf['% DIDO TBY'] = self.statsDf.apply(lambda x: round(((x['# DIDO TBY']/(x['isch_patients'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] - x['# recanalization procedures - Not done'])) * 100), 2) if (x['isch_patients'] - x['# recanalization procedures - Returned to the initial centre after recanalization procedures were performed at another centre'] - x['# recanalization procedures - Not done']) > 0 else 0, axis=1)
 
             # Create temporary dataframe with the patients who has been transferred for recanalization procedures
@@ -827,9 +870,7 @@ class ComputeStats:
             # Create one column with times of door-in door-out time 
             recanalization_procedure_tby_dido['DIDO'] = recanalization_procedure_tby_dido['IVT_TBY_REFER_DIDO_TIME'] + recanalization_procedure_tby_dido['IVT_TBY_REFER_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_ALL_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_ALL_DIDO_TIME_MIN'] + recanalization_procedure_tby_dido['TBY_REFER_LIM_DIDO_TIME'] + recanalization_procedure_tby_dido['TBY_REFER_LIM_DIDO_TIME_MIN']
 
-            tmp = recanalization_procedure_tby_dido.groupby(['Protocol ID']).DIDO.agg(['median']).rename(columns={'median': 'Median TBY DIDO (minutes)'}).reset_index()
-            self.statsDf = self.statsDf.merge(tmp, how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median TBY DIDO (minutes)'] = self._get_median(recanalization_procedure_tby_dido, 'DIDO')
         """
 
         #######################
@@ -838,42 +879,42 @@ class ComputeStats:
         # For CZ exclude CVT from the calculation 
         # tag::dysphagia_screening[]
         if country_code == 'CZ':
-            is_ich_not_referred = is_ich.loc[~(is_ich['crf_parent_name'].isin(['F_RESQ_IVT_TBY_CZ_4']) & is_ich['RECANALIZATION_PROCEDURES'].isin([5,6]))].copy()
-            self.statsDf['is_ich_not_referred_patients'] = self._count_patients(dataframe=is_ich_not_referred) 
+            is_ich_not_referred = is_ich + (Any((('crf_parent_name', 'not isin', ('F_RESQ_IVT_TBY_CZ_4',)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)))),)
+            self.statsDf['is_ich_not_referred_patients'] = self._count_population(is_ich_not_referred)
             
-            self.tmp = is_ich_not_referred.groupby(['Protocol ID', 'DYSPHAGIA_SCREENING']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich_not_referred, 'DYSPHAGIA_SCREENING')
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=6, new_column_name='# dysphagia screening - not known')
-            self.statsDf['% dysphagia screening - not known'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - not known']/x['is_ich_not_referred_patients']) * 100), 2) if x['is_ich_not_referred_patients'] > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - not known'] = self._get_percentage(self.statsDf['# dysphagia screening - not known'], self.statsDf['is_ich_not_referred_patients'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=1, new_column_name='# dysphagia screening - Guss test')
-            self.statsDf['% dysphagia screening - Guss test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Guss test']/(x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Guss test'] = self._get_percentage(self.statsDf['# dysphagia screening - Guss test'], self.statsDf['is_ich_not_referred_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=2, new_column_name='# dysphagia screening - Other test')
-            self.statsDf['% dysphagia screening - Other test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Other test']/(x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Other test'] = self._get_percentage(self.statsDf['# dysphagia screening - Other test'], self.statsDf['is_ich_not_referred_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=3, new_column_name='# dysphagia screening - Another centre')
-            self.statsDf['% dysphagia screening - Another centre'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Another centre']/(x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Another centre'] = self._get_percentage(self.statsDf['# dysphagia screening - Another centre'], self.statsDf['is_ich_not_referred_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=4, new_column_name='# dysphagia screening - Not done')
-            self.statsDf['% dysphagia screening - Not done'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Not done']/(x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Not done'] = self._get_percentage(self.statsDf['# dysphagia screening - Not done'], self.statsDf['is_ich_not_referred_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=5, new_column_name='# dysphagia screening - Unable to test')
-            self.statsDf['% dysphagia screening - Unable to test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Unable to test']/(x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_not_referred_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Unable to test'] = self._get_percentage(self.statsDf['# dysphagia screening - Unable to test'], self.statsDf['is_ich_not_referred_patients'] - self.statsDf['# dysphagia screening - not known'])
             # self.statsDf['# dysphagia screening done'] = self.statsDf['# dysphagia screening - Guss test'] + self.statsDf['# dysphagia screening - Other test'] + self.statsDf['# dysphagia screening - Another centre']
             self.statsDf['# dysphagia screening done'] = self.statsDf['# dysphagia screening - Guss test'] + self.statsDf['# dysphagia screening - Other test']
             # self.statsDf['% dysphagia screening done'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening done']/(x['is_ich_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
-            self.statsDf['% dysphagia screening done'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening done']/(x['# dysphagia screening done'] + x['# dysphagia screening - Not done'])) * 100), 2) if (x['# dysphagia screening done'] + x['# dysphagia screening - Not done']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening done'] = self._get_percentage(self.statsDf['# dysphagia screening done'], self.statsDf['# dysphagia screening done'] + self.statsDf['# dysphagia screening - Not done'])
         else:
-            self.tmp = is_ich_cvt.groupby(['Protocol ID', 'DYSPHAGIA_SCREENING']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_ich_cvt, 'DYSPHAGIA_SCREENING')
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=6, new_column_name='# dysphagia screening - not known')
-            self.statsDf['% dysphagia screening - not known'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - not known']/x['is_ich_cvt_patients']) * 100), 2) if x['is_ich_cvt_patients'] > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - not known'] = self._get_percentage(self.statsDf['# dysphagia screening - not known'], self.statsDf['is_ich_cvt_patients'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=1, new_column_name='# dysphagia screening - Guss test')
-            self.statsDf['% dysphagia screening - Guss test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Guss test']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Guss test'] = self._get_percentage(self.statsDf['# dysphagia screening - Guss test'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=2, new_column_name='# dysphagia screening - Other test')
-            self.statsDf['% dysphagia screening - Other test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Other test']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Other test'] = self._get_percentage(self.statsDf['# dysphagia screening - Other test'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=3, new_column_name='# dysphagia screening - Another centre')
-            self.statsDf['% dysphagia screening - Another centre'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Another centre']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Another centre'] = self._get_percentage(self.statsDf['# dysphagia screening - Another centre'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=4, new_column_name='# dysphagia screening - Not done')
-            self.statsDf['% dysphagia screening - Not done'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Not done']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Not done'] = self._get_percentage(self.statsDf['# dysphagia screening - Not done'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING", value=5, new_column_name='# dysphagia screening - Unable to test')
-            self.statsDf['% dysphagia screening - Unable to test'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening - Unable to test']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening - Unable to test'] = self._get_percentage(self.statsDf['# dysphagia screening - Unable to test'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
             self.statsDf['# dysphagia screening done'] = self.statsDf['# dysphagia screening - Guss test'] + self.statsDf['# dysphagia screening - Other test'] + self.statsDf['# dysphagia screening - Another centre']
-            self.statsDf['% dysphagia screening done'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening done']/(x['is_ich_cvt_patients'] - x['# dysphagia screening - not known'])) * 100), 2) if (x['is_ich_cvt_patients'] - x['# dysphagia screening - not known']) > 0 else 0, axis=1)
+            self.statsDf['% dysphagia screening done'] = self._get_percentage(self.statsDf['# dysphagia screening done'], self.statsDf['is_ich_cvt_patients'] - self.statsDf['# dysphagia screening - not known'])
         # end::dysphagia_screening[]
 
         ############################
@@ -882,38 +923,38 @@ class ComputeStats:
         self.tmp = self.df.groupby(['Protocol ID', 'DYSPHAGIA_SCREENING_TIME']).size().to_frame('count').reset_index()
         self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING_TIME", value=1, new_column_name='# dysphagia screening time - Within first 24 hours')
         self.statsDf = self._get_values_for_factors(column_name="DYSPHAGIA_SCREENING_TIME", value=2, new_column_name='# dysphagia screening time - After first 24 hours')
-        self.statsDf['% dysphagia screening time - Within first 24 hours'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening time - Within first 24 hours']/(x['# dysphagia screening time - Within first 24 hours'] + x['# dysphagia screening time - After first 24 hours'])) * 100), 2) if (x['# dysphagia screening time - Within first 24 hours'] + x['# dysphagia screening time - After first 24 hours']) > 0 else 0, axis=1)
-        self.statsDf['% dysphagia screening time - After first 24 hours'] = self.statsDf.apply(lambda x: round(((x['# dysphagia screening time - After first 24 hours']/(x['# dysphagia screening time - Within first 24 hours'] + x['# dysphagia screening time - After first 24 hours'])) * 100), 2) if (x['# dysphagia screening time - Within first 24 hours'] + x['# dysphagia screening time - After first 24 hours']) > 0 else 0, axis=1)
+        self.statsDf['% dysphagia screening time - Within first 24 hours'] = self._get_percentage(self.statsDf['# dysphagia screening time - Within first 24 hours'], self.statsDf['# dysphagia screening time - Within first 24 hours'] + self.statsDf['# dysphagia screening time - After first 24 hours'])
+        self.statsDf['% dysphagia screening time - After first 24 hours'] = self._get_percentage(self.statsDf['# dysphagia screening time - After first 24 hours'], self.statsDf['# dysphagia screening time - Within first 24 hours'] + self.statsDf['# dysphagia screening time - After first 24 hours'])
 
         ###################
         # HEMICRANIECTOMY #
         ###################
-        self.tmp = isch.groupby(['Protocol ID', 'HEMICRANIECTOMY']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(isch, 'HEMICRANIECTOMY')
         self.statsDf = self._get_values_for_factors(column_name="HEMICRANIECTOMY", value=1, new_column_name='# hemicraniectomy - Yes')
-        self.statsDf['% hemicraniectomy - Yes'] = self.statsDf.apply(lambda x: round(((x['# hemicraniectomy - Yes']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% hemicraniectomy - Yes'] = self._get_percentage(self.statsDf['# hemicraniectomy - Yes'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="HEMICRANIECTOMY", value=2, new_column_name='# hemicraniectomy - No')
-        self.statsDf['% hemicraniectomy - No'] = self.statsDf.apply(lambda x: round(((x['# hemicraniectomy - No']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% hemicraniectomy - No'] = self._get_percentage(self.statsDf['# hemicraniectomy - No'], self.statsDf['isch_patients'])
         self.statsDf = self._get_values_for_factors(column_name="HEMICRANIECTOMY", value=3, new_column_name='# hemicraniectomy - Referred to another centre')
-        self.statsDf['% hemicraniectomy - Referred to another centre'] = self.statsDf.apply(lambda x: round(((x['# hemicraniectomy - Referred to another centre']/x['isch_patients']) * 100), 2) if x['isch_patients'] > 0 else 0, axis=1)
+        self.statsDf['% hemicraniectomy - Referred to another centre'] = self._get_percentage(self.statsDf['# hemicraniectomy - Referred to another centre'], self.statsDf['isch_patients'])
 
         ################
         # NEUROSURGERY #
         ################
-        self.tmp = ich.groupby(['Protocol ID', 'NEUROSURGERY']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(ich, 'NEUROSURGERY')
         self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY", value=3, new_column_name='# neurosurgery - Not known')
-        self.statsDf['% neurosurgery - Not known'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery - Not known']/x['ich_patients']) * 100), 2) if x['ich_patients'] > 0 else 0, axis=1)
+        self.statsDf['% neurosurgery - Not known'] = self._get_percentage(self.statsDf['# neurosurgery - Not known'], self.statsDf['ich_patients'])
         self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY", value=1, new_column_name='# neurosurgery - Yes')
-        self.statsDf['% neurosurgery - Yes'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery - Yes']/(x['ich_patients'] - x['# neurosurgery - Not known'])) * 100), 2) if (x['ich_patients'] - x['# neurosurgery - Not known']) > 0 else 0, axis=1)
+        self.statsDf['% neurosurgery - Yes'] = self._get_percentage(self.statsDf['# neurosurgery - Yes'], self.statsDf['ich_patients'] - self.statsDf['# neurosurgery - Not known'])
         self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY", value=2, new_column_name='# neurosurgery - No')
-        self.statsDf['% neurosurgery - No'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery - No']/(x['ich_patients'] - x['# neurosurgery - Not known'])) * 100), 2) if (x['ich_patients'] - x['# neurosurgery - Not known']) > 0 else 0, axis=1)
+        self.statsDf['% neurosurgery - No'] = self._get_percentage(self.statsDf['# neurosurgery - No'], self.statsDf['ich_patients'] - self.statsDf['# neurosurgery - Not known'])
 
         #####################
         # NEUROSURGERY TYPE #
         #####################
         # Create temporary dataframe of patients who have undergone neurosurgery 
-        neurosurgery = ich[ich['NEUROSURGERY'].isin([1])].copy()
+        neurosurgery = ich + (('NEUROSURGERY', 'isin', (1,)),)
 
-        if neurosurgery.empty:
+        if self._masks.is_empty(neurosurgery):
             # If no data available set 0 to all variables
             self.statsDf['neurosurgery_patients'] = 0
             self.statsDf['# neurosurgery type - intracranial hematoma evacuation'] = 0
@@ -925,37 +966,37 @@ class ComputeStats:
             self.statsDf['# neurosurgery type - Referred to another centre'] = 0
             self.statsDf['% neurosurgery type - Referred to another centre'] = 0
         else:
-            self.tmp = neurosurgery.groupby(['Protocol ID', 'NEUROSURGERY_TYPE']).size().to_frame('count').reset_index()
-            self.statsDf['neurosurgery_patients'] = self._count_patients(dataframe=neurosurgery)
+            self.tmp = self._get_population_values(neurosurgery, 'NEUROSURGERY_TYPE')
+            self.statsDf['neurosurgery_patients'] = self._count_population(neurosurgery)
             self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY_TYPE", value=1, new_column_name='# neurosurgery type - intracranial hematoma evacuation')
-            self.statsDf['% neurosurgery type - intracranial hematoma evacuation'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery type - intracranial hematoma evacuation']/x['neurosurgery_patients']) * 100), 2) if x['neurosurgery_patients'] > 0 else 0, axis=1)
+            self.statsDf['% neurosurgery type - intracranial hematoma evacuation'] = self._get_percentage(self.statsDf['# neurosurgery type - intracranial hematoma evacuation'], self.statsDf['neurosurgery_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY_TYPE", value=2, new_column_name='# neurosurgery type - external ventricular drainage')
-            self.statsDf['% neurosurgery type - external ventricular drainage'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery type - external ventricular drainage']/x['neurosurgery_patients']) * 100), 2) if x['neurosurgery_patients'] > 0 else 0, axis=1)
+            self.statsDf['% neurosurgery type - external ventricular drainage'] = self._get_percentage(self.statsDf['# neurosurgery type - external ventricular drainage'], self.statsDf['neurosurgery_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY_TYPE", value=3, new_column_name='# neurosurgery type - decompressive craniectomy')
-            self.statsDf['% neurosurgery type - decompressive craniectomy'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery type - decompressive craniectomy']/x['neurosurgery_patients']) * 100), 2) if x['neurosurgery_patients'] > 0 else 0, axis=1)
+            self.statsDf['% neurosurgery type - decompressive craniectomy'] = self._get_percentage(self.statsDf['# neurosurgery type - decompressive craniectomy'], self.statsDf['neurosurgery_patients'])
             self.statsDf = self._get_values_for_factors(column_name="NEUROSURGERY_TYPE", value=4, new_column_name='# neurosurgery type - Referred to another centre')
-            self.statsDf['% neurosurgery type - Referred to another centre'] = self.statsDf.apply(lambda x: round(((x['# neurosurgery type - Referred to another centre']/x['neurosurgery_patients']) * 100), 2) if x['neurosurgery_patients'] > 0 else 0, axis=1)
+            self.statsDf['% neurosurgery type - Referred to another centre'] = self._get_percentage(self.statsDf['# neurosurgery type - Referred to another centre'], self.statsDf['neurosurgery_patients'])
         del neurosurgery
 
         ###################
         # BLEEDING REASON #
         ###################
-        self.tmp = ich.groupby(['Protocol ID', 'BLEEDING_REASON']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(ich, 'BLEEDING_REASON')
         self.tmp['BLEEDING_REASON'] = self.tmp['BLEEDING_REASON'].astype(str)
         # Get number of patients entered in older form
         self.statsDf = self._get_values_for_factors(column_name="BLEEDING_REASON", value='-999', new_column_name='tmp')
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value='1', new_column_name='# bleeding reason - arterial hypertension')
-        self.statsDf['% bleeding reason - arterial hypertension'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - arterial hypertension']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - arterial hypertension'] = self._get_percentage(self.statsDf['# bleeding reason - arterial hypertension'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value="2", new_column_name='# bleeding reason - aneurysm')
-        self.statsDf['% bleeding reason - aneurysm'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - aneurysm']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - aneurysm'] = self._get_percentage(self.statsDf['# bleeding reason - aneurysm'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value="3", new_column_name='# bleeding reason - arterio-venous malformation')
-        self.statsDf['% bleeding reason - arterio-venous malformation'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - arterio-venous malformation']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - arterio-venous malformation'] = self._get_percentage(self.statsDf['# bleeding reason - arterio-venous malformation'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value="4", new_column_name='# bleeding reason - anticoagulation therapy')
-        self.statsDf['% bleeding reason - anticoagulation therapy'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - anticoagulation therapy']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - anticoagulation therapy'] = self._get_percentage(self.statsDf['# bleeding reason - anticoagulation therapy'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value="5", new_column_name='# bleeding reason - amyloid angiopathy')
-        self.statsDf['% bleeding reason - amyloid angiopathy'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - amyloid angiopathy']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - amyloid angiopathy'] = self._get_percentage(self.statsDf['# bleeding reason - amyloid angiopathy'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value="6", new_column_name='# bleeding reason - Other')
-        self.statsDf['% bleeding reason - Other'] = self.statsDf.apply(lambda x: round(((x['# bleeding reason - Other']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - Other'] = self._get_percentage(self.statsDf['# bleeding reason - Other'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
 
         ### DATA NORMALIZATION
         norm_tmp = self.statsDf[['% bleeding reason - arterial hypertension', '% bleeding reason - aneurysm', '% bleeding reason - arterio-venous malformation', '% bleeding reason - anticoagulation therapy', '% bleeding reason - amyloid angiopathy', '% bleeding reason - Other']].copy()
@@ -970,42 +1011,42 @@ class ComputeStats:
 
         # MORE THAN ONE POSIBILITY
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_REASON", value=",", new_column_name='# bleeding reason - more than one')
-        self.statsDf['% bleeding reason - more than one'] =  self.statsDf.apply(lambda x: round(((x['# bleeding reason - more than one']/(x['ich_patients'] - x['tmp'])) * 100), 2) if (x['ich_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding reason - more than one'] =  self._get_percentage(self.statsDf['# bleeding reason - more than one'], self.statsDf['ich_patients'] - self.statsDf['tmp'])
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ###################
         # BLEEDING SOURCE #
         ###################
-        self.tmp = sah.groupby(['Protocol ID', 'BLEEDING_SOURCE']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(sah, 'BLEEDING_SOURCE')
         self.tmp['BLEEDING_SOURCE'] = self.tmp['BLEEDING_SOURCE'].astype(str)
         # Get number of patients entered in older form
         # self.statsDf = self._get_values_for_factors(column_name="BLEEDING_SOURCE", value='-999', new_column_name='tmp')
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_SOURCE", value='-999', new_column_name='tmp')
         # self.statsDf = self._get_values_for_factors(column_name="BLEEDING_SOURCE", value='1', new_column_name='# bleeding source - Known')
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_SOURCE", value='1', new_column_name='# bleeding source - Known')
-        self.statsDf['% bleeding source - Known'] = self.statsDf.apply(lambda x: round(((x['# bleeding source - Known']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding source - Known'] = self._get_percentage(self.statsDf['# bleeding source - Known'], self.statsDf['sah_patients'] - self.statsDf['tmp'])
         # self.statsDf = self._get_values_for_factors(column_name="BLEEDING_SOURCE", value='2', new_column_name='# bleeding source - Not known')
         self.statsDf = self._get_values_for_factors_containing(column_name="BLEEDING_SOURCE", value='2', new_column_name='# bleeding source - Not known')
-        self.statsDf['% bleeding source - Not known'] = self.statsDf.apply(lambda x: round(((x['# bleeding source - Not known']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% bleeding source - Not known'] = self._get_percentage(self.statsDf['# bleeding source - Not known'], self.statsDf['sah_patients'] - self.statsDf['tmp'])
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ################
         # INTERVENTION #
         ################
-        self.tmp = sah.groupby(['Protocol ID', 'INTERVENTION']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(sah, 'INTERVENTION')
         self.tmp['INTERVENTION'] = self.tmp['INTERVENTION'].astype(str)
         # Get number of patients entered in older form
-        self.statsDf = self._get_values_for_factors(column_name="INTERVENTION", value=-999, new_column_name='tmp')
+        self.statsDf = self._get_values_for_factors(column_name="INTERVENTION", value='-999', new_column_name='tmp')
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value="1", new_column_name='# intervention - endovascular (coiling)')
-        self.statsDf['% intervention - endovascular (coiling)'] = self.statsDf.apply(lambda x: round(((x['# intervention - endovascular (coiling)']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - endovascular (coiling)'] = self._get_percentage(self.statsDf['# intervention - endovascular (coiling)'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value="2", new_column_name='# intervention - neurosurgical (clipping)')
-        self.statsDf['% intervention - neurosurgical (clipping)'] = self.statsDf.apply(lambda x: round(((x['# intervention - neurosurgical (clipping)']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - neurosurgical (clipping)'] = self._get_percentage(self.statsDf['# intervention - neurosurgical (clipping)'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value="3", new_column_name='# intervention - Other neurosurgical treatment (decompression, drainage)')
-        self.statsDf['% intervention - Other neurosurgical treatment (decompression, drainage)'] = self.statsDf.apply(lambda x: round(((x['# intervention - Other neurosurgical treatment (decompression, drainage)']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - Other neurosurgical treatment (decompression, drainage)'] = self._get_percentage(self.statsDf['# intervention - Other neurosurgical treatment (decompression, drainage)'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value="4", new_column_name='# intervention - Referred to another hospital for intervention')
-        self.statsDf['% intervention - Referred to another hospital for intervention'] = self.statsDf.apply(lambda x: round(((x['# intervention - Referred to another hospital for intervention']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - Referred to another hospital for intervention'] = self._get_percentage(self.statsDf['# intervention - Referred to another hospital for intervention'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value="5|6", new_column_name='# intervention - None / no intervention')
-        self.statsDf['% intervention - None / no intervention'] = self.statsDf.apply(lambda x: round(((x['# intervention - None / no intervention']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - None / no intervention'] = self._get_percentage(self.statsDf['# intervention - None / no intervention'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
 
         ### DATA NORMALIZATION
         norm_tmp = self.statsDf[['% intervention - endovascular (coiling)', '% intervention - neurosurgical (clipping)', '% intervention - Other neurosurgical treatment (decompression, drainage)', '% intervention - Referred to another hospital for intervention', '% intervention - None / no intervention']].copy()
@@ -1018,27 +1059,27 @@ class ComputeStats:
         del norm_tmp
 
         self.statsDf = self._get_values_for_factors_containing(column_name="INTERVENTION", value=",", new_column_name='# intervention - more than one')
-        self.statsDf['% intervention - more than one'] = self.statsDf.apply(lambda x: round(((x['# intervention - more than one']/(x['sah_patients'] - x['tmp'])) * 100), 2) if (x['sah_patients'] - x['tmp']) > 0 else 0, axis=1) 
+        self.statsDf['% intervention - more than one'] = self._get_percentage(self.statsDf['# intervention - more than one'], self.statsDf['sah_patients'] - self.statsDf['tmp']) 
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ################
         # VT TREATMENT #
         ################
-        if ('VT_TREATMENT' not in cvt.columns):
-            cvt['VT_TREATMENT'] = np.nan
-            
-        self.tmp = cvt.groupby(['Protocol ID', 'VT_TREATMENT']).size().to_frame('count').reset_index()
+        if ('VT_TREATMENT' not in self.df.columns):
+            self.tmp = pd.DataFrame(columns=['Protocol ID', 'VT_TREATMENT', 'count'])
+        else:
+            self.tmp = self._get_population_values(cvt, 'VT_TREATMENT')
         self.tmp[['VT_TREATMENT']] = self.tmp[['VT_TREATMENT']].astype(str)
         self.statsDf = self._get_values_for_factors_containing(column_name="VT_TREATMENT", value="1", new_column_name='# VT treatment - anticoagulation')
-        self.statsDf['% VT treatment - anticoagulation'] = self.statsDf.apply(lambda x: round(((x['# VT treatment - anticoagulation']/x['cvt_patients']) * 100), 2) if x['cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% VT treatment - anticoagulation'] = self._get_percentage(self.statsDf['# VT treatment - anticoagulation'], self.statsDf['cvt_patients'])
         self.statsDf = self._get_values_for_factors_containing(column_name="VT_TREATMENT", value="2", new_column_name='# VT treatment - thrombectomy')
-        self.statsDf['% VT treatment - thrombectomy'] = self.statsDf.apply(lambda x: round(((x['# VT treatment - thrombectomy']/x['cvt_patients']) * 100), 2) if x['cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% VT treatment - thrombectomy'] = self._get_percentage(self.statsDf['# VT treatment - thrombectomy'], self.statsDf['cvt_patients'])
         self.statsDf = self._get_values_for_factors_containing(column_name="VT_TREATMENT", value="3", new_column_name='# VT treatment - local thrombolysis')
-        self.statsDf['% VT treatment - local thrombolysis'] = self.statsDf.apply(lambda x: round(((x['# VT treatment - local thrombolysis']/x['cvt_patients']) * 100), 2) if x['cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% VT treatment - local thrombolysis'] = self._get_percentage(self.statsDf['# VT treatment - local thrombolysis'], self.statsDf['cvt_patients'])
         self.statsDf = self._get_values_for_factors_containing(column_name="VT_TREATMENT", value="4", new_column_name='# VT treatment - local neurological treatment')
-        self.statsDf['% VT treatment - local neurological treatment'] = self.statsDf.apply(lambda x: round(((x['# VT treatment - local neurological treatment']/x['cvt_patients']) * 100), 2) if x['cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% VT treatment - local neurological treatment'] = self._get_percentage(self.statsDf['# VT treatment - local neurological treatment'], self.statsDf['cvt_patients'])
         self.statsDf = self._get_values_for_factors_containing(column_name="VT_TREATMENT", value=",", new_column_name='# VT treatment - more than one treatment')
-        self.statsDf['% VT treatment - more than one treatment'] = self.statsDf.apply(lambda x: round(((x['# VT treatment - more than one treatment']/x['cvt_patients']) * 100), 2) if x['cvt_patients'] > 0 else 0, axis=1)
+        self.statsDf['% VT treatment - more than one treatment'] = self._get_percentage(self.statsDf['# VT treatment - more than one treatment'], self.statsDf['cvt_patients'])
 
         ### DATA NORMALIZATION
         norm_tmp = self.statsDf[['% VT treatment - anticoagulation', '% VT treatment - thrombectomy', '% VT treatment - local thrombolysis', '% VT treatment - local neurological treatment']].copy()
@@ -1054,118 +1095,118 @@ class ComputeStats:
         ########
         # tag::afib[]
         if country_code == 'CZ':
-            not_reffered = is_tia.loc[~(is_tia['crf_parent_name'].isin(['F_RESQ_IVT_TBY_CZ_4']) & is_tia['RECANALIZATION_PROCEDURES'].isin([5,6,8]))].copy()
-            self.statsDf['not_reffered_patients'] = self._count_patients(dataframe=not_reffered) 
+            not_reffered = is_tia + (Any((('crf_parent_name', 'not isin', ('F_RESQ_IVT_TBY_CZ_4',)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6, 8)))),)
+            self.statsDf['not_reffered_patients'] = self._count_population(not_reffered)
 
             # Create dataframe with the patients referred to another hospital
-            reffered = is_tia[is_tia['RECANALIZATION_PROCEDURES'].isin([5,6,8])].copy()
-            self.statsDf['reffered_patients'] = self._count_patients(dataframe=reffered)
+            reffered = is_tia + (('RECANALIZATION_PROCEDURES', 'isin', (5, 6, 8)),)
+            self.statsDf['reffered_patients'] = self._count_population(reffered)
 
-            self.tmp = not_reffered.groupby(['Protocol ID', 'AFIB_FLUTTER']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(not_reffered, 'AFIB_FLUTTER')
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=1, new_column_name='# afib/flutter - Known')
-            self.statsDf['% afib/flutter - Known'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Known']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Known'] = self._get_percentage(self.statsDf['# afib/flutter - Known'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=2, new_column_name='# afib/flutter - Newly-detected at admission')
-            self.statsDf['% afib/flutter - Newly-detected at admission'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Newly-detected at admission']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Newly-detected at admission'] = self._get_percentage(self.statsDf['# afib/flutter - Newly-detected at admission'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=3, new_column_name='# afib/flutter - Detected during hospitalization')
-            self.statsDf['% afib/flutter - Detected during hospitalization'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Detected during hospitalization']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Detected during hospitalization'] = self._get_percentage(self.statsDf['# afib/flutter - Detected during hospitalization'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=4, new_column_name='# afib/flutter - Not detected')
-            self.statsDf['% afib/flutter - Not detected'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Not detected']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1)
+            self.statsDf['% afib/flutter - Not detected'] = self._get_percentage(self.statsDf['# afib/flutter - Not detected'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=5, new_column_name='# afib/flutter - Not known')
-            self.statsDf['% afib/flutter - Not known'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Not known']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1)
+            self.statsDf['% afib/flutter - Not known'] = self._get_percentage(self.statsDf['# afib/flutter - Not known'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients'])
 
             self.statsDf['afib_flutter_detected_only'] = self.statsDf['# afib/flutter - Newly-detected at admission'] + self.statsDf['# afib/flutter - Detected during hospitalization']
-            self.statsDf['% patients detected for aFib'] = self.statsDf.apply(lambda x: round(((x['afib_flutter_detected_only']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% patients detected for aFib'] = self._get_percentage(self.statsDf['afib_flutter_detected_only'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
 
         else:
-            not_reffered = is_tia[~is_tia['RECANALIZATION_PROCEDURES'].isin([7])].copy()
-            self.statsDf['not_reffered_patients'] = self._count_patients(dataframe=not_reffered)
+            not_reffered = is_tia + (('RECANALIZATION_PROCEDURES', 'not isin', (7,)),)
+            self.statsDf['not_reffered_patients'] = self._count_population(not_reffered)
 
             # Create dataframe with the patients referred to another hospital
-            reffered = is_tia[is_tia['RECANALIZATION_PROCEDURES'].isin([7])].copy()
-            self.statsDf['reffered_patients'] = self._count_patients(dataframe=reffered)
+            reffered = is_tia + (('RECANALIZATION_PROCEDURES', 'isin', (7,)),)
+            self.statsDf['reffered_patients'] = self._count_population(reffered)
 
-            self.tmp = not_reffered.groupby(['Protocol ID', 'AFIB_FLUTTER']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(not_reffered, 'AFIB_FLUTTER')
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=1, new_column_name='# afib/flutter - Known')
-            self.statsDf['% afib/flutter - Known'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Known']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Known'] = self._get_percentage(self.statsDf['# afib/flutter - Known'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=2, new_column_name='# afib/flutter - Newly-detected at admission')
-            self.statsDf['% afib/flutter - Newly-detected at admission'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Newly-detected at admission']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Newly-detected at admission'] = self._get_percentage(self.statsDf['# afib/flutter - Newly-detected at admission'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=3, new_column_name='# afib/flutter - Detected during hospitalization')
-            self.statsDf['% afib/flutter - Detected during hospitalization'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Detected during hospitalization']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% afib/flutter - Detected during hospitalization'] = self._get_percentage(self.statsDf['# afib/flutter - Detected during hospitalization'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=4, new_column_name='# afib/flutter - Not detected')
-            self.statsDf['% afib/flutter - Not detected'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Not detected']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1)
+            self.statsDf['% afib/flutter - Not detected'] = self._get_percentage(self.statsDf['# afib/flutter - Not detected'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="AFIB_FLUTTER", value=5, new_column_name='# afib/flutter - Not known')
-            self.statsDf['% afib/flutter - Not known'] = self.statsDf.apply(lambda x: round(((x['# afib/flutter - Not known']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1)
+            self.statsDf['% afib/flutter - Not known'] = self._get_percentage(self.statsDf['# afib/flutter - Not known'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients'])
 
             self.statsDf['afib_flutter_detected_only'] = self.statsDf['# afib/flutter - Newly-detected at admission'] + self.statsDf['# afib/flutter - Detected during hospitalization']
-            self.statsDf['% patients detected for aFib'] = self.statsDf.apply(lambda x: round(((x['afib_flutter_detected_only']/(x['is_tia_patients'] - x['reffered_patients'])) * 100), 2) if (x['is_tia_patients'] - x['reffered_patients']) > 0 else 0, axis=1) 
+            self.statsDf['% patients detected for aFib'] = self._get_percentage(self.statsDf['afib_flutter_detected_only'], self.statsDf['is_tia_patients'] - self.statsDf['reffered_patients']) 
         # end::afib[]
 
         #########################
         # AFIB DETECTION METHOD #
         #########################
         if country_code == 'CZ':
-            afib_detected_during_hospitalization = not_reffered[not_reffered['AFIB_FLUTTER'].isin([3])].copy()
+            afib_detected_during_hospitalization = self._get_population(not_reffered + (('AFIB_FLUTTER', 'isin', (3,)),), ['Protocol ID', 'AFIB_DETECTION_METHOD'])
             self.statsDf['afib_detected_during_hospitalization_patients'] = self._count_patients(dataframe=afib_detected_during_hospitalization)
             afib_detected_during_hospitalization['AFIB_DETECTION_METHOD'] = afib_detected_during_hospitalization['AFIB_DETECTION_METHOD'].astype(str) # Convert values to string
             self.tmp = afib_detected_during_hospitalization.groupby(['Protocol ID', 'AFIB_DETECTION_METHOD']).size().to_frame('count').reset_index()
             
             self.statsDf = self._get_values_for_factors_containing(column_name="AFIB_DETECTION_METHOD", value="1", new_column_name='# afib detection method - Telemetry with monitor allowing automatic detection of aFib')
-            self.statsDf['% afib detection method - Telemetry with monitor allowing automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Telemetry with monitor allowing automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib detection method - Telemetry with monitor allowing automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - Telemetry with monitor allowing automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
             self.statsDf = self._get_values_for_factors_containing(column_name="AFIB_DETECTION_METHOD", value="2", new_column_name='# afib detection method - Telemetry without monitor allowing automatic detection of aFib')
-            self.statsDf['% afib detection method - Telemetry without monitor allowing automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Telemetry without monitor allowing automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib detection method - Telemetry without monitor allowing automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - Telemetry without monitor allowing automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
             self.statsDf = self._get_values_for_factors_containing(column_name="AFIB_DETECTION_METHOD", value="3", new_column_name='# afib detection method - Holter-type monitoring')
-            self.statsDf['% afib detection method - Holter-type monitoring'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Holter-type monitoring']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib detection method - Holter-type monitoring'] = self._get_percentage(self.statsDf['# afib detection method - Holter-type monitoring'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
             self.statsDf = self._get_values_for_factors_containing(column_name="AFIB_DETECTION_METHOD", value="4", new_column_name='# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib')
-            self.statsDf['% afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
             self.statsDf = self._get_values_for_factors_containing(column_name="AFIB_DETECTION_METHOD", value="5", new_column_name='# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib')
-            self.statsDf['% afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
         else:
-            afib_detected_during_hospitalization = not_reffered[not_reffered['AFIB_FLUTTER'].isin([3])].copy()
+            afib_detected_during_hospitalization = self._get_population(not_reffered + (('AFIB_FLUTTER', 'isin', (3,)),), ['Protocol ID', 'AFIB_DETECTION_METHOD'])
             self.statsDf['afib_detected_during_hospitalization_patients'] = self._count_patients(dataframe=afib_detected_during_hospitalization)
             afib_detected_during_hospitalization['AFIB_DETECTION_METHOD'] = afib_detected_during_hospitalization['AFIB_DETECTION_METHOD'].astype(str)
             self.tmp = afib_detected_during_hospitalization.groupby(['Protocol ID', 'AFIB_DETECTION_METHOD']).size().to_frame('count').reset_index()
             
-            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value=1, new_column_name='# afib detection method - Telemetry with monitor allowing automatic detection of aFib')
-            self.statsDf['% afib detection method - Telemetry with monitor allowing automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Telemetry with monitor allowing automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value='1', new_column_name='# afib detection method - Telemetry with monitor allowing automatic detection of aFib')
+            self.statsDf['% afib detection method - Telemetry with monitor allowing automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - Telemetry with monitor allowing automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
-            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value=2, new_column_name='# afib detection method - Telemetry without monitor allowing automatic detection of aFib')
-            self.statsDf['% afib detection method - Telemetry without monitor allowing automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Telemetry without monitor allowing automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value='2', new_column_name='# afib detection method - Telemetry without monitor allowing automatic detection of aFib')
+            self.statsDf['% afib detection method - Telemetry without monitor allowing automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - Telemetry without monitor allowing automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
-            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value=3, new_column_name='# afib detection method - Holter-type monitoring')
-            self.statsDf['% afib detection method - Holter-type monitoring'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - Holter-type monitoring']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value='3', new_column_name='# afib detection method - Holter-type monitoring')
+            self.statsDf['% afib detection method - Holter-type monitoring'] = self._get_percentage(self.statsDf['# afib detection method - Holter-type monitoring'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
-            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value=4, new_column_name='# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib')
-            self.statsDf['% afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value='4', new_column_name='# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib')
+            self.statsDf['% afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - EKG monitoring in an ICU bed with automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
             
-            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value=5, new_column_name='# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib')
-            self.statsDf['% afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'] = self.statsDf.apply(lambda x: round(((x['# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib']/x['afib_detected_during_hospitalization_patients']) * 100), 2) if x['afib_detected_during_hospitalization_patients'] > 0 else 0, axis=1)
+            self.statsDf = self._get_values_for_factors(column_name="AFIB_DETECTION_METHOD", value='5', new_column_name='# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib')
+            self.statsDf['% afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'] = self._get_percentage(self.statsDf['# afib detection method - EKG monitoring in an ICU bed without automatic detection of aFib'], self.statsDf['afib_detected_during_hospitalization_patients'])
 
         ###############################
         # AFIB OTHER DETECTION METHOD #
         ###############################
-        afib_not_detected_or_not_known = not_reffered[not_reffered['AFIB_FLUTTER'].isin([4, 5])].copy()
-        self.statsDf['afib_not_detected_or_not_known_patients'] = self._count_patients(dataframe=afib_not_detected_or_not_known)
-        self.tmp = afib_not_detected_or_not_known.groupby(['Protocol ID', 'AFIB_OTHER_RECS']).size().to_frame('count').reset_index()
+        afib_not_detected_or_not_known = not_reffered + (('AFIB_FLUTTER', 'isin', (4, 5)),)
+        self.statsDf['afib_not_detected_or_not_known_patients'] = self._count_population(afib_not_detected_or_not_known)
+        self.tmp = self._get_population_values(afib_not_detected_or_not_known, 'AFIB_OTHER_RECS')
         
         self.statsDf = self._get_values_for_factors(column_name="AFIB_OTHER_RECS", value=1, new_column_name='# other afib detection method - Yes')
-        self.statsDf['% other afib detection method - Yes'] = self.statsDf.apply(lambda x: round(((x['# other afib detection method - Yes']/x['afib_not_detected_or_not_known_patients']) * 100), 2) if x['afib_not_detected_or_not_known_patients'] > 0 else 0, axis=1)
+        self.statsDf['% other afib detection method - Yes'] = self._get_percentage(self.statsDf['# other afib detection method - Yes'], self.statsDf['afib_not_detected_or_not_known_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="AFIB_OTHER_RECS", value=2, new_column_name='# other afib detection method - Not detected or not known')
-        self.statsDf['% other afib detection method - Not detected or not known'] = self.statsDf.apply(lambda x: round(((x['# other afib detection method - Not detected or not known']/x['afib_not_detected_or_not_known_patients']) * 100), 2) if x['afib_not_detected_or_not_known_patients'] > 0 else 0, axis=1)
+        self.statsDf['% other afib detection method - Not detected or not known'] = self._get_percentage(self.statsDf['# other afib detection method - Not detected or not known'], self.statsDf['afib_not_detected_or_not_known_patients'])
 
         
         ############################
@@ -1204,13 +1245,13 @@ class ComputeStats:
                 self.tmp = cz_df_is_tia.groupby(['Protocol ID', 'CAROTID_ARTERIES_IMAGING']).size().to_frame('count').reset_index()
       
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=3, new_column_name='# carotid arteries imaging - Not known')
-                self.statsDf['% carotid arteries imaging - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Not known']/x['cz_df_is_tia_pts']) * 100), 2) if x['cz_df_is_tia_pts'] > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Not known'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Not known'], self.statsDf['cz_df_is_tia_pts'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=1, new_column_name='# carotid arteries imaging - Yes')
-                self.statsDf['% carotid arteries imaging - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Yes']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Yes'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Yes'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=2, new_column_name='# carotid arteries imaging - No')
-                self.statsDf['% carotid arteries imaging - No'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - No']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - No'] = self._get_percentage(self.statsDf['# carotid arteries imaging - No'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 del cz_df_is_tia, cz_df
 
             elif (not comparison and (self.period.startswith('Q2') or self.period.startswith('H1')) and self.period.endswith('2019')):
@@ -1237,13 +1278,13 @@ class ComputeStats:
                 self.tmp = cz_df_is_tia.groupby(['Protocol ID', 'CAROTID_ARTERIES_IMAGING']).size().to_frame('count').reset_index()
       
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=3, new_column_name='# carotid arteries imaging - Not known')
-                self.statsDf['% carotid arteries imaging - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Not known']/x['cz_df_is_tia_pts']) * 100), 2) if x['cz_df_is_tia_pts'] > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Not known'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Not known'], self.statsDf['cz_df_is_tia_pts'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=1, new_column_name='# carotid arteries imaging - Yes')
-                self.statsDf['% carotid arteries imaging - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Yes']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Yes'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Yes'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=2, new_column_name='# carotid arteries imaging - No')
-                self.statsDf['% carotid arteries imaging - No'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - No']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - No'] = self._get_percentage(self.statsDf['# carotid arteries imaging - No'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 del cz_df_is_tia, cz_df
 
             elif (not comparison and self.period == '2019'):
@@ -1271,164 +1312,164 @@ class ComputeStats:
                 self.tmp = cz_df_is_tia.groupby(['Protocol ID', 'CAROTID_ARTERIES_IMAGING']).size().to_frame('count').reset_index()
       
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=3, new_column_name='# carotid arteries imaging - Not known')
-                self.statsDf['% carotid arteries imaging - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Not known']/x['cz_df_is_tia_pts']) * 100), 2) if x['cz_df_is_tia_pts'] > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Not known'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Not known'], self.statsDf['cz_df_is_tia_pts'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=1, new_column_name='# carotid arteries imaging - Yes')
-                self.statsDf['% carotid arteries imaging - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Yes']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Yes'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Yes'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=2, new_column_name='# carotid arteries imaging - No')
-                self.statsDf['% carotid arteries imaging - No'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - No']/(x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['cz_df_is_tia_pts'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - No'] = self._get_percentage(self.statsDf['# carotid arteries imaging - No'], self.statsDf['cz_df_is_tia_pts'] - self.statsDf['# carotid arteries imaging - Not known'])
                 del cz_df_is_tia, cz_df
             else:
-                self.tmp = is_tia.groupby(['Protocol ID', 'CAROTID_ARTERIES_IMAGING']).size().to_frame('count').reset_index()
+                self.tmp = self._get_population_values(is_tia, 'CAROTID_ARTERIES_IMAGING')
         
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=3, new_column_name='# carotid arteries imaging - Not known')
-                self.statsDf['% carotid arteries imaging - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Not known']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Not known'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Not known'], self.statsDf['is_tia_patients'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=1, new_column_name='# carotid arteries imaging - Yes')
-                self.statsDf['% carotid arteries imaging - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Yes']/(x['is_tia_patients'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['is_tia_patients'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - Yes'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Yes'], self.statsDf['is_tia_patients'] - self.statsDf['# carotid arteries imaging - Not known'])
                 
                 self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=2, new_column_name='# carotid arteries imaging - No')
-                self.statsDf['% carotid arteries imaging - No'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - No']/(x['is_tia_patients'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['is_tia_patients'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+                self.statsDf['% carotid arteries imaging - No'] = self._get_percentage(self.statsDf['# carotid arteries imaging - No'], self.statsDf['is_tia_patients'] - self.statsDf['# carotid arteries imaging - Not known'])
 
             if 'cz_df_is_tia_pts' in self.statsDf.columns:
                 self.statsDf.drop(['cz_df_is_tia_pts'], inplace=True, axis=1)
         else:
-            self.tmp = is_tia.groupby(['Protocol ID', 'CAROTID_ARTERIES_IMAGING']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_tia, 'CAROTID_ARTERIES_IMAGING')
         
             self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=3, new_column_name='# carotid arteries imaging - Not known')
-            self.statsDf['% carotid arteries imaging - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Not known']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+            self.statsDf['% carotid arteries imaging - Not known'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Not known'], self.statsDf['is_tia_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=1, new_column_name='# carotid arteries imaging - Yes')
-            self.statsDf['% carotid arteries imaging - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - Yes']/(x['is_tia_patients'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['is_tia_patients'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% carotid arteries imaging - Yes'] = self._get_percentage(self.statsDf['# carotid arteries imaging - Yes'], self.statsDf['is_tia_patients'] - self.statsDf['# carotid arteries imaging - Not known'])
             
             self.statsDf = self._get_values_for_factors(column_name="CAROTID_ARTERIES_IMAGING", value=2, new_column_name='# carotid arteries imaging - No')
-            self.statsDf['% carotid arteries imaging - No'] = self.statsDf.apply(lambda x: round(((x['# carotid arteries imaging - No']/(x['is_tia_patients'] - x['# carotid arteries imaging - Not known'])) * 100), 2) if (x['is_tia_patients'] - x['# carotid arteries imaging - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% carotid arteries imaging - No'] = self._get_percentage(self.statsDf['# carotid arteries imaging - No'], self.statsDf['is_tia_patients'] - self.statsDf['# carotid arteries imaging - Not known'])
 
         ############################
         # ANTITHROMBOTICS WITH CVT #
         ############################
         # Create dataframe with dead patients excluded
-        antithrombotics_with_cvt = is_tia_cvt[~is_tia_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['antithrombotics_patients_with_cvt'] = self._count_patients(dataframe=antithrombotics_with_cvt)
+        antithrombotics_with_cvt = is_tia_cvt + (('DISCHARGE_DESTINATION', 'not isin', (5,)),)
+        self.statsDf['antithrombotics_patients_with_cvt'] = self._count_population(antithrombotics_with_cvt)
         
-        ischemic_transient_cerebral_dead = is_tia_cvt[is_tia_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['ischemic_transient_cerebral_dead_patients'] = self._count_patients(dataframe=ischemic_transient_cerebral_dead)
-        self.tmp = antithrombotics_with_cvt.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        ischemic_transient_cerebral_dead = is_tia_cvt + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['ischemic_transient_cerebral_dead_patients'] = self._count_population(ischemic_transient_cerebral_dead)
+        self.tmp = self._get_population_values(antithrombotics_with_cvt, 'ANTITHROMBOTICS')
 
         del antithrombotics_with_cvt, ischemic_transient_cerebral_dead
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# patients receiving antiplatelets with CVT')
-        self.statsDf['% patients receiving antiplatelets with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving antiplatelets with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving antiplatelets with CVT'] = self._get_percentage(self.statsDf['# patients receiving antiplatelets with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=2, new_column_name='# patients receiving Vit. K antagonist with CVT')
-        self.statsDf['% patients receiving Vit. K antagonist with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving Vit. K antagonist with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving Vit. K antagonist with CVT'] = self._get_percentage(self.statsDf['# patients receiving Vit. K antagonist with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=3, new_column_name='# patients receiving dabigatran with CVT')
-        self.statsDf['% patients receiving dabigatran with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving dabigatran with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving dabigatran with CVT'] = self._get_percentage(self.statsDf['# patients receiving dabigatran with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=4, new_column_name='# patients receiving rivaroxaban with CVT')
-        self.statsDf['% patients receiving rivaroxaban with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving rivaroxaban with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving rivaroxaban with CVT'] = self._get_percentage(self.statsDf['# patients receiving rivaroxaban with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=5, new_column_name='# patients receiving apixaban with CVT')
-        self.statsDf['% patients receiving apixaban with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving apixaban with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving apixaban with CVT'] = self._get_percentage(self.statsDf['# patients receiving apixaban with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=6, new_column_name='# patients receiving edoxaban with CVT')
-        self.statsDf['% patients receiving edoxaban with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving edoxaban with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving edoxaban with CVT'] = self._get_percentage(self.statsDf['# patients receiving edoxaban with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=7, new_column_name='# patients receiving LMWH or heparin in prophylactic dose with CVT')
-        self.statsDf['% patients receiving LMWH or heparin in prophylactic dose with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving LMWH or heparin in prophylactic dose with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving LMWH or heparin in prophylactic dose with CVT'] = self._get_percentage(self.statsDf['# patients receiving LMWH or heparin in prophylactic dose with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=8, new_column_name='# patients receiving LMWH or heparin in full anticoagulant dose with CVT')
-        self.statsDf['% patients receiving LMWH or heparin in full anticoagulant dose with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients receiving LMWH or heparin in full anticoagulant dose with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving LMWH or heparin in full anticoagulant dose with CVT'] = self._get_percentage(self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=9, new_column_name='# patients not prescribed antithrombotics, but recommended with CVT')
-        self.statsDf['% patients not prescribed antithrombotics, but recommended with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients not prescribed antithrombotics, but recommended with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients not prescribed antithrombotics, but recommended with CVT'] = self._get_percentage(self.statsDf['# patients not prescribed antithrombotics, but recommended with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=10, new_column_name='# patients neither receiving antithrombotics nor recommended with CVT')
-        self.statsDf['% patients neither receiving antithrombotics nor recommended with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients neither receiving antithrombotics nor recommended with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients neither receiving antithrombotics nor recommended with CVT'] = self._get_percentage(self.statsDf['# patients neither receiving antithrombotics nor recommended with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
 
         ## ANTITHROMBOTICS - PATIENTS PRESCRIBED + RECOMMENDED
-        self.statsDf.loc[:, '# patients prescribed antithrombotics with CVT'] = self.statsDf.apply(lambda x: x['# patients receiving antiplatelets with CVT'] + x['# patients receiving Vit. K antagonist with CVT'] + x['# patients receiving dabigatran with CVT'] + x['# patients receiving rivaroxaban with CVT'] + x['# patients receiving apixaban with CVT'] + x['# patients receiving edoxaban with CVT'] + x['# patients receiving LMWH or heparin in prophylactic dose with CVT'] + x['# patients receiving LMWH or heparin in full anticoagulant dose with CVT'], axis=1)
+        self.statsDf.loc[:, '# patients prescribed antithrombotics with CVT'] = self.statsDf['# patients receiving antiplatelets with CVT'] + self.statsDf['# patients receiving Vit. K antagonist with CVT'] + self.statsDf['# patients receiving dabigatran with CVT'] + self.statsDf['# patients receiving rivaroxaban with CVT'] + self.statsDf['# patients receiving apixaban with CVT'] + self.statsDf['# patients receiving edoxaban with CVT'] + self.statsDf['# patients receiving LMWH or heparin in prophylactic dose with CVT'] + self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose with CVT']
 
         # self.statsDf['% patients prescribed antithrombotics'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended']) > 0 else 0, axis=1)
-        self.statsDf['% patients prescribed antithrombotics with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics with CVT']/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed antithrombotics with CVT'] = self._get_percentage(self.statsDf['# patients prescribed antithrombotics with CVT'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'])
 
-        self.statsDf.loc[:, '# patients prescribed or recommended antithrombotics with CVT'] = self.statsDf.apply(lambda x: x['# patients receiving antiplatelets with CVT'] + x['# patients receiving Vit. K antagonist with CVT'] + x['# patients receiving dabigatran with CVT'] + x['# patients receiving rivaroxaban with CVT'] + x['# patients receiving apixaban with CVT'] + x['# patients receiving edoxaban with CVT'] + x['# patients receiving LMWH or heparin in prophylactic dose with CVT'] + x['# patients receiving LMWH or heparin in full anticoagulant dose with CVT'] + x['# patients not prescribed antithrombotics, but recommended with CVT'], axis=1)
+        self.statsDf.loc[:, '# patients prescribed or recommended antithrombotics with CVT'] = self.statsDf['# patients receiving antiplatelets with CVT'] + self.statsDf['# patients receiving Vit. K antagonist with CVT'] + self.statsDf['# patients receiving dabigatran with CVT'] + self.statsDf['# patients receiving rivaroxaban with CVT'] + self.statsDf['# patients receiving apixaban with CVT'] + self.statsDf['# patients receiving edoxaban with CVT'] + self.statsDf['# patients receiving LMWH or heparin in prophylactic dose with CVT'] + self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose with CVT'] + self.statsDf['# patients not prescribed antithrombotics, but recommended with CVT']
 
-        self.statsDf['% patients prescribed or recommended antithrombotics with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed or recommended antithrombotics with CVT'] - x['ischemic_transient_cerebral_dead_patients'])/(x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended with CVT'])) * 100, 2) if ((x['is_tia_cvt_patients'] - x['ischemic_transient_cerebral_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended with CVT']) > 0) else 0, axis=1)
+        self.statsDf['% patients prescribed or recommended antithrombotics with CVT'] = self._get_percentage(self.statsDf['# patients prescribed or recommended antithrombotics with CVT'] - self.statsDf['ischemic_transient_cerebral_dead_patients'], self.statsDf['is_tia_cvt_patients'] - self.statsDf['ischemic_transient_cerebral_dead_patients'] - self.statsDf['# patients not prescribed antithrombotics, but recommended with CVT'])
 
         self.statsDf.fillna(0, inplace=True)
 
         ###########################################
         # ANTIPLATELETS - PRESCRIBED WITHOUT AFIB #
         ###########################################
-        afib_flutter_not_detected_or_not_known_with_cvt = is_tia_cvt[is_tia_cvt['AFIB_FLUTTER'].isin([4, 5])].copy()
-        self.statsDf['afib_flutter_not_detected_or_not_known_patients_with_cvt'] = self._count_patients(dataframe=afib_flutter_not_detected_or_not_known_with_cvt)
+        afib_flutter_not_detected_or_not_known_with_cvt = is_tia_cvt + (('AFIB_FLUTTER', 'isin', (4, 5)),)
+        self.statsDf['afib_flutter_not_detected_or_not_known_patients_with_cvt'] = self._count_population(afib_flutter_not_detected_or_not_known_with_cvt)
 
-        afib_flutter_not_detected_or_not_known_with_cvt_dead = afib_flutter_not_detected_or_not_known_with_cvt[afib_flutter_not_detected_or_not_known_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients_with_cvt'] = self._count_patients(dataframe=afib_flutter_not_detected_or_not_known_with_cvt_dead)
+        afib_flutter_not_detected_or_not_known_with_cvt_dead = afib_flutter_not_detected_or_not_known_with_cvt + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients_with_cvt'] = self._count_population(afib_flutter_not_detected_or_not_known_with_cvt_dead)
 
-        prescribed_antiplatelets_no_afib_with_cvt = afib_flutter_not_detected_or_not_known_with_cvt[afib_flutter_not_detected_or_not_known_with_cvt['ANTITHROMBOTICS'].isin([1])].copy()
-        self.statsDf['prescribed_antiplatelets_no_afib_patients_with_cvt'] = self._count_patients(dataframe=prescribed_antiplatelets_no_afib_with_cvt)
+        prescribed_antiplatelets_no_afib_with_cvt = afib_flutter_not_detected_or_not_known_with_cvt + (('ANTITHROMBOTICS', 'isin', (1,)),)
+        self.statsDf['prescribed_antiplatelets_no_afib_patients_with_cvt'] = self._count_population(prescribed_antiplatelets_no_afib_with_cvt)
 
-        prescribed_antiplatelets_no_afib_dead_with_cvt = prescribed_antiplatelets_no_afib_with_cvt[prescribed_antiplatelets_no_afib_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['prescribed_antiplatelets_no_afib_dead_patients_with_cvt'] = self._count_patients(dataframe=prescribed_antiplatelets_no_afib_dead_with_cvt)
+        prescribed_antiplatelets_no_afib_dead_with_cvt = prescribed_antiplatelets_no_afib_with_cvt + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['prescribed_antiplatelets_no_afib_dead_patients_with_cvt'] = self._count_population(prescribed_antiplatelets_no_afib_dead_with_cvt)
 
-        self.tmp = afib_flutter_not_detected_or_not_known_with_cvt.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(afib_flutter_not_detected_or_not_known_with_cvt, 'ANTITHROMBOTICS')
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# patients prescribed antiplatelets without aFib with CVT')
-        self.statsDf['% patients prescribed antiplatelets without aFib with CVT'] =  self.statsDf.apply(lambda x: round(((x['# patients prescribed antiplatelets without aFib with CVT'] - x['prescribed_antiplatelets_no_afib_dead_patients_with_cvt'])/(x['afib_flutter_not_detected_or_not_known_patients_with_cvt'] - x['afib_flutter_not_detected_or_not_known_dead_patients_with_cvt'])) * 100, 2) if ((x['afib_flutter_not_detected_or_not_known_patients_with_cvt'] - x['afib_flutter_not_detected_or_not_known_dead_patients_with_cvt']) > 0) else 0, axis=1)
+        self.statsDf['% patients prescribed antiplatelets without aFib with CVT'] =  self._get_percentage(self.statsDf['# patients prescribed antiplatelets without aFib with CVT'] - self.statsDf['prescribed_antiplatelets_no_afib_dead_patients_with_cvt'], self.statsDf['afib_flutter_not_detected_or_not_known_patients_with_cvt'] - self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients_with_cvt'])
 
         del afib_flutter_not_detected_or_not_known_with_cvt, afib_flutter_not_detected_or_not_known_with_cvt_dead, prescribed_antiplatelets_no_afib_with_cvt, prescribed_antiplatelets_no_afib_dead_with_cvt
 
         #########################################
         # ANTICOAGULANTS - PRESCRIBED WITH AFIB #
         #########################################       
-        afib_flutter_detected_with_cvt = is_tia_cvt[is_tia_cvt['AFIB_FLUTTER'].isin([1, 2, 3])].copy()
-        self.statsDf['afib_flutter_detected_patients_with_cvt'] = self._count_patients(dataframe=afib_flutter_detected_with_cvt)
+        afib_flutter_detected_with_cvt = is_tia_cvt + (('AFIB_FLUTTER', 'isin', (1, 2, 3)),)
+        self.statsDf['afib_flutter_detected_patients_with_cvt'] = self._count_population(afib_flutter_detected_with_cvt)
 
-        anticoagulants_prescribed_with_cvt = afib_flutter_detected_with_cvt[~afib_flutter_detected_with_cvt['ANTITHROMBOTICS'].isin([1, 10, 9]) & ~afib_flutter_detected_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['# patients prescribed anticoagulants with aFib with CVT'] = self._count_patients(dataframe=anticoagulants_prescribed_with_cvt)
+        anticoagulants_prescribed_with_cvt = afib_flutter_detected_with_cvt + (('ANTITHROMBOTICS', 'not isin', (1, 10, 9)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['# patients prescribed anticoagulants with aFib with CVT'] = self._count_population(anticoagulants_prescribed_with_cvt)
         
-        anticoagulants_recommended_with_cvt = afib_flutter_detected_with_cvt[afib_flutter_detected_with_cvt['ANTITHROMBOTICS'].isin([9])].copy()
-        self.statsDf['anticoagulants_recommended_patients_with_cvt'] = self._count_patients(dataframe=anticoagulants_recommended_with_cvt)
+        anticoagulants_recommended_with_cvt = afib_flutter_detected_with_cvt + (('ANTITHROMBOTICS', 'isin', (9,)),)
+        self.statsDf['anticoagulants_recommended_patients_with_cvt'] = self._count_population(anticoagulants_recommended_with_cvt)
 
-        afib_flutter_detected_dead_with = afib_flutter_detected_with_cvt[afib_flutter_detected_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['afib_flutter_detected_dead_patients_with_cvt'] = self._count_patients(dataframe=afib_flutter_detected_dead_with)
+        afib_flutter_detected_dead_with = afib_flutter_detected_with_cvt + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['afib_flutter_detected_dead_patients_with_cvt'] = self._count_population(afib_flutter_detected_dead_with)
 
-        self.statsDf['% patients prescribed anticoagulants with aFib with CVT'] =  self.statsDf.apply(lambda x: round(((x['# patients prescribed anticoagulants with aFib with CVT']/(x['afib_flutter_detected_patients_with_cvt'] - x['afib_flutter_detected_dead_patients_with_cvt'])) * 100), 2) if (x['afib_flutter_detected_patients_with_cvt'] - x['afib_flutter_detected_dead_patients_with_cvt']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed anticoagulants with aFib with CVT'] =  self._get_percentage(self.statsDf['# patients prescribed anticoagulants with aFib with CVT'], self.statsDf['afib_flutter_detected_patients_with_cvt'] - self.statsDf['afib_flutter_detected_dead_patients_with_cvt'])
 
         ##########################################
         # ANTITHROMBOTICS - PRESCRIBED WITH AFIB #
         ##########################################
-        antithrombotics_prescribed_with_cvt = afib_flutter_detected_with_cvt[~afib_flutter_detected_with_cvt['ANTITHROMBOTICS'].isin([9, 10]) & ~afib_flutter_detected_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['# patients prescribed antithrombotics with aFib with CVT'] = self._count_patients(dataframe=antithrombotics_prescribed_with_cvt)
+        antithrombotics_prescribed_with_cvt = afib_flutter_detected_with_cvt + (('ANTITHROMBOTICS', 'not isin', (9, 10)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['# patients prescribed antithrombotics with aFib with CVT'] = self._count_population(antithrombotics_prescribed_with_cvt)
 
-        recommended_antithrombotics_with_afib_alive_with_cvt = afib_flutter_detected_with_cvt[afib_flutter_detected_with_cvt['ANTITHROMBOTICS'].isin([9]) & ~afib_flutter_detected_with_cvt['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['recommended_antithrombotics_with_afib_alive_patients_with_cvt'] = self._count_patients(dataframe=recommended_antithrombotics_with_afib_alive_with_cvt)
+        recommended_antithrombotics_with_afib_alive_with_cvt = afib_flutter_detected_with_cvt + (('ANTITHROMBOTICS', 'isin', (9,)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['recommended_antithrombotics_with_afib_alive_patients_with_cvt'] = self._count_population(recommended_antithrombotics_with_afib_alive_with_cvt)
 
-        self.statsDf['% patients prescribed antithrombotics with aFib with CVT'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics with aFib with CVT']/(x['afib_flutter_detected_patients_with_cvt'] - x['afib_flutter_detected_dead_patients_with_cvt'] - x['recommended_antithrombotics_with_afib_alive_patients_with_cvt'])) * 100), 2) if (x['afib_flutter_detected_dead_patients_with_cvt'] - x['afib_flutter_detected_dead_patients_with_cvt'] - x['recommended_antithrombotics_with_afib_alive_patients_with_cvt']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed antithrombotics with aFib with CVT'] = self._get_percentage(self.statsDf['# patients prescribed antithrombotics with aFib with CVT'], self.statsDf['afib_flutter_detected_patients_with_cvt'] - self.statsDf['afib_flutter_detected_dead_patients_with_cvt'] - self.statsDf['recommended_antithrombotics_with_afib_alive_patients_with_cvt']).where((self.statsDf['afib_flutter_detected_dead_patients_with_cvt'] - self.statsDf['afib_flutter_detected_dead_patients_with_cvt'] - self.statsDf['recommended_antithrombotics_with_afib_alive_patients_with_cvt']) > 0, 0)
         
         del afib_flutter_detected_with_cvt, anticoagulants_prescribed_with_cvt, anticoagulants_recommended_with_cvt, afib_flutter_detected_dead_with, antithrombotics_prescribed_with_cvt, recommended_antithrombotics_with_afib_alive_with_cvt
         ###############################
         # ANTITHROMBOTICS WITHOUT CVT #
         ###############################
-        antithrombotics = is_tia[~is_tia['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['antithrombotics_patients'] = self._count_patients(dataframe=antithrombotics)
+        antithrombotics = is_tia + (('DISCHARGE_DESTINATION', 'not isin', (5,)),)
+        self.statsDf['antithrombotics_patients'] = self._count_population(antithrombotics)
 
-        ischemic_transient_dead = is_tia[is_tia['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['ischemic_transient_dead_patients'] = self._count_patients(dataframe=ischemic_transient_dead)
+        ischemic_transient_dead = is_tia + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['ischemic_transient_dead_patients'] = self._count_population(ischemic_transient_dead)
         del ischemic_transient_dead
 
-        ischemic_transient_dead_prescribed = is_tia[is_tia['DISCHARGE_DESTINATION'].isin([5]) & ~is_tia['ANTITHROMBOTICS'].isin([10])].copy()
-        self.statsDf['ischemic_transient_dead_patients_prescribed'] = self._count_patients(dataframe=ischemic_transient_dead_prescribed)
+        ischemic_transient_dead_prescribed = is_tia + (('DISCHARGE_DESTINATION', 'isin', (5,)), ('ANTITHROMBOTICS', 'not isin', (10,)))
+        self.statsDf['ischemic_transient_dead_patients_prescribed'] = self._count_population(ischemic_transient_dead_prescribed)
         del ischemic_transient_dead_prescribed
         
-        self.tmp = antithrombotics.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(antithrombotics, 'ANTITHROMBOTICS')
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# patients receiving antiplatelets')
-        self.statsDf['% patients receiving antiplatelets'] = self.statsDf.apply(lambda x: round(((x['# patients receiving antiplatelets']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients receiving antiplatelets'] = self._get_percentage(self.statsDf['# patients receiving antiplatelets'], self.statsDf['is_tia_patients'] - self.statsDf['ischemic_transient_dead_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=2, new_column_name='# patients receiving Vit. K antagonist')
         # self.statsDf['% patients receiving Vit. K antagonist'] = self.statsDf.apply(lambda x: round(((x['# patients receiving Vit. K antagonist']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
@@ -1452,22 +1493,22 @@ class ComputeStats:
         # self.statsDf['% patients receiving LMWH or heparin in full anticoagulant dose'] = self.statsDf.apply(lambda x: round(((x['# patients receiving LMWH or heparin in full anticoagulant dose']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=9, new_column_name='# patients not prescribed antithrombotics, but recommended')
-        self.statsDf['% patients not prescribed antithrombotics, but recommended'] = self.statsDf.apply(lambda x: round(((x['# patients not prescribed antithrombotics, but recommended']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients not prescribed antithrombotics, but recommended'] = self._get_percentage(self.statsDf['# patients not prescribed antithrombotics, but recommended'], self.statsDf['is_tia_patients'] - self.statsDf['ischemic_transient_dead_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=10, new_column_name='# patients neither receiving antithrombotics nor recommended')
-        self.statsDf['% patients neither receiving antithrombotics nor recommended'] = self.statsDf.apply(lambda x: round(((x['# patients neither receiving antithrombotics nor recommended']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients neither receiving antithrombotics nor recommended'] = self._get_percentage(self.statsDf['# patients neither receiving antithrombotics nor recommended'], self.statsDf['is_tia_patients'] - self.statsDf['ischemic_transient_dead_patients'])
 
         ## ANTITHROMBOTICS - PATIENTS PRESCRIBED + RECOMMENDED
-        self.statsDf.loc[:, '# patients prescribed antithrombotics'] = self.statsDf.apply(lambda x: x['# patients receiving antiplatelets'] + x['# patients receiving Vit. K antagonist'] + x['# patients receiving dabigatran'] + x['# patients receiving rivaroxaban'] + x['# patients receiving apixaban'] + x['# patients receiving edoxaban'] + x['# patients receiving LMWH or heparin in prophylactic dose'] + x['# patients receiving LMWH or heparin in full anticoagulant dose'], axis=1)
+        self.statsDf.loc[:, '# patients prescribed antithrombotics'] = self.statsDf['# patients receiving antiplatelets'] + self.statsDf['# patients receiving Vit. K antagonist'] + self.statsDf['# patients receiving dabigatran'] + self.statsDf['# patients receiving rivaroxaban'] + self.statsDf['# patients receiving apixaban'] + self.statsDf['# patients receiving edoxaban'] + self.statsDf['# patients receiving LMWH or heparin in prophylactic dose'] + self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose']
 
         # self.statsDf['% patients prescribed antithrombotics'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics']/(x['is_tia_cvt_patients'] - x['ischemic_transient_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended'])) * 100), 2) if (x['is_tia_cvt_patients'] - x['ischemic_transient_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended']) > 0 else 0, axis=1)
-        self.statsDf['% patients prescribed antithrombotics'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics']/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100), 2) if (x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed antithrombotics'] = self._get_percentage(self.statsDf['# patients prescribed antithrombotics'], self.statsDf['is_tia_patients'] - self.statsDf['ischemic_transient_dead_patients'])
 
-        self.statsDf.loc[:, '# patients prescribed or recommended antithrombotics'] = self.statsDf.apply(lambda x: x['# patients receiving antiplatelets'] + x['# patients receiving Vit. K antagonist'] + x['# patients receiving dabigatran'] + x['# patients receiving rivaroxaban'] + x['# patients receiving apixaban'] + x['# patients receiving edoxaban'] + x['# patients receiving LMWH or heparin in prophylactic dose'] + x['# patients receiving LMWH or heparin in full anticoagulant dose'] + x['# patients not prescribed antithrombotics, but recommended'], axis=1)
+        self.statsDf.loc[:, '# patients prescribed or recommended antithrombotics'] = self.statsDf['# patients receiving antiplatelets'] + self.statsDf['# patients receiving Vit. K antagonist'] + self.statsDf['# patients receiving dabigatran'] + self.statsDf['# patients receiving rivaroxaban'] + self.statsDf['# patients receiving apixaban'] + self.statsDf['# patients receiving edoxaban'] + self.statsDf['# patients receiving LMWH or heparin in prophylactic dose'] + self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose'] + self.statsDf['# patients not prescribed antithrombotics, but recommended']
 
         # From patients prescribed or recommended antithrombotics remove patient who had prescribed antithrombotics and were dead (nominator)
         # self.statsDf['% patients prescribed or recommended antithrombotics'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed or recommended antithrombotics'] - x['ischemic_transient_dead_patients_prescribed'])/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended'])) * 100, 2) if ((x['is_tia_patients'] - x['ischemic_transient_dead_patients'] - x['# patients not prescribed antithrombotics, but recommended']) > 0) else 0, axis=1)
-        self.statsDf['% patients prescribed or recommended antithrombotics'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed or recommended antithrombotics'] - x['ischemic_transient_dead_patients_prescribed'])/(x['is_tia_patients'] - x['ischemic_transient_dead_patients'])) * 100, 2) if ((x['is_tia_patients'] - x['ischemic_transient_dead_patients']) > 0) else 0, axis=1)
+        self.statsDf['% patients prescribed or recommended antithrombotics'] = self._get_percentage(self.statsDf['# patients prescribed or recommended antithrombotics'] - self.statsDf['ischemic_transient_dead_patients_prescribed'], self.statsDf['is_tia_patients'] - self.statsDf['ischemic_transient_dead_patients'])
         
         # Drop the redundant columns
         self.statsDf.drop(['# patients receiving Vit. K antagonist', '# patients receiving dabigatran', '# patients receiving rivaroxaban', '# patients receiving apixaban', '# patients receiving edoxaban', '# patients receiving LMWH or heparin in prophylactic dose','# patients receiving LMWH or heparin in full anticoagulant dose'], axis=1, inplace=True)
@@ -1477,86 +1518,83 @@ class ComputeStats:
         ###########################################
         # ANTIPLATELETS - PRESCRIBED WITHOUT AFIB #
         ###########################################
-        afib_flutter_not_detected_or_not_known = is_tia[is_tia['AFIB_FLUTTER'].isin([4, 5])].copy()
-        self.statsDf['afib_flutter_not_detected_or_not_known_patients'] = self._count_patients(dataframe=afib_flutter_not_detected_or_not_known)
+        afib_flutter_not_detected_or_not_known = is_tia + (('AFIB_FLUTTER', 'isin', (4, 5)),)
+        self.statsDf['afib_flutter_not_detected_or_not_known_patients'] = self._count_population(afib_flutter_not_detected_or_not_known)
 
-        afib_flutter_not_detected_or_not_known_dead = afib_flutter_not_detected_or_not_known[afib_flutter_not_detected_or_not_known['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients'] = self._count_patients(dataframe=afib_flutter_not_detected_or_not_known_dead)
+        afib_flutter_not_detected_or_not_known_dead = afib_flutter_not_detected_or_not_known + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients'] = self._count_population(afib_flutter_not_detected_or_not_known_dead)
 
-        prescribed_antiplatelets_no_afib = afib_flutter_not_detected_or_not_known[afib_flutter_not_detected_or_not_known['ANTITHROMBOTICS'].isin([1])].copy()
-        self.statsDf['prescribed_antiplatelets_no_afib_patients'] = self._count_patients(dataframe=prescribed_antiplatelets_no_afib)
+        prescribed_antiplatelets_no_afib = afib_flutter_not_detected_or_not_known + (('ANTITHROMBOTICS', 'isin', (1,)),)
+        self.statsDf['prescribed_antiplatelets_no_afib_patients'] = self._count_population(prescribed_antiplatelets_no_afib)
 
-        prescribed_antiplatelets_no_afib_dead = prescribed_antiplatelets_no_afib[prescribed_antiplatelets_no_afib['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['prescribed_antiplatelets_no_afib_dead_patients'] = self._count_patients(dataframe=prescribed_antiplatelets_no_afib_dead)
+        prescribed_antiplatelets_no_afib_dead = prescribed_antiplatelets_no_afib + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['prescribed_antiplatelets_no_afib_dead_patients'] = self._count_population(prescribed_antiplatelets_no_afib_dead)
 
-        self.tmp = afib_flutter_not_detected_or_not_known.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(afib_flutter_not_detected_or_not_known, 'ANTITHROMBOTICS')
         
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# patients prescribed antiplatelets without aFib')
-        self.statsDf['% patients prescribed antiplatelets without aFib'] =  self.statsDf.apply(lambda x: round(((x['# patients prescribed antiplatelets without aFib'] - x['prescribed_antiplatelets_no_afib_dead_patients'])/(x['afib_flutter_not_detected_or_not_known_patients'] - x['afib_flutter_not_detected_or_not_known_dead_patients'])) * 100, 2) if ((x['afib_flutter_not_detected_or_not_known_patients'] - x['afib_flutter_not_detected_or_not_known_dead_patients']) > 0) else 0, axis=1)
+        self.statsDf['% patients prescribed antiplatelets without aFib'] =  self._get_percentage(self.statsDf['# patients prescribed antiplatelets without aFib'] - self.statsDf['prescribed_antiplatelets_no_afib_dead_patients'], self.statsDf['afib_flutter_not_detected_or_not_known_patients'] - self.statsDf['afib_flutter_not_detected_or_not_known_dead_patients'])
 
         del afib_flutter_not_detected_or_not_known, afib_flutter_not_detected_or_not_known_dead, prescribed_antiplatelets_no_afib, prescribed_antiplatelets_no_afib_dead
 
         #########################################
         # ANTICOAGULANTS - PRESCRIBED WITH AFIB #
         #########################################
-        afib_flutter_detected = is_tia[is_tia['AFIB_FLUTTER'].isin([1, 2, 3])].copy()
-        self.statsDf['afib_flutter_detected_patients'] = self._count_patients(dataframe=afib_flutter_detected)
+        afib_flutter_detected = is_tia + (('AFIB_FLUTTER', 'isin', (1, 2, 3)),)
+        self.statsDf['afib_flutter_detected_patients'] = self._count_population(afib_flutter_detected)
 
-        afib_flutter_detected_not_dead = afib_flutter_detected[~afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['afib_flutter_detected_patients_not_dead'] = self._count_patients(dataframe=afib_flutter_detected_not_dead)
+        afib_flutter_detected_not_dead = afib_flutter_detected + (('DISCHARGE_DESTINATION', 'not isin', (5,)),)
+        self.statsDf['afib_flutter_detected_patients_not_dead'] = self._count_population(afib_flutter_detected_not_dead)
         del afib_flutter_detected_not_dead
 
-        anticoagulants_prescribed = afib_flutter_detected[
-            ~afib_flutter_detected['ANTITHROMBOTICS'].isin([1, 10, 9]) & 
-            ~afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])
-        ].copy()
-        self.statsDf['# patients prescribed anticoagulants with aFib'] = self._count_patients(dataframe=anticoagulants_prescribed)
+        anticoagulants_prescribed = afib_flutter_detected + (('ANTITHROMBOTICS', 'not isin', (1, 10, 9)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['# patients prescribed anticoagulants with aFib'] = self._count_population(anticoagulants_prescribed)
 
-        self.tmp = anticoagulants_prescribed.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(anticoagulants_prescribed, 'ANTITHROMBOTICS')
         
         # Additional calculation 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=2, new_column_name='# patients receiving Vit. K antagonist')
         # self.statsDf['% patients receiving Vit. K antagonist'] = self.statsDf.apply(lambda x: round(((x['# patients receiving Vit. K antagonist']/x['# patients prescribed anticoagulants with aFib']) * 100), 2) if x['# patients prescribed anticoagulants with aFib'] > 0 else 0, axis=1)
-        self.statsDf['% patients receiving Vit. K antagonist'] = self.statsDf.apply(lambda x: round(((x['# patients receiving Vit. K antagonist']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving Vit. K antagonist'] = self._get_percentage(self.statsDf['# patients receiving Vit. K antagonist'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=3, new_column_name='# patients receiving dabigatran')
-        self.statsDf['% patients receiving dabigatran'] = self.statsDf.apply(lambda x: round(((x['# patients receiving dabigatran']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving dabigatran'] = self._get_percentage(self.statsDf['# patients receiving dabigatran'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=4, new_column_name='# patients receiving rivaroxaban')
-        self.statsDf['% patients receiving rivaroxaban'] = self.statsDf.apply(lambda x: round(((x['# patients receiving rivaroxaban']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving rivaroxaban'] = self._get_percentage(self.statsDf['# patients receiving rivaroxaban'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=5, new_column_name='# patients receiving apixaban')
-        self.statsDf['% patients receiving apixaban'] = self.statsDf.apply(lambda x: round(((x['# patients receiving apixaban']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving apixaban'] = self._get_percentage(self.statsDf['# patients receiving apixaban'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=6, new_column_name='# patients receiving edoxaban')
-        self.statsDf['% patients receiving edoxaban'] = self.statsDf.apply(lambda x: round(((x['# patients receiving edoxaban']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving edoxaban'] = self._get_percentage(self.statsDf['# patients receiving edoxaban'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=7, new_column_name='# patients receiving LMWH or heparin in prophylactic dose')
-        self.statsDf['% patients receiving LMWH or heparin in prophylactic dose'] = self.statsDf.apply(lambda x: round(((x['# patients receiving LMWH or heparin in prophylactic dose']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving LMWH or heparin in prophylactic dose'] = self._get_percentage(self.statsDf['# patients receiving LMWH or heparin in prophylactic dose'], self.statsDf['afib_flutter_detected_patients_not_dead'])
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=8, new_column_name='# patients receiving LMWH or heparin in full anticoagulant dose')
-        self.statsDf['% patients receiving LMWH or heparin in full anticoagulant dose'] = self.statsDf.apply(lambda x: round(((x['# patients receiving LMWH or heparin in full anticoagulant dose']/x['afib_flutter_detected_patients_not_dead']) * 100), 2) if x['afib_flutter_detected_patients_not_dead'] > 0 else 0, axis=1)
+        self.statsDf['% patients receiving LMWH or heparin in full anticoagulant dose'] = self._get_percentage(self.statsDf['# patients receiving LMWH or heparin in full anticoagulant dose'], self.statsDf['afib_flutter_detected_patients_not_dead'])
         
-        anticoagulants_recommended = afib_flutter_detected[afib_flutter_detected['ANTITHROMBOTICS'].isin([9])].copy()
-        self.statsDf['anticoagulants_recommended_patients'] = self._count_patients(dataframe=anticoagulants_recommended)
+        anticoagulants_recommended = afib_flutter_detected + (('ANTITHROMBOTICS', 'isin', (9,)),)
+        self.statsDf['anticoagulants_recommended_patients'] = self._count_population(anticoagulants_recommended)
 
-        afib_flutter_detected_dead = afib_flutter_detected[afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['afib_flutter_detected_dead_patients'] = self._count_patients(dataframe=afib_flutter_detected_dead)
+        afib_flutter_detected_dead = afib_flutter_detected + (('DISCHARGE_DESTINATION', 'isin', (5,)),)
+        self.statsDf['afib_flutter_detected_dead_patients'] = self._count_population(afib_flutter_detected_dead)
 
-        self.statsDf['% patients prescribed anticoagulants with aFib'] =  self.statsDf.apply(lambda x: round(((x['# patients prescribed anticoagulants with aFib']/(x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients'])) * 100), 2) if (x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed anticoagulants with aFib'] =  self._get_percentage(self.statsDf['# patients prescribed anticoagulants with aFib'], self.statsDf['afib_flutter_detected_patients'] - self.statsDf['afib_flutter_detected_dead_patients'])
 
         ##########################################
         # ANTITHROMBOTICS - PRESCRIBED WITH AFIB #
         ##########################################
-        antithrombotics_prescribed = afib_flutter_detected[~afib_flutter_detected['ANTITHROMBOTICS'].isin([9, 10]) & ~afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['# patients prescribed antithrombotics with aFib'] = self._count_patients(dataframe=antithrombotics_prescribed)
+        antithrombotics_prescribed = afib_flutter_detected + (('ANTITHROMBOTICS', 'not isin', (9, 10)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['# patients prescribed antithrombotics with aFib'] = self._count_population(antithrombotics_prescribed)
         del antithrombotics_prescribed
 
-        recommended_antithrombotics_with_afib_alive = afib_flutter_detected[afib_flutter_detected['ANTITHROMBOTICS'].isin([9]) & ~afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])].copy()
-        self.statsDf['recommended_antithrombotics_with_afib_alive_patients'] = self._count_patients(dataframe=recommended_antithrombotics_with_afib_alive)
+        recommended_antithrombotics_with_afib_alive = afib_flutter_detected + (('ANTITHROMBOTICS', 'isin', (9,)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+        self.statsDf['recommended_antithrombotics_with_afib_alive_patients'] = self._count_population(recommended_antithrombotics_with_afib_alive)
         del recommended_antithrombotics_with_afib_alive
 
-        self.statsDf['% patients prescribed antithrombotics with aFib'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed antithrombotics with aFib']/(x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients'] - x['recommended_antithrombotics_with_afib_alive_patients'])) * 100), 2) if (x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients'] - x['recommended_antithrombotics_with_afib_alive_patients']) > 0 else 0, axis=1)
+        self.statsDf['% patients prescribed antithrombotics with aFib'] = self._get_percentage(self.statsDf['# patients prescribed antithrombotics with aFib'], self.statsDf['afib_flutter_detected_patients'] - self.statsDf['afib_flutter_detected_dead_patients'] - self.statsDf['recommended_antithrombotics_with_afib_alive_patients'])
     
 
         ###########
@@ -1564,77 +1602,77 @@ class ComputeStats:
         ###########
         # For CZ only patients discharged home included
         if country_code == 'CZ':
-            is_tia_discharged_home = is_tia[is_tia['DISCHARGE_DESTINATION'].isin([1])].copy()
-            self.statsDf['is_tia_discharged_home_patients'] = self._count_patients(dataframe=is_tia_discharged_home)
+            is_tia_discharged_home = is_tia + (('DISCHARGE_DESTINATION', 'isin', (1,)),)
+            self.statsDf['is_tia_discharged_home_patients'] = self._count_population(is_tia_discharged_home)
             
-            self.tmp = is_tia_discharged_home.groupby(['Protocol ID', 'STATIN']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_tia_discharged_home, 'STATIN')
             del is_tia_discharged_home
             
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=1, new_column_name='# patients prescribed statins - Yes')
-            self.statsDf['% patients prescribed statins - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - Yes']/x['is_tia_discharged_home_patients']) * 100), 2) if x['is_tia_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - Yes'] = self._get_percentage(self.statsDf['# patients prescribed statins - Yes'], self.statsDf['is_tia_discharged_home_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=2, new_column_name='# patients prescribed statins - No')
-            self.statsDf['% patients prescribed statins - No'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - No']/x['is_tia_discharged_home_patients']) * 100), 2) if x['is_tia_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - No'] = self._get_percentage(self.statsDf['# patients prescribed statins - No'], self.statsDf['is_tia_discharged_home_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=3, new_column_name='# patients prescribed statins - Not known')
-            self.statsDf['% patients prescribed statins - Not known'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - Not known']/x['is_tia_discharged_home_patients']) * 100), 2) if x['is_tia_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - Not known'] = self._get_percentage(self.statsDf['# patients prescribed statins - Not known'], self.statsDf['is_tia_discharged_home_patients'])
         else:
-            self.tmp = is_tia.groupby(['Protocol ID', 'STATIN']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(is_tia, 'STATIN')
            
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=1, new_column_name='# patients prescribed statins - Yes')
-            self.statsDf['% patients prescribed statins - Yes'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - Yes']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - Yes'] = self._get_percentage(self.statsDf['# patients prescribed statins - Yes'], self.statsDf['is_tia_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=2, new_column_name='# patients prescribed statins - No')
-            self.statsDf['% patients prescribed statins - No'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - No']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - No'] = self._get_percentage(self.statsDf['# patients prescribed statins - No'], self.statsDf['is_tia_patients'])
             
             self.statsDf = self._get_values_for_factors(column_name="STATIN", value=3, new_column_name='# patients prescribed statins - Not known')
-            self.statsDf['% patients prescribed statins - Not known'] = self.statsDf.apply(lambda x: round(((x['# patients prescribed statins - Not known']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+            self.statsDf['% patients prescribed statins - Not known'] = self._get_percentage(self.statsDf['# patients prescribed statins - Not known'], self.statsDf['is_tia_patients'])
 
         ####################
         # CAROTID STENOSIS #
         ####################
-        self.tmp = is_tia.groupby(['Protocol ID', 'CAROTID_STENOSIS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(is_tia, 'CAROTID_STENOSIS')
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS", value=1, new_column_name='# carotid stenosis - 50%-70%')
-        self.statsDf['% carotid stenosis - 50%-70%'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis - 50%-70%']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis - 50%-70%'] = self._get_percentage(self.statsDf['# carotid stenosis - 50%-70%'], self.statsDf['is_tia_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS", value=2, new_column_name='# carotid stenosis - >70%')
-        self.statsDf['% carotid stenosis - >70%'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis - >70%']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis - >70%'] = self._get_percentage(self.statsDf['# carotid stenosis - >70%'], self.statsDf['is_tia_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS", value=3, new_column_name='# carotid stenosis - No')
-        self.statsDf['% carotid stenosis - No'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis - No']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis - No'] = self._get_percentage(self.statsDf['# carotid stenosis - No'], self.statsDf['is_tia_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS", value=4, new_column_name='# carotid stenosis - Not known')
-        self.statsDf['% carotid stenosis - Not known'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis - Not known']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis - Not known'] = self._get_percentage(self.statsDf['# carotid stenosis - Not known'], self.statsDf['is_tia_patients'])
 
         # Create a new column to be used in the graph for carotid stenosis. We were including just over 70% and we need to replace this by carotid stenosis > 50%
         self.statsDf['# carotid stenosis - >50%'] = self.statsDf['# carotid stenosis - 50%-70%'] + self.statsDf['# carotid stenosis - >70%']
-        self.statsDf['% carotid stenosis - >50%'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis - >50%']/x['is_tia_patients']) * 100), 2) if x['is_tia_patients'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis - >50%'] = self._get_percentage(self.statsDf['# carotid stenosis - >50%'], self.statsDf['is_tia_patients'])
 
         ##############################
         # CAROTID STENOSIS FOLLOW-UP #
         ##############################
         # Create temporary dataframe if carotid stenosis was 50-70% or > 70%
-        carotid_stenosis = is_tia[is_tia['CAROTID_STENOSIS'].isin([1, 2])] 
+        carotid_stenosis = is_tia + (('CAROTID_STENOSIS', 'isin', (1, 2)),)
 
-        self.tmp = carotid_stenosis.groupby(['Protocol ID', 'CAROTID_STENOSIS_FOLLOWUP']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(carotid_stenosis, 'CAROTID_STENOSIS_FOLLOWUP')
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS_FOLLOWUP", value=1, new_column_name='# carotid stenosis followup - Yes')
-        self.statsDf['% carotid stenosis followup - Yes'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis followup - Yes']/x['# carotid stenosis - >50%']) * 100), 2) if x['# carotid stenosis - >50%'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis followup - Yes'] = self._get_percentage(self.statsDf['# carotid stenosis followup - Yes'], self.statsDf['# carotid stenosis - >50%'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS_FOLLOWUP", value=2, new_column_name='# carotid stenosis followup - No')
-        self.statsDf['% carotid stenosis followup - No'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis followup - No']/x['# carotid stenosis - >50%']) * 100), 2) if x['# carotid stenosis - >50%'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis followup - No'] = self._get_percentage(self.statsDf['# carotid stenosis followup - No'], self.statsDf['# carotid stenosis - >50%'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS_FOLLOWUP", value=3, new_column_name='# carotid stenosis followup - No, but planned later')
-        self.statsDf['% carotid stenosis followup - No, but planned later'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis followup - No, but planned later']/x['# carotid stenosis - >50%']) * 100), 2) if x['# carotid stenosis - >50%'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis followup - No, but planned later'] = self._get_percentage(self.statsDf['# carotid stenosis followup - No, but planned later'], self.statsDf['# carotid stenosis - >50%'])
 
         # Create temporary dataframe if carotid stenosis was followed up or planned to follow up later
-        carotid_stenosis_followup = carotid_stenosis[carotid_stenosis['CAROTID_STENOSIS_FOLLOWUP'].isin([1, 3])].copy()
+        carotid_stenosis_followup = carotid_stenosis + (('CAROTID_STENOSIS_FOLLOWUP', 'isin', (1, 3)),)
 
-        self.statsDf['# carotid stenosis followup - Yes, but planned'] = self._count_patients(dataframe=carotid_stenosis_followup)
-        self.statsDf['% carotid stenosis followup - Yes, but planned'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis followup - Yes, but planned']/x['# carotid stenosis - >50%']) * 100), 2) if x['# carotid stenosis - >50%'] > 0 else 0, axis=1)
+        self.statsDf['# carotid stenosis followup - Yes, but planned'] = self._count_population(carotid_stenosis_followup)
+        self.statsDf['% carotid stenosis followup - Yes, but planned'] = self._get_percentage(self.statsDf['# carotid stenosis followup - Yes, but planned'], self.statsDf['# carotid stenosis - >50%'])
 
         self.statsDf = self._get_values_for_factors(column_name="CAROTID_STENOSIS_FOLLOWUP", value=4, new_column_name='# carotid stenosis followup - Referred to another centre')
-        self.statsDf['% carotid stenosis followup - Referred to another centre'] = self.statsDf.apply(lambda x: round(((x['# carotid stenosis followup - Referred to another centre']/x['# carotid stenosis - >50%']) * 100), 2) if x['# carotid stenosis - >50%'] > 0 else 0, axis=1)
+        self.statsDf['% carotid stenosis followup - Referred to another centre'] = self._get_percentage(self.statsDf['# carotid stenosis followup - Referred to another centre'], self.statsDf['# carotid stenosis - >50%'])
 
         del carotid_stenosis, carotid_stenosis_followup
 
@@ -1644,31 +1682,31 @@ class ComputeStats:
         # tag::antihypertensive[]
         if country_code == 'CZ':
             # filter patients with recanaliztion procedure 8 and form CZ_4 (antihypertensive not shown in the new version)
-            discharge_subset_alive_not_returned_back = discharge_subset_alive.loc[~(discharge_subset_alive['crf_parent_name'].isin(['F_RESQ_IVT_TBY_CZ_4']) & discharge_subset_alive['RECANALIZATION_PROCEDURES'].isin([5,6,8]))].copy()
-            self.statsDf['discharge_subset_alive_not_returned_back_patients'] = self._count_patients(dataframe=discharge_subset_alive_not_returned_back) 
+            discharge_subset_alive_not_returned_back = discharge_subset_alive + (Any((('crf_parent_name', 'not isin', ('F_RESQ_IVT_TBY_CZ_4',)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6, 8)))),)
+            self.statsDf['discharge_subset_alive_not_returned_back_patients'] = self._count_population(discharge_subset_alive_not_returned_back)
 
-            self.tmp = discharge_subset_alive_not_returned_back.groupby(['Protocol ID', 'ANTIHYPERTENSIVE']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive_not_returned_back, 'ANTIHYPERTENSIVE')
 
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=3, new_column_name='# prescribed antihypertensives - Not known')
-            self.statsDf['% prescribed antihypertensives - Not known'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - Not known']/x['discharge_subset_alive_not_returned_back_patients']) * 100), 2) if x['discharge_subset_alive_not_returned_back_patients'] > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - Not known'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - Not known'], self.statsDf['discharge_subset_alive_not_returned_back_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=1, new_column_name='# prescribed antihypertensives - Yes')
-            self.statsDf['% prescribed antihypertensives - Yes'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - Yes']/(x['discharge_subset_alive_not_returned_back_patients'] - x['# prescribed antihypertensives - Not known'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['# prescribed antihypertensives - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - Yes'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - Yes'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['# prescribed antihypertensives - Not known'])
             
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=2, new_column_name='# prescribed antihypertensives - No')
-            self.statsDf['% prescribed antihypertensives - No'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - No']/(x['discharge_subset_alive_not_returned_back_patients'] - x['# prescribed antihypertensives - Not known'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['# prescribed antihypertensives - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - No'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - No'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['# prescribed antihypertensives - Not known'])
 
         else:
-            self.tmp = discharge_subset_alive.groupby(['Protocol ID', 'ANTIHYPERTENSIVE']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive, 'ANTIHYPERTENSIVE')
 
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=3, new_column_name='# prescribed antihypertensives - Not known')
-            self.statsDf['% prescribed antihypertensives - Not known'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - Not known']/x['discharge_subset_alive_patients']) * 100), 2) if x['discharge_subset_alive_patients'] > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - Not known'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - Not known'], self.statsDf['discharge_subset_alive_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=1, new_column_name='# prescribed antihypertensives - Yes')
-            self.statsDf['% prescribed antihypertensives - Yes'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - Yes']/(x['discharge_subset_alive_patients'] - x['# prescribed antihypertensives - Not known'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['# prescribed antihypertensives - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - Yes'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - Yes'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['# prescribed antihypertensives - Not known'])
             
             self.statsDf = self._get_values_for_factors(column_name="ANTIHYPERTENSIVE", value=2, new_column_name='# prescribed antihypertensives - No')
-            self.statsDf['% prescribed antihypertensives - No'] = self.statsDf.apply(lambda x: round(((x['# prescribed antihypertensives - No']/(x['discharge_subset_alive_patients'] - x['# prescribed antihypertensives - Not known'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['# prescribed antihypertensives - Not known']) > 0 else 0, axis=1)
+            self.statsDf['% prescribed antihypertensives - No'] = self._get_percentage(self.statsDf['# prescribed antihypertensives - No'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['# prescribed antihypertensives - Not known'])
         # end::antihypertensive[]
 
 
@@ -1677,28 +1715,28 @@ class ComputeStats:
         #####################
         # tag::smoking[]
         if country_code == 'CZ':
-            self.tmp = discharge_subset_alive_not_returned_back.groupby(['Protocol ID', 'SMOKING_CESSATION']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive_not_returned_back, 'SMOKING_CESSATION')
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=3, new_column_name='# recommended to a smoking cessation program - not a smoker')
-            self.statsDf['% recommended to a smoking cessation program - not a smoker'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - not a smoker']/x['discharge_subset_alive_not_returned_back_patients']) * 100), 2) if x['discharge_subset_alive_not_returned_back_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - not a smoker'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - not a smoker'], self.statsDf['discharge_subset_alive_not_returned_back_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=1, new_column_name='# recommended to a smoking cessation program - Yes')
-            self.statsDf['% recommended to a smoking cessation program - Yes'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - Yes']/x['discharge_subset_alive_not_returned_back_patients']) * 100), 2) if x['discharge_subset_alive_not_returned_back_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - Yes'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - Yes'], self.statsDf['discharge_subset_alive_not_returned_back_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=2, new_column_name='# recommended to a smoking cessation program - No')
-            self.statsDf['% recommended to a smoking cessation program - No'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - No']/x['discharge_subset_alive_not_returned_back_patients']) * 100), 2) if x['discharge_subset_alive_not_returned_back_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - No'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - No'], self.statsDf['discharge_subset_alive_not_returned_back_patients'])
 
         else:
-            self.tmp = discharge_subset_alive.groupby(['Protocol ID', 'SMOKING_CESSATION']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive, 'SMOKING_CESSATION')
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=3, new_column_name='# recommended to a smoking cessation program - not a smoker')
-            self.statsDf['% recommended to a smoking cessation program - not a smoker'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - not a smoker']/x['discharge_subset_alive_patients']) * 100), 2) if x['discharge_subset_alive_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - not a smoker'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - not a smoker'], self.statsDf['discharge_subset_alive_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=1, new_column_name='# recommended to a smoking cessation program - Yes')
-            self.statsDf['% recommended to a smoking cessation program - Yes'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - Yes']/x['discharge_subset_alive_patients']) * 100), 2) if x['discharge_subset_alive_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - Yes'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - Yes'], self.statsDf['discharge_subset_alive_patients'])
 
             self.statsDf = self._get_values_for_factors(column_name="SMOKING_CESSATION", value=2, new_column_name='# recommended to a smoking cessation program - No')
-            self.statsDf['% recommended to a smoking cessation program - No'] = self.statsDf.apply(lambda x: round(((x['# recommended to a smoking cessation program - No']/x['discharge_subset_alive_patients']) * 100), 2) if x['discharge_subset_alive_patients'] > 0 else 0, axis=1)
+            self.statsDf['% recommended to a smoking cessation program - No'] = self._get_percentage(self.statsDf['# recommended to a smoking cessation program - No'], self.statsDf['discharge_subset_alive_patients'])
         # end::smoking[]
 
 
@@ -1707,42 +1745,42 @@ class ComputeStats:
         ##########################
         # tag::cerebrovascular_expert[]
         if country_code == 'CZ':
-            self.tmp = discharge_subset_alive_not_returned_back.groupby(['Protocol ID', 'CEREBROVASCULAR_EXPERT']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive_not_returned_back, 'CEREBROVASCULAR_EXPERT')
 
             # Claculate number of patients entered to the old form
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=-999, new_column_name='tmp')
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=1, new_column_name='# recommended to a cerebrovascular expert - Recommended, and appointment was made')
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended, and appointment was made'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended, and appointment was made']/(x['discharge_subset_alive_not_returned_back_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended, and appointment was made'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended, and appointment was made'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['tmp'])
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=2, new_column_name='# recommended to a cerebrovascular expert - Recommended, but appointment was not made')
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended, but appointment was not made'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended, but appointment was not made']/(x['discharge_subset_alive_not_returned_back_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended, but appointment was not made'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended, but appointment was not made'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['tmp'])
 
-            self.statsDf.loc[:, '# recommended to a cerebrovascular expert - Recommended'] = self.statsDf.apply(lambda x: x['# recommended to a cerebrovascular expert - Recommended, and appointment was made'] + x['# recommended to a cerebrovascular expert - Recommended, but appointment was not made'], axis=1)
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended']/(x['discharge_subset_alive_not_returned_back_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf.loc[:, '# recommended to a cerebrovascular expert - Recommended'] = self.statsDf['# recommended to a cerebrovascular expert - Recommended, and appointment was made'] + self.statsDf['# recommended to a cerebrovascular expert - Recommended, but appointment was not made']
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['tmp'])
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=3, new_column_name='# recommended to a cerebrovascular expert - Not recommended')
-            self.statsDf['% recommended to a cerebrovascular expert - Not recommended'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Not recommended']/(x['discharge_subset_alive_not_returned_back_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_not_returned_back_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Not recommended'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Not recommended'], self.statsDf['discharge_subset_alive_not_returned_back_patients'] - self.statsDf['tmp'])
 
             self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         else:
-            self.tmp = discharge_subset_alive.groupby(['Protocol ID', 'CEREBROVASCULAR_EXPERT']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(discharge_subset_alive, 'CEREBROVASCULAR_EXPERT')
 
             # Claculate number of patients entered to the old form
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=-999, new_column_name='tmp')
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=1, new_column_name='# recommended to a cerebrovascular expert - Recommended, and appointment was made')
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended, and appointment was made'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended, and appointment was made']/(x['discharge_subset_alive_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended, and appointment was made'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended, and appointment was made'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['tmp'])
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=2, new_column_name='# recommended to a cerebrovascular expert - Recommended, but appointment was not made')
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended, but appointment was not made'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended, but appointment was not made']/(x['discharge_subset_alive_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended, but appointment was not made'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended, but appointment was not made'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['tmp'])
 
-            self.statsDf.loc[:, '# recommended to a cerebrovascular expert - Recommended'] = self.statsDf.apply(lambda x: x['# recommended to a cerebrovascular expert - Recommended, and appointment was made'] + x['# recommended to a cerebrovascular expert - Recommended, but appointment was not made'], axis=1)
-            self.statsDf['% recommended to a cerebrovascular expert - Recommended'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Recommended']/(x['discharge_subset_alive_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf.loc[:, '# recommended to a cerebrovascular expert - Recommended'] = self.statsDf['# recommended to a cerebrovascular expert - Recommended, and appointment was made'] + self.statsDf['# recommended to a cerebrovascular expert - Recommended, but appointment was not made']
+            self.statsDf['% recommended to a cerebrovascular expert - Recommended'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Recommended'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['tmp'])
 
             self.statsDf = self._get_values_for_factors(column_name="CEREBROVASCULAR_EXPERT", value=3, new_column_name='# recommended to a cerebrovascular expert - Not recommended')
-            self.statsDf['% recommended to a cerebrovascular expert - Not recommended'] = self.statsDf.apply(lambda x: round(((x['# recommended to a cerebrovascular expert - Not recommended']/(x['discharge_subset_alive_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_alive_patients'] - x['tmp']) > 0 else 0, axis=1)
+            self.statsDf['% recommended to a cerebrovascular expert - Not recommended'] = self._get_percentage(self.statsDf['# recommended to a cerebrovascular expert - Not recommended'], self.statsDf['discharge_subset_alive_patients'] - self.statsDf['tmp'])
 
             self.statsDf.drop(['tmp'], inplace=True, axis=1)
         # end::cerebrovascular_expert[]
@@ -1750,94 +1788,94 @@ class ComputeStats:
         #########################
         # DISCHARGE DESTINATION #
         #########################
-        self.tmp = discharge_subset.groupby(['Protocol ID', 'DISCHARGE_DESTINATION']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(discharge_subset, 'DISCHARGE_DESTINATION')
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_DESTINATION", value=1, new_column_name='# discharge destination - Home')
-        self.statsDf['% discharge destination - Home'] = self.statsDf.apply(lambda x: round(((x['# discharge destination - Home']/x['discharge_subset_patients']) * 100), 2) if x['discharge_subset_patients'] > 0 else 0, axis=1)
+        self.statsDf['% discharge destination - Home'] = self._get_percentage(self.statsDf['# discharge destination - Home'], self.statsDf['discharge_subset_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_DESTINATION", value=2, new_column_name='# discharge destination - Transferred within the same centre')
-        self.statsDf['% discharge destination - Transferred within the same centre'] = self.statsDf.apply(lambda x: round(((x['# discharge destination - Transferred within the same centre']/x['discharge_subset_patients']) * 100), 2) if x['discharge_subset_patients'] > 0 else 0, axis=1)
+        self.statsDf['% discharge destination - Transferred within the same centre'] = self._get_percentage(self.statsDf['# discharge destination - Transferred within the same centre'], self.statsDf['discharge_subset_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_DESTINATION", value=3, new_column_name='# discharge destination - Transferred to another centre')
-        self.statsDf['% discharge destination - Transferred to another centre'] = self.statsDf.apply(lambda x: round(((x['# discharge destination - Transferred to another centre']/x['discharge_subset_patients']) * 100), 2) if x['discharge_subset_patients'] > 0 else 0, axis=1)
+        self.statsDf['% discharge destination - Transferred to another centre'] = self._get_percentage(self.statsDf['# discharge destination - Transferred to another centre'], self.statsDf['discharge_subset_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_DESTINATION", value=4, new_column_name='# discharge destination - Social care facility')
-        self.statsDf['% discharge destination - Social care facility'] = self.statsDf.apply(lambda x: round(((x['# discharge destination - Social care facility']/x['discharge_subset_patients']) * 100), 2) if x['discharge_subset_patients'] > 0 else 0, axis=1)
+        self.statsDf['% discharge destination - Social care facility'] = self._get_percentage(self.statsDf['# discharge destination - Social care facility'], self.statsDf['discharge_subset_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_DESTINATION", value=5, new_column_name='# discharge destination - Dead')
-        self.statsDf['% discharge destination - Dead'] = self.statsDf.apply(lambda x: round(((x['# discharge destination - Dead']/x['discharge_subset_patients']) * 100), 2) if x['discharge_subset_patients'] > 0 else 0, axis=1)
+        self.statsDf['% discharge destination - Dead'] = self._get_percentage(self.statsDf['# discharge destination - Dead'], self.statsDf['discharge_subset_patients'])
 
         #######################################
         # DISCHARGE DESTINATION - SAME CENTRE #
         #######################################
-        discharge_subset_same_centre = discharge_subset[discharge_subset['DISCHARGE_DESTINATION'].isin([2])].copy()
-        self.statsDf['discharge_subset_same_centre_patients'] = self._count_patients(dataframe=discharge_subset_same_centre)
+        discharge_subset_same_centre = discharge_subset + (('DISCHARGE_DESTINATION', 'isin', (2,)),)
+        self.statsDf['discharge_subset_same_centre_patients'] = self._count_population(discharge_subset_same_centre)
 
-        self.tmp = discharge_subset_same_centre.groupby(['Protocol ID', 'DISCHARGE_SAME_FACILITY']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(discharge_subset_same_centre, 'DISCHARGE_SAME_FACILITY')
         del discharge_subset_same_centre
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_SAME_FACILITY", value=1, new_column_name='# transferred within the same centre - Acute rehabilitation')
-        self.statsDf['% transferred within the same centre - Acute rehabilitation'] = self.statsDf.apply(lambda x: round(((x['# transferred within the same centre - Acute rehabilitation']/x['discharge_subset_same_centre_patients']) * 100), 2) if x['discharge_subset_same_centre_patients'] > 0 else 0, axis=1)
+        self.statsDf['% transferred within the same centre - Acute rehabilitation'] = self._get_percentage(self.statsDf['# transferred within the same centre - Acute rehabilitation'], self.statsDf['discharge_subset_same_centre_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_SAME_FACILITY", value=2, new_column_name='# transferred within the same centre - Post-care bed')
-        self.statsDf['% transferred within the same centre - Post-care bed'] = self.statsDf.apply(lambda x: round(((x['# transferred within the same centre - Post-care bed']/x['discharge_subset_same_centre_patients']) * 100), 2) if x['discharge_subset_same_centre_patients'] > 0 else 0, axis=1)
+        self.statsDf['% transferred within the same centre - Post-care bed'] = self._get_percentage(self.statsDf['# transferred within the same centre - Post-care bed'], self.statsDf['discharge_subset_same_centre_patients'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_SAME_FACILITY", value=3, new_column_name='# transferred within the same centre - Another department')
 
-        self.statsDf['% transferred within the same centre - Another department'] = self.statsDf.apply(lambda x: round(((x['# transferred within the same centre - Another department']/x['discharge_subset_same_centre_patients']) * 100), 2) if x['discharge_subset_same_centre_patients'] > 0 else 0, axis=1)
+        self.statsDf['% transferred within the same centre - Another department'] = self._get_percentage(self.statsDf['# transferred within the same centre - Another department'], self.statsDf['discharge_subset_same_centre_patients'])
 
         ############################################
         # DISCHARGE DESTINATION - ANOTHER FACILITY #
         ############################################
-        discharge_subset_another_centre = discharge_subset[discharge_subset['DISCHARGE_DESTINATION'].isin([3])].copy()
-        self.statsDf['discharge_subset_another_centre_patients'] = self._count_patients(dataframe=discharge_subset_another_centre)
+        discharge_subset_another_centre = discharge_subset + (('DISCHARGE_DESTINATION', 'isin', (3,)),)
+        self.statsDf['discharge_subset_another_centre_patients'] = self._count_population(discharge_subset_another_centre)
 
-        self.tmp = discharge_subset_another_centre.groupby(['Protocol ID', 'DISCHARGE_OTHER_FACILITY']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(discharge_subset_another_centre, 'DISCHARGE_OTHER_FACILITY')
 
         # Calculate number of patients entered to the old form
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_OTHER_FACILITY", value=-999, new_column_name='tmp')
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_OTHER_FACILITY", value=1, new_column_name='# transferred to another centre - Stroke centre')
-        self.statsDf['% transferred to another centre - Stroke centre'] = self.statsDf.apply(lambda x: round(((x['# transferred to another centre - Stroke centre']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% transferred to another centre - Stroke centre'] = self._get_percentage(self.statsDf['# transferred to another centre - Stroke centre'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_OTHER_FACILITY", value=2, new_column_name='# transferred to another centre - Comprehensive stroke centre')
-        self.statsDf['% transferred to another centre - Comprehensive stroke centre'] = self.statsDf.apply(lambda x: round(((x['# transferred to another centre - Comprehensive stroke centre']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% transferred to another centre - Comprehensive stroke centre'] = self._get_percentage(self.statsDf['# transferred to another centre - Comprehensive stroke centre'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf = self._get_values_for_factors(column_name="DISCHARGE_OTHER_FACILITY", value=3, new_column_name='# transferred to another centre - Another hospital')
-        self.statsDf['% transferred to another centre - Another hospital'] = self.statsDf.apply(lambda x: round(((x['# transferred to another centre - Another hospital']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% transferred to another centre - Another hospital'] = self._get_percentage(self.statsDf['# transferred to another centre - Another hospital'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         #########################################################
         # DISCHARGE DESTINATION - ANOTHER FACILITY - DEPARTMENT #
         #########################################################
-        self.tmp = discharge_subset_another_centre.groupby(['Protocol ID', 'DISCHARGE_OTHER_FACILITY_O1']).size().to_frame('count').reset_index()
-        tmp_o2 = discharge_subset_another_centre.groupby(['Protocol ID', 'DISCHARGE_OTHER_FACILITY_O2']).size().to_frame('count').reset_index()
-        tmp_o3 = discharge_subset_another_centre.groupby(['Protocol ID', 'DISCHARGE_OTHER_FACILITY_O3']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(discharge_subset_another_centre, 'DISCHARGE_OTHER_FACILITY_O1')
+        tmp_o2 = self._get_population_values(discharge_subset_another_centre, 'DISCHARGE_OTHER_FACILITY_O2')
+        tmp_o3 = self._get_population_values(discharge_subset_another_centre, 'DISCHARGE_OTHER_FACILITY_O3')
         del discharge_subset_another_centre
 
         # Calculate number of patients entered to the old form
         self.statsDf.loc[:, 'tmp'] = 0
 
         self.statsDf['# department transferred to within another centre - Acute rehabilitation'] = self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O1", value=1, dataframe=self.tmp) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O2", value=1, dataframe=tmp_o2) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O3", value=1, dataframe=tmp_o3)
-        self.statsDf['% department transferred to within another centre - Acute rehabilitation'] = self.statsDf.apply(lambda x: round(((x['# department transferred to within another centre - Acute rehabilitation']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department transferred to within another centre - Acute rehabilitation'] = self._get_percentage(self.statsDf['# department transferred to within another centre - Acute rehabilitation'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf['# department transferred to within another centre - Post-care bed'] = self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O1", value=2, dataframe=self.tmp) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O2", value=2, dataframe=tmp_o2) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O3", value=2, dataframe=tmp_o3)
-        self.statsDf['% department transferred to within another centre - Post-care bed'] = self.statsDf.apply(lambda x: round(((x['# department transferred to within another centre - Post-care bed']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department transferred to within another centre - Post-care bed'] = self._get_percentage(self.statsDf['# department transferred to within another centre - Post-care bed'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf['# department transferred to within another centre - Neurology'] = self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O1", value=3, dataframe=self.tmp) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O2", value=3, dataframe=tmp_o2) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O3", value=3, dataframe=tmp_o3)
-        self.statsDf['% department transferred to within another centre - Neurology'] = self.statsDf.apply(lambda x: round(((x['# department transferred to within another centre - Neurology']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department transferred to within another centre - Neurology'] = self._get_percentage(self.statsDf['# department transferred to within another centre - Neurology'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf['# department transferred to within another centre - Another department'] = self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O1", value=4, dataframe=self.tmp) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O2", value=4, dataframe=tmp_o2) + self._get_values_only_columns(column_name="DISCHARGE_OTHER_FACILITY_O3", value=4, dataframe=tmp_o3)
-        self.statsDf['% department transferred to within another centre - Another department'] = self.statsDf.apply(lambda x: round(((x['# department transferred to within another centre - Another department']/(x['discharge_subset_another_centre_patients'] - x['tmp'])) * 100), 2) if (x['discharge_subset_another_centre_patients'] - x['tmp']) > 0 else 0, axis=1)
+        self.statsDf['% department transferred to within another centre - Another department'] = self._get_percentage(self.statsDf['# department transferred to within another centre - Another department'], self.statsDf['discharge_subset_another_centre_patients'] - self.statsDf['tmp'])
 
         self.statsDf.drop(['tmp'], inplace=True, axis=1)
 
         ############################################
         # DISCHARGE DESTINATION - ANOTHER FACILITY #
         ############################################
-        discharge_subset.fillna(0, inplace=True)
-        discharge_subset_mrs = discharge_subset[~discharge_subset['DISCHARGE_MRS'].isin([0])].copy()
+        # The missing mRS is handled as 0
+        discharge_subset_mrs = self._get_population(discharge_subset + (('DISCHARGE_MRS', 'notnull', None), ('DISCHARGE_MRS', 'not isin', (0,))), ['Protocol ID', 'DISCHARGE_MRS', 'D_MRS_SCORE']).fillna(0)
         del discharge_subset
         #discharge_subset_mrs['DISCHARGE_MRS'] = discharge_subset_mrs['DISCHARGE_MRS'].astype(float)
 
@@ -1864,41 +1902,38 @@ class ComputeStats:
             discharge_subset_mrs['DISCHARGE_MRS_ADDED'] = discharge_subset_mrs['DISCHARGE_MRS_ADJUSTED'] + discharge_subset_mrs['D_MRS_SCORE']
             discharge_subset_mrs.fillna(0, inplace=True)
 
-            self.statsDf = self.statsDf.merge(discharge_subset_mrs.groupby(['Protocol ID']).DISCHARGE_MRS_ADDED.agg(['median']).rename(columns={'median': 'Median discharge mRS'})['Median discharge mRS'].reset_index(), how='outer')
-            self.statsDf.fillna(0, inplace=True)
+            self.statsDf['Median discharge mRS'] = self._get_median(discharge_subset_mrs, 'DISCHARGE_MRS_ADDED')
         del discharge_subset_mrs
 
         ########################
         # MEDIAN HOSPITAL STAY #
         ########################
-        positive_hospital_days = self.df[self.df['HOSPITAL_DAYS'] > 0]
-        self.statsDf = self.statsDf.merge(positive_hospital_days.groupby(['Protocol ID']).HOSPITAL_DAYS.agg(['median']).rename(columns={'median': 'Median hospital stay (days)'})['Median hospital stay (days)'].reset_index(), how='outer')
-        self.statsDf.fillna(0, inplace=True)
+        positive_hospital_days = self._get_population((('HOSPITAL_DAYS', '>', 0),), ['Protocol ID', 'HOSPITAL_DAYS'])
+        self.statsDf['Median hospital stay (days)'] = self._get_median(positive_hospital_days, 'HOSPITAL_DAYS')
         del positive_hospital_days
 
         ###########################
         # MEDIAN LAST SEEN NORMAL #
         ###########################
-        self.statsDf = self.statsDf.merge(self.df[self.df['LAST_SEEN_NORMAL'] != 0].groupby(['Protocol ID']).LAST_SEEN_NORMAL.agg(['median']).rename(columns={'median': 'Median last seen normal'})['Median last seen normal'].reset_index(), how='outer')
-        self.statsDf.fillna(0, inplace=True)
+        self.statsDf['Median last seen normal'] = self._get_median(self._get_population((('LAST_SEEN_NORMAL', 'not isin', (0,)),), ['Protocol ID', 'LAST_SEEN_NORMAL']), 'LAST_SEEN_NORMAL')
 
         # ELIGIBLE RECANALIZATION
 
-        wrong_ivtpa = recanalization_procedure_iv_tpa.loc[recanalization_procedure_iv_tpa['IVTPA'] <= 0]
+        wrong_ivtpa = recanalization_procedure_iv_tpa + (Any((('IVTPA', '<=', 0), ('IVTPA', 'isnull', None))),)
 
-        self.statsDf['wrong_ivtpa'] = self._count_patients(dataframe=wrong_ivtpa)
+        self.statsDf['wrong_ivtpa'] = self._count_population(wrong_ivtpa)
 
         # self.statsDf.loc[:, '# patients eligible thrombolysis'] = self.statsDf.apply(lambda x: (x['# recanalization procedures - IV tPa'] + x['# recanalization procedures - IV tPa + endovascular treatment'] + x['# recanalization procedures - IV tPa + referred to another centre for endovascular treatment']) - x['wrong_ivtpa'], axis=1)
-        self.statsDf.loc[:, '# patients eligible thrombolysis'] = self.statsDf.apply(lambda x: x['# IV tPa'] - x['wrong_ivtpa'], axis=1)
+        self.statsDf.loc[:, '# patients eligible thrombolysis'] = self.statsDf['# IV tPa'] - self.statsDf['wrong_ivtpa']
 
         self.statsDf.drop(['wrong_ivtpa'], inplace=True, axis=1)
         del wrong_ivtpa
 
-        wrong_tby = recanalization_procedure_tby_dtg[recanalization_procedure_tby_dtg['TBY'] <= 0]
+        wrong_tby = recanalization_procedure_tby_dtg + (Any((('TBY', '<=', 0), ('TBY', 'isnull', None))),)
 
-        self.statsDf['wrong_tby'] = self._count_patients(dataframe=wrong_tby)
+        self.statsDf['wrong_tby'] = self._count_population(wrong_tby)
 
-        self.statsDf.loc[:, '# patients eligible thrombectomy'] = self.statsDf.apply(lambda x: (x['# TBY'] - x['wrong_tby']), axis=1)
+        self.statsDf.loc[:, '# patients eligible thrombectomy'] = self.statsDf['# TBY'] - self.statsDf['wrong_tby']
 
         self.statsDf.drop(['wrong_tby'], inplace=True, axis=1)
 
@@ -1915,8 +1950,8 @@ class ComputeStats:
 
         del wrong_tby
 
-        ivt_tby_mix = isch.loc[(isch['IVT_DONE'] == 1) | (isch['TBY_DONE'] == 1)].copy()
-        self.statsDf['patients_eligible_recanalization'] = self._count_patients(dataframe=ivt_tby_mix)
+        ivt_tby_mix = isch + (Any((('IVT_DONE', '==', 1), ('TBY_DONE', '==', 1))),)
+        self.statsDf['patients_eligible_recanalization'] = self._count_population(ivt_tby_mix)
         del ivt_tby_mix
 
         ################
@@ -1927,24 +1962,22 @@ class ComputeStats:
 
         ## Calculate classic recanalization procedure       
         #recanalization_procedure_tby_only_dtg =  recanalization_procedure_tby_dtg[recanalization_procedure_tby_dtg['RECANALIZATION_PROCEDURES'].isin([4])]
-        recanalization_procedure_tby_only_dtg = recanalization_procedure_tby_dtg.loc[
-            recanalization_procedure_tby_dtg['IVT_DONE'] == 0
-        ]
+        recanalization_procedure_tby_only_dtg = recanalization_procedure_tby_dtg + (Any((('IVT_DONE', '==', 0), ('IVT_DONE', 'isnull', None))),)
 
         # Create temporary dataframe only with rows where thrombolysis was performed under 60 minute
-        recanalization_procedure_iv_tpa_under_60 = recanalization_procedure_iv_tpa.loc[(recanalization_procedure_iv_tpa['IVTPA'] > 0) & (recanalization_procedure_iv_tpa['IVTPA'] <= 60)]
+        recanalization_procedure_iv_tpa_under_60 = recanalization_procedure_iv_tpa + (('IVTPA', '>', 0), ('IVTPA', '<=', 60))
         # Create temporary dataframe only with rows where thrombolysis was performed under 45 minute
-        recanalization_procedure_iv_tpa_under_45 = recanalization_procedure_iv_tpa.loc[(recanalization_procedure_iv_tpa['IVTPA'] > 0) & (recanalization_procedure_iv_tpa['IVTPA'] <= 45)]
+        recanalization_procedure_iv_tpa_under_45 = recanalization_procedure_iv_tpa + (('IVTPA', '>', 0), ('IVTPA', '<=', 45))
 
         del recanalization_procedure_iv_tpa
 
-        recanalization_procedure_tby_only_dtg_under_60 = recanalization_procedure_tby_only_dtg.loc[(recanalization_procedure_tby_only_dtg['TBY'] > 0) & (recanalization_procedure_tby_only_dtg['TBY'] <= 60)]
-        self.statsDf['# patients treated with door to recanalization therapy < 60 minutes'] = self._count_patients(dataframe=recanalization_procedure_iv_tpa_under_60) + self._count_patients(dataframe=recanalization_procedure_tby_only_dtg_under_60)
-        self.statsDf['% patients treated with door to recanalization therapy < 60 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to recanalization therapy < 60 minutes']/x['# patients recanalized']) * 100), 2) if x['# patients recanalized'] > 0 else 0, axis=1)
+        recanalization_procedure_tby_only_dtg_under_60 = recanalization_procedure_tby_only_dtg + (('TBY', '>', 0), ('TBY', '<=', 60))
+        self.statsDf['# patients treated with door to recanalization therapy < 60 minutes'] = self._count_population(recanalization_procedure_iv_tpa_under_60)+ self._count_population(recanalization_procedure_tby_only_dtg_under_60)
+        self.statsDf['% patients treated with door to recanalization therapy < 60 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to recanalization therapy < 60 minutes'], self.statsDf['# patients recanalized'])
 
-        recanalization_procedure_tby_only_dtg_under_45 = recanalization_procedure_tby_only_dtg.loc[(recanalization_procedure_tby_only_dtg['TBY'] > 0) & (recanalization_procedure_tby_only_dtg['TBY'] <= 45)]
-        self.statsDf['# patients treated with door to recanalization therapy < 45 minutes'] = self._count_patients(dataframe=recanalization_procedure_iv_tpa_under_45) + self._count_patients(dataframe=recanalization_procedure_tby_only_dtg_under_45)
-        self.statsDf['% patients treated with door to recanalization therapy < 45 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to recanalization therapy < 45 minutes']/x['# patients recanalized']) * 100), 2) if x['# patients recanalized'] > 0 else 0, axis=1)
+        recanalization_procedure_tby_only_dtg_under_45 = recanalization_procedure_tby_only_dtg + (('TBY', '>', 0), ('TBY', '<=', 45))
+        self.statsDf['# patients treated with door to recanalization therapy < 45 minutes'] = self._count_population(recanalization_procedure_iv_tpa_under_45)+ self._count_population(recanalization_procedure_tby_only_dtg_under_45)
+        self.statsDf['% patients treated with door to recanalization therapy < 45 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to recanalization therapy < 45 minutes'], self.statsDf['# patients recanalized'])
 
         del recanalization_procedure_tby_only_dtg
 
@@ -1952,27 +1985,27 @@ class ComputeStats:
         #### DOOR TO THROMBOLYSIS THERAPY - MINUTES ####
         # If thrombectomy done not at all, take the possible lowest award they can get
 
-        self.statsDf['# patients treated with door to thrombolysis < 60 minutes'] = self._count_patients(dataframe=recanalization_procedure_iv_tpa_under_60)
-        self.statsDf['% patients treated with door to thrombolysis < 60 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to thrombolysis < 60 minutes']/x['# patients eligible thrombolysis']) * 100), 2) if x['# patients eligible thrombolysis'] > 0 else 0, axis=1)
+        self.statsDf['# patients treated with door to thrombolysis < 60 minutes'] = self._count_population(recanalization_procedure_iv_tpa_under_60)
+        self.statsDf['% patients treated with door to thrombolysis < 60 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to thrombolysis < 60 minutes'], self.statsDf['# patients eligible thrombolysis'])
         del recanalization_procedure_iv_tpa_under_60
 
-        self.statsDf['# patients treated with door to thrombolysis < 45 minutes'] = self._count_patients(dataframe=recanalization_procedure_iv_tpa_under_45)
-        self.statsDf['% patients treated with door to thrombolysis < 45 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to thrombolysis < 45 minutes']/x['# patients eligible thrombolysis']) * 100), 2) if x['# patients eligible thrombolysis'] > 0 else 0, axis=1)
+        self.statsDf['# patients treated with door to thrombolysis < 45 minutes'] = self._count_population(recanalization_procedure_iv_tpa_under_45)
+        self.statsDf['% patients treated with door to thrombolysis < 45 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to thrombolysis < 45 minutes'], self.statsDf['# patients eligible thrombolysis'])
         del recanalization_procedure_iv_tpa_under_45
 
         # Create temporary dataframe only with rows where trombectomy was performed under 90 minutes
-        recanalization_procedure_tby_only_dtg_under_120 = recanalization_procedure_tby_dtg.loc[(recanalization_procedure_tby_dtg['TBY'] > 0) & (recanalization_procedure_tby_dtg['TBY'] <= 120)]
+        recanalization_procedure_tby_only_dtg_under_120 = recanalization_procedure_tby_dtg + (('TBY', '>', 0), ('TBY', '<=', 120))
         # Create temporary dataframe only with rows where trombectomy was performed under 60 minutes
-        recanalization_procedure_tby_only_dtg_under_90 = recanalization_procedure_tby_dtg.loc[(recanalization_procedure_tby_dtg['TBY'] > 0) & (recanalization_procedure_tby_dtg['TBY'] <= 90)]
+        recanalization_procedure_tby_only_dtg_under_90 = recanalization_procedure_tby_dtg + (('TBY', '>', 0), ('TBY', '<=', 90))
 
         del recanalization_procedure_tby_dtg
         
-        self.statsDf['# patients treated with door to thrombectomy < 120 minutes'] = self._count_patients(dataframe=recanalization_procedure_tby_only_dtg_under_120)
-        self.statsDf['% patients treated with door to thrombectomy < 120 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to thrombectomy < 120 minutes']/x['# patients eligible thrombectomy']) * 100), 2) if x['# patients eligible thrombectomy'] > 0 else 0, axis=1)
+        self.statsDf['# patients treated with door to thrombectomy < 120 minutes'] = self._count_population(recanalization_procedure_tby_only_dtg_under_120)
+        self.statsDf['% patients treated with door to thrombectomy < 120 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to thrombectomy < 120 minutes'], self.statsDf['# patients eligible thrombectomy'])
         del recanalization_procedure_tby_only_dtg_under_120
 
-        self.statsDf['# patients treated with door to thrombectomy < 90 minutes'] = self._count_patients(dataframe=recanalization_procedure_tby_only_dtg_under_90)
-        self.statsDf['% patients treated with door to thrombectomy < 90 minutes'] = self.statsDf.apply(lambda x: round(((x['# patients treated with door to thrombectomy < 90 minutes']/x['# patients eligible thrombectomy']) * 100), 2) if x['# patients eligible thrombectomy'] > 0 else 0, axis=1)
+        self.statsDf['# patients treated with door to thrombectomy < 90 minutes'] = self._count_population(recanalization_procedure_tby_only_dtg_under_90)
+        self.statsDf['% patients treated with door to thrombectomy < 90 minutes'] = self._get_percentage(self.statsDf['# patients treated with door to thrombectomy < 90 minutes'], self.statsDf['# patients eligible thrombectomy'])
         del recanalization_procedure_tby_only_dtg_under_90
 
         #### RECANALIZATION RATE ####
@@ -1985,127 +2018,102 @@ class ComputeStats:
 
         #### DYSPHAGIA SCREENING ####
         self.statsDf['# all stroke patients undergoing dysphagia screening'] = self.statsDf['# dysphagia screening - Guss test'] + self.statsDf['# dysphagia screening - Other test']
-        self.statsDf['% all stroke patients undergoing dysphagia screening'] = self.statsDf.apply(lambda x: round(((x['# all stroke patients undergoing dysphagia screening']/(x['# all stroke patients undergoing dysphagia screening'] + x['# dysphagia screening - Not done'])) * 100), 2) if (x['# all stroke patients undergoing dysphagia screening'] + x['# dysphagia screening - Not done']) > 0 else 0, axis=1)
+        self.statsDf['% all stroke patients undergoing dysphagia screening'] = self._get_percentage(self.statsDf['# all stroke patients undergoing dysphagia screening'], self.statsDf['# all stroke patients undergoing dysphagia screening'] + self.statsDf['# dysphagia screening - Not done'])
 
         #### ISCHEMIC STROKE + NO AFIB + ANTIPLATELETS ####
         # Exclude patients referred for recanalization procedure
-        non_transferred_antiplatelets = antithrombotics[~antithrombotics['RECANALIZATION_PROCEDURES'].isin([5,6])]
+        non_transferred_antiplatelets = antithrombotics + (('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)),)
         # Get temporary dataframe with patients who have prescribed antithrombotics and ischemic stroke
-        antiplatelets = non_transferred_antiplatelets[
-            non_transferred_antiplatelets['STROKE_TYPE'].isin([1])]
+        antiplatelets = non_transferred_antiplatelets + (('STROKE_TYPE', 'isin', (1,)),)
         del non_transferred_antiplatelets
         # Filter temporary dataframe and get only patients who have not been detected or not known for aFib flutter. 
-        antiplatelets = antiplatelets[antiplatelets['AFIB_FLUTTER'].isin([4, 5])]
+        antiplatelets = antiplatelets + (('AFIB_FLUTTER', 'isin', (4, 5)),)
         # Get patients who have prescribed antithrombotics 
         # exclude also patients with option 11 - applies to PT form
-        except_recommended = antiplatelets[~antiplatelets['ANTITHROMBOTICS'].isin([9, 11])]
+        except_recommended = antiplatelets + (('ANTITHROMBOTICS', 'not isin', (9, 11)),)
 
         # Get number of patients who have prescribed antithrombotics and ischemic stroke, have not been detected or not known for aFib flutter.
-        self.statsDf['except_recommended_patients'] = self._count_patients(dataframe=except_recommended)
+        self.statsDf['except_recommended_patients'] = self._count_population(except_recommended)
         # Get temporary dataframe groupby protocol ID and antithrombotics column
-        self.tmp = antiplatelets.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        self.tmp = self._get_population_values(antiplatelets, 'ANTITHROMBOTICS')
 
         self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# ischemic stroke patients discharged with antiplatelets')
 
-        self.statsDf['% ischemic stroke patients discharged with antiplatelets'] = self.statsDf.apply(lambda x: round(((x['# ischemic stroke patients discharged with antiplatelets']/x['except_recommended_patients']) * 100), 2) if x['except_recommended_patients'] > 0 else 0, axis=1)
+        self.statsDf['% ischemic stroke patients discharged with antiplatelets'] = self._get_percentage(self.statsDf['# ischemic stroke patients discharged with antiplatelets'], self.statsDf['except_recommended_patients'])
 
         # discharged home
-        antiplatelets_discharged_home = antiplatelets[antiplatelets['DISCHARGE_DESTINATION'].isin([1])]
+        antiplatelets_discharged_home = antiplatelets + (('DISCHARGE_DESTINATION', 'isin', (1,)),)
         
-        if (antiplatelets_discharged_home.empty):
-            self.tmp = antiplatelets.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+        if (self._masks.is_empty(antiplatelets_discharged_home)):
+            self.tmp = self._get_population_values(antiplatelets, 'ANTITHROMBOTICS')
             self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# ischemic stroke patients discharged home with antiplatelets')
-            self.statsDf['% ischemic stroke patients discharged home with antiplatelets'] = self.statsDf.apply(lambda x: round(((x['# ischemic stroke patients discharged home with antiplatelets']/x['except_recommended_patients']) * 100), 2) if x['except_recommended_patients'] > 0 else 0, axis=1)
+            self.statsDf['% ischemic stroke patients discharged home with antiplatelets'] = self._get_percentage(self.statsDf['# ischemic stroke patients discharged home with antiplatelets'], self.statsDf['except_recommended_patients'])
             self.statsDf['except_recommended_discharged_home_patients'] = self.statsDf['except_recommended_patients']
         else:
-            self.tmp = antiplatelets_discharged_home.groupby(['Protocol ID', 'ANTITHROMBOTICS']).size().to_frame('count').reset_index()
+            self.tmp = self._get_population_values(antiplatelets_discharged_home, 'ANTITHROMBOTICS')
             # Get patients who have prescribed antithrombotics 
-            except_recommended_discharged_home = except_recommended[except_recommended['DISCHARGE_DESTINATION'].isin([1])]
+            except_recommended_discharged_home = except_recommended + (('DISCHARGE_DESTINATION', 'isin', (1,)),)
 
             # Get number of patients who have prescribed antithrombotics and ischemic stroke, have not been detected or not known for aFib flutter.
-            self.statsDf['except_recommended_discharged_home_patients'] = self._count_patients(dataframe=except_recommended_discharged_home)
+            self.statsDf['except_recommended_discharged_home_patients'] = self._count_population(except_recommended_discharged_home)
 
             self.statsDf = self._get_values_for_factors(column_name="ANTITHROMBOTICS", value=1, new_column_name='# ischemic stroke patients discharged home with antiplatelets')
-            self.statsDf['% ischemic stroke patients discharged home with antiplatelets'] = self.statsDf.apply(lambda x: round(((x['# ischemic stroke patients discharged home with antiplatelets']/x['except_recommended_discharged_home_patients']) * 100), 2) if x['except_recommended_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% ischemic stroke patients discharged home with antiplatelets'] = self._get_percentage(self.statsDf['# ischemic stroke patients discharged home with antiplatelets'], self.statsDf['except_recommended_discharged_home_patients'])
 
         # Comapre number of ischemic stroke patients discharged with antiplatelets to the discharged home with antiplatelets and select the higher value
-        self.statsDf['# ischemic stroke patients discharged (home) with antiplatelets'] = self.statsDf.apply(lambda x: x['# ischemic stroke patients discharged with antiplatelets'] if x['# ischemic stroke patients discharged with antiplatelets'] > x['# ischemic stroke patients discharged home with antiplatelets'] else x['# ischemic stroke patients discharged home with antiplatelets'], axis=1)
-        self.statsDf['% ischemic stroke patients discharged (home) with antiplatelets'] = self.statsDf.apply(lambda x: x['% ischemic stroke patients discharged with antiplatelets'] if x['% ischemic stroke patients discharged with antiplatelets'] > x['% ischemic stroke patients discharged home with antiplatelets'] else x['% ischemic stroke patients discharged home with antiplatelets'], axis=1)
+        self.statsDf['# ischemic stroke patients discharged (home) with antiplatelets'] = self.statsDf['# ischemic stroke patients discharged with antiplatelets'].where(self.statsDf['# ischemic stroke patients discharged with antiplatelets'] > self.statsDf['# ischemic stroke patients discharged home with antiplatelets'], self.statsDf['# ischemic stroke patients discharged home with antiplatelets'])
+        self.statsDf['% ischemic stroke patients discharged (home) with antiplatelets'] = self.statsDf['% ischemic stroke patients discharged with antiplatelets'].where(self.statsDf['% ischemic stroke patients discharged with antiplatelets'] > self.statsDf['% ischemic stroke patients discharged home with antiplatelets'], self.statsDf['% ischemic stroke patients discharged home with antiplatelets'])
 
         #### ISCHEMIC STROKE + AFIB + ANTICOAGULANTS ####
-        afib_flutter_detected = is_tia.loc[
-            is_tia['AFIB_FLUTTER'].isin([1, 2, 3])
-        ].copy()
+        afib_flutter_detected = is_tia + (('AFIB_FLUTTER', 'isin', (1, 2, 3)),)
         # exclude also patients with option 11 - applies to PT form
-        anticoagulants_prescribed = afib_flutter_detected[
-            ~afib_flutter_detected['ANTITHROMBOTICS'].isin([1, 10, 9, 11]) & 
-            ~afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])
-        ].copy()
-
-        not_transferred_afib_flutter_detected = afib_flutter_detected.loc[
-            ~afib_flutter_detected['RECANALIZATION_PROCEDURES'].isin([5,6])
-        ]
-        non_trasferred_anticoagulants = anticoagulants_prescribed[
-            ~anticoagulants_prescribed['RECANALIZATION_PROCEDURES'].isin([5,6])
-        ]
+        anticoagulants_prescribed = afib_flutter_detected + (('ANTITHROMBOTICS', 'not isin', (1, 10, 9, 11)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))
+
+        not_transferred_afib_flutter_detected = afib_flutter_detected + (('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)),)
+        non_trasferred_anticoagulants = anticoagulants_prescribed + (('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)),)
         
-        self.statsDf['# afib patients discharged with anticoagulants'] = self._count_patients(dataframe=non_trasferred_anticoagulants)
-        #self.statsDf['# afib patients discharged with anticoagulants'] = self._count_patients(dataframe=anticoagulants_prescribed)
+        self.statsDf['# afib patients discharged with anticoagulants'] = self._count_population(non_trasferred_anticoagulants)
+        #self.statsDf['# afib patients discharged with anticoagulants'] = self._count_population(anticoagulants_prescribed)
         # Get temporary dataframe with patients who are not dead with detected aFib flutter and with prescribed antithrombotics or with nothign (ANTITHROMBOTICS = 10)
         # exclude also patients with option 11 - applies to PT form
-        afib_detected_discharged_home = not_transferred_afib_flutter_detected[
-            (~not_transferred_afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])) & 
-            (~not_transferred_afib_flutter_detected['ANTITHROMBOTICS'].isin([1,9,11]))
-        ]
+        afib_detected_discharged_home = not_transferred_afib_flutter_detected + (('DISCHARGE_DESTINATION', 'not isin', (5,)), ('ANTITHROMBOTICS', 'not isin', (1, 9, 11)))
         # Get afib patients discharged and not dead
-        self.statsDf['afib_detected_discharged_patients'] = self._count_patients(dataframe=afib_detected_discharged_home)
+        self.statsDf['afib_detected_discharged_patients'] = self._count_population(afib_detected_discharged_home)
 
         # self.statsDf['% afib patients discharged with anticoagulants'] = self.statsDf.apply(lambda x: round(((x['# afib patients discharged with anticoagulants']/(x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients'])) * 100), 2) if (x['afib_flutter_detected_patients'] - x['afib_flutter_detected_dead_patients']) > 0 else 0, axis=1)
-        self.statsDf['% afib patients discharged with anticoagulants'] = self.statsDf.apply(
-            lambda x: round((
-                (x['# afib patients discharged with anticoagulants']/x['afib_detected_discharged_patients']) * 100
-                ), 2) if (x['afib_detected_discharged_patients']) > 0 else 0, axis=1
-            )
+        self.statsDf['% afib patients discharged with anticoagulants'] = self._get_percentage(self.statsDf['# afib patients discharged with anticoagulants'], self.statsDf['afib_detected_discharged_patients'])
         
         # Get temporary dataframe with patients who have prescribed anticoagulats and were discharged home 
-        anticoagulants_prescribed_discharged_home = non_trasferred_anticoagulants[
-            non_trasferred_anticoagulants['DISCHARGE_DESTINATION'].isin([1])
-        ]
+        anticoagulants_prescribed_discharged_home = non_trasferred_anticoagulants + (('DISCHARGE_DESTINATION', 'isin', (1,)),)
 
         # anticoagulants_prescribed_discharged_home = anticoagulants_prescribed[anticoagulants_prescribed['DISCHARGE_DESTINATION'].isin([1])]
         # Get temporary dataframe with patients who have been discharge at home with detected aFib flutter and with prescribed antithrombotics
         # afib_detected_discharged_home = afib_flutter_detected[(afib_flutter_detected['DISCHARGE_DESTINATION'].isin([1])) & (~afib_flutter_detected['ANTITHROMBOTICS'].isin([9]))]
         # exclude also patients with option 11 - applies to PT form
-        afib_detected_discharged_home = not_transferred_afib_flutter_detected[
-            (not_transferred_afib_flutter_detected['DISCHARGE_DESTINATION'].isin([1])) & 
-            (~not_transferred_afib_flutter_detected['ANTITHROMBOTICS'].isin([1,9,11]))
-        ]
+        afib_detected_discharged_home = not_transferred_afib_flutter_detected + (('DISCHARGE_DESTINATION', 'isin', (1,)), ('ANTITHROMBOTICS', 'not isin', (1, 9, 11)))
 
         # Check if temporary dataframe is empty. If yes, the value is calculated not only for discharged home, but only dead patients are excluded
-        if (anticoagulants_prescribed_discharged_home.empty):
+        if (self._masks.is_empty(anticoagulants_prescribed_discharged_home)):
             # afib patients discharged home with anticoagulants	
-            anticoagulants_prescribed_discharged_home = non_trasferred_anticoagulants.copy()
+            anticoagulants_prescribed_discharged_home = non_trasferred_anticoagulants
             # Get temporary dataframe with patients who are not dead with detected aFib flutter and with prescribed antithrombotics 
             # exclude also patients with option 11 - applies to PT form
-            afib_detected_discharged_home = not_transferred_afib_flutter_detected[
-                (~not_transferred_afib_flutter_detected['DISCHARGE_DESTINATION'].isin([5])) & 
-                (~not_transferred_afib_flutter_detected['ANTITHROMBOTICS'].isin([1,9,11]))
-            ]
+            afib_detected_discharged_home = not_transferred_afib_flutter_detected + (('DISCHARGE_DESTINATION', 'not isin', (5,)), ('ANTITHROMBOTICS', 'not isin', (1, 9, 11)))
             # Get # afib patients discharged home with anticoagulants
-            self.statsDf['# afib patients discharged home with anticoagulants'] = self._count_patients(dataframe=anticoagulants_prescribed_discharged_home)
+            self.statsDf['# afib patients discharged home with anticoagulants'] = self._count_population(anticoagulants_prescribed_discharged_home)
             # Get afib patients discharged and not dead
-            self.statsDf['afib_detected_discharged_home_patients'] = self._count_patients(dataframe=afib_detected_discharged_home)
+            self.statsDf['afib_detected_discharged_home_patients'] = self._count_population(afib_detected_discharged_home)
             # Get % afib patients discharge with anticoagulants and not dead
-            self.statsDf['% afib patients discharged home with anticoagulants'] = self.statsDf.apply(lambda x: round(((x['# afib patients discharged home with anticoagulants']/x['afib_detected_discharged_home_patients']) * 100), 2) if x['afib_detected_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib patients discharged home with anticoagulants'] = self._get_percentage(self.statsDf['# afib patients discharged home with anticoagulants'], self.statsDf['afib_detected_discharged_home_patients'])
         else:
-            self.statsDf['# afib patients discharged home with anticoagulants'] = self._count_patients(dataframe=anticoagulants_prescribed_discharged_home)
+            self.statsDf['# afib patients discharged home with anticoagulants'] = self._count_population(anticoagulants_prescribed_discharged_home)
             # Get afib patients discharged home 
-            self.statsDf['afib_detected_discharged_home_patients'] = self._count_patients(dataframe=afib_detected_discharged_home)
+            self.statsDf['afib_detected_discharged_home_patients'] = self._count_population(afib_detected_discharged_home)
 
-            self.statsDf['% afib patients discharged home with anticoagulants'] = self.statsDf.apply(lambda x: round(((x['# afib patients discharged home with anticoagulants']/x['afib_detected_discharged_home_patients']) * 100), 2) if x['afib_detected_discharged_home_patients'] > 0 else 0, axis=1)
+            self.statsDf['% afib patients discharged home with anticoagulants'] = self._get_percentage(self.statsDf['# afib patients discharged home with anticoagulants'], self.statsDf['afib_detected_discharged_home_patients'])
 
-        self.statsDf['# afib patients discharged (home) with anticoagulants'] = self.statsDf.apply(lambda x: x['# afib patients discharged with anticoagulants'] if x['% afib patients discharged with anticoagulants'] > x['% afib patients discharged home with anticoagulants'] else x['# afib patients discharged home with anticoagulants'], axis=1)
-        self.statsDf['% afib patients discharged (home) with anticoagulants'] = self.statsDf.apply(lambda x: x['% afib patients discharged with anticoagulants'] if x['% afib patients discharged with anticoagulants'] > x['% afib patients discharged home with anticoagulants'] else x['% afib patients discharged home with anticoagulants'], axis=1)
+        self.statsDf['# afib patients discharged (home) with anticoagulants'] = self.statsDf['# afib patients discharged with anticoagulants'].where(self.statsDf['% afib patients discharged with anticoagulants'] > self.statsDf['% afib patients discharged home with anticoagulants'], self.statsDf['# afib patients discharged home with anticoagulants'])
+        self.statsDf['% afib patients discharged (home) with anticoagulants'] = self.statsDf['% afib patients discharged with anticoagulants'].where(self.statsDf['% afib patients discharged with anticoagulants'] > self.statsDf['% afib patients discharged home with anticoagulants'], self.statsDf['% afib patients discharged home with anticoagulants'])
 
         #### STROKE UNIT ####
         # stroke patients treated in a dedicated stroke unit / ICU
@@ -2114,19 +2122,12 @@ class ComputeStats:
         # % stroke patients treated in a dedicated stroke unit / ICU	
         self.statsDf['% stroke patients treated in a dedicated stroke unit / ICU'] = self.statsDf['% patients hospitalized in stroke unit / ICU']
 
-        # Create temporary dataframe to calculate final award 
-        self.angels_awards_tmp = self.statsDf[[self.total_patient_column, '% patients treated with door to recanalization therapy < 60 minutes', '% patients treated with door to recanalization therapy < 45 minutes', '% patients treated with door to thrombolysis < 60 minutes', '% patients treated with door to thrombolysis < 45 minutes', '% patients treated with door to thrombectomy < 120 minutes', '% patients treated with door to thrombectomy < 90 minutes', '% recanalization rate out of total ischemic incidence', '% suspected stroke patients undergoing CT/MRI', '% all stroke patients undergoing dysphagia screening', '% ischemic stroke patients discharged (home) with antiplatelets', '% afib patients discharged (home) with anticoagulants', '% stroke patients treated in a dedicated stroke unit / ICU', '# patients eligible thrombectomy', '# patients eligible thrombolysis']]
-
         #self.angels_awards_tmp = self.statsDf[[self.total_patient_column, '% patients treated with door to recanalization therapy < 60 minutes', '% patients treated with door to recanalization therapy < 45 minutes', '% patients treated with door to thrombolysis < 60 minutes', '% patients treated with door to thrombolysis < 45 minutes', '% patients treated with door to thrombectomy < 120 minutes', '% patients treated with door to thrombectomy < 90 minutes', '% recanalization rate out of total ischemic incidence', '% suspected stroke patients undergoing CT/MRI', '% all stroke patients undergoing dysphagia screening', '% ischemic stroke patients discharged (home) with antiplatelets', '% patients prescribed anticoagulants with aFib', '% stroke patients treated in a dedicated stroke unit / ICU', '# patients eligible thrombectomy', '# patients eligible thrombolysis']]
 
         
         self.statsDf.fillna(0, inplace=True)
 
-        self.angels_awards_tmp.loc[:, 'Proposed Award (old calculation)'] = self.angels_awards_tmp.apply(lambda x: self._get_final_award(x, new_calculation=False), axis=1)
-        self.angels_awards_tmp.loc[:, 'Proposed Award'] = self.angels_awards_tmp.apply(lambda x: self._get_final_award(x, new_calculation=True), axis=1)
-        
-        self.statsDf['Proposed Award (old calculation)'] = self.angels_awards_tmp['Proposed Award (old calculation)']
-        self.statsDf['Proposed Award'] = self.angels_awards_tmp['Proposed Award'] 
+        self._get_angels_awards()
 
         self.statsDf.rename(columns={"Protocol ID": "Site ID"}, inplace=True)
 
@@ -2136,168 +2137,113 @@ class ComputeStats:
 
         del isch, is_ich_tia_cvt, is_ich_cvt, is_ich, is_tia, is_ich_sah_cvt, is_tia_cvt, cvt, ich_sah, ich, sah, discharge_subset_alive
 
-    def _get_final_award(self, x, new_calculation=True):
-        """ The function calculating the proposed award. 
+    def _get_angels_awards(self):
+        """ The function calculating the proposed award (the new and old calculation) for each site and adding the columns into the statistics. """
 
-        :param x: the row from temporary dataframe
-        :type x: pandas series
-        :returns: award -- the proposed award
+        # Create temporary dataframe to calculate final award 
+        self.angels_awards_tmp = self.statsDf[[self.total_patient_column] + ANGELS_AWARDS].copy()
+
+        self.angels_awards_tmp['Proposed Award (old calculation)'], _ = get_awards(self.angels_awards_tmp, OLD_ANGELS_AWARDS_INDICATORS, self.total_patient_column)
+        self.angels_awards_tmp['Proposed Award'], self.angels_awards_tmp['Proposed Award capped by'] = get_awards(self.angels_awards_tmp, ANGELS_AWARDS_INDICATORS, self.total_patient_column)
+        
+        self.statsDf['Proposed Award (old calculation)'] = self.angels_awards_tmp['Proposed Award (old calculation)']
+        self.statsDf['Proposed Award'] = self.angels_awards_tmp['Proposed Award'] 
+
+    def _compute_metrics(self, metrics, country_code, totals=None):
+        """ The function calculating only the selected metrics from the metric registry. If the proposed award is selected, the metrics needed for the Angels Awards are calculated too.
+
+        :param metrics: the list of the metrics (columns of the statistics)
+        :type metrics: list
+        :param country_code: the country code
+        :type country_code: str
+        :param totals: the column whose values are calculated as the totals of all patients with the value (eg. Country)
+        :type totals: str
+        """
+        awards = [x for x in metrics if x in ['Proposed Award', 'Proposed Award (old calculation)', 'Proposed Award capped by']]
+        names = [x for x in metrics if x not in awards]
+        if awards:
+            names += [x for x in ANGELS_AWARDS if x not in names]
+
+        self.statsDf = MetricRegistry(self.df, self.statsDf, country_code=country_code, masks=self._masks, totals=totals).compute(names)
+
+        if awards:
+            self.total_patient_column = '# total patients >= {0}'.format(self.patient_limit)
+            self.statsDf[self.total_patient_column] = self.statsDf['Total Patients'] >= self.patient_limit
+            self._get_angels_awards()
+            # The name of the indicator which limited the proposed award
+            if 'Proposed Award capped by' in awards:
+                self.statsDf['Proposed Award capped by'] = self.angels_awards_tmp['Proposed Award capped by']
+            columns = ['Protocol ID', 'Site Name', 'Total Patients'] + [x for x in metrics if x not in awards] + [self.total_patient_column] + awards
+            self.statsDf = self.statsDf[list(dict.fromkeys(columns))]
+
+    def _get_site_values(self, values):
+        """ The function aligning the values calculated per site with the rows of the statistics. The sites without value get 0. The values are returned in the same order as the sites in the statistics, so they can be assigned as a new column without merging the dataframes.
+
+        :param values: the values indexed by Protocol ID
+        :type values: pandas series
+        :returns: the column with the values
+        """
+        return pd.Series(get_site_values(values, self.statsDf['Protocol ID']), index=self.statsDf.index)
+
+    def _get_crosstab(self, dataframe, column_name):
+        """ The function returning the number of patients per site (rows) and value (columns) from the temporary dataframe. The crosstab is built only once for each temporary dataframe and reused for all values of the column. 
+
+        :param dataframe: the temporary dataframe with the number of patients per site and value
+        :type dataframe: pandas dataframe
+        :param column_name: the name of column with the values
+        :type column_name: str
+        :returns: the crosstab, the missing combinations are NaN
+        """
+        if self._crosstab is None or self._crosstab[0] is not dataframe or self._crosstab[1] != column_name:
+            crosstab = dataframe.set_index(['Protocol ID', column_name])['count'].unstack()
+            self._crosstab = (dataframe, column_name, crosstab)
+
+        return self._crosstab[2]
+
+    def _get_crosstab_values(self, crosstab, values, new_column_name):
+        """ The function summing the number of patients for the selected values of the crosstab and adding the column into the statistics. 
+
+        :param crosstab: the crosstab returned by `_get_crosstab`
+        :type crosstab: pandas dataframe
+        :param values: the list of the values (columns of the crosstab)
+        :type values: list
+        :param new_column_name: the name of the created column containing the number of patients
+        :type new_column_name: str
+        :returns: the dataframe with calculated statistics
         """
-        if x[self.total_patient_column] == False:
-            award = "STROKEREADY"
+        values = [x for x in crosstab.columns if x in values]
+        if values:
+            counts = crosstab[values].sum(axis=1, min_count=1)
         else:
-            if new_calculation:
-                thrombolysis_therapy_lt_60min = x['% patients treated with door to thrombolysis < 60 minutes']
-
-                # Calculate award for thrombolysis, if no patients were eligible for thrombolysis and number of total patients was greater than minimum than the award is set to DIAMOND 
-                if (float(thrombolysis_therapy_lt_60min) >= 50 and float(thrombolysis_therapy_lt_60min) <= 74.99):
-                    award = "GOLD"
-                elif (float(thrombolysis_therapy_lt_60min) >= 75):
-                    award = "DIAMOND"
-                else: 
-                    award = "STROKEREADY"
-
-                thrombolysis_therapy_lt_45min = x['% patients treated with door to thrombolysis < 45 minutes']
-
-                if award != "STROKEREADY":
-                    if (float(thrombolysis_therapy_lt_45min) <= 49.99):
-                        if (award != "GOLD" or award == "DIAMOND"):
-                            award = "PLATINUM"
-                    elif (float(thrombolysis_therapy_lt_45min) >= 50):
-                        if (award != "GOLD"):
-                            award = "DIAMOND"
-                    else:
-                        award = "STROKEREADY"
-
-
-                # Calculate award for thrombectomy, if no patients were eligible for thrombectomy and number of total patients was greater than minimum than the award is set to the possible proposed award (eg. if in thrombolysis step award was set to GOLD then the award will be GOLD)
-                thrombectomy_pts = x['# patients eligible thrombectomy']
-                # if thrombectomy_pts != 0:
-                if thrombectomy_pts > 3:
-                    thrombectomy_therapy_lt_120min = x['% patients treated with door to thrombectomy < 120 minutes']
-                    if award != "STROKEREADY":
-                        if (float(thrombectomy_therapy_lt_120min) >= 50 and float(thrombectomy_therapy_lt_120min) <= 74.99):
-                            if (award == "PLATINUM" or award == "DIAMOND"):
-                                award = "GOLD"
-                        elif (float(thrombectomy_therapy_lt_120min) >= 75):
-                            if (award == "DIAMOND"):
-                                award = "DIAMOND"
-                        else: 
-                            award = "STROKEREADY"
-
-                    thrombectomy_therapy_lt_90min = x['% patients treated with door to thrombectomy < 90 minutes']
-                    if award != "STROKEREADY":
-                        if (float(thrombectomy_therapy_lt_90min) <= 49.99):
-                            if (award != "GOLD" or award == "DIAMOND"):
-                                award = "PLATINUM"
-                        elif (float(thrombectomy_therapy_lt_90min) >= 50):
-                            if (award == "DIAMOND"):
-                                award = "DIAMOND"
-                        else:
-                            award = "STROKEREADY"
-            else:
-                recan_therapy_lt_60min = x['% patients treated with door to recanalization therapy < 60 minutes']
-                if (float(recan_therapy_lt_60min) >= 50 and float(recan_therapy_lt_60min) <= 74.99):
-                    award = "GOLD"
-                elif (float(recan_therapy_lt_60min) >= 75):
-                    award = "DIAMOND"
-                else: 
-                    award = "STROKEREADY"
-
-                recan_therapy_lt_45min = x['% patients treated with door to recanalization therapy < 45 minutes']
-                if award != "STROKEREADY":
-                    if (float(recan_therapy_lt_45min) <= 49.99):
-                        if (award != "GOLD" or award == "DIAMOND"):
-                            award = "PLATINUM"
-                    elif (float(recan_therapy_lt_45min) >= 50):
-                        if (award != "GOLD"):
-                            award = "DIAMOND"
-                    else:
-                        award = "STROKEREADY"
-
-            recan_rate = x['% recanalization rate out of total ischemic incidence']
-            if award != "STROKEREADY":
-                if (float(recan_rate) >= 5 and float(recan_rate) <= 14.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(recan_rate) >= 15 and float(recan_rate) <= 24.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(recan_rate) >= 25):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-
-            ct_mri = x['% suspected stroke patients undergoing CT/MRI']
-            if award != "STROKEREADY":
-                if (float(ct_mri) >= 80 and float(ct_mri) <= 84.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(ct_mri) >= 85 and float(ct_mri) <= 89.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(ct_mri) >= 90):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-            dysphagia_screening = x['% all stroke patients undergoing dysphagia screening']
-            if award != "STROKEREADY":
-                if (float(dysphagia_screening) >= 80 and float(dysphagia_screening) <= 84.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(dysphagia_screening) >= 85 and float(dysphagia_screening) <= 89.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(dysphagia_screening) >= 90):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-            discharged_with_antiplatelets_final = x['% ischemic stroke patients discharged (home) with antiplatelets']
-            if award != "STROKEREADY":
-                if (float(discharged_with_antiplatelets_final) >= 80 and float(discharged_with_antiplatelets_final) <= 84.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(discharged_with_antiplatelets_final) >= 85 and float(discharged_with_antiplatelets_final) <= 89.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(discharged_with_antiplatelets_final) >= 90):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-            discharged_with_anticoagulants_final = x['% afib patients discharged (home) with anticoagulants']
-            if award != "STROKEREADY":
-                if (float(discharged_with_anticoagulants_final) >= 80 and float(discharged_with_anticoagulants_final) <= 84.99):
-                    if (award == "PLATINUM" or award == "DIAMOND"):
-                        award = "GOLD"
-                elif (float(discharged_with_anticoagulants_final) >= 85 and float(discharged_with_anticoagulants_final) <= 89.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(discharged_with_anticoagulants_final) >= 90):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-            stroke_unit = x['% stroke patients treated in a dedicated stroke unit / ICU']
-            if award != "STROKEREADY":
-                if (float(stroke_unit) <= 0.99):
-                    if (award == "DIAMOND"):
-                        award = "PLATINUM"
-                elif (float(stroke_unit) >= 1):
-                    if (award == "DIAMOND"):
-                        award = "DIAMOND"
-                else:
-                    award = "STROKEREADY"
-
-        return award
+            counts = pd.Series(dtype=float)
+        # The counts of the sites which have all values are integers
+        if not counts.isnull().any():
+            counts = counts.astype('int64')
+        self.statsDf[new_column_name] = self._get_site_values(counts)
+
+        return self.statsDf
+
+    def _get_percentage(self, numerator, denominator):
+        """ The function calculating the percentage of patients rounded to 2 decimal places. If the denominator is not greater than 0, the percentage is 0. 
+
+        :param numerator: the column with the number of patients
+        :type numerator: pandas series
+        :param denominator: the column with the number of patients in the population
+        :type denominator: pandas series
+        :returns: the column with the percentages
+        """
+        return pd.Series(get_percentage(numerator, denominator), index=self.statsDf.index)
+
+    def _get_median(self, dataframe, column_name):
+        """ The function calculating the median of the column per site. 
+
+        :param dataframe: the dataframe with the raw data
+        :type dataframe: pandas dataframe
+        :param column_name: the name of the column
+        :type column_name: str
+        :returns: the column with the medians, the sites without patients get 0
+        """
+        return self._get_site_values(dataframe.groupby(['Protocol ID'])[column_name].median())
 
     def _count_patients(self, dataframe):
         """ The function calculating the number of patients per site. 
@@ -2306,11 +2252,41 @@ class ComputeStats:
         :type dataframe: dataframe
         :returns: the column with number of patients
         """
-        tmpDf = dataframe.groupby(['Protocol ID']).size().reset_index(name='count_patients')
-        factorDf = self.statsDf.merge(tmpDf, how='outer')
-        factorDf.fillna(0, inplace=True)
+        return self._get_site_values(dataframe.groupby(['Protocol ID']).size())
+
+    def _count_population(self, conditions):
+        """ The function calculating the number of patients per site in the population defined by the conditions. The population is evaluated from the cached masks, the rows are not copied.
+
+        :param conditions: the tuple of conditions (column, operator, operand)
+        :type conditions: tuple
+        :returns: the column with number of patients
+        """
+        return self._get_site_values(self._masks.count(conditions))
 
-        return factorDf['count_patients']
+    def _get_population(self, conditions, columns=None):
+        """ The function returning the rows of the population defined by the conditions. Only the selected columns are copied.
+
+        :param conditions: the tuple of conditions (column, operator, operand)
+        :type conditions: tuple
+        :param columns: the list of columns (default: all columns)
+        :type columns: list
+        :returns: the dataframe with the population
+        :rtype: pandas dataframe
+        """
+        return self._masks.get_subset(conditions, columns)
+
+    def _get_population_values(self, conditions, column_name):
+        """ The function returning the temporary dataframe with the number of patients per site and value of the column in the population defined by the conditions.
+
+        :param conditions: the tuple of conditions (column, operator, operand)
+        :type conditions: tuple
+        :param column_name: the name of the column
+        :type column_name: str
+        :returns: the dataframe with the columns Protocol ID, column_name and count
+        :rtype: pandas dataframe
+        """
+        population = self._get_population(conditions, ['Protocol ID', column_name])
+        return population.groupby(['Protocol ID', column_name]).size().to_frame('count').reset_index()
 
     def _get_values_only_columns(self, column_name, value, dataframe):
         """ The function calculating the numbeer of patients per site for the given value from the temporary dataframe. 
@@ -2323,19 +2299,19 @@ class ComputeStats:
         :type dataframe: pandas dataframe
         :returns: the column with the number of patients
         """
+        crosstab = self._get_crosstab(dataframe, column_name)
+        counts = crosstab[value] if value in crosstab.columns else pd.Series(dtype=float)
+        if not counts.isnull().any():
+            counts = counts.astype('int64')
 
-        tmpDf = dataframe[dataframe[column_name] == value].reset_index()[['Protocol ID', 'count']]
-        factorDf = self.statsDf.merge(tmpDf, how='outer')
-        factorDf.fillna(0, inplace=True)
-
-        return factorDf['count']
+        return self._get_site_values(counts)
 
     def _get_values_for_factors(self, column_name, value, new_column_name, df=None):
         """ The function calculating the numbeer of patients per site for the given value from the temporary dataframe. 
 
         :param column_name: the name of column name the number of patients should be calculated
         :type column_name: str
-        :param value: the value for which we would like to get number of patients from the specific column
+        :param value: the value for which we would like to get number of patients from the specific column, the code for the coded columns (see :mod:`resqdb.Schema`) or the string for the columns converted to strings
         :type value: int
         :param new_column_name: to this value will be renamed the created column containing the number of patients
         :type new_column_name: str
@@ -2343,18 +2319,13 @@ class ComputeStats:
         :type df: pandas dataframe
         :returns: the dataframe with calculated statistics
         """
-        # Check if type of column name is type of number, if not convert value into string
-        if (self.tmp[column_name].dtype != np.number):
+        # The coded column which could not be typed by the schema contains strings, convert value into string
+        if not pd.api.types.is_numeric_dtype(self.tmp[column_name]):
             value = str(value)
-        else:
-            value = value 
 
-        tmpDf = self.tmp[self.tmp[column_name] == value].reset_index()[['Protocol ID', 'count']]
-        factorDf = self.statsDf.merge(tmpDf, how='outer')
-        factorDf.rename(columns={'count': new_column_name}, inplace=True)
-        factorDf.fillna(0, inplace=True)
+        crosstab = self._get_crosstab(self.tmp, column_name)
 
-        return factorDf
+        return self._get_crosstab_values(crosstab, [value], new_column_name)
 
     def _get_values_for_factors_more_values(self, column_name, value, new_column_name, df=None):
         """ The function calculating the number of patients per site for the given value from the temporary dataframe. 
@@ -2369,20 +2340,9 @@ class ComputeStats:
         :type df: pandas dataframe
         :returns: the dataframe with calculated statistics
         """
-        if df is None:
-            tmpDf = self.tmp[self.tmp[column_name].isin(value)].reset_index()[['Protocol ID', 'count']]
-            tmpDf = tmpDf.groupby('Protocol ID').sum().reset_index()
-            factorDf = self.statsDf.merge(tmpDf, how='outer')
-            factorDf.rename(columns={'count': new_column_name}, inplace=True)
-            factorDf.fillna(0, inplace=True)
-        else:
-            tmpDf = df[df[column_name].isin(value)].reset_index()[['Protocol ID', 'count']]
-            tmpDf = tmpDf.groupby('Protocol ID').sum().reset_index()
-            factorDf = self.statsDf.merge(tmpDf, how='outer')
-            factorDf.rename(columns={'count': new_column_name}, inplace=True)
-            factorDf.fillna(0, inplace=True)
+        crosstab = self._get_crosstab(self.tmp if df is None else df, column_name)
 
-        return factorDf
+        return self._get_crosstab_values(crosstab, list(value), new_column_name)
 
     def _get_values_for_factors_containing(self, column_name, value, new_column_name, df=None):
         """ The function calculating the number of patients per site for the given value from the temporary dataframe. 
@@ -2397,21 +2357,10 @@ class ComputeStats:
         :type df: pandas dataframe
         :returns: the dataframe with calculated statistics
         """
-        
-        if df is None:
-            tmpDf = self.tmp[self.tmp[column_name].str.contains(value)].reset_index()[['Protocol ID', 'count']]
-            tmpDf = tmpDf.groupby('Protocol ID').sum().reset_index()
-            factorDf = self.statsDf.merge(tmpDf, how='outer')
-            factorDf.rename(columns={'count': new_column_name}, inplace=True)
-            factorDf.fillna(0, inplace=True)
-        else:
-            tmpDf = df[df[column_name].str.contains(value)].reset_index()[['Protocol ID', 'count']]
-            tmpDf = tmpDf.groupby('Protocol ID').sum().reset_index()
-            factorDf = self.statsDf.merge(tmpDf, how='outer')
-            factorDf.rename(columns={'count': new_column_name}, inplace=True)
-            factorDf.fillna(0, inplace=True)
+        crosstab = self._get_crosstab(self.tmp if df is None else df, column_name)
+        values = crosstab.columns[crosstab.columns.str.contains(value, na=False)] if len(crosstab.columns) > 0 else []
 
-        return factorDf
+        return self._get_crosstab_values(crosstab, list(values), new_column_name)
 
     def _get_ctmri_delta(self, hosp_time, ct_time):
         """ The function calculating the difference between two times in minutes. 
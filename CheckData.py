@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 import time
 import logging
 from dateutil.relativedelta import relativedelta
-from threading import Thread
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 class CheckData:
     """ The class checking the dates and times in the dataframe. 
@@ -37,133 +37,202 @@ class CheckData:
         self.df = df.copy()
         self.nprocess = nprocess
 
-        if self.nprocess is not None:
-            # Dictionary initialization - db dataframes
-            self.dfs = np.array_split(self.df, self.nprocess)
-            self.pre_df = {}
-
-            threads = []
-            for i in range(0, len(self.dfs)):
-                logging.info("Process{0}: Check of data has been started.".format(i))
-                process = Thread(target=self.get_preprocessed_data(self.dfs[i], n=i, name=str(i)))
-                process.start()
-                threads.append(process)
-
-            for process in threads:
-                process.join()
-
-            self.preprocessed_data = pd.DataFrame()
-            for k, v in self.pre_df.items():
-                self.preprocessed_data = self.preprocessed_data.append(v, sort=False)
-
+        if self.nprocess is not None and self.nprocess > 1 and len(self.df) > 0:
+            self.preprocessed_data = self.get_preprocessed_data_parallel(self.df, self.nprocess)
         else:
+            self.nprocess = None
             self.preprocessed_data = self.get_preprocessed_data(self.df)
 
 
-    def time_diff(self, visit_date, hospital_date):
-        """ The function calculating the difference in minutes between hospital date and visit date. 
+    def _get_shards(self, df, nshards):
+        """ The function splitting the sites into shards. All patients of the site are in the same shard and the shards are balanced by the number of patients (the largest sites are assigned first to the smallest shard). 
 
-        :param visit_date: the last seen normal date
-        :type visit_date: the timestamp
-        :param hospital_date: the date of hospitalization
-        :type hospital_date: the timestamp
-        :returns: the difference between two timestamps in minutes
-        :rtype: int
+        :param df: the dataframe with the raw data
+        :type df: pandas dataframe
+        :param nshards: the number of shards
+        :type nshards: int
+        :returns: the number of the shard for each row
+        :rtype: numpy array
         """
-        if type(visit_date) is pd.Timestamp and type(hospital_date) is pd.Timestamp:
-            time_diff = hospital_date - visit_date
-            # Convert difference to minutes
-            total_minutes = time_diff.total_seconds() / 60.0
-        else:
-            total_minutes = 0
+        sites = df['Protocol ID'].fillna('').astype(str)
+        sizes = sites.value_counts()
+
+        loads = np.zeros(nshards, dtype=np.int64)
+        shards = {}
+        for site, size in sizes.items():
+            shard = int(np.argmin(loads))
+            shards[site] = shard
+            loads[shard] += size
+
+        return sites.map(shards).to_numpy()
 
-        if total_minutes < 0 or total_minutes > 40000:
-            total_minutes = 0
-        
-        return total_minutes
 
+    def get_preprocessed_data_parallel(self, df, nprocess):
+        """ The function preparing the preprocessed data in the pool of processes. The data are sharded by `Protocol ID`, each shard is checked in the separate process and the results are concatenated in the original order of rows. The duration of each shard is stored in `self.timings`. 
 
-    def get_preprocessed_data(self, df, n=None, name=None):    
+        :param df: the dataframe with the raw data
+        :type df: pandas dataframe
+        :param nprocess: the number of processes
+        :type nprocess: int
+        :returns: the preprocessed data
+        :rtype: DataFrame
+        """
+        shards = self._get_shards(df, nprocess)
+        # Keep the original order of rows
+        positions = np.arange(len(df))
+
+        self.timings = {}
+        results = []
+        with ProcessPoolExecutor(max_workers=nprocess) as executor:
+            futures = [executor.submit(_check_shard, df[shards == i], positions[shards == i], i) for i in range(0, nprocess) if (shards == i).any()]
+            for future in as_completed(futures):
+                n, preprocessed_data, shard_positions, duration = future.result()
+                self.timings[n] = duration
+                results.append((preprocessed_data, shard_positions))
+                logging.info("Process{0}: {1} rows were checked in {2} seconds.".format(n, len(preprocessed_data), duration))
+
+        preprocessed_data = pd.concat([x[0] for x in results], sort=False)
+        order = np.argsort(np.concatenate([x[1] for x in results]), kind='stable')
+        return preprocessed_data.iloc[order]
+
+
+    def get_preprocessed_data(self, df):    
         """ The function preparing the preprocessed data from the raw data. 
 
         :param df: the dataframe with the raw data
         :type df: pandas dataframe
-        :param n: the number of the process if more processes are run simultaneously
-        :type n: int
-        :param name: the name of dataframe used as key in the dictionary
-        :type name: str
-        :returns: preprocessed data if one process has been run
+        :returns: the preprocessed data
         :rtype: DataFrame
         """     
         
-        if self.nprocess is not None:
-            preprocessed_data = df.copy()
-            # Calculate hospital days
-            preprocessed_data['HOSPITAL_DAYS'] = preprocessed_data.apply(lambda x: self._get_hospital_days(x['HOSPITAL_DATE'], x['DISCHARGE_DATE']), axis=1)
-            if n is not None:
-                logging.info("Process{0}: Hospital days were calculated.".format(n))
-            else:
-                logging.info("Hospital days were calculated.")
-            
-            # Add to old columns suffix _OLD
-            preprocessed_data.rename(columns={"VISIT_DATE": "VISIT_DATE_OLD", "HOSPITAL_DATE": "HOSPITAL_DATE_OLD","DISCHARGE_DATE": "DISCHARGE_DATE_OLD", "HOSPITAL_DAYS": "HOSPITAL_DAYS_OLD",}, inplace=True)
+        preprocessed_data = df.copy()
+        # Calculate hospital days
+        preprocessed_data['HOSPITAL_DAYS'] = self._get_hospital_days_column(preprocessed_data['HOSPITAL_DATE'], preprocessed_data['DISCHARGE_DATE'])
+        logging.info("Hospital days were calculated.")
+        
+        # Add to old columns suffix _OLD
+        preprocessed_data.rename(columns={"VISIT_DATE": "VISIT_DATE_OLD", "HOSPITAL_DATE": "HOSPITAL_DATE_OLD","DISCHARGE_DATE": "DISCHARGE_DATE_OLD", "HOSPITAL_DAYS": "HOSPITAL_DAYS_OLD",}, inplace=True)
 
-            # Fix hospital/discharge date if hospital days < 0 or > 300
-            preprocessed_data['VISIT_DATE'], preprocessed_data['HOSPITAL_DATE'], preprocessed_data['DISCHARGE_DATE'], preprocessed_data['HOSPITAL_DAYS'], preprocessed_data['HOSPITAL_DAYS_FIXED'] = zip(*preprocessed_data.apply(lambda x: self._fix_dates(visit_date=x['VISIT_DATE_OLD'], hosp_date=x['HOSPITAL_DATE_OLD'], disc_date=x['DISCHARGE_DATE_OLD']) if (x['HOSPITAL_DAYS_OLD'] < 0 or x['HOSPITAL_DAYS_OLD'] > 300) else (x['VISIT_DATE_OLD'], x['HOSPITAL_DATE_OLD'], x['DISCHARGE_DATE_OLD'], x['HOSPITAL_DAYS_OLD'], False), axis=1))
+        # Fix hospital/discharge date if hospital days < 0 or > 300
+        preprocessed_data = self._fix_dates_column(preprocessed_data)
 
-            preprocessed_data['VISIT_TIMESTAMP'] = preprocessed_data.apply(lambda x: datetime.combine(x['VISIT_DATE'], x['VISIT_TIME']) if (x['VISIT_TIME'] is not None and x['VISIT_DATE'] is not None) else None, axis=1)
-            preprocessed_data['HOSPITAL_TIMESTAMP'] = preprocessed_data.apply(lambda x: datetime.combine(x['HOSPITAL_DATE'], x['HOSPITAL_TIME']) if (x['HOSPITAL_TIME'] is not None and x['HOSPITAL_DATE'] is not None) else None, axis=1)
-            preprocessed_data['LAST_SEEN_NORMAL'] = preprocessed_data.apply(lambda x: self.time_diff(x['VISIT_TIMESTAMP'], x['HOSPITAL_TIMESTAMP']), axis=1)
+        preprocessed_data['VISIT_TIMESTAMP'] = self._get_timestamps(preprocessed_data['VISIT_DATE'], preprocessed_data['VISIT_TIME'])
+        preprocessed_data['HOSPITAL_TIMESTAMP'] = self._get_timestamps(preprocessed_data['HOSPITAL_DATE'], preprocessed_data['HOSPITAL_TIME'])
+        preprocessed_data['LAST_SEEN_NORMAL'] = self._get_last_seen_normal(preprocessed_data['VISIT_TIMESTAMP'], preprocessed_data['HOSPITAL_TIMESTAMP'])
+        logging.info("Check data: Dates were fixed.")
 
-            if n is not None:
-                logging.info("Process{0}: Dates were fixed.".format(n))
-            else:
-                logging.info("Check data: Dates were fixed.")
+        # Fix times
+        preprocessed_data = self._fix_times(df=preprocessed_data)
+        logging.info("Times were fixed and differences in minutes has been calculated.")
 
-            # Fix times
-            preprocessed_data = self._fix_times(df=preprocessed_data)
-            if n is not None:
-                logging.info("Process{0}: Times were fixed and differences in minutes has been calculated.".format(n))
-            else:
-                logging.info("Times were fixed an differences in minutes has been calculated.")
+        return preprocessed_data
 
-            self.pre_df[name] = preprocessed_data
+    
+    def _to_days(self, dates):
+        """ The function converting the column with dates into the numpy array of datetime64[D]. The dates out of the pandas timestamp range (eg. year 1029) are kept.
 
-        else:
-            preprocessed_data = df.copy()
-            # Calculate hospital days
-            preprocessed_data['HOSPITAL_DAYS'] = preprocessed_data.apply(lambda x: self._get_hospital_days(x['HOSPITAL_DATE'], x['DISCHARGE_DATE']), axis=1)
-            if self.nprocess is not None:
-                logging.info("Process{0}: Hospital days were calculated.".format(self.nprocess))
-            else:
-                logging.info("Hospital days were calculated.")
-            
-            # Add to old columns suffix _OLD
-            preprocessed_data.rename(columns={"VISIT_DATE": "VISIT_DATE_OLD", "HOSPITAL_DATE": "HOSPITAL_DATE_OLD","DISCHARGE_DATE": "DISCHARGE_DATE_OLD", "HOSPITAL_DAYS": "HOSPITAL_DAYS_OLD",}, inplace=True)
+        :param dates: the column with dates (date objects, timestamps or strings)
+        :type dates: Series
+        :returns: the array of dates, NaT if date is missing
+        :rtype: numpy array
+        """
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates.to_numpy().astype('datetime64[D]')
 
-            # Fix hospital/discharge date if hospital days < 0 or > 300
-            preprocessed_data['VISIT_DATE'], preprocessed_data['HOSPITAL_DATE'], preprocessed_data['DISCHARGE_DATE'], preprocessed_data['HOSPITAL_DAYS'], preprocessed_data['HOSPITAL_DAYS_FIXED'] = zip(*preprocessed_data.apply(lambda x: self._fix_dates(visit_date=x['VISIT_DATE_OLD'], hosp_date=x['HOSPITAL_DATE_OLD'], disc_date=x['DISCHARGE_DATE_OLD']) if (x['HOSPITAL_DAYS_OLD'] < 0 or x['HOSPITAL_DAYS_OLD'] > 300) else (x['VISIT_DATE_OLD'], x['HOSPITAL_DATE_OLD'], x['DISCHARGE_DATE_OLD'], x['HOSPITAL_DAYS_OLD'], False), axis=1))
+        values = [None if pd.isnull(x) else x for x in dates.tolist()]
+        return np.array(values, dtype='datetime64[D]')
 
-            preprocessed_data['VISIT_TIMESTAMP'] = preprocessed_data.apply(lambda x: datetime.combine(x['VISIT_DATE'], x['VISIT_TIME']) if (x['VISIT_TIME'] is not None and x['VISIT_DATE'] is not None) else None, axis=1)
-            preprocessed_data['HOSPITAL_TIMESTAMP'] = preprocessed_data.apply(lambda x: datetime.combine(x['HOSPITAL_DATE'], x['HOSPITAL_TIME']) if (x['HOSPITAL_TIME'] is not None and x['HOSPITAL_DATE'] is not None) else None, axis=1)
-            preprocessed_data['LAST_SEEN_NORMAL'] = preprocessed_data.apply(lambda x: self.time_diff(x['VISIT_TIMESTAMP'], x['HOSPITAL_TIMESTAMP']), axis=1)
 
+    def _get_hospital_days_column(self, hosp_dates, disc_dates):
+        """ The function calculating the number of hospital days for the whole column, see `_get_hospital_days`.
 
-            if self.nprocess is not None:
-                logging.info("Process{0}: Dates were fixed.".format(self.nprocess))
-            else:
-                logging.info("Check data: Dates were fixed.")
+        :param hosp_dates: the dates of hospitalization
+        :type hosp_dates: Series
+        :param disc_dates: the discharge dates
+        :type disc_dates: Series
+        :returns: the number of hospital days, NaN if some date is missing
+        :rtype: Series
+        """
+        diff = self._to_days(disc_dates) - self._to_days(hosp_dates)
+        missing = np.isnat(diff)
+        days = np.where(missing, 0, diff.astype(np.int64))
+        # If hospital date and discharge date are the same day, replace 0 by 1.
+        days[days == 0] = 1
+        if missing.any():
+            days = np.where(missing, np.nan, days)
 
-            # Fix times
-            preprocessed_data = self._fix_times(df=preprocessed_data)
-            if self.nprocess is not None:
-                logging.info("Process{0}: Times were fixed and differences in minutes has been calculated.".format(self.nprocess))
-            else:
-                logging.info("Times were fixed and differences in minutes has been calculated.")
+        return pd.Series(days, index=hosp_dates.index)
+
+
+    def _fix_dates_column(self, df):
+        """ The function fixing the hospital date and discharge date if hospital days are < 0 or > 300. Only the rows with incorrect hospital days are fixed by `_fix_dates`, the other rows are kept.
+
+        :param df: the dataframe with VISIT_DATE_OLD, HOSPITAL_DATE_OLD, DISCHARGE_DATE_OLD and HOSPITAL_DAYS_OLD columns
+        :type df: DataFrame
+        :returns: the dataframe with VISIT_DATE, HOSPITAL_DATE, DISCHARGE_DATE, HOSPITAL_DAYS and HOSPITAL_DAYS_FIXED columns
+        :rtype: DataFrame
+        """
+        days = df['HOSPITAL_DAYS_OLD']
+        mask = ((days < 0) | (days > 300)).to_numpy()
+
+        visit_dates = df['VISIT_DATE_OLD'].to_numpy(dtype=object, copy=True)
+        hosp_dates = df['HOSPITAL_DATE_OLD'].to_numpy(dtype=object, copy=True)
+        disc_dates = df['DISCHARGE_DATE_OLD'].to_numpy(dtype=object, copy=True)
+        hospital_days = days.to_numpy(dtype=object, copy=True)
+        fixed = np.zeros(len(df), dtype=bool)
+
+        for i in np.flatnonzero(mask):
+            visit_dates[i], hosp_dates[i], disc_dates[i], hospital_days[i], fixed[i] = self._fix_dates(visit_date=visit_dates[i], hosp_date=hosp_dates[i], disc_date=disc_dates[i])
+
+        df['VISIT_DATE'] = visit_dates
+        df['HOSPITAL_DATE'] = hosp_dates
+        df['DISCHARGE_DATE'] = disc_dates
+        df['HOSPITAL_DAYS'] = pd.to_numeric(pd.Series(hospital_days, index=df.index))
+        df['HOSPITAL_DAYS_FIXED'] = fixed
+
+        return df
+
+
+    def _get_timestamps(self, dates, times):
+        """ The function combining the dates and times into the timestamps.
+
+        :param dates: the dates
+        :type dates: Series
+        :param times: the times
+        :type times: Series
+        :returns: the timestamps, NaT if date or time is missing
+        :rtype: Series
+        """
+        days = self._to_days(dates).astype('datetime64[us]')
+        minutes = self._get_minutes(times)
+        missing = np.isnan(minutes)
+        microseconds = np.where(missing, 0, np.round(minutes * 60 * 10**6)).astype(np.int64).astype('timedelta64[us]')
+        timestamps = days + microseconds
+        timestamps[missing] = np.datetime64('NaT')
+        # Keep only the timestamps in the pandas range
+        valid = (timestamps >= np.datetime64('1678-01-01')) & (timestamps < np.datetime64('2262-01-01'))
+        timestamps[~valid] = np.datetime64('NaT')
+
+        return pd.Series(timestamps.astype('datetime64[ns]'), index=dates.index)
+
+
+    def _get_last_seen_normal(self, visit_timestamps, hosp_timestamps):
+        """ The function calculating the difference in minutes between hospital timestamp and visit timestamp for the whole column, the negative differences and differences longer than 40000 minutes are replaced by 0. 
+
+        :param visit_timestamps: the last seen normal timestamps
+        :type visit_timestamps: Series
+        :param hosp_timestamps: the timestamps of hospitalization
+        :type hosp_timestamps: Series
+        :returns: the difference between timestamps in minutes
+        :rtype: Series
+        """
+        total_minutes = (pd.to_datetime(hosp_timestamps) - pd.to_datetime(visit_timestamps)).dt.total_seconds() / 60.0
+        total_minutes = total_minutes.fillna(0)
+        total_minutes[(total_minutes < 0) | (total_minutes > 40000)] = 0
+
+        return total_minutes
 
-            return preprocessed_data
 
-    
     def _fix_dates(self, visit_date, hosp_date, disc_date):
         """ The function fixing the hospital date and discharge date if hospital days were negative. 
 
@@ -359,6 +428,47 @@ class CheckData:
             logging.error(error)
 
 
+    def _replace(self, df, column, mask, values):
+        """ The function replacing the values in the column in the rows matching the mask. 
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :param column: the name of the column
+        :type column: str
+        :param mask: the boolean mask
+        :type mask: Series
+        :param values: the scalar value or the column with new values
+        :type values: object
+        """
+        if isinstance(values, pd.Series):
+            values = values.to_numpy()
+        df[column] = np.where(np.asarray(mask, dtype=bool), values, df[column].to_numpy())
+
+
+    def _set_times_in_minutes(self, df, admission, bolus, column, changed, mask, max_time):
+        """ The function calculating the difference between times in minutes for the rows matching the mask, the other rows are set to 0 and `False`. 
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :param admission: the name of the column with admission time
+        :type admission: str
+        :param bolus: the name of the column with needle (groin puncture, discharge) time
+        :type bolus: str
+        :param column: the name of the column with the result in minutes
+        :type column: str
+        :param changed: the name of the column set to `True` if time has been fixed
+        :type changed: str
+        :param mask: the rows for which the times are calculated
+        :type mask: Series
+        :param max_time: the maximum time which is realistic for the type of the recanalization treatment
+        :type max_time: int
+        """
+        mask = np.asarray(mask, dtype=bool)
+        minutes, fixed = self._get_times_in_minutes(admission_time=df[admission], bolus_time=df[bolus], hosp_time=df['HOSPITAL_TIME'], max_time=max_time)
+        df[column] = np.where(mask, minutes, 0)
+        df[changed] = mask & fixed
+
+
     def _fix_times(self, df):
         """ The function fixing the times for recanalization procedures. 
 
@@ -382,21 +492,17 @@ class CheckData:
             'IVT_TBY_REFER_NEEDLE_TIME': 0
             })
         # Fill IVT only needle time into IVTPA column
-        df['IVTPA'] = df.apply(
-            lambda x: x['IVT_ONLY_NEEDLE_TIME'] if x['IVT_ONLY'] == 1 else x['IVTPA'], 
-            axis=1
-            )
+        self._replace(df, 'IVTPA', df['IVT_ONLY'] == 1, df['IVT_ONLY_NEEDLE_TIME'])
 
-        df['IVT_ONLY_NEEDLE_TIME'] = df.apply(lambda x: 0 if x['IVT_ONLY'] == 2 else x['IVT_ONLY_NEEDLE_TIME'], axis=1) # (delete values calculated by Mirek)
+        self._replace(df, 'IVT_ONLY_NEEDLE_TIME', df['IVT_ONLY'] == 2, 0) # (delete values calculated by Mirek)
         # IVT needle time
         if ('IVT_ONLY_BOLUS_TIME' in df.columns and 'IVT_ONLY_ADMISSION_TIME' in df.columns):
 
-            df['IVT_ONLY_NEEDLE_TIME_MIN'], df['IVT_ONLY_NEEDLE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=
-                str(x['IVT_ONLY_ADMISSION_TIME']), bolus_time=str(x['IVT_ONLY_BOLUS_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=400) if (x['IVT_ONLY'] == 2) else (0, False), axis=1))
-            df['IVTPA'] = df.apply(lambda x: x['IVT_ONLY_NEEDLE_TIME_MIN'] if x['IVT_ONLY'] == 2 else x['IVTPA'], axis=1)
+            self._set_times_in_minutes(df, 'IVT_ONLY_ADMISSION_TIME', 'IVT_ONLY_BOLUS_TIME', 'IVT_ONLY_NEEDLE_TIME_MIN', 'IVT_ONLY_NEEDLE_TIME_MIN_CHANGED', df['IVT_ONLY'] == 2, max_time=400)
+            self._replace(df, 'IVTPA', df['IVT_ONLY'] == 2, df['IVT_ONLY_NEEDLE_TIME_MIN'])
 
         # Create new column called IVT_DONE, if 1 than IVT has been performed else NaN
-        df['IVT_DONE'] = df.apply(lambda x: 1 if x['IVT_ONLY'] in [1,2] else np.nan, axis=1)
+        df['IVT_DONE'] = np.where(df['IVT_ONLY'].isin([1,2]), 1, np.nan)
 
         # Create IVT_TBY column
         # IVT_TBY - 1) filled in minutes, 2) filled admission, bolus and groin puncture time
@@ -406,17 +512,16 @@ class CheckData:
         # IVT_TBY_GROIN_PUNCTURE_TIME - HH:MM format
         # IVT_TBY_NEEDLE_TIME in minutes
         # IVT_TBY_NEEDLE_TIME_MIN - calculated by script (minutes) (delete values calculated by Mirek)
-        df['IVTPA'] = df.apply(lambda x: x['IVT_TBY_NEEDLE_TIME'] if x['IVT_TBY'] == 1 else x['IVTPA'], axis=1)
-        df['IVT_TBY_NEEDLE_TIME'] = df.apply(lambda x: 0 if x['IVT_TBY'] == 2 else x['IVT_TBY_NEEDLE_TIME'], axis=1) #(delete values calculated by Mirek)
+        self._replace(df, 'IVTPA', df['IVT_TBY'] == 1, df['IVT_TBY_NEEDLE_TIME'])
+        self._replace(df, 'IVT_TBY_NEEDLE_TIME', df['IVT_TBY'] == 2, 0) #(delete values calculated by Mirek)
 
         # IVT TBY needle time
         if ('IVT_TBY_ADMISSION_TIME' in df.columns and 'IVT_TBY_BOLUS_TIME' in df.columns):
 
-            df['IVT_TBY_NEEDLE_TIME_MIN'], df['IVT_TBY_NEEDLE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['IVT_TBY_ADMISSION_TIME']), bolus_time=str(x['IVT_TBY_BOLUS_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=400) if(x['IVT_TBY'] == 2) else (0, False), axis=1))
-            df['IVTPA'] = df.apply(lambda x: x['IVT_TBY_NEEDLE_TIME_MIN'] if x['IVT_TBY'] == 2 else x['IVTPA'], axis=1)
+            self._set_times_in_minutes(df, 'IVT_TBY_ADMISSION_TIME', 'IVT_TBY_BOLUS_TIME', 'IVT_TBY_NEEDLE_TIME_MIN', 'IVT_TBY_NEEDLE_TIME_MIN_CHANGED', df['IVT_TBY'] == 2, max_time=400)
+            self._replace(df, 'IVTPA', df['IVT_TBY'] == 2, df['IVT_TBY_NEEDLE_TIME_MIN'])
 
-        df['IVT_DONE'] = df.apply(lambda x: 1 if x['IVT_TBY'] in [1,2] else x['IVT_DONE'], axis=1)
+        self._replace(df, 'IVT_DONE', df['IVT_TBY'].isin([1,2]), 1)
 
         
 
@@ -425,17 +530,16 @@ class CheckData:
         # IVT_TBY_REFER_ADMISSION_TIME - HH:MM format
         # IVT_TBY_REFER_NEEDLE_TIME - minutes
         # IVT_TBY_REFER_NEEDLE_TIME_MIN - calculated by script (minutes) (delete values calculated by Mirek)
-        df['IVTPA'] = df.apply(lambda x: x['IVT_TBY_REFER_NEEDLE_TIME'] if x['IVT_TBY_REFER'] == 1 else x['IVTPA'], axis=1)
-        df['IVT_TBY_REFER_NEEDLE_TIME'] = df.apply(lambda x: 0 if x['IVT_TBY_REFER'] == 2 else x['IVT_TBY_REFER_NEEDLE_TIME'], axis=1) # (delete values calculated by Mirek)
+        self._replace(df, 'IVTPA', df['IVT_TBY_REFER'] == 1, df['IVT_TBY_REFER_NEEDLE_TIME'])
+        self._replace(df, 'IVT_TBY_REFER_NEEDLE_TIME', df['IVT_TBY_REFER'] == 2, 0) # (delete values calculated by Mirek)
 
         # IVT TBY refer needle time
         if ('IVT_TBY_REFER_ADMISSION_TIME' in df.columns and 'IVT_TBY_REFER_BOLUS_TIME' in df.columns):
 
-            df['IVT_TBY_REFER_NEEDLE_TIME_MIN'], df['IVT_TBY_REFER_NEEDLE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['IVT_TBY_REFER_ADMISSION_TIME']), bolus_time=str(x['IVT_TBY_REFER_BOLUS_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=400) if(x['IVT_TBY_REFER'] == 2) else (0, False), axis=1))
-            df['IVTPA'] = df.apply(lambda x: x['IVT_TBY_REFER_NEEDLE_TIME_MIN'] if x['IVT_TBY_REFER'] == 2 else x['IVTPA'], axis=1)
+            self._set_times_in_minutes(df, 'IVT_TBY_REFER_ADMISSION_TIME', 'IVT_TBY_REFER_BOLUS_TIME', 'IVT_TBY_REFER_NEEDLE_TIME_MIN', 'IVT_TBY_REFER_NEEDLE_TIME_MIN_CHANGED', df['IVT_TBY_REFER'] == 2, max_time=400)
+            self._replace(df, 'IVTPA', df['IVT_TBY_REFER'] == 2, df['IVT_TBY_REFER_NEEDLE_TIME_MIN'])
 
-        df['IVT_DONE'] = df.apply(lambda x: 1 if x['IVT_TBY_REFER'] in [1,2] else x['IVT_DONE'], axis=1)
+        self._replace(df, 'IVT_DONE', df['IVT_TBY_REFER'].isin([1,2]), 1)
 
         # Create TBY_ONLY column
         # TBY_ONLY_ADMISSION_TIME - HH:MM format
@@ -450,121 +554,81 @@ class CheckData:
             'TBY_REFER_ALL_GROIN_PUNCTURE_TIME': 0, 
             'TBY_REFER_LIM_GROIN_PUNCTURE_TIME': 0})
 
-        df['TBY'] = df.apply(lambda x: x['TBY_ONLY_GROIN_PUNCTURE_TIME'] if x['TBY_ONLY'] == 1 else x['TBY'], axis=1)
-        df['TBY_ONLY_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: 0 if x['TBY_ONLY'] == 2 else x['TBY_ONLY_GROIN_PUNCTURE_TIME'], axis=1)
+        self._replace(df, 'TBY', df['TBY_ONLY'] == 1, df['TBY_ONLY_GROIN_PUNCTURE_TIME'])
+        self._replace(df, 'TBY_ONLY_GROIN_PUNCTURE_TIME', df['TBY_ONLY'] == 2, 0)
 
         # TBY only groin time
         if ('TBY_ONLY_PUNCTURE_TIME' in df.columns and 'TBY_ONLY_ADMISSION_TIME' in df.columns):
 
-            df['TBY_ONLY_GROIN_TIME_MIN'], df['TBY_ONLY_GROIN_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_ONLY_ADMISSION_TIME']), bolus_time=str(x['TBY_ONLY_PUNCTURE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_ONLY'] == 2) else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['TBY_ONLY_GROIN_TIME_MIN'] if x['TBY_ONLY'] == 2 else x['TBY'], axis=1)
+            self._set_times_in_minutes(df, 'TBY_ONLY_ADMISSION_TIME', 'TBY_ONLY_PUNCTURE_TIME', 'TBY_ONLY_GROIN_TIME_MIN', 'TBY_ONLY_GROIN_TIME_MIN_CHANGED', df['TBY_ONLY'] == 2, max_time=700)
+            self._replace(df, 'TBY', df['TBY_ONLY'] == 2, df['TBY_ONLY_GROIN_TIME_MIN'])
 
         # Create TBY_DONE if TBY has been performed, else NaN
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_ONLY'] in [1,2] else np.nan, axis=1)
+        df['TBY_DONE'] = np.where(df['TBY_ONLY'].isin([1,2]), 1, np.nan)
 
         # IVT TBY groin puncture time
         # IVT_TBY_ADMISSION_TIME - HH:MM format
         # IVT_TBY_GROIN_PUNCTURE_TIME - HH:MM format
         # IVT_TBY_GROIN_TIME_MIN - calculated by script (minutes)
-        df['TBY'] = df.apply(lambda x: x['IVT_TBY_GROIN_TIME'] if x['IVT_TBY'] == 1 else x['TBY'], axis=1)
-        df['IVT_TBY_GROIN_TIME'] = df.apply(lambda x: 0 if x['IVT_TBY'] == 2 else x['IVT_TBY_GROIN_TIME'], axis=1)
+        self._replace(df, 'TBY', df['IVT_TBY'] == 1, df['IVT_TBY_GROIN_TIME'])
+        self._replace(df, 'IVT_TBY_GROIN_TIME', df['IVT_TBY'] == 2, 0)
 
         if ('IVT_TBY_ADMISSION_TIME' in df.columns and 'IVT_TBY_GROIN_PUNCTURE_TIME' in df.columns):
 
-            df['IVT_TBY_GROIN_TIME_MIN'], df['IVT_TBY_GROIN_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['IVT_TBY_ADMISSION_TIME']), bolus_time=str(x['IVT_TBY_GROIN_PUNCTURE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['IVT_TBY'] == 2) else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['IVT_TBY_GROIN_TIME_MIN'] if x['IVT_TBY'] == 2 else x['TBY'], axis=1)
+            self._set_times_in_minutes(df, 'IVT_TBY_ADMISSION_TIME', 'IVT_TBY_GROIN_PUNCTURE_TIME', 'IVT_TBY_GROIN_TIME_MIN', 'IVT_TBY_GROIN_TIME_MIN_CHANGED', df['IVT_TBY'] == 2, max_time=700)
+            self._replace(df, 'TBY', df['IVT_TBY'] == 2, df['IVT_TBY_GROIN_TIME_MIN'])
 
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['IVT_TBY'] in [1,2] else x['TBY_DONE'], axis=1)
+        self._replace(df, 'TBY_DONE', df['IVT_TBY'].isin([1,2]), 1)
 
         # Implement changes from F_RESQ_IVT_TBY_CZ_4
-        df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_TIME'] if x['TBY_REFER_ALL'] == 1 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY'], axis=1)
+        cz_forms = df['crf_parent_name'].isin(['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'])
+        self._replace(df, 'TBY', (df['TBY_REFER_ALL'] == 1) & cz_forms, df['TBY_REFER_ALL_GROIN_TIME'])
 
         if ('TBY_REFER_ALL_GROIN_PUNCTURE_TIME' in df.columns and 'TBY_REFER_ALL_ADMISSION_TIME' in df.columns):
             
-            df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'], df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_ALL_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4']) else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY'], axis=1)
+            self._set_times_in_minutes(df, 'TBY_REFER_ALL_ADMISSION_TIME', 'TBY_REFER_ALL_GROIN_PUNCTURE_TIME', 'TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN', 'TBY_REFER_ALL_GROIN_PUNCTURE_TIME_CHANGED', (df['TBY_REFER_ALL'] == 2) & cz_forms, max_time=700)
+            self._replace(df, 'TBY', (df['TBY_REFER_ALL'] == 2) & cz_forms, df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'])
 
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_ALL'] in [1,2] and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY_DONE'], axis=1)
+        self._replace(df, 'TBY_DONE', df['TBY_REFER_ALL'].isin([1,2]) & cz_forms, 1)
         
         # F_RESQ_IVT_TBY_CZ_2
         # TO DO: August 2019
         # Implement changes made to IVT/TBY form. In the TBY_REFER_ALL and TBY_REFER_LIM were replace values for discharge by groin time. But in the name of column is mistake and column is names as TBY_REFER_ALL_BOLUS_TIME/TBY_REFER_LIM_BOLUS_TIME if the time is entered in HH:MM format. In the future will be these column names as TBY_REFER_ALL_PUNCTURE_TIME/TBY_REFER__LIM_PUNCTURE_TIME
 
-        # Set nan to TBY_REFER_ALL_GROIN_PUNCTURE_TIME if times in HH:MM were filled in (delete values calculated by Mirek)
-        # df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME'] if x['TBY_REFER_ALL'] == 1 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY'], axis=1)
-
-        #df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME'] if x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else 0, axis=1)
-        # To calculate groin puncture from DIDO time (needed due to missing field in the prev version of form), take only times in minutes
-        #df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: x['TBY_REFER_ALL_DIDO_TIME'] if 'IVT_TBY' in x['crf_parent_name'] and x['TBY_REFER_ALL'] == 1 else x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME'], axis=1)
-
-        """
-        # Calculate TBY refer all bolus time
-        if ('TBY_REFER_ALL_BOLUS_TIME' in df.columns and 'TBY_REFER_ALL_ADMISSION_TIME' in df.columns):
-
-            df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'], df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_ALL_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_ALL_BOLUS_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2') else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY'], axis=1)
-        
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_ALL'] in [1,2] and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY_DONE'], axis=1)
-        """
-
         # Implement changes from F_RESQ_IVT_TBY_CZ_4
         # We can comment the previous code for version CZ_2 because when the times are mapped, the cz_2 is mappd to cz_4
         # TBY_REFER_ALL_GROIN_PUNCTURE_TIME_CZ -> TBY_REFER_ALL_GROIN_TIME_CZ
         # TBY_REFER_ALL_BOLUS_TIME_CZ -> TBY_REFER_ALL_GROIN_PUNCTURE_TIME_CZ_2
         # TBY_REFER_LIM_GROIN_PUNCTURE_TIME_CZ -> TBY_REFER_LIM_GROIN_TIME_CZ
         # TBY_REFER_LIM_BOLUS_TIME_CZ -> TBY_REFER_LIM_GROIN_PUNCTURE_TIME_CZ_2
-        df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_TIME'] if x['TBY_REFER_LIM'] == 1 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY'], axis=1)
+        self._replace(df, 'TBY', (df['TBY_REFER_LIM'] == 1) & cz_forms, df['TBY_REFER_LIM_GROIN_TIME'])
 
         if ('TBY_REFER_LIM_GROIN_PUNCTURE_TIME' in df.columns and 'TBY_REFER_LIM_ADMISSION_TIME' in df.columns):
-            df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'], df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_LIM_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4']) else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY'], axis=1)
-
-
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_LIM'] in [1,2] and x['crf_parent_name'] in ['F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_4'] else x['TBY_DONE'], axis=1)
-
-        # Set nan to TBY_REFER_LIM_GROIN_PUNCTURE_TIME if times in HH:MM were filled in (delete values calculated by Mirek)
-
-        # df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME'] if x['TBY_REFER_LIM'] == 1 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY'], axis=1)
-        # df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME'] if x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else 0, axis=1)
-        # To calculate groin puncture from DIDO time (needed due to missing field in the prev version of form), take only times in minutes
-        # df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: x['TBY_REFER_LIM_DIDO_TIME'] if 'IVT_TBY' in x['crf_parent_name'] and x['TBY_REFER_LIM'] == 1 else x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME'], axis=1)
-
-        """
-        # TBY refer lim groin puncture time
-        if ('TBY_REFER_LIM_BOLUS_TIME' in df.columns and 'TBY_REFER_LIM_ADMISSION_TIME' in df.columns):
-            df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'], df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_LIM_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_LIM_BOLUS_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2') else (0, False), axis=1))
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY'], axis=1)
+            self._set_times_in_minutes(df, 'TBY_REFER_LIM_ADMISSION_TIME', 'TBY_REFER_LIM_GROIN_PUNCTURE_TIME', 'TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN', 'TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN_CHANGED', (df['TBY_REFER_LIM'] == 2) & cz_forms, max_time=700)
+            self._replace(df, 'TBY', (df['TBY_REFER_LIM'] == 2) & cz_forms, df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'])
 
 
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_LIM'] in [1,2] and x['crf_parent_name'] == 'F_RESQ_IVT_TBY_CZ_2' else x['TBY_DONE'], axis=1)
-        """
+        self._replace(df, 'TBY_DONE', df['TBY_REFER_LIM'].isin([1,2]) & cz_forms, 1)
 
         # IVT TBY refer dido time
         # IVT_TBY_GROIN_TIME_MIN - HH:MM format
         # IVT_TBY_REFER_DIDO_TIME_MIN - calculated by script (minutes)
-        df['IVT_TBY_REFER_DIDO_TIME'] = df.apply(lambda x: np.nan if x['IVT_TBY_REFER'] == 2 else x['IVT_TBY_REFER_DIDO_TIME'], axis=1)
+        self._replace(df, 'IVT_TBY_REFER_DIDO_TIME', df['IVT_TBY_REFER'] == 2, np.nan)
 
         # tag::ivt_tby_refer_mins[]
-        df['DIDO'] = df.apply(lambda x: x['IVT_TBY_REFER_DIDO_TIME'] if (x['IVT_TBY_REFER'] == 1) else x['DIDO'], axis=1)
+        self._replace(df, 'DIDO', df['IVT_TBY_REFER'] == 1, df['IVT_TBY_REFER_DIDO_TIME'])
         # end::ivt_tby_refer_mins[]
 
         if ('IVT_TBY_REFER_ADMISSION_TIME' in df.columns and 'IVT_TBY_REFER_DISCHARGE_TIME' in df.columns):
 
-            df['IVT_TBY_REFER_DIDO_TIME_MIN'], df['IVT_TBY_REFER_DIDO_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['IVT_TBY_REFER_ADMISSION_TIME']), bolus_time=str(x['IVT_TBY_REFER_DISCHARGE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['IVT_TBY_REFER'] == 2) else (0, False), axis=1))
+            self._set_times_in_minutes(df, 'IVT_TBY_REFER_ADMISSION_TIME', 'IVT_TBY_REFER_DISCHARGE_TIME', 'IVT_TBY_REFER_DIDO_TIME_MIN', 'IVT_TBY_REFER_DIDO_TIME_MIN_CHANGED', df['IVT_TBY_REFER'] == 2, max_time=700)
 
             # tag::ivt_tby_refer_timestamp[]
-            df['DIDO'] = df.apply(lambda x: x['IVT_TBY_REFER_DIDO_TIME_MIN'] if x['IVT_TBY_REFER'] == 2 else x['DIDO'], axis=1)
+            self._replace(df, 'DIDO', df['IVT_TBY_REFER'] == 2, df['IVT_TBY_REFER_DIDO_TIME_MIN'])
             # end::ivt_tby_refer_timestamp[]
 
         # tag::ivt_tby_refer_done[]
-        df['REFERRED_DONE'] = df.apply(lambda x: 1 if x['IVT_TBY_REFER'] in [1,2] else np.nan, axis=1)
+        df['REFERRED_DONE'] = np.where(df['IVT_TBY_REFER'].isin([1,2]), 1, np.nan)
         # end::ivt_tby_refer_done[]
 
         # Create TBY_REFER column
@@ -572,66 +636,68 @@ class CheckData:
         # TBY_REFER_DISCHARGE_TIME - HH:MM format
         # TBY_REFER_DIDO_TIME - minutes
         # TBY_REFER_DIDO_TIME_MIN - calculated by script (minutes)
-        df['TBY_REFER_DIDO_TIME'] = df.apply(lambda x: np.nan if x['TBY_REFER'] == 2 else x['TBY_REFER_DIDO_TIME'], axis=1)        
+        self._replace(df, 'TBY_REFER_DIDO_TIME', df['TBY_REFER'] == 2, np.nan)
 
         # tag::tby_refer_mins[]
-        df['DIDO'] = df.apply(lambda x: x['TBY_REFER_DIDO_TIME'] if (x['TBY_REFER'] == 1) else x['DIDO'], axis=1)
+        self._replace(df, 'DIDO', df['TBY_REFER'] == 1, df['TBY_REFER_DIDO_TIME'])
         # end::tby_refer_mins[]
 
         # TBY refer dido time
         if ('TBY_REFER_DISCHARGE_TIME' in df.columns and 'TBY_REFER_ADMISSION_TIME' in df.columns):
 
-            df['TBY_REFER_DIDO_TIME_MIN'], df['TBY_REFER_DIDO_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_DISCHARGE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER'] == 2) else (0, False), axis=1))
+            self._set_times_in_minutes(df, 'TBY_REFER_ADMISSION_TIME', 'TBY_REFER_DISCHARGE_TIME', 'TBY_REFER_DIDO_TIME_MIN', 'TBY_REFER_DIDO_TIME_MIN_CHANGED', df['TBY_REFER'] == 2, max_time=700)
 
             # tag::tby_refer_timestamp[]
-            df['DIDO'] = df.apply(lambda x: x['TBY_REFER_DIDO_TIME_MIN'] if x['TBY_REFER'] == 2 else x['DIDO'], axis=1)
+            self._replace(df, 'DIDO', df['TBY_REFER'] == 2, df['TBY_REFER_DIDO_TIME_MIN'])
             # end::tby_refer_timestamp[]
 
         # tag::tby_refer_done[]
-        df['REFERRED_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER'] in [1,2] else x['REFERRED_DONE'], axis=1)
+        self._replace(df, 'REFERRED_DONE', df['TBY_REFER'].isin([1,2]), 1)
         # end::tby_refer_done[]
 
+        # Forms where the TBY_REFER_ALL and TBY_REFER_LIM times are entered as DIDO times
+        pl_forms = df['crf_parent_name'].isin(['F_RESQV20DEV_PL'])
+        dido_forms = ~df['crf_parent_name'].isin(['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2'])
+
         # Create TBY_REFER_ALL column
         # TBY_REFER_ALL_ADMISSION_TIME - HH:MM format
         # TBY_REFER_ALL_DISCHARGE_TIME - HH:MM format
         # TBY_REFER_ALL_DIDO_TIME - minutes
         # TBY_REFER_ALL_DIDO_TIME_MIN - calculated by script (minutes)
         # Set nan to TBY_REFER_ALL_DIDO_TIME if times in HH:MM were filled in (delete values calculated by Mirek)
-        df['TBY_REFER_ALL_DIDO_TIME'] = df.apply(lambda x: np.nan if x['TBY_REFER_ALL'] == 2 else x['TBY_REFER_ALL_DIDO_TIME'], axis=1)
+        self._replace(df, 'TBY_REFER_ALL_DIDO_TIME', df['TBY_REFER_ALL'] == 2, np.nan)
 
         # tag::tby_refer_all_mins[]
-        df['DIDO'] = df.apply(lambda x: x['TBY_REFER_ALL_DIDO_TIME'] if (x['TBY_REFER_ALL'] == 1 and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) else x['DIDO'], axis=1)
+        self._replace(df, 'DIDO', (df['TBY_REFER_ALL'] == 1) & dido_forms, df['TBY_REFER_ALL_DIDO_TIME'])
         # end::tby_refer_all_mins[]
 
         # tag::pl_tby_refer_all_time_mins[]
         # If crf parent name is F_RESQV20DEV_PL and time was entered in minutes fill TBY column by DIDO time
-        df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_DIDO_TIME'] if (x['TBY_REFER_ALL'] == 1 and x['crf_parent_name'] in ['F_RESQV20DEV_PL']) else x['TBY'], axis=1)
+        self._replace(df, 'TBY', (df['TBY_REFER_ALL'] == 1) & pl_forms, df['TBY_REFER_ALL_DIDO_TIME'])
         # end::pl_tby_refer_all_time_mins[]
 
         # TBY refer all dido time
         if ('TBY_REFER_ALL_DISCHARGE_TIME' in df.columns and 'TBY_REFER_ALL_ADMISSION_TIME' in df.columns):
 
             # tag::tby_refer_all_timestamp[]
-            df['TBY_REFER_ALL_DIDO_TIME_MIN'], df['TBY_REFER_ALL_DIDO_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(
-                x['TBY_REFER_ALL_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_ALL_DISCHARGE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if (x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) else (0, False), axis=1))
+            self._set_times_in_minutes(df, 'TBY_REFER_ALL_ADMISSION_TIME', 'TBY_REFER_ALL_DISCHARGE_TIME', 'TBY_REFER_ALL_DIDO_TIME_MIN', 'TBY_REFER_ALL_DIDO_TIME_MIN_CHANGED', (df['TBY_REFER_ALL'] == 2) & dido_forms, max_time=700)
 
-            df['DIDO'] = df.apply(lambda x: x['TBY_REFER_ALL_DIDO_TIME_MIN'] if (x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) else x['DIDO'], axis=1)
+            self._replace(df, 'DIDO', (df['TBY_REFER_ALL'] == 2) & dido_forms, df['TBY_REFER_ALL_DIDO_TIME_MIN'])
             # end::tby_refer_all_timestamp[]
 
             # tag::pl_tby_refer_all_timestamp[]
             # If crf_parent_name is F_RESQV20DEV_PL calculate groin time from admission and discharge time if time entered in HH:MM
-            df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'], df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN_CHANGED'] = zip(*df.apply(lambda x: self._get_times_in_minutes(admission_time=str(x['TBY_REFER_ALL_ADMISSION_TIME']), bolus_time=str(x['TBY_REFER_ALL_DISCHARGE_TIME']), hosp_time=str(x['HOSPITAL_TIME']), max_time=700) if(x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] in ['F_RESQV20DEV_PL']) else (0, False), axis=1))
+            self._set_times_in_minutes(df, 'TBY_REFER_ALL_ADMISSION_TIME', 'TBY_REFER_ALL_DISCHARGE_TIME', 'TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN', 'TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN_CHANGED', (df['TBY_REFER_ALL'] == 2) & pl_forms, max_time=700)
 
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_ALL'] == 2 and x['crf_parent_name'] in ['F_RESQV20DEV_PL'] else x['TBY'], axis=1)
+            self._replace(df, 'TBY', (df['TBY_REFER_ALL'] == 2) & pl_forms, df['TBY_REFER_ALL_GROIN_PUNCTURE_TIME_MIN'])
             # end::pl_tby_refer_all_timestamp[]
 
         # tag::pl_tby_refer_all[]
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_ALL'] in [1,2] and x['crf_parent_name'] in ['F_RESQV20DEV_PL'] else x['TBY_DONE'], axis=1)
+        self._replace(df, 'TBY_DONE', df['TBY_REFER_ALL'].isin([1,2]) & pl_forms, 1)
         # end::pl_tby_refer_all[]
 
         # tag::tby_refer_all_done[]
-        df['REFERRED_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_ALL'] in [1,2] and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2'] else x['REFERRED_DONE'], axis=1)
+        self._replace(df, 'REFERRED_DONE', df['TBY_REFER_ALL'].isin([1,2]) & dido_forms, 1)
         # end::tby_refer_all_done[]
         
         # Create TBY_REFER_LIM column
@@ -640,59 +706,39 @@ class CheckData:
         # TBY_REFER_LIM_DIDO_TIME - minutes
         # TBY_REFER_LIM_DIDO_TIME_MIN - calculated by script (minutes)
         # Set nan to TBY_REFER_LIM_DIDO_TIME if times in HH:MM were filled in (delete values calculated by Mirek)
-        df['TBY_REFER_LIM_DIDO_TIME'] = df.apply(lambda x: np.nan if x['TBY_REFER_LIM'] == 2 else x['TBY_REFER_LIM_DIDO_TIME'], axis=1)
+        self._replace(df, 'TBY_REFER_LIM_DIDO_TIME', df['TBY_REFER_LIM'] == 2, np.nan)
 
         # tag::tby_refer_lim_mins[]
-        df['DIDO'] = df.apply(lambda x: x['TBY_REFER_LIM_DIDO_TIME'] if (x['TBY_REFER_LIM'] == 1 and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) else x['DIDO'], axis=1)
+        self._replace(df, 'DIDO', (df['TBY_REFER_LIM'] == 1) & dido_forms, df['TBY_REFER_LIM_DIDO_TIME'])
         # end::tby_refer_lim_mins[]
 
         # tag::pl_tby_refer_lim_time_mins[]
         # If crf parent name is F_RESQV20DEV_PL and time was entered in minutes fill TBY column by DIDO time
-        df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_DIDO_TIME'] if (x['TBY_REFER_LIM'] == 1 and x['crf_parent_name'] in ['F_RESQV20DEV_PL']) else x['TBY'], axis=1)
+        self._replace(df, 'TBY', (df['TBY_REFER_LIM'] == 1) & pl_forms, df['TBY_REFER_LIM_DIDO_TIME'])
         # end::pl_tby_refer_lim_time_mins[]
 
         # TBY refer lim dido time
         if ('TBY_REFER_LIM_DISCHARGE_TIME' in df.columns and 'TBY_REFER_LIM_ADMISSION_TIME' in df.columns):
 
             # tag::tby_refer_lim_timestamp[]
-            df['TBY_REFER_LIM_DIDO_TIME_MIN'], \
-                df['TBY_REFER_LIM_DIDO_TIME_MIN_CHANGED'] = \
-                    zip(*df.apply(lambda x: self._get_times_in_minutes(
-                        admission_time=str(x['TBY_REFER_LIM_ADMISSION_TIME']), 
-                        bolus_time=str(x['TBY_REFER_LIM_DISCHARGE_TIME']), 
-                        hosp_time=str(x['HOSPITAL_TIME']), 
-                        max_time=700) \
-                            if (x['TBY_REFER_LIM'] == 2 \
-                                and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) 
-                            else (0, False), \
-                                axis=1))
-
-            df['DIDO'] = df.apply(lambda x: x['TBY_REFER_LIM_DIDO_TIME_MIN'] if (x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2']) else x['DIDO'], axis=1)
+            self._set_times_in_minutes(df, 'TBY_REFER_LIM_ADMISSION_TIME', 'TBY_REFER_LIM_DISCHARGE_TIME', 'TBY_REFER_LIM_DIDO_TIME_MIN', 'TBY_REFER_LIM_DIDO_TIME_MIN_CHANGED', (df['TBY_REFER_LIM'] == 2) & dido_forms, max_time=700)
+
+            self._replace(df, 'DIDO', (df['TBY_REFER_LIM'] == 2) & dido_forms, df['TBY_REFER_LIM_DIDO_TIME_MIN'])
             # end::tby_refer_lim_timestamp[]
 
             # tag::pl_tby_refer_lim_timestamp[]
             # If crf_parent_name is F_RESQV20DEV_PL calculate groin time from admission and discharge time if time entered in HH:MM
-            df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'], \
-                df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN_CHANGED'] = \
-                    zip(*df.apply(lambda x: self._get_times_in_minutes(
-                        admission_time=str(x['TBY_REFER_LIM_ADMISSION_TIME']), 
-                        bolus_time=str(x['TBY_REFER_LIM_DISCHARGE_TIME']), 
-                        hosp_time=str(x['HOSPITAL_TIME']), 
-                        max_time=700) \
-                            if(x['TBY_REFER_LIM'] == 2 \
-                                and x['crf_parent_name'] in ['F_RESQV20DEV_PL']) 
-                            else (0, False), \
-                                axis=1))
-
-            df['TBY'] = df.apply(lambda x: x['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'] if x['TBY_REFER_LIM'] == 2 and x['crf_parent_name'] in ['F_RESQV20DEV_PL'] else x['TBY'], axis=1)
+            self._set_times_in_minutes(df, 'TBY_REFER_LIM_ADMISSION_TIME', 'TBY_REFER_LIM_DISCHARGE_TIME', 'TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN', 'TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN_CHANGED', (df['TBY_REFER_LIM'] == 2) & pl_forms, max_time=700)
+
+            self._replace(df, 'TBY', (df['TBY_REFER_LIM'] == 2) & pl_forms, df['TBY_REFER_LIM_GROIN_PUNCTURE_TIME_MIN'])
             # end::pl_tby_refer_lim_timestamp[]
 
         # tag::pl_tby_refer_lim[]
-        df['TBY_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_LIM'] in [1,2] and x['crf_parent_name'] in ['F_RESQV20DEV_PL'] else x['TBY_DONE'], axis=1)
+        self._replace(df, 'TBY_DONE', df['TBY_REFER_LIM'].isin([1,2]) & pl_forms, 1)
         # end::pl_tby_refer_lim[]
         
         # tag::tby_refer_lim_done[]
-        df['REFERRED_DONE'] = df.apply(lambda x: 1 if x['TBY_REFER_LIM'] in [1,2] and x['crf_parent_name'] not in ['F_RESQV20DEV_PL', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQ_IVT_TBY_CZ_2'] else x['REFERRED_DONE'], axis=1)
+        self._replace(df, 'REFERRED_DONE', df['TBY_REFER_LIM'].isin([1,2]) & dido_forms, 1)
         # end::tby_refer_lim_done[]
 
   
@@ -748,84 +794,75 @@ class CheckData:
         return df
 
 
+    def _get_minutes(self, times):
+        """ The function converting the times into the minutes from midnight. 
+
+        :param times: the column with times (time objects or strings in HH:MM:SS format)
+        :type times: Series
+        :returns: the minutes, NaN if time is missing
+        :rtype: numpy array
+        """
+        # Parse only the unique times, the missing times get the code -1
+        codes, uniques = pd.factorize(times)
+        timedeltas = pd.to_timedelta(pd.Series(uniques, dtype=object).astype(str), errors='coerce')
+        minutes = np.append((timedeltas.dt.total_seconds() / 60.0).to_numpy(), np.nan)
+        return minutes[codes]
+
+
     def _get_times_in_minutes(self, admission_time, bolus_time, hosp_time, max_time):
-        """ The function calculating difference between times in minutes. 
+        """ The function calculating difference between times in minutes for the whole columns. If admission time and bolus time are missing, the difference is 0. If only admission time is missing, hospital time is used as admission time. If bolus time is missing, the difference is 0. If the difference is negative, 1 day is added (the treatment was after midnight). 
+
+        The times greater than `max_time` are not corrected by hospital time. The previous row-wise implementation had this correction, but its condition compared the time string with `True` and so it was never applied.
 
         :param admission_time: the time of admission
-        :type admission_time: time
+        :type admission_time: Series
         :param bolus_time: the time of needle time
-        :type bolus_time: time
+        :type bolus_time: Series
         :param hosp_time: the time of hospitalization
-        :type hosp_time: time
+        :type hosp_time: Series
         :param max_time: the maximum time which is realistic for the type of the recanalization treatment
         :type max_time: int
         :returns: the calculated difference in minutes, `True` if time has been fixed else `False`
-        :rtype: int, boolean
+        :rtype: numpy array, numpy array
         """
-        
-        fixed = False
-        timeformat = '%H:%M:%S'
-        
-        if admission_time == 'None' or admission_time == None or admission_time == 'nan' or pd.isnull(admission_time):
-            admission_bool = False
-        else:
-            admission_bool = True
-        
-        if bolus_time == 'None' or bolus_time == None or bolus_time == 'nan' or pd.isnull(bolus_time):
-            bolus_bool = False
-        else:
-            bolus_bool = True
-        
-        if hosp_time == 'None' or hosp_time == None or hosp_time == 'nan' or pd.isnull(hosp_time):
-            hosp_bool = False
-        else:
-            hosp_bool = True
+        admission = self._get_minutes(admission_time)
+        bolus = self._get_minutes(bolus_time)
+        hospital = self._get_minutes(hosp_time)
 
-        #print(admission_time, type(admission_time), admission_bool, bolus_time, type(bolus_time), bolus_bool, hosp_time, type(hosp_time),hosp_bool)
+        admission_bool = ~np.isnan(admission)
+        bolus_bool = ~np.isnan(bolus)
+        hosp_bool = ~np.isnan(hospital)
 
-        # If admission time and bolus time are Nan, difference is set to 0
-        if admission_bool == False and bolus_bool == False:
-            tdeltaMin = 0
-            fixed = True
-        # If only admission time is not filled, hospital time is used as admission time. If difference is < 0, then add 1 day.
-        elif admission_bool == False and hosp_bool:
-            tdelta = datetime.strptime(bolus_time, timeformat) - datetime.strptime(hosp_time, timeformat)
-            tdeltaMin = tdelta.total_seconds()/60.0
-            if (tdeltaMin < 0):
-                tdelta += timedelta(days=1)
-                tdeltaMin = tdelta.total_seconds()/60.0
-            fixed = True
+        tdeltaMin = np.zeros(len(admission))
+        fixed = np.ones(len(admission), dtype=bool)
 
-        elif admission_bool == False and hosp_bool == False and bolus_bool:
-            tdeltaMin = 0
-            fixed = True
-        # If bolus time is Nan, tdelta in min is set to 0
-        elif bolus_bool == False:
-            tdeltaMin = 0
-            fixed = True
-        # Else, delta is calculated bolus time - admission time. If delta is > max time (400 for needle time, 700 for groin time) then check if hospital time is not uknown and if difference between bolus time and hospital time is < max time, if yes the time is calculated as bolus time - hospital time. If bolus time - hospital time > max time or bolus time - admission time, keep bolus time - admission time.
-        else:
-            tdelta = datetime.strptime(bolus_time, timeformat) - datetime.strptime(admission_time, timeformat)
-            tdeltaMin = tdelta.total_seconds()/60.0
-            if tdeltaMin < 0:
-                tdelta += timedelta(days=1)
-                tdeltaMin = tdelta.total_seconds()/60.0
-
-            if tdeltaMin > max_time and hosp_time == True:
-                if (datetime.strptime(hosp_time, timeformat) != datetime.strptime(admission_time, timeformat) and datetime.strptime(hosp_time, timeformat) > datetime.strptime(admission_time, timeformat)):
-                    tdelta = datetime.strptime(bolus_time, timeformat) - datetime.strptime(hosp_time, timeformat)
-                    tdeltaMin = tdelta.total_seconds()/60.0
-                    if (tdeltaMin < 0):
-                        tdelta += timedelta(days=1)
-                        tdeltaMin = tdelta.total_seconds()/60.0
-                    fixed = True
+        # If only admission time is not filled, hospital time is used as admission time.
+        from_hospital = ~admission_bool & bolus_bool & hosp_bool
+        tdeltaMin[from_hospital] = (bolus - hospital)[from_hospital]
 
-        return tdeltaMin, fixed
+        # Else, delta is calculated bolus time - admission time.
+        from_admission = admission_bool & bolus_bool
+        tdeltaMin[from_admission] = (bolus - admission)[from_admission]
+        fixed[from_admission] = False
 
-    
+        # If difference is < 0, then add 1 day.
+        tdeltaMin[tdeltaMin < 0] += 24 * 60
 
+        return tdeltaMin, fixed
 
 
-        
+def _check_shard(df, positions, n):
+    """ The function checking one shard of the data in the separate process, see `CheckData.get_preprocessed_data_parallel`. 
 
-    
+    :param df: the shard of the dataframe with the raw data
+    :type df: pandas dataframe
+    :param positions: the positions of the rows in the original dataframe
+    :type positions: numpy array
+    :param n: the number of the shard
+    :type n: int
+    :returns: the number of the shard, the preprocessed data, the positions and the duration in seconds
+    :rtype: int, DataFrame, numpy array, float
+    """
+    start = time.time()
+    preprocessed_data = CheckData(df=df).preprocessed_data
+    return n, preprocessed_data, positions, time.time() - start
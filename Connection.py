@@ -11,10 +11,14 @@ import pandas as pd
 import logging
 from configparser import ConfigParser
 from resqdb.CheckData import CheckData
+from resqdb.Snapshot import Snapshot
+from resqdb.Schema import apply_schema
+from resqdb.Harmonization import harmonize, get_tmp_antithrombotics, RESQV12_RULES, IVTTBY_RAW_RULES, IVTTBY_RULES
 import numpy as np
 import time
 from multiprocessing import Process, Pool
-from threading import Thread
+from threading import Thread, BoundedSemaphore
+from psycopg2.pool import ThreadedConnectionPool
 import collections
 import datetime
 import csv
@@ -28,12 +32,49 @@ class Connection():
     :type nprocess: int
     :param data: the name of data (resq or atalaia)
     :type data: str
+    :param fetch_size: the number of rows fetched at once by the server-side cursor, if provided the tables are streamed in chunks instead of being read at once
+    :type fetch_size: int
+    :param snapshot: the path to the folder with the local snapshot, if provided only the rows changed since the last run are exported, prepared and checked
+    :type snapshot: str
     """
 
-    def __init__(self, nprocess=1, data='resq'):
+    # Columns kept for each source table when the data are streamed, (kept columns, kept suffixes)
+    stream_columns = {
+        'resq': (['site_id', 'facility_name', 'oc_oid', 'label', 'facility_country', 'fabry_cs', 'prenotification_pt_2', 'mrs_prior_stroke_pt_2'], ('_en',)),
+        'ivttby': (['site_id', 'facility_name', 'label', 'oc_oid', 'tby_refer_all_groin_puncture_time_cz_2', 'tby_refer_lim_groin_puncture_time_cz_2'], ('_cz',)),
+        'thailand': (['site_id', 'facility_name', 'label', 'door_to_groin', 'door_to_needle'], ('_cz',)),
+    }
+
+    # Columns used as the watermark of the incremental export (the latest modification timestamp)
+    watermark_columns = {
+        'resq': 'date_updated',
+        'ivttby': 'date_updated',
+        'thailand': 'date_updated',
+    }
+    # Columns identifying the row in the raw and in the prepared data of each table, the thailand table has only one form so the label is unique
+    raw_keys = {
+        'resq': ['label', 'oc_oid'],
+        'ivttby': ['label', 'oc_oid'],
+        'thailand': ['label'],
+    }
+    prepared_keys = {
+        'resq': ['Subject ID', 'crf_parent_name'],
+        'ivttby': ['Subject ID', 'crf_parent_name'],
+        'thailand': ['Subject ID'],
+    }
+    # Columns identifying the row in the merged preprocessed data
+    checked_keys = ['Subject ID', 'crf_parent_name']
+
+    def __init__(self, nprocess=1, data='resq', fetch_size=None, snapshot=None):
 
         start = time.time()
 
+        self.fetch_size = fetch_size
+        self.snapshot = Snapshot(snapshot) if snapshot is not None else None
+        # The new or updated rows exported in this run and the keys of the changed prepared rows
+        self.deltas = {}
+        self.changed_keys = set()
+
         # Create log file in the working folder
         debug = 'debug_' + datetime.datetime.now().strftime('%d-%m-%Y') + '.log' 
         log_file = os.path.join(os.getcwd(), debug)
@@ -100,7 +141,7 @@ class Connection():
                 # Get all country code in dataframe
                 self.countries = self._get_countries(df=self.df)
                 # Get preprocessed data
-                self.preprocessed_data = self.check_data(df=self.df, nprocess=1)
+                self.preprocessed_data = apply_schema(self.check_data(df=self.df, nprocess=1))
 
                 self.preprocessed_data['RES-Q reports name'] = self.preprocessed_data.apply(lambda x: cz_names_dict[x['Protocol ID']]['report_name'] if 'Czech Republic' in x['Country'] and x['Protocol ID'] in cz_names_dict.keys() else x['Site Name'], axis=1)
                 self.preprocessed_data['ESO Angels name'] = self.preprocessed_data.apply(lambda x: cz_names_dict[x['Protocol ID']]['angels_name'] if 'Czech Republic' in x['Country'] and x['Protocol ID'] in cz_names_dict.keys() else x['Site Name'], axis=1)
@@ -159,41 +200,12 @@ class Connection():
 
         else:
             if data == 'resq':
-                threads = []
-                for i in range(0, len(self.names)):
-                    df_name = self.names[i]
-                    process = Thread(target=self.connect(self.sqls[i], datamix, i, df_name=df_name))
-                    process.start()
-                    threads.append(process)
-                # logging.info('The process with id {0} is running.'.format(process))
+                # Export the tables concurrently and prepare each table as soon as it arrives
+                self.export_tables(datamix, nprocess)
 
-                process = Thread(target=self.connect(self.sqls[2], datamix, 1, df_name='resq_ivttby_mix'))
-                process.start()
-                threads.append(process)
-
-                for process in threads:
-                    process.join()
-            
                 end = time.time()
                 tdelta = (end-start)/60
-                logging.info('The database data were exported in {0} minutes.'.format(tdelta))
-
-                # self.dictdb_df['resq_ivttby_mix'].to_csv('resq_ivttby_mix.csv', sep=',', index=False)
-                if 'resq_ivttby_mix' in self.dictdb_df.keys():
-                    del self.dictdb_df['resq_ivttby_mix']
-                treads = []
-                for i in range(0, len(self.names)):
-                    df_name = self.names[i]
-                    process = Thread(target=self.prepare_df(df=self.dictdb_df[df_name], name=df_name))
-                    process.start()
-                    threads.append(process)
-
-                for process in threads:
-                    process.join()
-
-                end = time.time()
-                tdelta = (end-start)/60
-                logging.info('The database data were prepared in {0} minutes.'.format(tdelta))
+                logging.info('The database data were exported and prepared in {0} minutes.'.format(tdelta))
 
                 self.df = pd.DataFrame()
                 for i in range(0, len(self.names)):
@@ -229,7 +241,10 @@ class Connection():
                 # Get all country code in dataframe
                 self.countries = self._get_countries(df=self.df)
                 # Cal check data function
-                self.preprocessed_data = self.check_data(self.df, nprocess=nprocess)
+                check_start = time.time()
+                self.preprocessed_data = apply_schema(self.check_data(self.df, nprocess=nprocess))
+                self.timings['check_data'] = time.time() - check_start
+                logging.info('The database data were checked in {0} minutes.'.format(self.timings['check_data']/60))
                 #self.preprocessed_data = self.check_data(self.df, nprocess=None)   
 
                 self.preprocessed_data['RES-Q reports name'] = self.preprocessed_data.apply(lambda x: cz_names_dict[x['Protocol ID']]['report_name'] if 'Czech Republic' in x['Country'] and x['Protocol ID'] in cz_names_dict.keys() else x['Site Name'], axis=1)
@@ -380,7 +395,7 @@ class Connection():
         return db
 
     
-    def connect(self, sql, section, nprocess, df_name=None):
+    def connect(self, sql, section, nprocess, df_name=None, pool=None):
         """ The function connecting to te database. 
 
         :param sql: the sql query 
@@ -391,20 +406,29 @@ class Connection():
         :type nprocess: int
         :param df_name: the name of the dataframe used as key in the dictionary
         :type df_name: str
+        :param pool: the connection pool, if provided the connection is taken from the pool instead of opening the new one
+        :type pool: ThreadedConnectionPool
         :raises: Exception
         """
 
         conn = None    
         try: 
-            # Read connection parameters
-            params = self.config(section)
+            if pool is None:
+                # Read connection parameters
+                params = self.config(section)
 
-            # Connect to the PostgreSQL server
-            logging.info('Process{0}: Connecting to the PostgreSQL database... '.format(nprocess))
-            conn = psycopg2.connect(**params)
+                # Connect to the PostgreSQL server
+                logging.info('Process{0}: Connecting to the PostgreSQL database... '.format(nprocess))
+                conn = psycopg2.connect(**params)
+            else:
+                conn = pool.getconn()
+                logging.info('Process{0}: Connection has been taken from the pool.'.format(nprocess))
             # Create dataframe for given sql query
             if df_name is not None:
-                self.dictdb_df[df_name] = pd.read_sql_query(sql, conn)
+                if self.snapshot is not None and df_name in self.watermark_columns:
+                    self.dictdb_df[df_name] = self.read_sql_incremental(sql, conn, df_name)
+                else:
+                    self.dictdb_df[df_name] = self.read_sql(sql, conn, df_name)
                 logging.info('Process{0}: Dataframe {1} has been created created.'.format(nprocess, df_name))
             else:
                 logging.info('Process{0}: Name of dataframe is missing.'.format(nprocess))
@@ -414,12 +438,241 @@ class Connection():
 
         finally:
             if conn is not None:
-                conn.close()
-                logging.info('Process{0}: Database connection has been closed.'.format(nprocess))
+                if pool is None:
+                    conn.close()
+                    logging.info('Process{0}: Database connection has been closed.'.format(nprocess))
+                else:
+                    pool.putconn(conn)
+                    logging.info('Process{0}: Database connection has been returned to the pool.'.format(nprocess))
+
+    def read_sql(self, sql, conn, name, params=None):
+        """ The function reading the sql query at once or in chunks if `fetch_size` is set. 
+
+        :param sql: the sql query
+        :type sql: str
+        :param conn: the database connection
+        :type conn: connection
+        :param name: the name of the dataframe
+        :type name: str
+        :param params: the parameters of the sql query
+        :type params: tuple
+        :returns: the dataframe
+        :rtype: DataFrame
+        """
+        if self.fetch_size:
+            return self.read_sql_chunks(sql, conn, name, params=params)
+        else:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def read_sql_incremental(self, sql, conn, name):
+        """ The function exporting only the rows inserted or updated since the last run (with the timestamp not older than the watermark). The rows are merged into the local snapshot by the keys in `raw_keys`, the new watermark is saved and the new or updated rows are stored in `self.deltas`. The keys of all rows are exported as well, if some row has been deleted in the database, or if the table is not in the snapshot yet, the whole table is exported and the prepared snapshot of the table is removed. 
+
+        :param sql: the sql query
+        :type sql: str
+        :param conn: the database connection
+        :type conn: connection
+        :param name: the name of the dataframe
+        :type name: str
+        :returns: the merged dataframe
+        :rtype: DataFrame
+        :raises: ValueError
+        """
+        if name not in self.raw_keys:
+            raise ValueError('Connection: The key columns of {0} are not set, the table cannot be exported incrementally.'.format(name))
+
+        column = self.watermark_columns[name]
+        keys = self.raw_keys[name]
+        watermark = self.snapshot.get_watermark(name)
+        snapshot = self.snapshot.load(name, 'raw')
+
+        if watermark is not None and snapshot is not None:
+            # The deleted rows are not returned by the watermark query, compare the keys in the database with the keys in the snapshot
+            db_keys = pd.read_sql_query('SELECT {0} FROM ({1}) AS snapshot_keys'.format(', '.join(keys), sql), conn)
+            deleted = ~Snapshot.get_keys(snapshot, keys).isin(Snapshot.get_keys(db_keys, keys))
+            if deleted.any():
+                snapshot = None
+                logging.info('Connection: {0} rows of {1} have been deleted in the database.'.format(deleted.sum(), name))
+
+        if watermark is not None and snapshot is not None:
+            # The rows with the same timestamp as the watermark can be committed after the last run, they are exported again and the rows already in the snapshot are dropped
+            delta = self.read_sql('{0} WHERE {1} >= %s'.format(sql, column), conn, name, params=(watermark,))
+            exported = Snapshot.get_keys(delta, keys + [column]).isin(Snapshot.get_keys(snapshot, keys + [column]))
+            delta = delta[~exported].drop_duplicates(subset=keys, keep='last')
+            logging.info('Connection: {0} new or updated rows of {1} since {2}.'.format(len(delta), name, watermark))
+        else:
+            delta = self.read_sql(sql, conn, name)
+            snapshot = None
+            # The prepared rows of the table can be outdated, the whole table is prepared again
+            self.snapshot.remove(name, 'prepared')
+            logging.info('Connection: The whole table {0} has been exported.'.format(name))
+
+        df = Snapshot.merge(snapshot, delta, keys)
+        self.deltas[name] = delta
+        self.snapshot.save(name, 'raw', df)
+
+        if column in df.columns:
+            self.snapshot.set_watermark(name, df[column].max())
+        else:
+            logging.warning('Connection: Column {0} is missing in {1}, the whole table will be exported next time.'.format(column, name))
+
+        return df
+
+    def read_sql_chunks(self, sql, conn, name, params=None):
+        """ The function reading the sql query through the named (server-side) cursor. The rows are fetched in chunks of `self.fetch_size` rows, the unused columns are dropped and the numeric columns are downcasted in each chunk before the chunks are concatenated. 
+
+        :param sql: the sql query
+        :type sql: str
+        :param conn: the database connection
+        :type conn: connection
+        :param name: the name of the dataframe, used to select the kept columns
+        :type name: str
+        :param params: the parameters of the sql query
+        :type params: tuple
+        :returns: the dataframe
+        :rtype: DataFrame
+        """
+        chunks = []
+        columns = None
+        with conn.cursor(name='resqdb_{0}'.format(name)) as cursor:
+            cursor.itersize = self.fetch_size
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if columns is None:
+                    columns = [desc[0] for desc in cursor.description]
+                    keep = self._get_stream_columns(columns, name)
+                    exclude = [c for c in columns if c not in keep]
+                if not rows:
+                    break
+                chunk = pd.DataFrame.from_records(rows, columns=columns, exclude=exclude, coerce_float=True)
+                chunks.append(self._downcast(chunk))
+                logging.info('Connection: {0} rows of {1} have been fetched.'.format(sum(len(x) for x in chunks), name))
+
+        if not chunks:
+            return pd.DataFrame(columns=keep)
+        return pd.concat(chunks, ignore_index=True, sort=False)
+
+    def _get_stream_columns(self, columns, name):
+        """ The function returning the columns kept for the source table when the data are streamed. All columns are kept for the unknown tables. 
+
+        :param columns: the column names returned by the query
+        :type columns: list
+        :param name: the name of the dataframe
+        :type name: str
+        :returns: the kept column names
+        :rtype: list
+        """
+        if name not in self.stream_columns:
+            return list(columns)
+
+        kept, suffixes = self.stream_columns[name]
+        # Keep also the watermark column for the incremental export
+        kept = kept + [self.watermark_columns.get(name)]
+        return [c for c in columns if c in kept or c.endswith(suffixes)]
+
+    def _downcast(self, df):
+        """ The function downcasting the numeric columns. The integer columns are converted to int32 and the float columns with only integer values (coded answers) to float32 if the values fit. 
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :returns: the downcasted dataframe
+        :rtype: DataFrame
+        """
+        limit = 2**24
+        for column in df.columns:
+            values = df[column]
+            if pd.api.types.is_integer_dtype(values) and values.dtype.itemsize > 4:
+                if values.empty or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max):
+                    df[column] = values.astype(np.int32)
+            elif pd.api.types.is_float_dtype(values) and values.dtype.itemsize > 4:
+                notnull = values.dropna()
+                if (notnull.abs() < limit).all() and (notnull == np.floor(notnull)).all():
+                    df[column] = values.astype(np.float32)
+        return df
+
+    def export_tables(self, section, nprocess):
+        """ The function exporting the tables from `self.sqls` concurrently. Each table is exported in its own thread using the connection from the bounded connection pool and it is prepared by `prepare_df` as soon as it arrives. The duration of the export and preparation of each table is stored in `self.timings`.
+
+        :param section: the section from the database.ini
+        :type section: str
+        :param nprocess: the maximum number of connections open simultaneously
+        :type nprocess: int
+        """
+        maxconn = max(1, min(nprocess, len(self.names)))
+        params = self.config(section)
+        pool = ThreadedConnectionPool(1, maxconn, **params)
+        # The pool raises an error instead of waiting if it is exhausted, so the threads have to wait for a free connection
+        semaphore = BoundedSemaphore(maxconn)
+        self.timings = {}
+
+        threads = []
+        try:
+            for i in range(0, len(self.names)):
+                process = Thread(target=self._export_table, args=(self.sqls[i], self.names[i], i, pool, semaphore))
+                process.start()
+                threads.append(process)
+
+            for process in threads:
+                process.join()
+        finally:
+            pool.closeall()
+
+    def _export_table(self, sql, name, n, pool, semaphore):
+        """ The function exporting and preparing one table. It is run in the separate thread by `export_tables`.
+
+        :param sql: the sql query
+        :type sql: str
+        :param name: the name of the dataframe used as key in the dictionary
+        :type name: str
+        :param n: the number of the process
+        :type n: int
+        :param pool: the connection pool
+        :type pool: ThreadedConnectionPool
+        :param semaphore: the semaphore limiting the number of connections taken from the pool
+        :type semaphore: BoundedSemaphore
+        """
+        start = time.time()
+        with semaphore:
+            self.connect(sql, None, n, df_name=name, pool=pool)
+        exported = time.time()
+
+        if name in self.dictdb_df:
+            self.prepare_df(df=self.dictdb_df[name], name=name)
+        prepared = time.time()
+
+        self.timings[name] = {'export': exported - start, 'prepare': prepared - exported}
+        logging.info('Process{0}: Dataframe {1} was exported in {2} minutes and prepared in {3} minutes.'.format(n, name, (exported - start)/60, (prepared - exported)/60))
     
     
     def prepare_df(self, df, name):
-        """ The function preparing the raw data from the database to be used for statistic calculation. The prepared dataframe is entered into dict_df and the name is used as key.
+        """ The function preparing the raw data from the database to be used for statistic calculation. The prepared dataframe is entered into dict_df and the name is used as key. If the snapshot is used, only the new or updated rows are prepared and merged into the prepared snapshot.
+        
+        :param df: the raw dataframe exported from the database
+        :type df: pandas dataframe
+        :param name: the name of the database
+        :type name: str
+        """
+        if self.snapshot is None or name not in self.deltas:
+            self._prepare_df(df, name)
+            apply_schema(self.dict_df[name])
+            return
+
+        snapshot = self.snapshot.load(name, 'prepared')
+        if snapshot is None:
+            # Nothing has been prepared yet, prepare the whole table
+            self._prepare_df(df, name)
+        else:
+            self._prepare_df(self.deltas[name].copy(), name)
+        delta = apply_schema(self.dict_df[name])
+        # The changed keys are compared with the keys of the merged preprocessed data, the key columns missing in the table are empty there
+        self.changed_keys.update(Snapshot.get_keys(delta.reindex(columns=self.checked_keys), self.checked_keys))
+
+        self.dict_df[name] = Snapshot.merge(snapshot, delta, self.prepared_keys[name])
+        self.snapshot.save(name, 'prepared', self.dict_df[name])
+        logging.info("Connection: {0} new or updated rows of {1} were prepared.".format(len(delta), name))
+
+    def _prepare_df(self, df, name):
+        """ The function preparing the raw data from the database, see `prepare_df`.
         
         :param df: the raw dataframe exported from the database
         :type df: pandas dataframe
@@ -429,42 +682,8 @@ class Connection():
 
         if 'resq' in name:
             df.rename(columns={'fabry_cs': 'fabry_en'}, inplace=True)
-            # If CRF is v1.2 replace BLEEDING REASON with -999
-            df['bleeding_reason_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['bleeding_reason_en'], axis=1)
-            # If CRF is v1.2 replace INTERVENTION with -999
-            df['intervention_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['intervention_en'], axis=1)
-            # If CRF is v1.2 replace RECURRENT_STROKE value with -999
-            df['recurrent_stroke_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['recurrent_stroke_en'], axis=1)
-            # If CRF is v1.2 replace VENTILATOR value with -999
-            df['ventilator_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['ventilator_en'], axis=1)
-            # If CRF is v1.2 and stroke type is 2 then neurosurgery is 3
-            df['neurosurgery_en'] = df.apply(lambda x: 3 if "RESQV12" in x['oc_oid'] and x['stroke_type_en'] == 2 else x['neurosurgery_en'], axis=1)
-            # If CRF is v1.2 replace BLEEDING SOURCE with -999
-            df['bleeding_source_en'] = df.apply(lambda x: 3 if "RESQV12" in x['oc_oid'] else x['bleeding_source_en'], axis=1)
-            # If CRF is v1.2 replace CEREBROVASCULAR EXPERT with -999
-            df['cerebrovascular_expert_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['cerebrovascular_expert_en'], axis=1)
-            
-            # If CRF is v1.2. replace DISCHARGE SAME FACILITY with -999 if DISCHARGE_DESTINATIOn is not 2, else 1
-            def discharge_same_facility(val):
-                res = 1 if val == 2 else -999
-                return res
-            df['discharge_same_facility_en'] = df.apply(lambda x: discharge_same_facility(x['discharge_destination_en']) if "RESQV12" in x['oc_oid'] else x['discharge_same_facility_en'], axis=1) 
-            # If CRF is v1.2. replace DISCHARGE OTHER FACILITY with -999 if DISCHARGE_DESTINATION is not 3, else 3
-            def discharge_other_facility(val):
-                res = 3 if val == 3 else -999
-                return res
-            df['discharge_other_facility_en'] = df.apply(lambda x: discharge_other_facility(x['discharge_destination_en']) if "RESQV12" in x['oc_oid'] else x['discharge_other_facility_en'], axis=1)
-            # If CRF is v1.2 replace DISCHARGE OTHER FACILITY O2 with -999
-            df['discharge_other_facility_o2_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['discharge_other_facility_o2_en'], axis=1)
-            # If CRF is v1.2 replace DISCHARGE OTHER FACILITY O1 with -999
-            df['discharge_other_facility_o1_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['discharge_other_facility_o1_en'], axis=1)
-            # If CRF is v1.2. replace DISCHARGE OTHER FACILITY O3 with -999 if DISCHARGE_DESTINATION is not 3, else 4
-            def discharge_other_facility_o3(val):
-                res = 4 if val == 3 else -999
-                return res
-            df['discharge_other_facility_o3_en'] = df.apply(lambda x: discharge_other_facility_o3(x['discharge_destination_en']) if "RESQV12" in x['oc_oid'] else x['discharge_other_facility_o3_en'], axis=1)
-            # If CRF is v1.2 replace DEPARTMENT TYPE with -999 else kepp DEPARTMENT_TYPE
-            df['department_type_en'] = df.apply(lambda x: -999 if "RESQV12" in x['oc_oid'] else x['department_type_en'], axis=1)
+            # Harmonize RES-Q v1.2 values to RES-Q v2.0
+            harmonize(df, RESQV12_RULES)
 
             # Rename PT column (Prenotification + Prior mRS)
             df.rename(columns={
@@ -508,8 +727,7 @@ class Connection():
             #df = df[df['oc_oid'] != "F_RESQ_IVT_TBY_1565_DEVCZ10"].copy()
 
             # Merge ct_time columns 
-            vals = [1,2,3,4,5,6]
-            df['ct_time_cz'] = df.apply(lambda x: x['ct_time_2_cz'] if (x['ct_mri_cz'] in vals and pd.isnull(x['ct_time_cz'])) else x['ct_time_cz'], axis=1)
+            harmonize(df, IVTTBY_RAW_RULES)
 
             # Rename tby_refer_all_groin_puncture_time_cz and tby_refer_lim_groin_puncture_time_cz to something else, because we need to keep only these times with _cz_2
             df.rename(columns={
@@ -544,18 +762,8 @@ class Connection():
             df.rename(columns=dict(zip(df.columns[0:], new_cols)),inplace=True)
             df.rename(columns={'ANTITHROMBOTICS': 'ANTITHROMBOTICS_TMP', 'GLUCOSE': 'GLUCOSE_OLD'}, inplace=True)
 
-            # Create columns for admission time using hospital times (to keep previous calculation and setting)
-            df['IVT_ONLY_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['IVT_ONLY'] == 2 else None, axis=1)
-            df['IVT_TBY_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['IVT_TBY'] == 2 else None, axis=1)
-            df['IVT_TBY_REFER_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['IVT_TBY_REFER'] == 2 else None, axis=1)
-            df['TBY_ONLY_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['TBY_ONLY'] == 2 else None, axis=1)
-            df['TBY_REFER_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['TBY_REFER'] == 2 else None, axis=1)
-            df['TBY_REFER_ALL_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['TBY_REFER_ALL'] == 2 else None, axis=1)
-            df['TBY_REFER_LIM_ADMISSION_TIME'] = df.apply(lambda x: x['HOSPITAL_TIME'] if x['TBY_REFER_LIM'] == 2 else None, axis=1)
-
-            # Convert antithrombotics to RES-Q v2.0
-            df['ANTITHROMBOTICS_TMP'] = df.apply(lambda x: int(x['ANTITHROMBOTICS_TMP']) if 'DEVCZ10' in x['crf_parent_name'] else x['ANTITHROMBOTICS_TMP'], axis=1)
-            df['ANTITHROMBOTICS'] = df.apply(lambda x: self._get_tmp_antithrombotics(x['ANTITHROMBOTICS_TMP'], x['AFIB_FLUTTER']) if 'DEVCZ10' not in x['crf_parent_name'] else x['ANTITHROMBOTICS_TMP'], axis=1)
+            # Create columns for admission time using hospital times (to keep previous calculation and setting) and convert antithrombotics to RES-Q v2.0
+            harmonize(df, IVTTBY_RULES)
 
             # Create value assessed for reabilitation
             df.loc[:, 'ASSESSED_FOR_REHAB'] = np.nan
@@ -679,69 +887,8 @@ class Connection():
         :returns: mapped value 
         :rtype: int
         """
-    
-        if col_vals is not None:
-            vals_str = col_vals.split(',') # Split selected values using , as seperator
-            vals = list(map(int, vals_str)) # Convert string values to integers
-            antiplatelets_vals = [1,2,3,4,5,6] # antiplatelets values in IVT/TBY
-            anticoagulants_vals = [8,9,10,11,12,13,14] # anticoagulants values in IVT/TBY
-            antiplatelets_recs = 7 # antiplatelets recommended
-            anticoagulants_recs = 15 # anticoagulants recommended
-            nothing = 16 # nothing
-
-            # mapping anticoagulants
-            anticoagulants_dict = {
-                8: 2, # warfarin
-                9: 3, # dabigatran
-                10: 4, # rivaroxaban
-                11: 5, # apixaban
-                12: 6, # edoxaban
-                13: 7, # LMWH or heparin in prophylactic dose
-                14: 8, # LMWH or heparin in full anticoagulant dose
-            }
-
-            # default value (now deleted by Mirek)
-            if len(vals) > 15:
-                res = None
-            # nothing prescribed
-            elif nothing in vals:
-                res = 10
-            else:
-                # if AFIB not detected or not know we are interested only in antiplatelets, if antiplatelets recommended value in vals set result to 9 (not prescribed, but recommended), else check if some value from antiplatelets_vals is in vals, and if yes set result to 1 (antiplatelets) else set result to 10 (nothing)
-                if afib in [4,5]: 
-                    if antiplatelets_recs in vals:
-                        res = 9
-                    else:
-                        # Antiplatelets values which are in selected antithrombotics
-                        x = set(antiplatelets_vals).intersection(set(vals))
-                        if bool(x):
-                            res = 1
-                        else:
-                            res = 10
-                # if AFIB known or detected we are interested only in anticoagulants, if anticoagulants recommended value in vals set result to 9 (not prescribed, but recommended), else check if some value from anticoagulants_vals is in vals, and if yes map value based on anticoagulants_dict else set result to 10 (nothing)
-                elif afib in [1,2,3]:
-                    if anticoagulants_recs in vals:
-                        res = 9
-                    else:
-                        # Anticoagulant values which are in selected antithrombotics
-                        x = set(anticoagulants_vals).intersection(set(vals))
-                        if bool(x):
-                            for val in x:
-                                res = anticoagulants_dict[val]
-                        else:
-                            x = set(antiplatelets_vals).intersection(set(vals))
-                            if bool(x):
-                                res = 1
-                            else:
-                                res = 10
-                            #res = 10
-
-            #print("Vals: {0}, Results: {1}".format(vals, res))
-            return res
-        else:
-            return None
-             
-    
+        return get_tmp_antithrombotics(col_vals, afib)
+
     def get_ctmri_delta(self, hosp_time, ct_time):
         """ The function calculating door to CT date time in minutes. 
         
@@ -833,12 +980,47 @@ class Connection():
         :returns: the dataframe with preprocessed data
         :rtype: DataFrame
         """
+        if self.snapshot is not None:
+            return self._check_data_incremental(df, nprocess)
+
         chd = CheckData(df=df, nprocess=nprocess)
 
         logging.info("Connection: The data were preprocessed.")
 
         return chd.preprocessed_data
 
+    def _check_data_incremental(self, df, nprocess):
+        """ The function calling the CheckData object only for the rows changed since the last run. The rows which haven't been changed are taken from the checked snapshot. The rows removed from the dataframe are removed from the snapshot as well.
+
+        :param df: the raw dataframe 
+        :type df: DataFrame
+        :param nprocess: the number of processes run simulataneously
+        :type nprocess: int
+        :returns: the dataframe with preprocessed data
+        :rtype: DataFrame
+        """
+        snapshot = self.snapshot.load('preprocessed_data', 'checked')
+        keys = Snapshot.get_keys(df, self.checked_keys)
+
+        if snapshot is not None:
+            snapshot_keys = Snapshot.get_keys(snapshot, self.checked_keys)
+            changed = keys.isin(self.changed_keys) | ~keys.isin(snapshot_keys)
+            unchanged = snapshot[snapshot_keys.isin(keys[~changed])]
+            df = df[changed]
+        else:
+            unchanged = None
+
+        if len(df) > 0:
+            checked = CheckData(df=df, nprocess=nprocess).preprocessed_data
+        else:
+            checked = df
+
+        preprocessed_data = pd.concat([unchanged, checked], sort=False) if unchanged is not None else checked
+        self.snapshot.save('preprocessed_data', 'checked', preprocessed_data)
+        logging.info("Connection: {0} new or updated rows were preprocessed.".format(len(checked)))
+
+        return preprocessed_data
+
 
     def prepare_atalaia_df(self, df):
         """ The function preparing the atalaia dataframe if data is equal to atalaia. The column names are renamed.
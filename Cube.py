@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Cube.py
+Package: resq
+Version comment: Cube of the partial aggregates per site and month answering the statistics of any period and set of sites without the patients.
+"""
+
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from resqdb.Metrics import MetricRegistry, MaskCache, POPULATIONS, CZ_POPULATIONS, METRICS, ANGELS_AWARDS, Count, Median, MedianInterval, get_columns
+from resqdb.Awards import get_awards, ANGELS_AWARDS_INDICATORS, OLD_ANGELS_AWARDS_INDICATORS
+from resqdb.Rollup import get_runs
+
+AWARDS_COLUMNS = ['Proposed Award', 'Proposed Award (old calculation)', 'Proposed Award capped by']
+
+
+def _get_skips(country_code=''):
+    """ The function returning the populations of `skip_if_empty` in the order of the populations, the parents are before their children.
+
+    :param country_code: the country code
+    :type country_code: str
+    :returns: the list of names of the populations
+    :rtype: list
+    """
+    populations = {population.name: population for population in POPULATIONS}
+    if country_code == 'CZ':
+        populations.update({population.name: population for population in CZ_POPULATIONS})
+
+    return list(dict.fromkeys(x.skip_if_empty for x in populations.values() if x.skip_if_empty is not None))
+
+
+def _get_variant(skipped):
+    """ The function returning the number of the variant of the cube, the bit `i` is set if the `i`-th population of `skip_if_empty` is empty.
+
+    :param skipped: the list of the values saying if the populations are empty
+    :type skipped: list
+    :returns: the number of the variant
+    :rtype: int
+    """
+    return sum(1 << i for i, x in enumerate(skipped) if x)
+
+
+class CubeRegistry(MetricRegistry):
+    """ The metric registry reading the number of patients and the values of the populations from the partial aggregates of the cube instead of the patients.
+
+    :param counts: the number of patients with the columns id, Protocol ID and count
+    :type counts: pandas dataframe
+    :param values: the values of the columns with the columns id, Protocol ID and value
+    :type values: pandas dataframe
+    :param ids: the ids of the aggregates of the populations {(population, column): id}, the column is empty for the number of patients
+    :type ids: dict
+    :param sites: the sites with the columns Protocol ID, Site Name and Country
+    :type sites: pandas dataframe
+    :param stats: the dataframe with the columns Protocol ID, Site Name and Total Patients
+    :type stats: pandas dataframe
+    :param country_code: the country code
+    :type country_code: str
+    :param totals: the column grouping the sites (eg. Country)
+    :type totals: str
+    """
+
+    def __init__(self, counts, values, ids, sites, stats, country_code='', totals=None):
+
+        MetricRegistry.__init__(self, sites, stats, country_code=country_code, totals=totals)
+        self.counts = counts.groupby(['id', 'Protocol ID'])['count'].sum()
+        self.values = values
+        self.ids = ids
+
+    def _get_counts(self, name):
+        """ The function returning the number of patients in the population per site summed over the periods.
+
+        :param name: the name of the population
+        :type name: str
+        :returns: the number of patients indexed by Protocol ID, the sites without patients are not included
+        :rtype: pandas series
+        """
+        counts = self.counts[self.counts.index.get_level_values('id') == self.ids[(name, '')]].droplevel('id')
+
+        return counts[counts > 0]
+
+    def _get_runs(self, name, column):
+        """ The function returning the sorted values of the column in the population per site merged over the periods.
+
+        :param name: the name of the population
+        :type name: str
+        :param column: the name of the column
+        :type column: str
+        :returns: the runs indexed by Protocol ID
+        :rtype: Runs
+        """
+        if (name, column) not in self.runs:
+            rows = self.values[self.values['id'] == self.ids[(name, column)]]
+            self.runs[(name, column)] = get_runs(rows, ['Protocol ID'], 'value')
+
+        return self.runs[(name, column)]
+
+
+class Cube:
+    """ The class storing the partial aggregates of the metric registry per site and period (eg. month). The number of patients in each population and the values of the columns used by the medians are calculated once after the data are checked, the statistics for any range of whole periods and any set of sites are then summed and merged from the aggregates (see :meth:`get_stats`). The populations with `skip_if_empty` depend on the selected data, so the aggregates are calculated for each combination of these populations being empty or not, the same aggregates are stored only once. The patients without the date are not included.
+
+    :param df: the preprocessed data (default: empty cube, eg. to be loaded from the cache)
+    :type df: pandas dataframe
+    :param country_code: the country code, the populations are adjusted for some countries (eg. CZ)
+    :type country_code: str
+    :param column: the date column used to assign the patients to the periods (DISCHARGE_DATE or HOSPITAL_DATE)
+    :type column: str
+    :param freq: the length of the periods as the pandas frequency (eg. M for months or D for days)
+    :type freq: str
+    """
+
+    def __init__(self, df=None, country_code='', column='DISCHARGE_DATE', freq='M'):
+
+        self.country_code = country_code
+        self.column = column
+        self.freq = freq
+        self.skips = _get_skips(country_code)
+        self.sites = pd.DataFrame(columns=['Protocol ID', 'Site Name', 'Country'])
+        self.populations = pd.DataFrame(columns=['variant', 'population', 'column', 'id'])
+        self.counts = pd.DataFrame(columns=['id', 'Protocol ID', 'Period', 'count'])
+        self.values = pd.DataFrame(columns=['id', 'Protocol ID', 'Period', 'value'])
+
+        if df is not None:
+            self._build(df)
+
+    def _build(self, df):
+        """ The function calculating the partial aggregates of all variants.
+
+        :param df: the preprocessed data
+        :type df: pandas dataframe
+        """
+        columns = ['Protocol ID', 'Site Name', 'ESO Angels name', 'Country', self.column] + get_columns(self.country_code)
+        df = df.loc[pd.to_datetime(df[self.column]).notnull(), [x for x in dict.fromkeys(columns) if x in df.columns]]
+        if 'ESO Angels name' in df.columns:
+            df = df.drop(['Site Name'], axis=1).rename(columns={'ESO Angels name': 'Site Name'})
+        df.insert(0, 'Period', pd.to_datetime(df[self.column]).dt.to_period(self.freq).dt.start_time)
+
+        self.sites = df.drop_duplicates('Protocol ID').loc[:, [x for x in ['Protocol ID', 'Site Name', 'Country'] if x in df.columns]].reset_index(drop=True)
+
+        names = list(dict.fromkeys(['all'] + [x.population for x in METRICS if isinstance(x, Count)] + self.skips))
+        medians = list(dict.fromkeys((x.population, x.column) for x in METRICS if isinstance(x, (Median, MedianInterval))))
+        keys = ('Protocol ID', 'Period')
+        masks = MaskCache(df)
+
+        # The aggregates are keyed by the conditions of the populations, the variants with the same conditions share the aggregates
+        ids = {}
+        populations, counts, values = [], [], []
+        for skipped in itertools.product((False, True), repeat=len(self.skips)):
+            registry = MetricRegistry(df, self.sites.iloc[:0], country_code=self.country_code, masks=masks, keys=keys, empty=dict(zip(self.skips, skipped)))
+            for name, column in [(x, '') for x in names] + medians:
+                key = (registry.get_conditions(name), column)
+                if key not in ids:
+                    ids[key] = len(ids)
+                    if column:
+                        rows = masks.get_subset(key[0], list(keys) + [column]).rename(columns={column: 'value'})
+                        values.append(rows.assign(id=ids[key]))
+                    else:
+                        counts.append(masks.count(key[0], keys).rename_axis(list(keys)).rename('count').reset_index().assign(id=ids[key]))
+                populations.append((_get_variant(skipped), name, column, ids[key]))
+
+        self.populations = pd.DataFrame(populations, columns=['variant', 'population', 'column', 'id'])
+        self.counts = pd.concat(counts, ignore_index=True)[['id', 'Protocol ID', 'Period', 'count']]
+        self.values = pd.concat(values, ignore_index=True)[['id', 'Protocol ID', 'Period', 'value']]
+        self.values['value'] = self.values['value'].astype(float)
+        logging.info('Cube: {0} aggregates of {1} populations have been calculated for {2} sites.'.format(len(ids), len(names) + len(medians), len(self.sites)))
+
+    def _get_range(self, date1, date2):
+        """ The function returning the first and the last period of the range of dates, the range has to consist of whole periods.
+
+        :param date1: the first date included in the range
+        :type date1: date
+        :param date2: the last date included in the range
+        :type date2: date
+        :returns: the starts of the first and the last period
+        :rtype: tuple
+        :raises: ValueError
+        """
+        first = pd.Period(pd.Timestamp(date1), self.freq)
+        last = pd.Period(pd.Timestamp(date2), self.freq)
+        if pd.Timestamp(date1).normalize() != first.start_time or pd.Timestamp(date2).normalize() != last.end_time.normalize():
+            raise ValueError('The dates {0} - {1} are not the whole periods of the cube ({2}).'.format(date1, date2, self.freq))
+
+        return first.start_time, last.start_time
+
+    def _get_ids(self, counts):
+        """ The function returning the ids of the aggregates of the variant matching the selected data. Each population of `skip_if_empty` is empty if it has no patients in the variant given by the populations before.
+
+        :param counts: the selected number of patients
+        :type counts: pandas dataframe
+        :returns: the ids of the aggregates {(population, column): id}
+        :rtype: dict
+        """
+        populations = self.populations.set_index(['variant', 'population', 'column'])['id']
+        skipped = []
+        for i, name in enumerate(self.skips):
+            id = populations[(_get_variant(skipped), name, '')]
+            skipped.append(counts.loc[counts['id'] == id, 'count'].sum() == 0)
+        populations = populations.loc[_get_variant(skipped)]
+
+        return dict(zip(populations.index, populations.to_numpy()))
+
+    def get_stats(self, date1=None, date2=None, site_ids=None, metrics=None, country=False, patient_limit=30):
+        """ The function calculating the statistics from the aggregates. The results are the same as the results of :class:`resqdb.Calculation.ComputeStats` with the metrics calculated from the data filtered by the dates and the sites.
+
+        :param date1: the first date included in the statistics, the start of the period (default: all periods)
+        :type date1: date
+        :param date2: the last date included in the statistics, the end of the period (default: all periods)
+        :type date2: date
+        :param site_ids: the list of Protocol IDs included in the statistics (default: all sites)
+        :type site_ids: list
+        :param metrics: the list of the metrics, the proposed awards can be included (default: all metrics of the registry)
+        :type metrics: list
+        :param country: the results for whole country included in the statistics
+        :type country: bool
+        :param patient_limit: the number of patients used as limit when evaluating angels awards
+        :type patient_limit: int
+        :returns: the dataframe with the statistics
+        :rtype: pandas dataframe
+        """
+        counts, values = self.counts, self.values
+        if date1 is not None and date2 is not None:
+            first, last = self._get_range(date1, date2)
+            counts = counts.loc[(counts['Period'] >= first) & (counts['Period'] <= last)]
+            values = values.loc[(values['Period'] >= first) & (values['Period'] <= last)]
+        if site_ids is not None:
+            counts = counts.loc[counts['Protocol ID'].isin(site_ids)]
+            values = values.loc[values['Protocol ID'].isin(site_ids)]
+        ids = self._get_ids(counts)
+
+        total_patients = counts.loc[counts['id'] == ids[('all', '')]].groupby('Protocol ID')['count'].sum()
+        stats = self.sites.merge(total_patients.rename('Total Patients'), left_on='Protocol ID', right_index=True)
+        if country:
+            country_stats = stats.groupby(['Country'])['Total Patients'].sum().reset_index()
+            country_stats['Protocol ID'] = country_stats['Country']
+            country_stats['Site Name'] = country_stats['Country']
+            stats = pd.concat([stats, country_stats])
+        stats = stats.sort_values(['Protocol ID', 'Site Name']).reset_index(drop=True)[['Protocol ID', 'Site Name', 'Total Patients']]
+
+        if metrics is None:
+            metrics = [metric.name for metric in METRICS]
+        awards = [x for x in metrics if x in AWARDS_COLUMNS]
+        names = [x for x in metrics if x not in awards]
+        if awards:
+            names += [x for x in ANGELS_AWARDS if x not in names]
+
+        stats = CubeRegistry(counts, values, ids, self.sites, stats, country_code=self.country_code, totals='Country' if country else None).compute(names)
+
+        if awards:
+            total_patient_column = '# total patients >= {0}'.format(patient_limit)
+            stats[total_patient_column] = stats['Total Patients'] >= patient_limit
+            stats['Proposed Award (old calculation)'], _ = get_awards(stats, OLD_ANGELS_AWARDS_INDICATORS, total_patient_column)
+            stats['Proposed Award'], stats['Proposed Award capped by'] = get_awards(stats, ANGELS_AWARDS_INDICATORS, total_patient_column)
+            columns = ['Protocol ID', 'Site Name', 'Total Patients'] + [x for x in metrics if x not in awards] + [total_patient_column] + awards
+            stats = stats[list(dict.fromkeys(columns))]
+
+        stats.rename(columns={'Protocol ID': 'Site ID'}, inplace=True)
+        stats.drop_duplicates(inplace=True)
+        logging.info('Cube: Statistics have been calculated for {0} sites.'.format(len(stats)))
+
+        return stats
+
+    def save(self, cache, export_date=None):
+        """ The function saving the aggregates into the cache.
+
+        :param cache: the cache
+        :type cache: Cache
+        :param export_date: the date of the export (default: today)
+        :type export_date: date
+        """
+        cache.save(pd.DataFrame({'country_code': [self.country_code], 'column': [self.column], 'freq': [self.freq]}), 'cube_info', export_date)
+        cache.save(self.sites, 'cube_sites', export_date)
+        cache.save(self.populations, 'cube_populations', export_date)
+        cache.save(self.counts, 'cube_counts', export_date)
+        cache.save(self.values, 'cube_values', export_date)
+
+    def load(self, cache, export_date=None, country_code=None):
+        """ The function loading the aggregates from the cache.
+
+        :param cache: the cache
+        :type cache: Cache
+        :param export_date: the date of the export (default: the latest export)
+        :type export_date: date
+        :param country_code: the country code the aggregates must be calculated for (default: any country code)
+        :type country_code: str
+        :returns: True if the aggregates were loaded, False if they are not in the cache
+        :rtype: bool
+        :raises: ValueError
+        """
+        if export_date is None:
+            dates = cache.get_dates('cube_info')
+            if not dates:
+                return False
+            export_date = dates[-1]
+        info = cache.load('cube_info', export_date)
+        if info is None:
+            return False
+
+        # The populations depend on the country code, the aggregates of another country code would give different statistics
+        stored_country_code = info.iloc[0]['country_code']
+        if country_code is not None and stored_country_code != country_code:
+            raise ValueError('The aggregates were calculated for the country code "{0}", not for "{1}".'.format(stored_country_code, country_code))
+
+        self.country_code, self.column, self.freq = info.iloc[0][['country_code', 'column', 'freq']]
+        self.skips = _get_skips(self.country_code)
+        self.sites = cache.load('cube_sites', export_date)
+        self.populations = cache.load('cube_populations', export_date)
+        self.counts = cache.load('cube_counts', export_date)
+        self.values = cache.load('cube_values', export_date)
+
+        return True
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Fanout.py
+Package: resq
+Version comment: Reports of the sites generated in the pool of processes.
+"""
+
+import time
+import copy
+import logging
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def _run_job(generator, method, name, kwargs):
+    """ The function generating one report in the separate process, see `fan_out`. The exception is returned instead of being raised, so the other reports are generated.
+
+    :param generator: the object generating the reports
+    :type generator: object
+    :param method: the name of the method generating the report
+    :type method: str
+    :param name: the name of the job (eg. the site ID)
+    :type name: str
+    :param kwargs: the arguments of the method
+    :type kwargs: dict
+    :returns: the name of the job, the duration in seconds and the traceback of the error (None if the report was generated)
+    :rtype: str, float, str
+    """
+    start = time.time()
+    try:
+        getattr(generator, method)(**kwargs)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return name, time.time() - start, error
+
+
+def fan_out(generator, method, jobs, nprocess, exclude=()):
+    """ The function generating the reports in the pool of processes. Each process gets the copy of the generator without the excluded attributes (eg. the statistics of all sites) and the arguments of its job (eg. the statistics of the site and the country). At most two jobs per process are submitted at once, so the arguments of the other jobs are not prepared before they are needed.
+
+    :param generator: the object generating the reports
+    :type generator: object
+    :param method: the name of the method generating the report
+    :type method: str
+    :param jobs: the iterable of the tuples (name, kwargs)
+    :type jobs: iterable
+    :param nprocess: the number of processes
+    :type nprocess: int
+    :param exclude: the attributes of the generator not sent to the processes
+    :type exclude: tuple
+    :returns: the duration of each job in seconds and the tracebacks of the failed jobs
+    :rtype: dict, dict
+    """
+    shipped = copy.copy(generator)
+    for attribute in exclude:
+        setattr(shipped, attribute, None)
+
+    timings = {}
+    errors = {}
+
+    def collect(futures):
+        for future in futures:
+            name, duration, error = future.result()
+            timings[name] = duration
+            if error is None:
+                logging.info('Fanout: The report {0} was generated in {1} seconds.'.format(name, duration))
+            else:
+                errors[name] = error
+                logging.error('Fanout: The report {0} failed after {1} seconds.\n{2}'.format(name, duration, error))
+
+    with ProcessPoolExecutor(max_workers=nprocess) as executor:
+        pending = set()
+        for name, kwargs in jobs:
+            if len(pending) >= 2 * nprocess:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(_run_job, shipped, method, name, kwargs))
+        done, pending = wait(pending)
+        collect(done)
+
+    return timings, errors
@@ -20,6 +20,7 @@ from xlsxwriter.utility import xl_rowcol_to_cell, xl_col_to_name
 import logging
 from collections import defaultdict, OrderedDict
 import pytz
+from resqdb.Fanout import fan_out
 
 class GeneratePreprocessedData:
     """ Class generating preprocessed data in the excel format containing calculated statistics with intermediate columns! 
@@ -50,7 +51,8 @@ class GeneratePreprocessedData:
                             datefmt='%H:%M:%S',
                             level=logging.DEBUG)
 
-        self.df = df.copy()
+        # The dataframe is only read, it is not copied
+        self.df = df
         self.split_sites = split_sites
         self.report = report
         self.quarter = quarter
@@ -79,6 +81,39 @@ class GeneratePreprocessedData:
         self._generate_preprocessed_data(self.df, site_code=None)
         logging.info('FormatData: Preprocessed data: The preprocessed data were generate for all data.')
 
+    def _write_table(self, worksheet, df, header_format, formats=None, chunksize=10000):
+        """ The function writing the dataframe with the header and the autofilter into the worksheet of the workbook in the constant_memory mode. The rows are written in order by chunks, the missing values are left blank. 
+
+        :param worksheet: the worksheet
+        :type worksheet: Worksheet
+        :param df: the dataframe to be written
+        :type df: pandas dataframe
+        :param header_format: the format of the header
+        :type header_format: Format
+        :param formats: the formats of the columns, eg. the date format
+        :type formats: dict
+        :param chunksize: the number of rows converted at once
+        :type chunksize: int
+        """
+        if formats is None:
+            formats = {}
+
+        # The tables aren't supported in the constant_memory mode, the header with the autofilter is used instead
+        for j, column in enumerate(df.columns):
+            worksheet.write_string(0, j, column, header_format)
+        worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+
+        column_formats = [formats.get(column) for column in df.columns]
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            nulls = chunk.isnull().values
+            values = [chunk[column].tolist() for column in chunk.columns]
+            for i in range(0, len(chunk)):
+                row = start + i + 1
+                for j in range(0, len(values)):
+                    if not nulls[i, j]:
+                        worksheet.write(row, j, values[j][i], column_formats[j])
+
     def _generate_preprocessed_data(self, df, site_code):
         """ The function generating the preprocessed data to Excel file. 
 
@@ -98,99 +133,29 @@ class GeneratePreprocessedData:
             else:
                 output_file = self.report + "_" + self.country_code + "_" + self.quarter + "_preprocessed_data.xlsx"
         
-        df = df.copy()
-        
-        # Convert dates to strings
-        dateformat = "%m/%d/%Y"
-        timeformat = "%H:%M"
-        def convert_to_string(datetime, format):
-            if datetime is None or datetime is np.nan or pd.isnull(datetime):
-                return datetime
-            else:
-                return datetime.strftime(format)
-        
-        if not self.csv:
-            #if df['VISIT_DATE'].dtype != np.object:
-            df['VISIT_DATE'] = df.apply(lambda x: convert_to_string(x['VISIT_DATE'], dateformat), axis=1)
-            # if df['VISIT_DATE_OLD'].dtype != np.object:
-            df['VISIT_DATE_OLD'] = df.apply(lambda x: convert_to_string(x['VISIT_DATE_OLD'], dateformat), axis=1)
-            #if df['VISIT_TIME'].dtype != np.object:
-            df['VISIT_TIME'] = df.apply(lambda x: convert_to_string(x['VISIT_TIME'], timeformat), axis=1)
-            df['HOSPITAL_DATE'] = df.apply(lambda x: convert_to_string(x['HOSPITAL_DATE'], dateformat), axis=1)
-            #if df['HOSPITAL_DATE_OLD'].dtype != np.object:
-            df['HOSPITAL_DATE_OLD'] = df.apply(lambda x: convert_to_string(x['HOSPITAL_DATE_OLD'], dateformat), axis=1)
-            #if df['HOSPITAL_TIME'].dtype != np.object:
-            df['HOSPITAL_TIME'] = df.apply(lambda x: convert_to_string(x['HOSPITAL_TIME'], timeformat), axis=1)
-            df['DISCHARGE_DATE'] = df.apply(lambda x: convert_to_string(x['DISCHARGE_DATE'], dateformat), axis=1)
-            #if df['DISCHARGE_DATE_OLD'].dtype != np.object:
-            df['DISCHARGE_DATE_OLD'] = df.apply(lambda x: convert_to_string(x['DISCHARGE_DATE_OLD'], dateformat), axis=1)
-            #if df['IVT_ONLY_ADMISSION_TIME'].dtype != np.object:
-            df['IVT_ONLY_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_ONLY_ADMISSION_TIME'], timeformat), axis=1)
-            #if df['IVT_ONLY_BOLUS_TIME'].dtype != np.object:
-            df['IVT_ONLY_BOLUS_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_ONLY_BOLUS_TIME'], timeformat), axis=1)
-            #if df['IVT_TBY_ADMISSION_TIME'].dtype != np.object:
-            df['IVT_TBY_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_ADMISSION_TIME'], timeformat), axis=1)
-            #if df['IVT_TBY_BOLUS_TIME'].dtype != np.object:
-            df['IVT_TBY_BOLUS_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_BOLUS_TIME'], timeformat), axis=1)
-            # if df['IVT_TBY_GROIN_PUNCTURE_TIME'].dtype != np.object:
-            df['IVT_TBY_GROIN_PUNCTURE_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_GROIN_PUNCTURE_TIME'], timeformat), axis=1)
-            #if df['TBY_ONLY_ADMISSION_TIME'].dtype != np.object:
-            df['TBY_ONLY_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_ONLY_ADMISSION_TIME'], timeformat), axis=1)
-            #if df['TBY_ONLY_PUNCTURE_TIME'].dtype != np.object:
-            df['TBY_ONLY_PUNCTURE_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_ONLY_PUNCTURE_TIME'], timeformat), axis=1)
-            #if df['IVT_TBY_REFER_ADMISSION_TIME'].dtype != np.object:
-            df['IVT_TBY_REFER_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_REFER_ADMISSION_TIME'], timeformat), axis=1)
-            #  if df['IVT_TBY_REFER_BOLUS_TIME'].dtype != np.object:
-            df['IVT_TBY_REFER_BOLUS_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_REFER_BOLUS_TIME'], timeformat), axis=1)
-            #  if df['IVT_TBY_REFER_DISCHARGE_TIME'].dtype != np.object:
-            df['IVT_TBY_REFER_DISCHARGE_TIME'] = df.apply(lambda x: convert_to_string(x['IVT_TBY_REFER_DISCHARGE_TIME'], timeformat), axis=1)
-            # if df['TBY_REFER_DISCHARGE_TIME'].dtype != np.object:
-            df['TBY_REFER_DISCHARGE_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_DISCHARGE_TIME'], timeformat), axis=1)
-            # if df['TBY_REFER_DISCHARGE_TIME'].dtype != np.object:
-            df['TBY_REFER_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_ADMISSION_TIME'], timeformat), axis=1)
-             # if df['TBY_REFER_ALL_DISCHARGE_TIME'].dtype != np.object:
-            df['TBY_REFER_ALL_DISCHARGE_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_ALL_DISCHARGE_TIME'], timeformat), axis=1)
-            #if df['TBY_REFER_ALL_ADMISSION_TIME'].dtype != np.object:
-            df['TBY_REFER_ALL_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_ALL_ADMISSION_TIME'], timeformat), axis=1)
-            #if df['TBY_REFER_LIM_DISCHARGE_TIME'].dtype != np.object:
-            df['TBY_REFER_LIM_DISCHARGE_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_LIM_DISCHARGE_TIME'], timeformat), axis=1)
-            # if df['TBY_REFER_LIM_ADMISSION_TIME'].dtype != np.object:
-            df['TBY_REFER_LIM_ADMISSION_TIME'] = df.apply(lambda x: convert_to_string(x['TBY_REFER_LIM_ADMISSION_TIME'], timeformat), axis=1)
-            #df['CT_TIME'] = df.apply(lambda x: convert_to_string(x['CT_TIME'], timeformat), axis=1)
-        # else:
-        #     df['HOSPITAL_DATE'] = df.apply(lambda x: convert_to_string(x['HOSPITAL_DATE'], dateformat), axis=1)
-            #df['DISCHARGE_DATE'] = df.apply(lambda x: convert_to_string(x['DISCHARGE_DATE'], dateformat), axis=1)
-        
-        #df.fillna(value="", inplace=True)
-        df = df.replace(np.nan, '', regex=True)
+        # The dates and times are written as the dates with the format (the dates from csv are strings and they are written unchanged)
+        date_columns = ['VISIT_DATE', 'VISIT_DATE_OLD', 'HOSPITAL_DATE', 'HOSPITAL_DATE_OLD', 'DISCHARGE_DATE', 'DISCHARGE_DATE_OLD']
+        time_columns = ['VISIT_TIME', 'HOSPITAL_TIME', 'IVT_ONLY_ADMISSION_TIME', 'IVT_ONLY_BOLUS_TIME', 'IVT_TBY_ADMISSION_TIME', 'IVT_TBY_BOLUS_TIME', 'IVT_TBY_GROIN_PUNCTURE_TIME', 'TBY_ONLY_ADMISSION_TIME', 'TBY_ONLY_PUNCTURE_TIME', 'IVT_TBY_REFER_ADMISSION_TIME', 'IVT_TBY_REFER_BOLUS_TIME', 'IVT_TBY_REFER_DISCHARGE_TIME', 'TBY_REFER_DISCHARGE_TIME', 'TBY_REFER_ADMISSION_TIME', 'TBY_REFER_ALL_DISCHARGE_TIME', 'TBY_REFER_ALL_ADMISSION_TIME', 'TBY_REFER_LIM_DISCHARGE_TIME', 'TBY_REFER_LIM_ADMISSION_TIME']
         
-        workbook = xlsxwriter.Workbook(output_file)
+        # The rows are written to the temporary files one by one, so the memory doesn't depend on the number of rows
+        workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
         logging.info('Preprocessed data: The workbook was created.')
         preprocessed_data_sheet = workbook.add_worksheet('Preprocessed_raw_data')
         legend_sheet = workbook.add_worksheet('Legend_v2.0')
         additional_desc_sheet = workbook.add_worksheet('Additional_description')
 
+        header_format = workbook.add_format({'bold': True, 'bottom': 1})
+
         ### PREPROCESSED DATA
-        preprocessed_data = df.values.tolist()
+        formats = {}
+        if not self.csv:
+            date_format = workbook.add_format({'num_format': 'mm/dd/yyyy'})
+            time_format = workbook.add_format({'num_format': 'hh:mm'})
+            formats.update({column: date_format for column in date_columns})
+            formats.update({column: time_format for column in time_columns})
         # Set width of columns
         preprocessed_data_sheet.set_column(0, 150, 30)
-        # Number of columns/rows
-        ncol = len(df.columns) - 1
-        nrow = len(df)
-
-        # Create header
-        col = []
-        for j in range(0, ncol + 1):
-            tmp = {}
-            tmp['header'] = df.columns.tolist()[j]
-            col.append(tmp)
-
-        options = {'data': preprocessed_data,
-                   'header_row': True,
-                   'columns': col,
-                   'style': 'Table Style Light 1'
-                   }
-        preprocessed_data_sheet.add_table(0, 0, nrow, ncol, options)
+        self._write_table(preprocessed_data_sheet, df, header_format, formats)
         logging.info('Preprocessed data: The sheet "Preprocessed data" was added.')
 
         ### LEGEND
@@ -205,24 +170,7 @@ class GeneratePreprocessedData:
         
         # set width of columns
         legend_sheet.set_column(0, 150, 30)
-        # number of columns
-        # add table into worksheet
-        ncol = len(legend_df.columns) - 1
-        nrow = len(legend_df)
-        col = []
-        for k in range(0, ncol + 1):
-            tmp = {}
-            tmp['header'] = legend_df.columns.tolist()[k]
-            # if (i >= 2):
-            #    tmp['total_function': 'sum']
-            col.append(tmp)
-
-        options = {'data': legend_list,
-                   'header_row': True,
-                   'columns': col,
-                   'style': 'Table Style Light 1'
-                   }
-        legend_sheet.add_table(0, 0, nrow, ncol, options)
+        self._write_table(legend_sheet, legend_df, header_format)
         logging.info('Preprocessed data: The sheet "Legend" was added.')
 
         ### ADDITIONAL INFO
@@ -262,23 +210,7 @@ class GeneratePreprocessedData:
         additional_desc_sheet.set_column(0, 10, 60)
 
         addition_df = pd.DataFrame(addition_list, columns=labels)
-        ncol = len(addition_df.columns) - 1
-        nrow = len(addition_df)
-        col = []
-        for k in range(0, ncol + 1):
-            tmp = {}
-            tmp['header'] = addition_df.columns.tolist()[k]
-            # if (i >= 2):
-            #    tmp['total_function': 'sum']
-            col.append(tmp)
-
-        options = {'data': addition_list,
-                   'header_row': True,
-                   'columns': col,
-                   'style': 'Table Style Light 1'
-                   }
-
-        additional_desc_sheet.add_table(0, 0, nrow, ncol, options)
+        self._write_table(additional_desc_sheet, addition_df, header_format)
         logging.info('Preprocessed data: The sheet "Additional info" was added.')
     
         workbook.close()
@@ -696,11 +628,16 @@ class GenerateFormattedStats:
     :type comp: bool
     :param minimum_patients: the minimum number of patients sites need to met condition for total patients
     :type minimum_patients: int
+    :param nprocess: the number of processes generating the statistics of the sites if `split_sites` is `True` (default: the statistics are generated one by one)
+    :type nprocess: int
     """
 
-    def __init__(self, df, country=False, country_code=None, split_sites=False, site=None, report=None, quarter=None, comp=False, minimum_patients=30, country_name=None):
+    def __init__(self, df, country=False, country_code=None, split_sites=False, site=None, report=None, quarter=None, comp=False, minimum_patients=30, country_name=None, nprocess=None):
 
         self.df_unformatted = df.drop_duplicates(subset=['Site ID', 'Total Patients'], keep='first')
+        self.timings = {}
+        self.errors = {}
+        self.formats = {}
         self.df = df.drop_duplicates(subset=['Site ID', 'Total Patients'], keep='first')
         self.country_code = country_code
         self.report = report
@@ -752,10 +689,18 @@ class GenerateFormattedStats:
 
         # Generate formatted statistics for all sites individualy + country as site is included
         if (split_sites) and site is None:
-            for i in site_ids:
-                df = self.df[self.df['Site ID'].isin([i, self.country_name])].copy()
-                df_unformatted = self.df_unformatted[self.df_unformatted['Site ID'].isin([i, self.country_name])].copy()
-                self._generate_formatted_statistics(df=df, df_tmp=df_unformatted, site_code=i)
+            if nprocess is not None and nprocess > 1:
+                # Each process gets only the statistics of its site and the country
+                jobs = ((i, {
+                    'df': self.df[self.df['Site ID'].isin([i, self.country_name])].copy(), 
+                    'df_tmp': self.df_unformatted[self.df_unformatted['Site ID'].isin([i, self.country_name])].copy(), 
+                    'site_code': i}) for i in site_ids)
+                self.timings, self.errors = fan_out(self, '_generate_formatted_statistics', jobs, nprocess, exclude=('df', 'df_unformatted'))
+            else:
+                for i in site_ids:
+                    df = self.df[self.df['Site ID'].isin([i, self.country_name])].copy()
+                    df_unformatted = self.df_unformatted[self.df_unformatted['Site ID'].isin([i, self.country_name])].copy()
+                    self._generate_formatted_statistics(df=df, df_tmp=df_unformatted, site_code=i)
     
         # Produce formatted statistics for all sites + country as site
         if site is None:
@@ -784,7 +729,7 @@ class GenerateFormattedStats:
         '''
         from xlsxwriter.utility import xl_rowcol_to_cell
 
-        formatting = workbook.add_format({
+        formatting = self._get_format(workbook, {
             'bold': 2,
             'border': 0,
             'align': 'center',
@@ -792,7 +737,7 @@ class GenerateFormattedStats:
             'fg_color': self.colors.get(color)
         })
 
-        formatting_color = workbook.add_format({
+        formatting_color = self._get_format(workbook, {
             'fg_color': self.colors.get(color),
             'text_wrap': True
         })
@@ -812,6 +757,58 @@ class GenerateFormattedStats:
                 else:
                     worksheet.write(xl_rowcol_to_cell(1, i), '', formatting_color)
 
+    def _get_format(self, workbook, properties):
+        """ The function returning the format with the properties. The formats are cached by their properties, so each format is added into the workbook only once. 
+
+        :param workbook: the active workbook object
+        :type workbook: Workbook
+        :param properties: the properties of the format
+        :type properties: dict
+        :returns: the format
+        :rtype: Format
+        """
+        key = tuple(sorted(properties.items()))
+        if key not in self.formats:
+            self.formats[key] = workbook.add_format(properties)
+        return self.formats[key]
+
+    def _add_conditional_formats(self, worksheet, column, first_row, last_row, rules, rows=None):
+        """ The function adding the conditional formats to the rows of the column. Each rule is added once for the whole range of the rows (the separated rows are joined into one rule too), the rules are applied in the given order. 
+
+        :param worksheet: the worksheet
+        :type worksheet: Worksheet
+        :param column: the name of the column in the excel, eg. E
+        :type column: str
+        :param first_row: the first formatted row (the excel row number)
+        :type first_row: int
+        :param last_row: the last formatted row (the excel row number)
+        :type last_row: int
+        :param rules: the options of the conditional formats
+        :type rules: list
+        :param rows: the formatted rows, eg. the sites without thrombectomy (default: all rows from the first to the last row)
+        :type rows: list
+        """
+        if rows is None:
+            rows = range(first_row, last_row + 1)
+        rows = list(rows)
+        if len(rows) == 0:
+            return
+
+        # Join the consecutive rows into the ranges, eg. E4:E6 E9
+        ranges = []
+        start = previous = rows[0]
+        for row in rows[1:] + [None]:
+            if row is None or row != previous + 1:
+                ranges.append(column + str(start) if start == previous else '{0}{1}:{0}{2}'.format(column, start, previous))
+                start = row
+            previous = row
+
+        for rule in rules:
+            options = dict(rule)
+            if len(ranges) > 1:
+                options['multi_range'] = ' '.join(ranges)
+            worksheet.conditional_format(ranges[0], options)
+
     def _generate_formatted_statistics(self, df, df_tmp, site_code=None):
         """ The function creating the new excel workbook and filling the statistics into it. 
 
@@ -839,6 +836,8 @@ class GenerateFormattedStats:
         df_tmp.to_csv(name_of_unformatted_stats, sep=",", encoding='utf-8', index=False)
         workbook1 = xlsxwriter.Workbook(name_of_output_file, {'strings_to_numbers': True})
         worksheet = workbook1.add_worksheet()
+        # The formats of the new workbook
+        self.formats = {}
 
         # set width of columns
         worksheet.set_column(0, 4, 15)
@@ -1432,14 +1431,14 @@ class GenerateFormattedStats:
         ################
         # angel awards #
         ################
-        awards = workbook1.add_format({
+        awards = self._get_format(workbook1, {
             'bold': 2,
             'border': 0,
             'align': 'center',
             'valign': 'vcenter',
             'fg_color': self.colors.get("angel_awards")})
 
-        awards_color = workbook1.add_format({
+        awards_color = self._get_format(workbook1, {
             'fg_color': self.colors.get("angel_awards")})
 
         first_index = column_names.index(self.total_patients_column)
@@ -1463,28 +1462,28 @@ class GenerateFormattedStats:
             worksheet.set_column(column + ":" + column, None, None, {'hidden': True})
 
         # format for green color
-        green = workbook1.add_format({
+        green = self._get_format(workbook1, {
             'bold': 2,
             'align': 'center',
             'valign': 'vcenter',
             'bg_color': self.colors.get("green")})
 
         # format for gold color
-        gold = workbook1.add_format({
+        gold = self._get_format(workbook1, {
             'bold': 1,
             'align': 'center',
             'valign': 'vcenter',
             'bg_color': self.colors.get("gold")})
 
         # format for platinum color
-        plat = workbook1.add_format({
+        plat = self._get_format(workbook1, {
             'bold': 1,
             'align': 'center',
             'valign': 'vcenter',
             'bg_color': self.colors.get("platinum")})
 
         # format for gold black
-        black = workbook1.add_format({
+        black = self._get_format(workbook1, {
             'bold': 1,
             'align': 'center',
             'valign': 'vcenter',
@@ -1492,7 +1491,7 @@ class GenerateFormattedStats:
             'color': self.colors.get("black")})
 
         # format for red color
-        red = workbook1.add_format({
+        red = self._get_format(workbook1, {
             'bold': 1,
             'align': 'center',
             'valign': 'vcenter',
@@ -1511,225 +1510,63 @@ class GenerateFormattedStats:
         # total number of rows
         number_of_rows = len(statistics) + 2
 
-        if not self.comp:    
-            row = 4
-            while row < nrow + 2:
-                index = column_names.index(self.total_patients_column)
-                cell_n = xl_col_to_name(index) + str(row)
-                worksheet.conditional_format(cell_n, {'type': 'text',
-                                                    'criteria': 'containing',
-                                                    'value': 'TRUE',
-                                                    'format': green})
-                row += 1
-
-            
-            def angels_awards_ivt_60(column_name, tmp_column=None):
-                """Add conditional formatting to angels awards for ivt < 60."""
-                row = 4
-                while row < number_of_rows + 2:
-                    cell_n = column_name + str(row)   
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': 'between',
-                                                        'minimum': 50,
-                                                        'maximum': 74.99,
-                                                        'format': gold})
-                    
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '>=',
-                                                        'value': 75,
-                                                        'format': black})
-                    row += 1      
-                    
-                row = 4
-                if tmp_column is not None:
-                    while row < number_of_rows + 2:
-                        cell_n = column_name + str(row)
-                        tmp_value = self.thrombectomy_patients[row-4]
-                        if (float(tmp_value) == 0.0):
-                            worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                            'criteria': '==',
-                                                            'value': 0.0,
-                                                            'format': black})
-                        row += 1
-
-            index = column_names.index('% patients treated with door to thrombolysis < 60 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_60(column)
-
-            index = column_names.index('% patients treated with door to thrombectomy < 120 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_60(column, tmp_column='% recanalization rate out of total ischemic incidence')
-                
-            index = column_names.index('% patients treated with door to recanalization therapy < 60 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_60(column)
-        
-
-            # angels_awards_ivt_60('D')
-
-
-            def angels_awards_ivt_45(column_name, tmp_column=None):
-                """Add conditional formatting to angels awards for ivt < 45."""
-                row = 4
-                while row < number_of_rows + 2:
-                    cell_n = column_name + str(row)
-                    if tmp_column is not None:
-                        worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                            'criteria': 'between',
-                                                            'minimum': 0.99,
-                                                            'maximum': 49.99,
-                                                            'format': plat})
-                    else:
-                        worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                            'criteria': '<=',
-                                                            'value': 49.99,
-                                                            'format': plat})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '>=',
-                                                        'value': 50,
-                                                        'format': black})
-                    row += 1
-
-                if tmp_column is not None:
-                    row = 4
-                    while row < number_of_rows + 2:
-                        cell_n = column_name + str(row)
-                        tmp_value = self.thrombectomy_patients[row-4]
-                        if (float(tmp_value) == 0.0):
-                            worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                            'criteria': '<=',
-                                                            'value': 0.99,
-                                                            'format': black})
-                        row += 1
-                        
-                            
-
-            index = column_names.index('% patients treated with door to thrombolysis < 45 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_45(column)
-
-            index = column_names.index('% patients treated with door to thrombectomy < 90 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_45(column, tmp_column='% recanalization rate out of total ischemic incidence')
-
-            index = column_names.index('% patients treated with door to recanalization therapy < 45 minutes')
-            column = xl_col_to_name(index)
-            angels_awards_ivt_45(column)
-                
-
-            # setting colors of cells according to their values
-            def angels_awards_recan(column_name):
-                """Add conditional formatting to angels awards for recaalization procedures."""
-                row = 4
-                while row < number_of_rows + 2:
-                    cell_n = column_name + str(row)
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': 'between',
-                                                        'minimum': 5,
-                                                        'maximum': 14.99,
-                                                        'format': gold})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': 'between',
-                                                        'minimum': 15,
-                                                        'maximum': 24.99,
-                                                        'format': plat})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '>=',
-                                                        'value': 25,
-                                                        'format': black})
-                    row += 1
-
-            index = column_names.index('% recanalization rate out of total ischemic incidence')
-            angels_awards_recan(column_name=xl_col_to_name(index))
+        if not self.comp:
+            # The data are in the excel rows from 4 to number_of_rows + 1, each rule is added for the whole column
+            first_row = 4
+            last_row = number_of_rows + 1
+            # The excel rows of the sites without patients eligible for thrombectomy
+            no_thrombectomy_rows = [first_row + i for i, value in enumerate(df_tmp['# patients eligible thrombectomy'].tolist()) if float(value) == 0.0]
+
+            def add_conditional_formats(column_name, rules, rows=None):
+                index = column_names.index(column_name)
+                self._add_conditional_formats(worksheet, xl_col_to_name(index), first_row, last_row, rules, rows=rows)
+
+            add_conditional_formats(self.total_patients_column, [
+                {'type': 'text', 'criteria': 'containing', 'value': 'TRUE', 'format': green}])
+
+            # angels awards for ivt < 60
+            for column_name in ['% patients treated with door to thrombolysis < 60 minutes', '% patients treated with door to thrombectomy < 120 minutes', '% patients treated with door to recanalization therapy < 60 minutes']:
+                add_conditional_formats(column_name, [
+                    {'type': 'cell', 'criteria': 'between', 'minimum': 50, 'maximum': 74.99, 'format': gold},
+                    {'type': 'cell', 'criteria': '>=', 'value': 75, 'format': black}])
+            add_conditional_formats('% patients treated with door to thrombectomy < 120 minutes', [
+                {'type': 'cell', 'criteria': '==', 'value': 0.0, 'format': black}], rows=no_thrombectomy_rows)
+
+            # angels awards for ivt < 45
+            for column_name in ['% patients treated with door to thrombolysis < 45 minutes', '% patients treated with door to recanalization therapy < 45 minutes']:
+                add_conditional_formats(column_name, [
+                    {'type': 'cell', 'criteria': '<=', 'value': 49.99, 'format': plat},
+                    {'type': 'cell', 'criteria': '>=', 'value': 50, 'format': black}])
+            add_conditional_formats('% patients treated with door to thrombectomy < 90 minutes', [
+                {'type': 'cell', 'criteria': 'between', 'minimum': 0.99, 'maximum': 49.99, 'format': plat},
+                {'type': 'cell', 'criteria': '>=', 'value': 50, 'format': black}])
+            add_conditional_formats('% patients treated with door to thrombectomy < 90 minutes', [
+                {'type': 'cell', 'criteria': '<=', 'value': 0.99, 'format': black}], rows=no_thrombectomy_rows)
+
+            # angels awards for recanalization procedures
+            add_conditional_formats('% recanalization rate out of total ischemic incidence', [
+                {'type': 'cell', 'criteria': 'between', 'minimum': 5, 'maximum': 14.99, 'format': gold},
+                {'type': 'cell', 'criteria': 'between', 'minimum': 15, 'maximum': 24.99, 'format': plat},
+                {'type': 'cell', 'criteria': '>=', 'value': 25, 'format': black}])
+
+            # angels awards for processes
+            for column_name in ['% suspected stroke patients undergoing CT/MRI', '% all stroke patients undergoing dysphagia screening', '% ischemic stroke patients discharged (home) with antiplatelets', '% afib patients discharged (home) with anticoagulants']:
+                add_conditional_formats(column_name, [
+                    {'type': 'cell', 'criteria': 'between', 'minimum': 80, 'maximum': 84.99, 'format': gold},
+                    {'type': 'cell', 'criteria': 'between', 'minimum': 85, 'maximum': 89.99, 'format': plat},
+                    {'type': 'cell', 'criteria': '>=', 'value': 90, 'format': black}])
+
+            # angels awards for hospitalization
+            add_conditional_formats('% stroke patients treated in a dedicated stroke unit / ICU', [
+                {'type': 'cell', 'criteria': '<=', 'value': 0, 'format': plat},
+                {'type': 'cell', 'criteria': '>=', 'value': 0.99, 'format': black}])
 
-
-            def angels_awards_processes(column_name, count=True):
-                """Add conditional formatting to angels awards for processes."""
-                count = count
-                row = 4
-                while row < number_of_rows + 2:
-                    cell_n = column_name + str(row)
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': 'between',
-                                                        'minimum': 80,
-                                                        'maximum': 84.99,
-                                                        'format': gold})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': 'between',
-                                                        'minimum': 85,
-                                                        'maximum': 89.99,
-                                                        'format': plat})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '>=',
-                                                        'value': 90,
-                                                        'format': black})
-                    row += 1
-
-            index = column_names.index('% suspected stroke patients undergoing CT/MRI')
-            angels_awards_processes(column_name=xl_col_to_name(index))
-            index = column_names.index('% all stroke patients undergoing dysphagia screening')
-            angels_awards_processes(column_name=xl_col_to_name(index))
-            index = column_names.index('% ischemic stroke patients discharged (home) with antiplatelets')
-            angels_awards_processes(column_name=xl_col_to_name(index))
-            index = column_names.index('% afib patients discharged (home) with anticoagulants')
-            angels_awards_processes(column_name=xl_col_to_name(index))
-
-            # setting colors of cells according to their values
-            def angels_awards_hosp(column_name):
-                """Add conditional formatting to angels awards for hospitalization."""
-                row = 4
-                while row < number_of_rows + 2:
-                    cell_n = column_name + str(row)
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '<=',
-                                                        'value': 0,
-                                                        'format': plat})
-
-                    worksheet.conditional_format(cell_n, {'type': 'cell',
-                                                        'criteria': '>=',
-                                                        'value': 0.99,
-                                                        'format': black})
-                    row += 1
-
-            
-            index = column_names.index('% stroke patients treated in a dedicated stroke unit / ICU')
-            angels_awards_hosp(column_name=xl_col_to_name(index))
-
-            
             # set color for proposed angel award
-            def proposed_award(column_name):
-                row = 4
-                while row < nrow + 2:
-                    cell_n = column + str(row)
-                    worksheet.conditional_format(cell_n, {'type': 'text',
-                                                        'criteria': 'containing',
-                                                        'value': 'STROKEREADY',
-                                                        'format': green})
-
-                    worksheet.conditional_format(cell_n, {'type': 'text',
-                                                        'criteria': 'containing',
-                                                        'value': 'GOLD',
-                                                        'format': gold})
-
-                    worksheet.conditional_format(cell_n, {'type': 'text',
-                                                        'criteria': 'containing',
-                                                        'value': 'PLATINUM',
-                                                        'format': plat})
-
-                    worksheet.conditional_format(cell_n, {'type': 'text',
-                                                        'criteria': 'containing',
-                                                        'value': 'DIAMOND',
-                                                        'format': black})
-                    row += 1
-
-            index = column_names.index('Proposed Award')
-            column = xl_col_to_name(index)
-            proposed_award(column)
+            add_conditional_formats('Proposed Award', [
+                {'type': 'text', 'criteria': 'containing', 'value': 'STROKEREADY', 'format': green},
+                {'type': 'text', 'criteria': 'containing', 'value': 'GOLD', 'format': gold},
+                {'type': 'text', 'criteria': 'containing', 'value': 'PLATINUM', 'format': plat},
+                {'type': 'text', 'criteria': 'containing', 'value': 'DIAMOND', 'format': black}])
             
         else:
             pass
@@ -20,6 +20,7 @@ import sqlite3
 import xlsxwriter
 
 import csv
+from xml.sax.saxutils import escape
 
 from pptx import Presentation
 from pptx.chart.data import CategoryChartData, ChartData
@@ -32,6 +33,126 @@ from pptx.enum.dml import MSO_LINE
 from pptx.oxml.xmlchemy import OxmlElement
 
 
+class BarChartData(ChartData):
+    """ The data of the clustered bar chart with one series which writes the chart XML including the colors of the bars, the data labels and the axes at once. The chart is the same as the chart formatted through the chart object but the bars aren't formatted one by one. 
+
+    :param color: the color of the bars
+    :type color: RGBColor
+    :param point_colors: the colors of the bars in the order of categories, they are used instead of `color` (optional)
+    :type point_colors: list
+    :param label_font_size: the font size of the data labels
+    :type label_font_size: Length
+    :param category_font_size: the font size of the tick labels
+    :type category_font_size: Length
+    :param font_name: the font name of the data labels and the tick labels
+    :type font_name: str
+    :param value_axis: `True` if the value axis should be shown
+    :type value_axis: bool
+    :param maximum: the maximum of the shown value axis (the minimum is 0)
+    :type maximum: float
+    """
+
+    def __init__(self, color, point_colors=None, label_font_size=Pt(8), category_font_size=Pt(8), font_name='Century Gothic', value_axis=True, maximum=None):
+        super(BarChartData, self).__init__()
+        self.color = color
+        self.point_colors = point_colors
+        self.label_font_size = label_font_size
+        self.category_font_size = category_font_size
+        self.font_name = font_name
+        self.value_axis = value_axis
+        self.maximum = maximum
+
+    def _get_fill_xml(self, color):
+        """ The function returning the XML of the solid fill. 
+
+        :param color: the color of the fill
+        :type color: RGBColor
+        :returns: the XML of the shape properties
+        :rtype: str
+        """
+        return '<c:spPr><a:solidFill><a:srgbClr val="{0}"/></a:solidFill></c:spPr>'.format(color)
+
+    def _get_text_xml(self, font_size, bold=False):
+        """ The function returning the XML of the text properties of the labels. 
+
+        :param font_size: the font size
+        :type font_size: Length
+        :param bold: `True` if the font is bold
+        :type bold: bool
+        :returns: the XML of the text properties
+        :rtype: str
+        """
+        return '<c:txPr><a:bodyPr/><a:lstStyle/><a:p><a:pPr><a:defRPr sz="{0}"{1}><a:latin typeface="{2}"/></a:defRPr></a:pPr></a:p></c:txPr>'.format(
+            font_size.centipoints, ' b="1"' if bold else '', self.font_name)
+
+    def _get_series_xml(self, series, fill_xml):
+        """ The function returning the XML of the series including the name, the categories and the values with their references to the embedded workbook. 
+
+        :param series: the series of the chart
+        :type series: CategorySeriesData
+        :param fill_xml: the XML of the colors of the bars
+        :type fill_xml: str
+        :returns: the XML of the series
+        :rtype: str
+        """
+        tx_xml = '<c:tx><c:strRef><c:f>{0}</c:f><c:strCache><c:ptCount val="1"/><c:pt idx="0"><c:v>{1}</c:v></c:pt></c:strCache></c:strRef></c:tx>'.format(
+            series.name_ref, escape(series.name))
+        cat_pt_xml = ''.join('<c:pt idx="{0}"><c:v>{1}</c:v></c:pt>'.format(idx, escape(str(category.label))) for idx, category in enumerate(series.categories))
+        cat_xml = '<c:cat><c:strRef><c:f>{0}</c:f><c:strCache><c:ptCount val="{1}"/>{2}</c:strCache></c:strRef></c:cat>'.format(
+            series.categories_ref, len(series.categories), cat_pt_xml)
+        # The missing values are left out
+        val_pt_xml = ''.join('<c:pt idx="{0}"><c:v>{1}</c:v></c:pt>'.format(idx, value) for idx, value in enumerate(series.values) if value is not None)
+        val_xml = '<c:val><c:numRef><c:f>{0}</c:f><c:numCache><c:formatCode>{1}</c:formatCode><c:ptCount val="{2}"/>{3}</c:numCache></c:numRef></c:val>'.format(
+            series.values_ref, series.number_format, len(series), val_pt_xml)
+
+        return '<c:ser><c:idx val="0"/><c:order val="0"/>{0}{1}{2}{3}</c:ser>'.format(tx_xml, fill_xml, cat_xml, val_xml)
+
+    def xml_bytes(self, chart_type):
+        """ The function returning the XML of the chart. 
+
+        :param chart_type: the type of the chart, only XL_CHART_TYPE.BAR_CLUSTERED is supported
+        :type chart_type: XL_CHART_TYPE
+        :returns: the XML of the chart
+        :rtype: bytes
+        :raises: ValueError
+        """
+        if chart_type != XL_CHART_TYPE.BAR_CLUSTERED or len(self) != 1:
+            raise ValueError('BarChartData supports only the clustered bar chart with one series.')
+
+        if self.point_colors is None:
+            fill_xml = self._get_fill_xml(self.color)
+        else:
+            fill_xml = ''.join(
+                '<c:dPt><c:idx val="{0}"/>{1}</c:dPt>'.format(idx, self._get_fill_xml(color)) for idx, color in enumerate(self.point_colors))
+        ser_xml = self._get_series_xml(self[0], fill_xml)
+
+        dlbls_xml = ('<c:dLbls>{0}<c:showLegendKey val="0"/><c:showVal val="1"/><c:showCatName val="0"/><c:showSerName val="0"/>'
+            '<c:showPercent val="0"/><c:showBubbleSize val="0"/><c:showLeaderLines val="1"/></c:dLbls>').format(self._get_text_xml(self.label_font_size, bold=True))
+
+        cat_ax_xml = ('<c:catAx><c:axId val="-2068027336"/><c:scaling><c:orientation val="minMax"/></c:scaling><c:delete val="0"/><c:axPos val="l"/>'
+            '<c:majorTickMark val="none"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+            '<c:spPr><a:ln><a:solidFill><a:srgbClr val="000000"><a:alpha val="0196"/></a:srgbClr></a:solidFill></a:ln></c:spPr>{0}'
+            '<c:crossAx val="-2113994440"/><c:crosses val="autoZero"/><c:auto val="1"/><c:lblAlgn val="ctr"/><c:lblOffset val="100"/>'
+            '<c:noMultiLvlLbl val="0"/></c:catAx>').format(self._get_text_xml(self.category_font_size))
+
+        if self.value_axis:
+            val_ax_xml = '<c:scaling><c:max val="{0}"/><c:min val="0.0"/></c:scaling><c:delete val="0"/>{1}'.format(
+                float(self.maximum), '<c:axPos val="b"/><c:majorTickMark val="out"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>' + self._get_text_xml(self.category_font_size))
+        else:
+            val_ax_xml = '<c:scaling/><c:delete/><c:axPos val="b"/><c:majorTickMark val="out"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+
+        xml = ('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'yes\'?>\n'
+            '<c:chartSpace xmlns:c="http://schemas.openxmlformats.org/drawingml/2006/chart" xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><c:date1904 val="0"/><c:chart><c:autoTitleDeleted val="0"/>'
+            '<c:plotArea><c:barChart><c:barDir val="bar"/><c:grouping val="clustered"/><c:varyColors val="0"/>{0}{1}<c:gapWidth val="100"/>'
+            '<c:axId val="-2068027336"/><c:axId val="-2113994440"/></c:barChart>{2}<c:valAx><c:axId val="-2113994440"/>{3}'
+            '<c:crossAx val="-2068027336"/><c:crosses val="autoZero"/></c:valAx></c:plotArea><c:dispBlanksAs val="gap"/></c:chart>'
+            '<c:txPr><a:bodyPr/><a:lstStyle/><a:p><a:pPr><a:defRPr sz="1800"/></a:pPr><a:endParaRPr lang="en-US"/></a:p></c:txPr></c:chartSpace>').format(
+            ser_xml, dlbls_xml, cat_ax_xml, val_ax_xml)
+
+        return xml.encode('utf-8')
+
+
 class GenerateGraphs:
     """ The class generating presentation with graphs for general reports.
 
@@ -159,8 +280,24 @@ class GenerateGraphs:
         # Set title
         title_placeholders.text = title
 
-        chart_data = ChartData()
-        chart_data.categories = dataframe[self.categories_column].tolist()
+        # If graphs for whole country are generated, set for bar with country with red color
+        # else set to blue color (same color as title uses)
+        site_names = dataframe[self.categories_column].tolist()
+        if (len(dataframe) > 2):
+            point_colors = [RGBColor(128,0,0) if site_name == self.country_name else RGBColor(43, 88, 173) for site_name in site_names]
+        else:
+            point_colors = None
+
+        # The colors, data labels and axes are written with the chart, hide the value axis for the total patients and the median age
+        chart_data = BarChartData(
+            color=RGBColor(43, 88, 173), 
+            point_colors=point_colors, 
+            label_font_size=self.data_label_font_size, 
+            category_font_size=self.category_font_size, 
+            font_name=self.font_name, 
+            value_axis=not ('Total Patients' in column_name or 'Median patient age' in column_name), 
+            maximum=maximum)
+        chart_data.categories = site_names
         chart_data.add_series(column_name, dataframe[column_name].tolist())
 
         # Add chart on slide
@@ -170,72 +307,8 @@ class GenerateGraphs:
             'left': Cm(0.7),
             'top': Cm(2)
             }
-        chart = slide.shapes.add_chart(
-            XL_CHART_TYPE.BAR_CLUSTERED, specs['left'],specs['top'], specs['width'],specs['height'], chart_data).chart
-
-        # Get series of chart
-        series = chart.series[0]
-        # If graphs for whole country are generated, set for bar with country with red color
-        # else set to blue color (same color as title uses)
-        site_names = dataframe[self.categories_column].tolist()
-        if (len(dataframe) > 2):
-            for idx, point in enumerate(series.points):
-                fill = point.format.fill
-                fill.solid()
-                if (site_names[idx] == self.country_name):
-                    fill.fore_color.rgb = RGBColor(128,0,0)
-                else:
-                    fill.fore_color.rgb = RGBColor(43, 88, 173)
-        else:
-            fill = series.format.fill
-            fill.solid()
-            fill.fore_color.rgb = RGBColor(43, 88, 173) 
-
-        # Get plot 
-        plot = chart.plots[0]
-        # Set for each bar same color
-        plot.vary_by_categories = False
-        # Show data labels and set font
-        plot.has_data_labels = True
-        # Change gap width
-        plot.gap_width = 100
-
-        
-        data_labels = plot.data_labels
-        data_labels.font.size = self.data_label_font_size
-        data_labels.font.bold = True
-        data_labels.font.name = self.font_name
-
-        if 'Total Patients' in column_name or 'Median patient age' in column_name:
-            value_axis = chart.value_axis
-            value_axis.visible = False
-            value_axis.has_major_gridlines = False
-        else:
-            # Value for x-axis (change font size, name, and other things)
-            value_axis = chart.value_axis
-            tick_labels = value_axis.tick_labels
-            tick_labels.font.size = self.category_font_size
-            tick_labels.font.name = self.font_name
-            
-            # Don't show major gridlines
-            value_axis.major_tick_mark = XL_TICK_MARK.OUTSIDE
-            value_axis.has_major_gridlines = False
-            # Set range of axis
-            value_axis.maximum_scale = maximum
-            value_axis.minimum_scale = 0
-       
-        # Value for y-axis (change font size, name, and other things)
-        category_axis = chart.category_axis
-        category_axis.format.line.color.rgb = RGBColor(0, 0, 0)
-        solidFill = category_axis.format.line.color._xFill
-        self._set_transparency(100, solidFill)
-
-        # Delete tick marks
-        category_axis.major_tick_mark = XL_TICK_MARK.NONE
-        category_axis.major_unit = 1
-        category_labels = category_axis.tick_labels
-        category_labels.font.size = self.category_font_size
-        category_labels.font.name = self.font_name
+        slide.shapes.add_chart(
+            XL_CHART_TYPE.BAR_CLUSTERED, specs['left'],specs['top'], specs['width'],specs['height'], chart_data)
 
     def _create_stacked_barplot(self, dataframe, title, column_name, legend, number_of_series):
         """ The function creating the normal barplot graph into the presentation based on the graph type. 
@@ -16,6 +16,8 @@ from datetime import datetime, date
 import sqlite3
 import pytz
 from resqdb.GenerateGraphs import GenerateGraphs, GenerateGraphsQuantiles, GenerateGraphsSites
+from resqdb.Fanout import fan_out
+from resqdb.Templates import get_presentation, get_json
 import xlsxwriter
 from pptx import Presentation
 from pptx.util import Cm, Pt, Inches
@@ -39,11 +41,15 @@ class GeneratePresentation:
     :type report: str
     :param quarter: the type of the period eg. Q1_2019
     :type quarter: str
+    :param nprocess: the number of processes generating the presentations of the sites if `split_sites` is `True` (default: the presentations are generated one by one)
+    :type nprocess: int
     """
 
-    def __init__(self, df, country=False, country_code=None, split_sites=False, site=None, report=None, quarter=None, country_name=None):
+    def __init__(self, df, country=False, country_code=None, split_sites=False, site=None, report=None, quarter=None, country_name=None, nprocess=None):
 
         self.df = df.drop_duplicates(subset=['Site ID', 'Total Patients'], keep='first')
+        self.timings = {}
+        self.errors = {}
         self.country_code = country_code
         self.report = report
         self.quarter = quarter
@@ -60,13 +66,10 @@ class GeneratePresentation:
         self.master = os.path.normpath(os.path.join(script_dir, "backgrounds", master_pptx))
 
         legend_path = os.path.join(os.path.dirname(__file__), 'tmp', 'graph_legend.json')
-        with open(legend_path, 'r', encoding='utf-8') as json_file:
-            self._legends = json.load(json_file)
-
+        self._legends = get_json(legend_path)
 
         title_path = os.path.join(os.path.dirname(__file__), 'tmp', 'graph_title.json')
-        with open(title_path, 'r', encoding='utf-8') as json_file:
-            self._titles = json.load(json_file)
+        self._titles = get_json(title_path)
 
         # Connect to database and get country name according to country code.
         def select_country(value):
@@ -99,9 +102,14 @@ class GeneratePresentation:
 
         # Generate formatted statistics for all sites individualy + country as site is included
         if (split_sites) and site is None:
-            for i in site_ids:
-                df = self.df[self.df['Site ID'].isin([i, self.country_name])].copy()
-                self._generate_graphs(df=df, site_code=i)
+            if nprocess is not None and nprocess > 1:
+                # Each process gets only the statistics of its site and the country
+                jobs = ((i, {'df': self.df[self.df['Site ID'].isin([i, self.country_name])].copy(), 'site_code': i}) for i in site_ids)
+                self.timings, self.errors = fan_out(self, '_generate_graphs', jobs, nprocess, exclude=('df',))
+            else:
+                for i in site_ids:
+                    df = self.df[self.df['Site ID'].isin([i, self.country_name])].copy()
+                    self._generate_graphs(df=df, site_code=i)
     
         # Produce formatted statistics for all sites + country as site
         if site is None:
@@ -128,7 +136,7 @@ class GeneratePresentation:
         :type site_code: str
         """
         
-        prs = Presentation(self.master)
+        prs = get_presentation(self.master)
 
         first_slide = prs.slides[0]
         shape = first_slide.shapes[5]
@@ -1046,7 +1054,7 @@ class GeneratePresentationQuantiles:
         :type site_code: str
         """
         
-        prs = Presentation(self.master)
+        prs = get_presentation(self.master)
 
         first_slide = prs.slides[0]
         shape = first_slide.shapes[5]
@@ -1336,7 +1344,7 @@ class GeneratePresentationSites(GeneratePresentation):
         :type site_code: str
         """
         
-        prs = Presentation(self.master)
+        prs = get_presentation(self.master)
 
         first_slide = prs.slides[0]
         shape = first_slide.shapes[5]
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Harmonization.py
+Package: resq
+Version comment: Declarative rules harmonizing older CRF versions (RES-Q v1.2, IVT/TBY, DEVCZ10) to RES-Q v2.0.
+"""
+
+import logging
+import collections
+import numpy as np
+import pandas as pd
+
+# A rule sets `column` to `value` in the rows matching all conditions in `when`. Each condition is a tuple (column, operator, operand). If `column` doesn't exist yet, it is created and filled with `default` for the rows not matching the conditions.
+Rule = collections.namedtuple('Rule', ['when', 'column', 'value', 'default'])
+Rule.__new__.__defaults__ = (None,)
+
+# The value is copied from the column in the matching rows.
+Copy = collections.namedtuple('Copy', ['column'])
+# The value is mapped from the column, the values not in the mapping are replaced by default.
+Map = collections.namedtuple('Map', ['column', 'mapping', 'default'])
+# The function is called once per unique combination of values in the columns and the results are broadcasted to the matching rows.
+Apply = collections.namedtuple('Apply', ['columns', 'func'])
+
+
+def get_tmp_antithrombotics(col_vals, afib):
+    """ The function converting the value for antitrombotics from IVT/TBY form to RES-Q v2.0.
+
+    :param col_vals: list of values for antithrombotcs in IVT/TBY (checkboxes in the form)
+    :type col_vals: list
+    :param afib: seelcted value for afib
+    :type afib: int
+    :returns: mapped value
+    :rtype: int
+    """
+
+    if col_vals is not None and not pd.isnull(col_vals):
+        vals_str = col_vals.split(',') # Split selected values using , as seperator
+        vals = list(map(int, vals_str)) # Convert string values to integers
+        antiplatelets_vals = [1,2,3,4,5,6] # antiplatelets values in IVT/TBY
+        anticoagulants_vals = [8,9,10,11,12,13,14] # anticoagulants values in IVT/TBY
+        antiplatelets_recs = 7 # antiplatelets recommended
+        anticoagulants_recs = 15 # anticoagulants recommended
+        nothing = 16 # nothing
+
+        # mapping anticoagulants
+        anticoagulants_dict = {
+            8: 2, # warfarin
+            9: 3, # dabigatran
+            10: 4, # rivaroxaban
+            11: 5, # apixaban
+            12: 6, # edoxaban
+            13: 7, # LMWH or heparin in prophylactic dose
+            14: 8, # LMWH or heparin in full anticoagulant dose
+        }
+
+        res = None
+        # default value (now deleted by Mirek)
+        if len(vals) > 15:
+            res = None
+        # nothing prescribed
+        elif nothing in vals:
+            res = 10
+        else:
+            # if AFIB not detected or not know we are interested only in antiplatelets, if antiplatelets recommended value in vals set result to 9 (not prescribed, but recommended), else check if some value from antiplatelets_vals is in vals, and if yes set result to 1 (antiplatelets) else set result to 10 (nothing)
+            if afib in [4,5]:
+                if antiplatelets_recs in vals:
+                    res = 9
+                else:
+                    # Antiplatelets values which are in selected antithrombotics
+                    x = set(antiplatelets_vals).intersection(set(vals))
+                    if bool(x):
+                        res = 1
+                    else:
+                        res = 10
+            # if AFIB known or detected we are interested only in anticoagulants, if anticoagulants recommended value in vals set result to 9 (not prescribed, but recommended), else check if some value from anticoagulants_vals is in vals, and if yes map value based on anticoagulants_dict else set result to 10 (nothing)
+            elif afib in [1,2,3]:
+                if anticoagulants_recs in vals:
+                    res = 9
+                else:
+                    # Anticoagulant values which are in selected antithrombotics
+                    x = set(anticoagulants_vals).intersection(set(vals))
+                    if bool(x):
+                        for val in x:
+                            res = anticoagulants_dict[val]
+                    else:
+                        x = set(antiplatelets_vals).intersection(set(vals))
+                        if bool(x):
+                            res = 1
+                        else:
+                            res = 10
+
+        return res
+    else:
+        return None
+
+
+# RES-Q v1.2 -> RES-Q v2.0 (raw column names from resq_mix)
+RESQV12 = (('oc_oid', 'contains', 'RESQV12'),)
+RESQV12_RULES = [
+    Rule(RESQV12, 'bleeding_reason_en', -999),
+    Rule(RESQV12, 'intervention_en', -999),
+    Rule(RESQV12, 'recurrent_stroke_en', -999),
+    Rule(RESQV12, 'ventilator_en', -999),
+    Rule(RESQV12 + (('stroke_type_en', '==', 2),), 'neurosurgery_en', 3),
+    Rule(RESQV12, 'bleeding_source_en', 3),
+    Rule(RESQV12, 'cerebrovascular_expert_en', -999),
+    # Discharge same facility is 1 if discharge destination is 2, else -999
+    Rule(RESQV12, 'discharge_same_facility_en', Map('discharge_destination_en', {2: 1}, -999)),
+    # Discharge other facility is 3 if discharge destination is 3, else -999
+    Rule(RESQV12, 'discharge_other_facility_en', Map('discharge_destination_en', {3: 3}, -999)),
+    Rule(RESQV12, 'discharge_other_facility_o2_en', -999),
+    Rule(RESQV12, 'discharge_other_facility_o1_en', -999),
+    # Discharge other facility O3 is 4 if discharge destination is 3, else -999
+    Rule(RESQV12, 'discharge_other_facility_o3_en', Map('discharge_destination_en', {3: 4}, -999)),
+    Rule(RESQV12, 'department_type_en', -999),
+]
+
+# IVT/TBY (raw column names from ivttby_mix), CT time is taken from the second field if the first one is empty
+IVTTBY_RAW_RULES = [
+    Rule((('ct_mri_cz', 'isin', (1, 2, 3, 4, 5, 6)), ('ct_time_cz', 'isnull', None)), 'ct_time_cz', Copy('ct_time_2_cz')),
+]
+
+# IVT/TBY (renamed columns), admission times are created from hospital time to keep previous calculation and setting, antithrombotics are converted to RES-Q v2.0
+DEVCZ10 = (('crf_parent_name', 'contains', 'DEVCZ10'),)
+NOT_DEVCZ10 = (('crf_parent_name', 'not contains', 'DEVCZ10'),)
+IVTTBY_RULES = [
+    Rule((('IVT_ONLY', '==', 2),), 'IVT_ONLY_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('IVT_TBY', '==', 2),), 'IVT_TBY_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('IVT_TBY_REFER', '==', 2),), 'IVT_TBY_REFER_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('TBY_ONLY', '==', 2),), 'TBY_ONLY_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('TBY_REFER', '==', 2),), 'TBY_REFER_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('TBY_REFER_ALL', '==', 2),), 'TBY_REFER_ALL_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule((('TBY_REFER_LIM', '==', 2),), 'TBY_REFER_LIM_ADMISSION_TIME', Copy('HOSPITAL_TIME')),
+    Rule(DEVCZ10, 'ANTITHROMBOTICS_TMP', Apply(('ANTITHROMBOTICS_TMP',), int)),
+    Rule(NOT_DEVCZ10, 'ANTITHROMBOTICS', Apply(('ANTITHROMBOTICS_TMP', 'AFIB_FLUTTER'), get_tmp_antithrombotics)),
+    Rule(DEVCZ10, 'ANTITHROMBOTICS', Copy('ANTITHROMBOTICS_TMP')),
+]
+
+
+def _get_condition(df, condition):
+    """ The function evaluating one condition of the rule over the whole column.
+
+    :param df: the dataframe
+    :type df: pandas dataframe
+    :param condition: the tuple (column, operator, operand)
+    :type condition: tuple
+    :returns: the boolean mask
+    :rtype: numpy array
+    :raises: ValueError
+    """
+    column, operator, operand = condition
+    values = df[column]
+    if operator == 'contains':
+        mask = values.astype(str).str.contains(operand, regex=False) & values.notnull()
+    elif operator == 'not contains':
+        mask = ~values.astype(str).str.contains(operand, regex=False) & values.notnull()
+    elif operator == '==':
+        mask = values == operand
+    elif operator == 'isin':
+        mask = values.isin(operand)
+    elif operator == 'not isin':
+        mask = ~values.isin(operand)
+    elif operator == '>':
+        mask = values > operand
+    elif operator == '<=':
+        mask = values <= operand
+    elif operator == 'isnull':
+        mask = values.isnull()
+    elif operator == 'notnull':
+        mask = values.notnull()
+    else:
+        raise ValueError('Unknown operator {0} in the harmonization rule for column {1}.'.format(operator, column))
+
+    return mask.to_numpy(dtype=bool)
+
+
+def _get_values(df, mask, value):
+    """ The function returning the values to be assigned into the rows matching the mask.
+
+    :param df: the dataframe
+    :type df: pandas dataframe
+    :param mask: the boolean mask of the matching rows
+    :type mask: numpy array
+    :param value: the scalar value, Copy, Map or Apply
+    :type value: object
+    :returns: the scalar or array of values
+    :rtype: object
+    """
+    if isinstance(value, Copy):
+        return df.loc[mask, value.column].to_numpy()
+    elif isinstance(value, Map):
+        source = df.loc[mask, value.column]
+        mapped = source.map(value.mapping).where(source.isin(list(value.mapping.keys())), value.default)
+        return mapped.to_numpy()
+    elif isinstance(value, Apply):
+        columns = list(value.columns)
+        source = df.loc[mask, columns]
+        # Call the function only once for each unique combination of values
+        codes = source.groupby(columns, dropna=False, sort=False).ngroup()
+        first = ~codes.duplicated()
+        results = {code: value.func(*row) for code, row in zip(codes[first], source[first].itertuples(index=False, name=None))}
+        return codes.map(results).to_numpy()
+    else:
+        return value
+
+
+def harmonize(df, rules):
+    """ The function applying the harmonization rules on the dataframe. The boolean mask is computed only once per unique set of conditions and the values are assigned columnwise. The masks are recomputed only if some rule modified the column used in the conditions.
+
+    :param df: the dataframe (modified in place)
+    :type df: pandas dataframe
+    :param rules: the list of rules
+    :type rules: list
+    :returns: the harmonized dataframe
+    :rtype: pandas dataframe
+    """
+    masks = {}
+    for rule in rules:
+        if rule.when not in masks:
+            mask = np.ones(len(df), dtype=bool)
+            for condition in rule.when:
+                mask &= _get_condition(df, condition)
+            masks[rule.when] = mask
+        mask = masks[rule.when]
+
+        if rule.column not in df.columns:
+            df[rule.column] = rule.default
+            df[rule.column] = df[rule.column].astype(object)
+
+        if mask.any():
+            # The column is rebuilt instead of assigning into it, the values can have other type than the column (eg. numbers in the column of strings)
+            column = df[rule.column].to_numpy(dtype=object, copy=True)
+            column[mask] = _get_values(df, mask, rule.value)
+            df[rule.column] = pd.Series(column, index=df.index).infer_objects()
+
+        # Invalidate masks depending on the modified column
+        masks = {when: m for when, m in masks.items() if rule.column not in [c[0] for c in when]}
+
+    logging.info("Harmonization: {0} rules were applied.".format(len(rules)))
+    return df
@@ -0,0 +1,657 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Metrics.py
+Package: resq
+Version comment: Declarative registry of the indicators evaluated only on demand in the dependency order.
+"""
+
+import logging
+import collections
+import numpy as np
+import pandas as pd
+import scipy.stats as st
+from resqdb.Harmonization import _get_condition
+from resqdb.Rollup import get_runs, rollup_counts, rollup_runs, get_medians
+
+# A population is the subset of the patients of its parent population matching all conditions in `when` (the conditions are the same as in the harmonization rules). If `skip_if_empty` is set and the population with this name has no patients in the whole dataset (or in the partition of the dataset, eg. the period), the conditions are skipped and the population is the same as its parent.
+Population = collections.namedtuple('Population', ['name', 'parent', 'when', 'skip_if_empty'])
+Population.__new__.__defaults__ = (None,)
+# The condition is true if any of the conditions is true.
+Any = collections.namedtuple('Any', ['conditions'])
+# The condition is true if all of the conditions are true.
+All = collections.namedtuple('All', ['conditions'])
+
+# The number of patients in the population per site.
+Count = collections.namedtuple('Count', ['name', 'population'])
+# The sum of the metrics in `add` minus the metrics in `subtract`.
+Sum = collections.namedtuple('Sum', ['name', 'add', 'subtract'])
+Sum.__new__.__defaults__ = ((),)
+# The percentage of the numerator out of the denominator, 0 if the denominator is not greater than 0.
+Percentage = collections.namedtuple('Percentage', ['name', 'numerator', 'denominator'])
+# The value of the metric `value` if the metric `compare` is greater than the metric `to`, else the value of the metric `otherwise`.
+Choose = collections.namedtuple('Choose', ['name', 'compare', 'to', 'value', 'otherwise'])
+# The median of the column in the population per site.
+Median = collections.namedtuple('Median', ['name', 'population', 'column'])
+# The lower or upper bound (`bound` is 'low' or 'high') of the confidence interval of the median of the column in the population per site.
+MedianInterval = collections.namedtuple('MedianInterval', ['name', 'population', 'column', 'bound'])
+
+
+POPULATIONS = [
+    Population('all', None, ()),
+    Population('isch', 'all', (('STROKE_TYPE', 'isin', (1,)),)),
+    Population('is_tia', 'all', (('STROKE_TYPE', 'isin', (1, 3)),)),
+    Population('is_ich', 'all', (('STROKE_TYPE', 'isin', (1, 2)),)),
+    Population('is_ich_cvt', 'all', (('STROKE_TYPE', 'isin', (1, 2, 5)),)),
+    Population('is_ich_tia_cvt', 'all', (('STROKE_TYPE', 'isin', (1, 2, 3, 5)),)),
+    # Stroke unit
+    Population('stroke_unit', 'all', (('HOSPITALIZED_IN', '==', 1),)),
+    # CT/MRI, patients referred for the recanalization procedure are excluded
+    Population('is_ich_tia_cvt_not_referred', 'is_ich_tia_cvt', (Any((('STROKE_TYPE', 'not isin', (1,)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6, 7, 8)))),)),
+    Population('ct_mri_performed', 'is_ich_tia_cvt_not_referred', (('CT_MRI', '==', 2),)),
+    # Recanalization
+    Population('recanalized', 'isch', (Any((('IVT_DONE', 'isin', (1,)), ('TBY_DONE', 'isin', (1,)))),)),
+    Population('recanalized_denominator', 'isch', (Any((('IVT_DONE', 'isin', (1,)), ('TBY_DONE', 'isin', (1,)), ('RECANALIZATION_PROCEDURES', 'isin', (1,)))),)),
+    # Thrombolysis, the patients with stroke in the hospital are excluded
+    Population('ivt', 'isch', (('IVT_DONE', 'isin', (1,)), ('HOSPITAL_STROKE_IVT_TIMESTAMPS', 'not isin', (1,)))),
+    Population('ivt_wrong', 'ivt', (Any((('IVTPA', '<=', 0), ('IVTPA', 'isnull', None))),)),
+    Population('ivt_dtn', 'ivt', (('IVTPA', '>', 0), ('IVTPA', '<=', 400))),
+    Population('ivt_under_60', 'ivt', (('IVTPA', '>', 0), ('IVTPA', '<=', 60))),
+    Population('ivt_under_45', 'ivt', (('IVTPA', '>', 0), ('IVTPA', '<=', 45))),
+    # Thrombectomy, the patients with stroke in the hospital are excluded
+    Population('tby', 'isch', (('TBY_DONE', 'isin', (1,)), ('HOSPITAL_STROKE_TBY_TIMESTAMPS', 'not isin', (1,)))),
+    Population('tby_wrong', 'tby', (Any((('TBY', '<=', 0), ('TBY', 'isnull', None))),)),
+    Population('tby_dtg', 'tby', (('TBY', '>', 0), ('TBY', '<=', 700))),
+    Population('tby_under_120', 'tby', (('TBY', '>', 0), ('TBY', '<=', 120))),
+    Population('tby_under_90', 'tby', (('TBY', '>', 0), ('TBY', '<=', 90))),
+    Population('tby_only', 'tby', (Any((('IVT_DONE', '==', 0), ('IVT_DONE', 'isnull', None))),)),
+    Population('tby_only_under_60', 'tby_only', (('TBY', '>', 0), ('TBY', '<=', 60))),
+    Population('tby_only_under_45', 'tby_only', (('TBY', '>', 0), ('TBY', '<=', 45))),
+    # Dysphagia screening
+    Population('dysphagia_screening', 'is_ich_cvt', ()),
+    Population('dysphagia_screening_guss', 'dysphagia_screening', (('DYSPHAGIA_SCREENING', '==', 1),)),
+    Population('dysphagia_screening_other', 'dysphagia_screening', (('DYSPHAGIA_SCREENING', '==', 2),)),
+    Population('dysphagia_screening_not_done', 'dysphagia_screening', (('DYSPHAGIA_SCREENING', '==', 4),)),
+    # Antiplatelets, ischemic stroke patients without aFib alive and not referred for the recanalization procedure
+    Population('antiplatelets', 'is_tia', (('DISCHARGE_DESTINATION', 'not isin', (5,)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)), ('STROKE_TYPE', 'isin', (1,)), ('AFIB_FLUTTER', 'isin', (4, 5)))),
+    Population('antiplatelets_prescribed', 'antiplatelets', (('ANTITHROMBOTICS', '==', 1),)),
+    Population('antiplatelets_except_recommended', 'antiplatelets', (('ANTITHROMBOTICS', 'not isin', (9, 11)),)),
+    # If nobody was discharged home, all discharged patients are included
+    Population('antiplatelets_home', 'antiplatelets', (('DISCHARGE_DESTINATION', 'isin', (1,)),), 'antiplatelets_home'),
+    Population('antiplatelets_prescribed_home', 'antiplatelets_home', (('ANTITHROMBOTICS', '==', 1),)),
+    Population('antiplatelets_except_recommended_home', 'antiplatelets_home', (('ANTITHROMBOTICS', 'not isin', (9, 11)),)),
+    # Anticoagulants, patients with aFib not referred for the recanalization procedure
+    Population('afib_not_referred', 'is_tia', (('AFIB_FLUTTER', 'isin', (1, 2, 3)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)))),
+    Population('anticoagulants', 'afib_not_referred', (('ANTITHROMBOTICS', 'not isin', (1, 10, 9, 11)), ('DISCHARGE_DESTINATION', 'not isin', (5,)))),
+    Population('afib_discharged', 'afib_not_referred', (('DISCHARGE_DESTINATION', 'not isin', (5,)), ('ANTITHROMBOTICS', 'not isin', (1, 9, 11)))),
+    # If nobody with anticoagulants was discharged home, all discharged patients are included
+    Population('anticoagulants_home', 'anticoagulants', (('DISCHARGE_DESTINATION', 'isin', (1,)),), 'anticoagulants_home'),
+    Population('afib_discharged_home', 'afib_discharged', (('DISCHARGE_DESTINATION', 'isin', (1,)),), 'anticoagulants_home'),
+]
+
+# In CZ the patients referred for the recanalization procedure in the IVT/TBY form are excluded and CVT is not included
+CZ_POPULATIONS = [
+    Population('dysphagia_screening', 'is_ich', (Any((('crf_parent_name', 'not isin', ('F_RESQ_IVT_TBY_CZ_4',)), ('RECANALIZATION_PROCEDURES', 'not isin', (5, 6)))),)),
+]
+
+METRICS = [
+    Count('isch_patients', 'isch'),
+    # Stroke unit
+    Count('# stroke patients treated in a dedicated stroke unit / ICU', 'stroke_unit'),
+    Percentage('% stroke patients treated in a dedicated stroke unit / ICU', '# stroke patients treated in a dedicated stroke unit / ICU', 'Total Patients'),
+    # CT/MRI
+    Count('is_ich_tia_cvt_not_referred_patients', 'is_ich_tia_cvt_not_referred'),
+    Count('# suspected stroke patients undergoing CT/MRI', 'ct_mri_performed'),
+    Percentage('% suspected stroke patients undergoing CT/MRI', '# suspected stroke patients undergoing CT/MRI', 'is_ich_tia_cvt_not_referred_patients'),
+    # Recanalization rate
+    Count('# patients recanalized', 'recanalized'),
+    Count('recanalized_denominator_patients', 'recanalized_denominator'),
+    Percentage('% patients recanalized', '# patients recanalized', 'recanalized_denominator_patients'),
+    Count('# recanalization rate out of total ischemic incidence', 'recanalized'),
+    Percentage('% recanalization rate out of total ischemic incidence', '# recanalization rate out of total ischemic incidence', 'recanalized_denominator_patients'),
+    # Thrombolysis
+    Count('# IV tPa', 'ivt'),
+    Percentage('% IV tPa', '# IV tPa', 'isch_patients'),
+    Median('Median DTN (minutes)', 'ivt_dtn', 'IVTPA'),
+    MedianInterval('Median DTN CI low', 'ivt_dtn', 'IVTPA', 'low'),
+    MedianInterval('Median DTN CI high', 'ivt_dtn', 'IVTPA', 'high'),
+    Count('wrong_ivtpa', 'ivt_wrong'),
+    Sum('# patients eligible thrombolysis', ('# IV tPa',), ('wrong_ivtpa',)),
+    Count('# patients treated with door to thrombolysis < 60 minutes', 'ivt_under_60'),
+    Percentage('% patients treated with door to thrombolysis < 60 minutes', '# patients treated with door to thrombolysis < 60 minutes', '# patients eligible thrombolysis'),
+    Count('# patients treated with door to thrombolysis < 45 minutes', 'ivt_under_45'),
+    Percentage('% patients treated with door to thrombolysis < 45 minutes', '# patients treated with door to thrombolysis < 45 minutes', '# patients eligible thrombolysis'),
+    # Thrombectomy
+    Count('# TBY', 'tby'),
+    Percentage('% TBY', '# TBY', 'isch_patients'),
+    Median('Median DTG (minutes)', 'tby_dtg', 'TBY'),
+    Count('wrong_tby', 'tby_wrong'),
+    Sum('# patients eligible thrombectomy', ('# TBY',), ('wrong_tby',)),
+    Count('# patients treated with door to thrombectomy < 120 minutes', 'tby_under_120'),
+    Percentage('% patients treated with door to thrombectomy < 120 minutes', '# patients treated with door to thrombectomy < 120 minutes', '# patients eligible thrombectomy'),
+    Count('# patients treated with door to thrombectomy < 90 minutes', 'tby_under_90'),
+    Percentage('% patients treated with door to thrombectomy < 90 minutes', '# patients treated with door to thrombectomy < 90 minutes', '# patients eligible thrombectomy'),
+    # Recanalization therapy, thrombolysis or thrombectomy alone
+    Count('tby_only_under_60_patients', 'tby_only_under_60'),
+    Sum('# patients treated with door to recanalization therapy < 60 minutes', ('# patients treated with door to thrombolysis < 60 minutes', 'tby_only_under_60_patients')),
+    Percentage('% patients treated with door to recanalization therapy < 60 minutes', '# patients treated with door to recanalization therapy < 60 minutes', '# patients recanalized'),
+    Count('tby_only_under_45_patients', 'tby_only_under_45'),
+    Sum('# patients treated with door to recanalization therapy < 45 minutes', ('# patients treated with door to thrombolysis < 45 minutes', 'tby_only_under_45_patients')),
+    Percentage('% patients treated with door to recanalization therapy < 45 minutes', '# patients treated with door to recanalization therapy < 45 minutes', '# patients recanalized'),
+    # Dysphagia screening
+    Count('# dysphagia screening - Guss test', 'dysphagia_screening_guss'),
+    Count('# dysphagia screening - Other test', 'dysphagia_screening_other'),
+    Count('# dysphagia screening - Not done', 'dysphagia_screening_not_done'),
+    Sum('# all stroke patients undergoing dysphagia screening', ('# dysphagia screening - Guss test', '# dysphagia screening - Other test')),
+    Sum('dysphagia_screening_denominator', ('# all stroke patients undergoing dysphagia screening', '# dysphagia screening - Not done')),
+    Percentage('% all stroke patients undergoing dysphagia screening', '# all stroke patients undergoing dysphagia screening', 'dysphagia_screening_denominator'),
+    # Antiplatelets
+    Count('except_recommended_patients', 'antiplatelets_except_recommended'),
+    Count('# ischemic stroke patients discharged with antiplatelets', 'antiplatelets_prescribed'),
+    Percentage('% ischemic stroke patients discharged with antiplatelets', '# ischemic stroke patients discharged with antiplatelets', 'except_recommended_patients'),
+    Count('except_recommended_discharged_home_patients', 'antiplatelets_except_recommended_home'),
+    Count('# ischemic stroke patients discharged home with antiplatelets', 'antiplatelets_prescribed_home'),
+    Percentage('% ischemic stroke patients discharged home with antiplatelets', '# ischemic stroke patients discharged home with antiplatelets', 'except_recommended_discharged_home_patients'),
+    Choose('# ischemic stroke patients discharged (home) with antiplatelets', '# ischemic stroke patients discharged with antiplatelets', '# ischemic stroke patients discharged home with antiplatelets', '# ischemic stroke patients discharged with antiplatelets', '# ischemic stroke patients discharged home with antiplatelets'),
+    Choose('% ischemic stroke patients discharged (home) with antiplatelets', '% ischemic stroke patients discharged with antiplatelets', '% ischemic stroke patients discharged home with antiplatelets', '% ischemic stroke patients discharged with antiplatelets', '% ischemic stroke patients discharged home with antiplatelets'),
+    # Anticoagulants
+    Count('# afib patients discharged with anticoagulants', 'anticoagulants'),
+    Count('afib_detected_discharged_patients', 'afib_discharged'),
+    Percentage('% afib patients discharged with anticoagulants', '# afib patients discharged with anticoagulants', 'afib_detected_discharged_patients'),
+    Count('# afib patients discharged home with anticoagulants', 'anticoagulants_home'),
+    Count('afib_detected_discharged_home_patients', 'afib_discharged_home'),
+    Percentage('% afib patients discharged home with anticoagulants', '# afib patients discharged home with anticoagulants', 'afib_detected_discharged_home_patients'),
+    Choose('# afib patients discharged (home) with anticoagulants', '% afib patients discharged with anticoagulants', '% afib patients discharged home with anticoagulants', '# afib patients discharged with anticoagulants', '# afib patients discharged home with anticoagulants'),
+    Choose('% afib patients discharged (home) with anticoagulants', '% afib patients discharged with anticoagulants', '% afib patients discharged home with anticoagulants', '% afib patients discharged with anticoagulants', '% afib patients discharged home with anticoagulants'),
+]
+
+# The metrics used to calculate the proposed Angels Awards
+ANGELS_AWARDS = [
+    '% patients treated with door to recanalization therapy < 60 minutes',
+    '% patients treated with door to recanalization therapy < 45 minutes',
+    '% patients treated with door to thrombolysis < 60 minutes',
+    '% patients treated with door to thrombolysis < 45 minutes',
+    '% patients treated with door to thrombectomy < 120 minutes',
+    '% patients treated with door to thrombectomy < 90 minutes',
+    '% recanalization rate out of total ischemic incidence',
+    '% suspected stroke patients undergoing CT/MRI',
+    '% all stroke patients undergoing dysphagia screening',
+    '% ischemic stroke patients discharged (home) with antiplatelets',
+    '% afib patients discharged (home) with anticoagulants',
+    '% stroke patients treated in a dedicated stroke unit / ICU',
+    '# patients eligible thrombectomy',
+    '# patients eligible thrombolysis',
+]
+
+
+def get_site_values(values, site_ids):
+    """ The function aligning the values calculated per site with the list of sites. The sites without value get 0.
+
+    :param values: the values indexed by Protocol ID (or by the multiindex of the keys)
+    :type values: pandas series
+    :param site_ids: the Protocol IDs of the sites (can contain duplicates) or the multiindex of the keys
+    :type site_ids: pandas series
+    :returns: the array of values in the order of the sites
+    :rtype: numpy array
+    """
+    values = values.reindex(site_ids)
+    if values.isnull().any():
+        values = values.fillna(0)
+
+    return values.to_numpy()
+
+
+def get_percentage(numerator, denominator):
+    """ The function calculating the percentage of patients rounded to 2 decimal places. If the denominator is not greater than 0, the percentage is 0.
+
+    :param numerator: the number of patients
+    :type numerator: array-like
+    :param denominator: the number of patients in the population
+    :type denominator: array-like
+    :returns: the array of percentages
+    :rtype: numpy array
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    percentage = np.zeros(len(numerator))
+    valid = denominator > 0
+    # Python round is used instead of np.round, which rounds the halves differently (eg. 0.025 -> 0.02)
+    percentage[valid] = [round(x, 2) for x in (numerator[valid] / denominator[valid] * 100).tolist()]
+
+    return percentage
+
+
+def get_median_intervals(runs, confidence=0.95, method='order', resamples=1000, seed=0):
+    """ The function calculating the median and its confidence interval for all groups at once. Each group is a segment of one sorted array (see :func:`resqdb.Rollup.get_runs`), so the order statistics of all groups are read by the indexes of the segments. The `order` method returns the distribution-free interval given by the order statistics of the binomial distribution. The `bootstrap` method resamples the positions in the segments instead of the values, because the sorted positions give the sorted values, so the medians of all groups are calculated by one sort per chunk of resamples.
+
+    :param runs: the sorted values per group
+    :type runs: Runs
+    :param confidence: the confidence level of the interval
+    :type confidence: float
+    :param method: `order` or `bootstrap`
+    :type method: str
+    :param resamples: the number of resamples of the bootstrap
+    :type resamples: int
+    :param seed: the seed of the random generator of the bootstrap, the intervals are reproducible
+    :type seed: int
+    :returns: the dataframe with the columns median, low and high indexed by the groups, the groups without values are not included
+    :rtype: pandas dataframe
+    :raises: ValueError
+    """
+    included = runs.sizes > 0
+    uniques, values, starts, sizes = runs.index[included], runs.values, runs.starts[included], runs.sizes[included]
+    # The middle values of the segments, the same for the odd sizes
+    lower = starts + (sizes - 1) // 2
+    upper = starts + sizes // 2
+    median = (values[lower] + values[upper]) / 2
+    alpha = 1 - confidence
+
+    if method == 'order':
+        # The rank r of the lower bound, the median is between the r-th smallest and the r-th largest value with the probability of at least the confidence
+        rank = np.maximum(st.binom.ppf(alpha / 2, sizes, 0.5).astype(np.int64), 1)
+        low = values[starts + rank - 1]
+        high = values[starts + sizes - rank]
+    elif method == 'bootstrap':
+        rng = np.random.default_rng(seed)
+        segments = np.repeat(np.arange(len(sizes)), sizes)
+        first, size = starts[segments], sizes[segments]
+        # The resamples are processed in chunks of about 10 million positions
+        chunk = max(1, 10000000 // max(len(values), 1))
+        medians = np.empty((resamples, len(sizes)))
+        for i in range(0, resamples, chunk):
+            n = min(chunk, resamples - i)
+            positions = first + (rng.random((n, len(values))) * size).astype(np.int64)
+            # The segments don't overlap, so the sorted positions of each segment stay in the segment
+            positions.sort(axis=1)
+            medians[i:i + n] = (values[positions[:, lower]] + values[positions[:, upper]]) / 2
+        low, high = np.percentile(medians, [alpha / 2 * 100, (1 - alpha / 2) * 100], axis=0)
+    else:
+        raise ValueError('Unknown method {0} of the confidence interval.'.format(method))
+
+    return pd.DataFrame({'median': median, 'low': low, 'high': high}, index=uniques)
+
+
+def get_dependencies(metric):
+    """ The function returning the names of the metrics the metric depends on.
+
+    :param metric: the metric
+    :type metric: Count, Sum, Percentage, Choose, Median or MedianInterval
+    :returns: the list of names
+    :rtype: list
+    """
+    if isinstance(metric, Sum):
+        return list(metric.add) + list(metric.subtract)
+    elif isinstance(metric, Percentage):
+        return [metric.numerator, metric.denominator]
+    elif isinstance(metric, Choose):
+        return [metric.compare, metric.to, metric.value, metric.otherwise]
+    else:
+        return []
+
+
+def get_columns(country_code=''):
+    """ The function returning the columns of the preprocessed data used by the populations and metrics of the registry.
+
+    :param country_code: the country code, the populations are adjusted for some countries (eg. CZ)
+    :type country_code: str
+    :returns: the list of columns
+    :rtype: list
+    """
+    populations = POPULATIONS + CZ_POPULATIONS if country_code == 'CZ' else POPULATIONS
+    conditions = [condition for population in populations for condition in population.when]
+    columns = []
+    while conditions:
+        condition = conditions.pop(0)
+        if isinstance(condition, Any):
+            conditions.extend(condition.conditions)
+        else:
+            columns.append(condition[0])
+    columns += [metric.column for metric in METRICS if isinstance(metric, (Median, MedianInterval))]
+
+    return list(dict.fromkeys(columns))
+
+
+class MaskCache:
+    """ The cache of the boolean masks of the patients matching the conditions (the conditions are the same as in the harmonization rules). The masks are packed into bits (8 patients per byte) and keyed by the conditions, so each condition is evaluated only once per run and the subsets are evaluated as intersections of the cached masks. The rows are materialized only when the values of the subset are needed.
+
+    :param df: the dataframe with the patients, the dataframe can't be modified while the cache is used
+    :type df: pandas dataframe
+    """
+
+    def __init__(self, df):
+
+        self.df = df
+        self.size = len(df)
+        # The packed masks of the single conditions and of the tuples of conditions
+        self.conditions = {}
+        self.masks = {}
+        # The codes of the values used to count the patients
+        self.codes = {}
+
+    def _get_condition(self, condition):
+        """ The function returning the packed mask of the condition.
+
+        :param condition: the tuple (column, operator, operand), Any or All
+        :type condition: tuple
+        :returns: the packed mask
+        :rtype: numpy array
+        """
+        if condition not in self.conditions:
+            if isinstance(condition, Any):
+                packed = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+                for c in condition.conditions:
+                    packed = packed | self._get_condition(c)
+            elif isinstance(condition, All):
+                packed = self.get_packed(condition.conditions)
+            else:
+                packed = np.packbits(_get_condition(self.df, condition))
+            self.conditions[condition] = packed
+
+        return self.conditions[condition]
+
+    def get_packed(self, conditions):
+        """ The function returning the packed mask of the patients matching all conditions.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :returns: the packed mask
+        :rtype: numpy array
+        """
+        conditions = tuple(conditions)
+        if conditions not in self.masks:
+            if not conditions:
+                packed = np.packbits(np.ones(self.size, dtype=bool))
+            else:
+                # The conditions are usually extending the conditions of the parent population, which are already in the cache
+                packed = self.get_packed(conditions[:-1]) & self._get_condition(conditions[-1])
+            self.masks[conditions] = packed
+
+        return self.masks[conditions]
+
+    def get_mask(self, conditions):
+        """ The function returning the boolean mask of the patients matching all conditions.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :returns: the boolean mask
+        :rtype: numpy array
+        """
+        return np.unpackbits(self.get_packed(conditions), count=self.size).view(bool)
+
+    def is_empty(self, conditions):
+        """ The function checking if no patient matches the conditions.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :returns: True if no patient matches the conditions
+        :rtype: bool
+        """
+        return not self.get_packed(conditions).any()
+
+    def get_subset(self, conditions, columns=None):
+        """ The function materializing the rows of the patients matching the conditions.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :param columns: the columns to be materialized (default: all columns)
+        :type columns: list
+        :returns: the subset of the dataframe
+        :rtype: pandas dataframe
+        """
+        mask = self.get_mask(conditions)
+        if columns is None:
+            return self.df[mask]
+
+        return self.df.loc[mask, columns]
+
+    def count(self, conditions, keys=('Protocol ID',)):
+        """ The function calculating the number of patients matching the conditions per value of the keys without materializing the rows.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :param keys: the columns the patients are grouped by
+        :type keys: tuple
+        :returns: the number of patients indexed by the values (multiindex if more keys are given), the values without patients are not included
+        :rtype: pandas series
+        """
+        keys = tuple(keys)
+        if keys not in self.codes:
+            if len(keys) == 1:
+                self.codes[keys] = pd.factorize(self.df[keys[0]])
+            else:
+                self.codes[keys] = pd.MultiIndex.from_frame(self.df[list(keys)]).factorize()
+        codes, uniques = self.codes[keys]
+
+        codes = codes[self.get_mask(conditions)]
+        counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(uniques)), index=uniques)
+
+        return counts[counts > 0]
+
+
+class MetricRegistry:
+    """ The class evaluating the metrics from the registry. Only the requested metrics and the metrics they depend on are calculated, in the order given by the dependencies. The masks of the populations are calculated once and shared between all metrics.
+
+    :param df: the preprocessed data
+    :type df: pandas dataframe
+    :param stats: the dataframe with the columns Protocol ID and Site Name, the calculated metrics are added to this dataframe, the metrics already in the dataframe (eg. Total Patients) are not calculated
+    :type stats: pandas dataframe
+    :param country_code: the country code, the populations are adjusted for some countries (eg. CZ)
+    :type country_code: str
+    :param masks: the mask cache of the dataframe shared with the caller (default: new cache)
+    :type masks: MaskCache
+    :param keys: the columns the metrics are grouped by, the columns have to be in both dataframes (eg. Period and Protocol ID for the statistics of more periods)
+    :type keys: tuple
+    :param partition: the column splitting the data into the independent datasets (eg. Period), the populations with `skip_if_empty` are evaluated in each dataset separately (default: one dataset)
+    :type partition: str
+    :param totals: the column grouping the sites (eg. Country), the metrics of the rows of the statistics with the values of this column in the Protocol ID are rolled up from the partial aggregates of the sites, so the patients don't have to be duplicated with the Protocol ID replaced (default: no totals)
+    :type totals: str
+    :param empty: the populations of `skip_if_empty` given as empty (True) or not empty (False) in all partitions instead of being evaluated from the data, eg. when the partial aggregates are calculated for both cases (default: evaluated from the data)
+    :type empty: dict
+    """
+
+    def __init__(self, df, stats, country_code='', masks=None, keys=('Protocol ID',), partition=None, totals=None, empty=None):
+
+        self.df = df
+        self.stats = stats
+        self.keys = list(keys)
+        # The mapping of the keys of the sites to the keys of the totals, the Protocol ID is replaced by the value of the column grouping the sites
+        self.totals = None
+        if totals is not None:
+            sites = self.df[['Protocol ID', totals]].drop_duplicates('Protocol ID').set_index('Protocol ID')[totals]
+            position = self.keys.index('Protocol ID')
+            if len(self.keys) == 1:
+                self.totals = sites
+            else:
+                self.totals = lambda key: key[:position] + (sites.get(key[position]),) + key[position + 1:]
+        self.populations = {population.name: population for population in POPULATIONS}
+        if country_code == 'CZ':
+            self.populations.update({population.name: population for population in CZ_POPULATIONS})
+        self.metrics = {metric.name: metric for metric in METRICS}
+        self.masks = masks if masks is not None else MaskCache(df)
+        self.conditions = {}
+        # The sorted values of the columns per site and the confidence intervals shared by the lower and upper bound
+        self.runs = {}
+        self.intervals = {}
+        self.partition = partition
+        self.partitions = (None,) if partition is None else tuple(pd.unique(df[partition]))
+        # The partitions without patients in the population before skipping the conditions
+        self.empty = {}
+        self.given = {} if empty is None else dict(empty)
+
+    def _get_empty(self, conditions):
+        """ The function returning the partitions of the data without patients matching the conditions.
+
+        :param conditions: the tuple of conditions
+        :type conditions: tuple
+        :returns: the tuple of partitions
+        :rtype: tuple
+        """
+        if self.partition is None:
+            return self.partitions if self.masks.is_empty(conditions) else ()
+
+        counts = self.masks.count(conditions, (self.partition,))
+        return tuple(x for x in self.partitions if x not in counts.index)
+
+    def get_conditions(self, name):
+        """ The function returning the conditions of the population including the conditions of its parents.
+
+        :param name: the name of the population
+        :type name: str
+        :returns: the tuple of conditions
+        :rtype: tuple
+        :raises: ValueError
+        """
+        if name not in self.conditions:
+            if name not in self.populations:
+                raise ValueError('Unknown population {0}.'.format(name))
+            population = self.populations[name]
+
+            parent = () if population.parent is None else self.get_conditions(population.parent)
+            self.conditions[name] = parent + tuple(population.when)
+            if name in self.given:
+                self.empty[name] = self.partitions if self.given[name] else ()
+            else:
+                self.empty[name] = self._get_empty(self.conditions[name])
+
+            if population.skip_if_empty is not None:
+                self.get_conditions(population.skip_if_empty)
+                empty = self.empty[population.skip_if_empty]
+                if len(empty) == len(self.partitions):
+                    self.conditions[name] = parent
+                elif empty:
+                    # The conditions are skipped only in the partitions without patients
+                    self.conditions[name] = parent + (Any((All(tuple(population.when)), (self.partition, 'isin', empty))),)
+
+        return self.conditions[name]
+
+    def get_order(self, names):
+        """ The function returning the metrics to be calculated in the order given by their dependencies.
+
+        :param names: the names of the requested metrics
+        :type names: list
+        :returns: the list of metrics
+        :rtype: list
+        :raises: ValueError
+        """
+        order = []
+        visited = set()
+        visiting = set()
+
+        def visit(name):
+            if name in visited or name in self.stats.columns:
+                return
+            if name in visiting:
+                raise ValueError('Metric {0} depends on itself.'.format(name))
+            if name not in self.metrics:
+                raise ValueError('Unknown metric {0}.'.format(name))
+            visiting.add(name)
+            for dependency in get_dependencies(self.metrics[name]):
+                visit(dependency)
+            visiting.remove(name)
+            visited.add(name)
+            order.append(self.metrics[name])
+
+        for name in names:
+            visit(name)
+
+        return order
+
+    def _get_counts(self, name):
+        """ The function returning the number of patients in the population per site.
+
+        :param name: the name of the population
+        :type name: str
+        :returns: the number of patients indexed by the keys, the sites without patients are not included
+        :rtype: pandas series
+        """
+        return self.masks.count(self.get_conditions(name), self.keys)
+
+    def _get_runs(self, name, column):
+        """ The function returning the sorted values of the column in the population per site.
+
+        :param name: the name of the population
+        :type name: str
+        :param column: the name of the column
+        :type column: str
+        :returns: the runs indexed by the keys
+        :rtype: Runs
+        """
+        if (name, column) not in self.runs:
+            rows = self.masks.get_subset(self.get_conditions(name), self.keys + [column])
+            self.runs[(name, column)] = get_runs(rows, self.keys, column)
+
+        return self.runs[(name, column)]
+
+    def _get_rolled_up(self, values, rollup, get=lambda x: x):
+        """ The function appending the totals rolled up from the partial aggregates of the sites.
+
+        :param values: the partial aggregates of the sites
+        :type values: pandas series or Runs
+        :param rollup: the function rolling up the partial aggregates (rollup_counts or rollup_runs)
+        :type rollup: function
+        :param get: the function returning the values from the partial aggregates
+        :type get: function
+        :returns: the values indexed by the keys
+        :rtype: pandas series or dataframe
+        """
+        if self.totals is None:
+            return get(values)
+
+        return pd.concat([get(values), get(rollup(values, self.totals))])
+
+    def _get_values(self, metric, columns):
+        """ The function calculating the values of the metric per site.
+
+        :param metric: the metric
+        :type metric: Count, Sum, Percentage, Choose, Median or MedianInterval
+        :param columns: the already calculated metrics
+        :type columns: dict
+        :returns: the values in the order of the sites
+        :rtype: numpy array
+        """
+        get = lambda name: columns[name] if name in columns else self.stats[name].to_numpy()
+        if len(self.keys) == 1:
+            site_ids = self.stats[self.keys[0]]
+        else:
+            site_ids = pd.MultiIndex.from_frame(self.stats[self.keys])
+
+        if isinstance(metric, Count):
+            counts = self._get_counts(metric.population)
+            return get_site_values(self._get_rolled_up(counts, rollup_counts), site_ids)
+        elif isinstance(metric, Median):
+            runs = self._get_runs(metric.population, metric.column)
+            return get_site_values(self._get_rolled_up(runs, rollup_runs, get_medians), site_ids)
+        elif isinstance(metric, MedianInterval):
+            if (metric.population, metric.column) not in self.intervals:
+                runs = self._get_runs(metric.population, metric.column)
+                self.intervals[(metric.population, metric.column)] = self._get_rolled_up(runs, rollup_runs, get_median_intervals)
+            return get_site_values(self.intervals[(metric.population, metric.column)][metric.bound], site_ids)
+        elif isinstance(metric, Sum):
+            values = sum(get(name) for name in metric.add)
+            for name in metric.subtract:
+                values = values - get(name)
+            return values
+        elif isinstance(metric, Percentage):
+            return get_percentage(get(metric.numerator), get(metric.denominator))
+        elif isinstance(metric, Choose):
+            return np.where(get(metric.compare) > get(metric.to), get(metric.value), get(metric.otherwise))
+
+    def compute(self, names):
+        """ The function calculating the requested metrics.
+
+        :param names: the names of the metrics
+        :type names: list
+        :returns: the dataframe with the statistics extended by the requested metrics
+        :rtype: pandas dataframe
+        """
+        columns = {}
+        order = self.get_order(names)
+        for metric in order:
+            columns[metric.name] = self._get_values(metric, columns)
+
+        stats = self.stats.copy()
+        for name in names:
+            if name in columns:
+                stats[name] = columns[name]
+        logging.info('Metrics: {0} metrics were calculated from {1} populations.'.format(len(order), len(self.conditions)))
+
+        return stats
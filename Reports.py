@@ -18,6 +18,7 @@ import scipy.stats as st
 from scipy.stats import sem, t
 from scipy import mean
 from resqdb.Calculation import FilterDataset
+from resqdb.Rollup import get_runs, rollup_counts, rollup_runs, get_medians
 from pptx import Presentation
 from pptx.chart.data import CategoryChartData, ChartData
 from pptx.enum.shapes import MSO_SHAPE
@@ -115,18 +116,15 @@ class Reports:
         df.reset_index(drop=True, inplace=True)
         """
 
-        tmp_country_df = df.copy()
-        tmp_country_df['Site Name'] = self.country_name
-        tmp_country_df['Protocol ID'] = 'CZ'
-        df = df.append(tmp_country_df, ignore_index=True, sort=False)
-        
+        # The results for the country (Protocol ID CZ) are rolled up from the results of the sites, the patients are not copied
         self.country_df = df
-        self.df = df.copy()
+        self.df = df
 
         # Get site names to hospitals_mt
         self.site_id_mapped_to_site_name = self.df[self.df['Protocol ID'].isin(self.hospitals_mt)][['Protocol ID', 'Site Name']].drop_duplicates(subset='Protocol ID', keep='first').reset_index()
         
         self.site_id_mapped_to_site_name.drop(['index'], inplace=True, axis=1)
+        self.site_id_mapped_to_site_name = pd.concat([self.site_id_mapped_to_site_name, pd.DataFrame({'Protocol ID': ['CZ'], 'Site Name': [self.country_name]})], ignore_index=True)
         
         # Filter dataframes per month
         self.filtered_dfs = self.filter_dataframe()
@@ -140,17 +138,15 @@ class Reports:
         self.save_excel()
 
 
-    def filter_dataframe(self):
-        """ The function filtering the preprocessed data for each month. 
+    def get_periods(self):
+        """ The function returning the periods of the reports, each month and the whole year until the last month. The periods can be used also for :class:`resqdb.Calculation.ComputePeriodStats` to calculate all periods in one pass.
 
-        :returns: the dictionary of filtered dataframes
+        :returns: the dictionary of periods {name: (start date, end date)}
         """
-        dfs = {}
-        # Get current date
-        current_year = datetime.today().year
+        periods = {}
         current_month = self.month
 
-        # Filter dataframe per month
+        # Periods per month
         for month in range(1, current_month + 1):
             if current_month == 12:
                 start_date = datetime(self.year, current_month, 1, 0, 0)
@@ -159,32 +155,84 @@ class Reports:
                 start_date = datetime(self.year, month, 1, 0, 0)
                 end_date = datetime(self.year, (month % 12 + 1), 1, 0, 0) - timedelta(days=1)
 
-            # Create object FilterDataset
-            fd_ojb = FilterDataset(df=self.df, country=self.country, date1=start_date, date2=end_date)
-            df = fd_ojb.fdf.copy()
-            df['Protocol ID']
-            df = df.loc[~df['Protocol ID'].isin(['CZ_052'])].copy()
-
-
-            # Add dataframe into dictionary
-            dfs[month] = df
+            periods[month] = (start_date, end_date)
 
-        # Filter dataframe for whole year
+        # Period for whole year
         start_date = datetime(self.year, 1, 1, 0, 0)
         # End date from current_month
         if current_month == 12:
             end_date = datetime(self.year, current_month, 31, 0, 0) - timedelta(days=1)
         else:
             end_date = datetime(self.year, (current_month % 12 + 1), 1, 0, 0) - timedelta(days=1)
-        fd_obj = FilterDataset(df=self.df, country=self.country, date1=start_date, date2=end_date)
-        df = fd_obj.fdf.copy()
-        df = df.loc[~df['Protocol ID'].isin(['CZ_052'])].copy()
+        periods[str(self.year)] = (start_date, end_date)
+
+        return periods
+
+    def filter_dataframe(self):
+        """ The function filtering the preprocessed data for each month. 
 
-        dfs[str(self.year)] = df
+        :returns: the dictionary of filtered dataframes
+        """
+        dfs = {}
+
+        # Filter dataframe per month and for whole year
+        for name, (start_date, end_date) in self.get_periods().items():
+            # Create object FilterDataset
+            fd_ojb = FilterDataset(df=self.df, country=self.country, date1=start_date, date2=end_date)
+            df = fd_ojb.fdf.copy()
+            df = df.loc[~df['Protocol ID'].isin(['CZ_052'])].copy()
+
+            # Add dataframe into dictionary
+            dfs[name] = df
         
         return dfs
 
     
+    def get_country(self, site_id):
+        """ The function returning the Protocol ID of the country the results of the site are rolled up to. 
+
+        :param site_id: the site ID
+        :type site_id: str
+        :returns: the Protocol ID of the country
+        """
+        return 'CZ'
+
+    def get_counts(self, df, sites=None):
+        """ The function calculating the number of patients grouped by Protocol ID and for the whole country (Protocol ID CZ) rolled up from all sites. 
+
+        :param df: the dataframe with preprocessed data
+        :type df: pandas dataframe
+        :param sites: the list of Protocol IDs included in the results, the country is calculated from all sites (default: all sites)
+        :type sites: list
+        :returns: the number of patients indexed by Protocol ID
+        """
+        counts = df.groupby(['Protocol ID']).size()
+        counts = pd.concat([counts, rollup_counts(counts, self.get_country)]).rename_axis('Protocol ID')
+        if sites is not None:
+            counts = counts.loc[counts.index.isin(sites)]
+
+        return counts
+
+    def get_medians(self, df, column_name, new_column_name, sites=None):
+        """ The function calculating the median grouped by Protocol ID and for the whole country (Protocol ID CZ) merged from the sorted values of all sites. 
+
+        :param df: the dataframe with preprocessed data
+        :type df: pandas dataframe
+        :param column_name: the name of the column
+        :type column_name: str
+        :param new_column_name: the name of the column with the medians
+        :type new_column_name: str
+        :param sites: the list of Protocol IDs included in the results, the country is calculated from all sites (default: all sites)
+        :type sites: list
+        :returns: the dataframe with the columns Protocol ID and new_column_name
+        """
+        runs = get_runs(df, ['Protocol ID'], column_name)
+        medians = pd.concat([get_medians(runs), get_medians(rollup_runs(runs, self.get_country))]).rename_axis('Protocol ID')
+        if sites is not None:
+            medians = medians.loc[medians.index.isin(sites)]
+
+        return medians.reset_index(name=new_column_name)
+
     def count_patients(self, df, statistic):
         """ The function calculating the number of patients grouped by Protocol ID. 
 
@@ -194,8 +242,8 @@ class Reports:
         :type statistic: pandas dataframe
         :returns: the column with patient numbers
         """
-        tmp = df.groupby(['Protocol ID']).size().reset_index(name='total_patients')
-        tmp_df = statistic.merge(tmp, how='outer')
+        tmp = self.get_counts(df).reset_index(name='total_patients')
+        tmp_df = statistic.merge(tmp, how='left')
         tmp_df.fillna(0, inplace=True)
 
         return tmp_df['total_patients']
@@ -282,6 +330,7 @@ class Reports:
         for name, df in self.filtered_dfs.items():
              
             statistic = self.country_df.groupby(['Protocol ID', 'Site Name']).size().reset_index(name="Total Patients")			# Get Protocol IDs and Total Patients
+            statistic = pd.concat([pd.DataFrame({'Protocol ID': ['CZ'], 'Site Name': [self.country_name], 'Total Patients': [len(self.country_df)]}), statistic], ignore_index=True)
             # Calculate IVtPa median
             ischemic_cmp = df[df['STROKE_TYPE'].isin([1])].copy()		
             thrombolysis_df = ischemic_cmp.loc[ischemic_cmp['IVT_DONE'].isin([1])].copy()	
@@ -322,8 +371,7 @@ class Reports:
                     (thrombolysis_df['INCORRECT_TIMES'] == True) & 
                     (thrombolysis_df['HOSPITAL_STROKE_TBY_TIMESTAMPS'] != 1)
                     ].copy()
-                incorrect_ivtpa_times_save = incorrect_ivtpa_times.loc[
-                    incorrect_ivtpa_times['Protocol ID'] != "CZ"].copy()
+                incorrect_ivtpa_times_save = incorrect_ivtpa_times.copy()
                 incorrect_ivtpa_times_save.to_csv('incorrect_ivtpa_times.csv', sep=',')
 
                 thrombolysis = thrombolysis_df[(thrombolysis_df['IVTPA'] > 0) & (thrombolysis_df['IVTPA'] <= 400)].copy()
@@ -339,7 +387,7 @@ class Reports:
                         statistic['# incorrect IVtPa times'] = self.count_patients(df=incorrect_ivtpa_times, statistic=statistic)
                         statistic['% incorrect IVtPa times'] = round((statistic['# incorrect IVtPa times'] / statistic['Total patients undergone IVT'])*100, 2)
                 else:
-                    thrombolysis_grouped = thrombolysis.groupby(['Protocol ID']).IVTPA.agg(['median']).rename(columns={'median': 'Median DTN (minutes)'}).reset_index() # calculate median DTN per site
+                    thrombolysis_grouped = self.get_medians(thrombolysis, 'IVTPA', 'Median DTN (minutes)') # calculate median DTN per site
                     statistic = statistic.merge(thrombolysis_grouped, how='outer') # Merge with statistic dataframe
 
                     # Get number of IVTs on IC/KCC
@@ -350,7 +398,7 @@ class Reports:
                     # Get difference in minutes between hospitalization and last visit
                     #thrombolysis['LAST_SEEN_NORMAL'] = thrombolysis.apply(lambda x: self.time_diff(x['VISIT_TIMESTAMP'], x['HOSPITAL_TIMESTAMP']), axis=1)
                     #thrombolysis['LAST_SEEN_NORMAL'].fillna(0, inplace=True)
-                    last_seen_normal_grouped = thrombolysis[thrombolysis['LAST_SEEN_NORMAL'] != 0].groupby(['Protocol ID']).LAST_SEEN_NORMAL.agg(['median']).rename(columns={'median': 'Median last seen normal'}).reset_index()
+                    last_seen_normal_grouped = self.get_medians(thrombolysis[thrombolysis['LAST_SEEN_NORMAL'] != 0], 'LAST_SEEN_NORMAL', 'Median last seen normal')
                     statistic = statistic.merge(last_seen_normal_grouped, how='outer') # Merge with statistic dataframe
 
                     if incorrect_ivtpa_times.empty:
@@ -401,7 +449,8 @@ class Reports:
 
             df['FIRST_HOSPITAL'] = df.apply(lambda x: 2 if (x['crf_parent_name'] == 'F_RESQ_IVT_TBY_1565_DEVCZ10' and x['Protocol ID'] in first_hosp_mapping.keys() and (x['FIRST_ARRIVAL_HOSP'] != 'unknown' or x['FIRST_ARRIVAL_HOSP'] != first_hosp_mapping[x['Protocol ID']])) else x['FIRST_HOSPITAL'], axis=1)
 
-            thrombectomy_df = df[(df['Protocol ID'].isin(self.hospitals_mt)) & (df['TBY_DONE'].isin([1])) & (df['STROKE_TYPE'].isin([1]))].copy()
+            # The patients of all sites are kept, the results for the country are calculated from all sites and the results of the sites only for hospitals doing thrombectomy
+            thrombectomy_df = df[(df['TBY_DONE'].isin([1])) & (df['STROKE_TYPE'].isin([1]))].copy()
             thrombectomy_df.fillna(0, inplace=True)
             statistic = self.site_id_mapped_to_site_name.copy()
             
@@ -446,12 +495,14 @@ class Reports:
                     (thrombectomy_df['HOSPITAL_STROKE_TBY_TIMESTAMPS'] != 1)].copy()
 
                 statistic['Total patients undergone TBY'] = self.count_patients(df=thrombectomy_df, statistic=statistic)
-                incorrect_tby_times_save = incorrect_tby_times.loc[incorrect_tby_times['Protocol ID'] != "CZ"].copy()
+                # Only the patients of the sites doing thrombectomy are saved
+                incorrect_tby_times_save = incorrect_tby_times.loc[incorrect_tby_times['Protocol ID'].isin(self.hospitals_mt)].copy()
                 incorrect_tby_times_save.to_csv('incorrect_tby_times.csv', sep=',')
                 
                 #thrombectomy_df.to_csv('thrombectomy_{}.csv'.format(name), sep=',')
                 included_in_median = thrombectomy_df[thrombectomy_df['INCLUDE_MEDIAN'] == True].copy()
-                included_in_median.to_csv('included_in_median.csv', sep=',')
+                # Only the patients of the sites doing thrombectomy are saved, the patients of the country are not duplicated
+                included_in_median.loc[included_in_median['Protocol ID'].isin(self.hospitals_mt)].to_csv('included_in_median.csv', sep=',')
                 thrombectomy = included_in_median[
                     (included_in_median['TBY'] > 0) & 
                     (included_in_median['TBY'] < 700)
@@ -478,7 +529,7 @@ class Reports:
                 else:
                     # Total patients
                     # total_patients = thrombectomy.groupby(['Protocol ID']).size().reset_index(name="# TBY")
-                    total_patients = thrombectomy_df.groupby(['Protocol ID']).size().reset_index(name="# TBY")
+                    total_patients = self.get_counts(thrombectomy_df, sites=self.hospitals_mt).reset_index(name="# TBY")
                     statistic = statistic.merge(total_patients, on='Protocol ID', how='outer') # Merge with statistic dataframe
                     statistic.fillna(0, inplace=True)
                     statistic.loc[statistic['Protocol ID'] == 'CZ', '# TBY'] = int(statistics.mean(statistic.loc[statistic['Protocol ID'] != 'CZ']['# TBY'].tolist()))
@@ -487,7 +538,7 @@ class Reports:
                     
 
 
-                    thrombectomy_grouped = thrombectomy.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes)'}).reset_index()
+                    thrombectomy_grouped = self.get_medians(thrombectomy, 'TBY', 'Median DTG (minutes)', sites=self.hospitals_mt)
                     statistic = statistic.merge(thrombectomy_grouped, how='outer') # Merge with statistic dataframe
 
                     if incorrect_tby_times.empty:
@@ -501,12 +552,13 @@ class Reports:
                         statistic.loc[statistic['Protocol ID'] == 'CZ', '% incorrect TBY times'] = round((statistic['# incorrect TBY times'] / statistic['Total patients undergone TBY'])*100, 2)
                         
                     # Median DTG for first hospital arrival
+                    # The results for the country use the first hospital reassigned for the sites
                     thrombectomy_first = thrombectomy[thrombectomy['FIRST_HOSPITAL'] == 1].copy()
                     if thrombectomy_first.empty:
                         statistic['Median DTG (minutes) - first hospital'] = 0
                     else:
                         # thrombectomy_first['TBY'] = thrombectomy_first['TBY_ONLY_GROIN_PUNCTURE_TIME'] + thrombectomy_first['TBY_ONLY_GROIN_TIME_MIN'] + thrombectomy_first['IVT_TBY_GROIN_TIME'] + thrombectomy_first['IVT_TBY_GROIN_TIME_MIN']  # get TBY times in one column
-                        thrombectomy_first_grouped = thrombectomy_first.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes) - first hospital'}).reset_index()
+                        thrombectomy_first_grouped = self.get_medians(thrombectomy_first, 'TBY', 'Median DTG (minutes) - first hospital', sites=self.hospitals_mt)
                         statistic = statistic.merge(thrombectomy_first_grouped, how='outer') # Merge with statistic dataframe
 
                     # Median DTG for secondary hospital
@@ -515,7 +567,7 @@ class Reports:
                         statistic['Median DTG (minutes) - second hospital'] = 0
                     else:
                         # thrombectomy_second['TBY'] = thrombectomy_second['TBY_ONLY_GROIN_PUNCTURE_TIME'] + thrombectomy_second['TBY_ONLY_GROIN_TIME_MIN'] + thrombectomy_second['IVT_TBY_GROIN_TIME'] + thrombectomy_second['IVT_TBY_GROIN_TIME_MIN']  # get TBY times in one column
-                        thrombectomy_second_grouped = thrombectomy_second.groupby(['Protocol ID']).TBY.agg(['median']).rename(columns={'median': 'Median DTG (minutes) - second hospital'}).reset_index()
+                        thrombectomy_second_grouped = self.get_medians(thrombectomy_second, 'TBY', 'Median DTG (minutes) - second hospital', sites=self.hospitals_mt)
                         statistic = statistic.merge(thrombectomy_second_grouped, how='outer') # Merge with statistic dataframe
                 
                 
@@ -549,9 +601,8 @@ class Reports:
                 region_total_patients['Total patients'] = 0
                 region_total_patients['# IVT per population'] = 0
             else:
-                # Get results per region
-                thrombolysis['Site Name'] = thrombolysis.apply(lambda x: self.get_region(x['Protocol ID']), axis=1)
-                total_patients =  thrombolysis.groupby(['Site Name']).size().reset_index(name='Total patients')
+                # Get results per region, the country (Protocol ID CZ) is a region in the mapping
+                total_patients = rollup_counts(self.get_counts(thrombolysis), self.get_region).rename_axis('Site Name').reset_index(name='Total patients')
                 region_total_patients = region_total_patients.merge(total_patients, on='Site Name', how='outer')
                 region_total_patients.fillna(0, inplace=True)
 
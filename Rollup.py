@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Rollup.py
+Package: resq
+Version comment: Partial aggregates per site rolled up to the regions and the country without copying the patients.
+"""
+
+import collections
+import numpy as np
+import pandas as pd
+
+# The sorted values of the column per group. The values of the group `i` are values[starts[i]:starts[i] + sizes[i]], `nulls` is the number of missing values in the group.
+Runs = collections.namedtuple('Runs', ['index', 'values', 'starts', 'sizes', 'nulls'])
+
+
+def _get_groups(index, mapping):
+    """ The function returning the codes of the groups the values of the index belong to.
+
+    :param index: the index of the partial aggregates
+    :type index: pandas index
+    :param mapping: the mapping of the values of the index to the groups (dictionary, series or function), the values mapped to None are not included in any group
+    :type mapping: dict
+    :returns: the codes of the groups (-1 if not included) and the names of the groups
+    :rtype: tuple
+    """
+    groups = index.map(mapping)
+    if isinstance(groups, pd.MultiIndex):
+        return groups.factorize()
+    return pd.factorize(groups)
+
+
+def get_runs(rows, keys, column):
+    """ The function sorting the values of the column per group of the keys. The rows are sorted once by the keys and the values, so each group is a segment of one sorted array.
+
+    :param rows: the dataframe with the keys and the column
+    :type rows: pandas dataframe
+    :param keys: the columns the rows are grouped by
+    :type keys: list
+    :param column: the name of the column
+    :type column: str
+    :returns: the runs indexed by the values of the keys (multiindex if more keys are given)
+    :rtype: Runs
+    """
+    keys = list(keys)
+    if len(keys) == 1:
+        codes, index = pd.factorize(rows[keys[0]])
+    else:
+        codes, index = pd.MultiIndex.from_frame(rows[keys]).factorize()
+    values = rows[column].to_numpy(dtype=float)
+
+    missing = np.isnan(values)
+    nulls = np.bincount(codes[missing], minlength=len(index))
+    codes, values = codes[~missing], values[~missing]
+    order = np.lexsort((values, codes))
+    sizes = np.bincount(codes, minlength=len(index))
+
+    return Runs(index, values[order], np.cumsum(sizes) - sizes, sizes, nulls)
+
+
+def rollup_counts(counts, mapping):
+    """ The function summing the counts of the sites per group, eg. per region or country.
+
+    :param counts: the counts indexed by the sites (or by the multiindex of the keys)
+    :type counts: pandas series
+    :param mapping: the mapping of the sites to the groups (dictionary, series or function)
+    :type mapping: dict
+    :returns: the counts indexed by the groups
+    :rtype: pandas series
+    """
+    codes, groups = _get_groups(counts.index, mapping)
+    included = codes >= 0
+
+    return pd.Series(np.bincount(codes[included], weights=counts.to_numpy()[included], minlength=len(groups)).astype(counts.dtype), index=groups)
+
+
+def rollup_runs(runs, mapping):
+    """ The function merging the sorted runs of the sites per group, eg. per region or country. The runs of the sites of one group are already sorted, so they are only merged by the stable sort of the values.
+
+    :param runs: the runs indexed by the sites (or by the multiindex of the keys)
+    :type runs: Runs
+    :param mapping: the mapping of the sites to the groups (dictionary, series or function)
+    :type mapping: dict
+    :returns: the runs indexed by the groups
+    :rtype: Runs
+    """
+    codes, groups = _get_groups(runs.index, mapping)
+    # The group of each value
+    value_codes = np.repeat(codes, runs.sizes)
+    included = value_codes >= 0
+    values, value_codes = runs.values[included], value_codes[included]
+
+    order = np.lexsort((values, value_codes))
+    sizes = np.bincount(value_codes, minlength=len(groups))
+    nulls = np.bincount(codes[codes >= 0], weights=runs.nulls[codes >= 0], minlength=len(groups)).astype(np.int64)
+
+    return Runs(groups, values[order], np.cumsum(sizes) - sizes, sizes, nulls)
+
+
+def get_medians(runs):
+    """ The function returning the medians of the groups, the missing values are skipped and the groups without values get NaN.
+
+    :param runs: the runs
+    :type runs: Runs
+    :returns: the medians indexed by the groups
+    :rtype: pandas series
+    """
+    if len(runs.values) == 0:
+        return pd.Series(np.nan, index=runs.index)
+    # The middle values of the segments, the same for the odd sizes
+    last = len(runs.values) - 1
+    lower = runs.values[np.clip(runs.starts + (runs.sizes - 1) // 2, 0, last)]
+    upper = runs.values[np.clip(runs.starts + runs.sizes // 2, 0, last)]
+    medians = np.where(runs.sizes > 0, (lower + upper) / 2, np.nan)
+
+    return pd.Series(medians, index=runs.index)
+
+
+def get_quantiles(runs, q):
+    """ The function returning the quantiles of the groups with the linear interpolation (the same as numpy.percentile). The groups with the missing values or without values get NaN.
+
+    :param runs: the runs
+    :type runs: Runs
+    :param q: the quantile between 0 and 1
+    :type q: float
+    :returns: the quantiles indexed by the groups
+    :rtype: pandas series
+    """
+    if len(runs.values) == 0:
+        return pd.Series(np.nan, index=runs.index)
+    position = (runs.sizes - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, runs.sizes - 1)
+    last = len(runs.values) - 1
+    a = runs.values[np.clip(runs.starts + lower, 0, last)]
+    b = runs.values[np.clip(runs.starts + upper, 0, last)]
+    t = position - lower
+    # The interpolation from the closer value
+    quantiles = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    quantiles = np.where((runs.sizes > 0) & (runs.nulls == 0), quantiles, np.nan)
+
+    return pd.Series(quantiles, index=runs.index)
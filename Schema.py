@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Schema.py
+Package: resq
+Version comment: Typed schema of the coded RES-Q answers read from the legend and enforced when the data enter the modules.
+"""
+
+import os
+import csv
+import logging
+import numpy as np
+import pandas as pd
+
+# The coded answers are stored as float32, the codes (including -999 of the older forms) are represented exactly and the missing values stay NaN, so the conditions and the replacement of the missing values work the same as with float64
+CODED_DTYPE = np.float32
+
+# The coded columns calculated in the preprocessing which are not in the legend
+DERIVED_CODES = [
+    'IVT_DONE',
+    'TBY_DONE',
+    'REFERRED_DONE',
+    'HOSPITAL_STROKE_IVT_TIMESTAMPS',
+    'HOSPITAL_STROKE_TBY_TIMESTAMPS',
+    'MRS_PRIOR_STROKE',
+    'PRENOTIFICATION',
+]
+
+
+def get_schema(path=None):
+    """ The function reading the types of the answers from the legend. The single-select answers are coded, the checkbox answers are the comma separated codes and the dates and times are kept by their type.
+
+    :param path: the path to the legend (default: tmp/legend.csv)
+    :type path: str
+    :returns: the dictionary {column: type}, the type is code, checkbox, date, time or text
+    :rtype: dict
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(__file__), 'tmp', 'legend.csv')
+
+    schema = {}
+    with open(path, 'r', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            column = row['Variable Name'].strip()
+            if column.endswith('_EN'):
+                column = column[:-len('_EN')]
+            response_type = row['Response Type'].strip()
+            if response_type == 'single-select':
+                schema[column] = 'code'
+            elif response_type == 'checkbox':
+                schema[column] = 'checkbox'
+            elif row['Response Options - value'].strip() in ['date', 'time']:
+                schema[column] = row['Response Options - value'].strip()
+            else:
+                schema[column] = 'text'
+    schema.update({column: 'code' for column in DERIVED_CODES})
+
+    return schema
+
+
+SCHEMA = get_schema()
+
+
+def apply_schema(df, schema=None):
+    """ The function casting the coded columns of the dataframe to CODED_DTYPE in place. The numbers stored as strings (eg. from csv) are converted too, the column with values which are not codes is kept unchanged and the warning is logged.
+
+    :param df: the dataframe
+    :type df: pandas dataframe
+    :param schema: the schema (default: the schema from the legend)
+    :type schema: dict
+    :returns: the same dataframe with the typed columns
+    :rtype: pandas dataframe
+    """
+    if schema is None:
+        schema = SCHEMA
+
+    for column in df.columns:
+        if schema.get(column) != 'code' or df[column].dtype == CODED_DTYPE:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        if values.isnull().sum() > df[column].isnull().sum():
+            logging.warning('Schema: Column {0} contains values which are not codes, it has not been converted.'.format(column))
+            continue
+        df[column] = values.astype(CODED_DTYPE)
+
+    return df
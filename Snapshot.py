@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Snapshot.py
+Package: resq
+Version comment: Local snapshot of the exported tables used for the incremental export.
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+
+
+class Snapshot:
+    """ The class storing the local copy of the exported tables and the watermark (the latest modification timestamp or the maximal primary key) of each table. The snapshot is stored in the folder as pickled dataframes, one file per table and layer (raw, prepared, checked), and the watermarks are stored in the `watermarks.json` file.
+
+    :param path: the path to the folder with the snapshot, the folder is created if it doesn't exist
+    :type path: str
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        self.watermarks_file = os.path.join(self.path, 'watermarks.json')
+        if os.path.exists(self.watermarks_file):
+            with open(self.watermarks_file, 'r', encoding='utf-8') as json_file:
+                self.watermarks = json.load(json_file)
+        else:
+            self.watermarks = {}
+
+    def _get_file(self, name, layer):
+        """ The function returning the path to the file with the snapshot of the table.
+
+        :param name: the name of the table
+        :type name: str
+        :param layer: the layer of the data (raw, prepared or checked)
+        :type layer: str
+        :returns: the path to the file
+        :rtype: str
+        """
+        return os.path.join(self.path, '{0}_{1}.pkl'.format(name, layer))
+
+    def load(self, name, layer):
+        """ The function loading the table from the snapshot.
+
+        :param name: the name of the table
+        :type name: str
+        :param layer: the layer of the data (raw, prepared or checked)
+        :type layer: str
+        :returns: the dataframe or None if the table is not in the snapshot
+        :rtype: DataFrame
+        """
+        path = self._get_file(name, layer)
+        if not os.path.exists(path):
+            return None
+
+        df = pd.read_pickle(path)
+        logging.info('Snapshot: {0} rows of {1} ({2}) have been loaded.'.format(len(df), name, layer))
+        return df
+
+    def save(self, name, layer, df):
+        """ The function saving the table into the snapshot.
+
+        :param name: the name of the table
+        :type name: str
+        :param layer: the layer of the data (raw, prepared or checked)
+        :type layer: str
+        :param df: the dataframe to be saved
+        :type df: DataFrame
+        """
+        df.to_pickle(self._get_file(name, layer))
+        logging.info('Snapshot: {0} rows of {1} ({2}) have been saved.'.format(len(df), name, layer))
+
+    def remove(self, name, layer):
+        """ The function removing the table from the snapshot, eg. if the table has been exported again and the older layers are no longer valid.
+
+        :param name: the name of the table
+        :type name: str
+        :param layer: the layer of the data (raw, prepared or checked)
+        :type layer: str
+        """
+        path = self._get_file(name, layer)
+        if os.path.exists(path):
+            os.remove(path)
+            logging.info('Snapshot: {0} ({1}) has been removed.'.format(name, layer))
+
+    def get_watermark(self, name):
+        """ The function returning the watermark of the table.
+
+        :param name: the name of the table
+        :type name: str
+        :returns: the watermark or None if the table hasn't been exported yet
+        :rtype: str or int
+        """
+        return self.watermarks.get(name)
+
+    def set_watermark(self, name, value):
+        """ The function saving the watermark of the table.
+
+        :param name: the name of the table
+        :type name: str
+        :param value: the latest modification timestamp or the maximal primary key
+        :type value: object
+        """
+        if value is None or pd.isnull(value):
+            self.watermarks.pop(name, None)
+        else:
+            # Convert numpy values to python values
+            if hasattr(value, 'item'):
+                value = value.item()
+            self.watermarks[name] = value if isinstance(value, (int, float)) else str(value)
+
+        with open(self.watermarks_file, 'w', encoding='utf-8') as json_file:
+            json.dump(self.watermarks, json_file, indent=4)
+
+    @staticmethod
+    def get_keys(df, columns):
+        """ The function returning the key identifying each row of the dataframe.
+
+        :param df: the dataframe
+        :type df: DataFrame
+        :param columns: the columns forming the key
+        :type columns: list
+        :returns: the series of keys
+        :rtype: Series
+        :raises: ValueError
+        """
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError('Snapshot: The key columns {0} are missing, the rows cannot be identified.'.format(', '.join(missing)))
+
+        keys = pd.Series('', index=df.index)
+        for column in columns:
+            keys = keys + '|' + df[column].astype(str)
+        return keys
+
+    @staticmethod
+    def merge(snapshot, delta, columns):
+        """ The function merging the new or updated rows into the snapshot. The rows of the snapshot with the same key as some row in the delta are replaced. The rows deleted from the source are not detected here, they must be removed from the snapshot before the merge.
+
+        :param snapshot: the dataframe from the snapshot
+        :type snapshot: DataFrame
+        :param delta: the new or updated rows
+        :type delta: DataFrame
+        :param columns: the columns forming the key
+        :type columns: list
+        :returns: the merged dataframe
+        :rtype: DataFrame
+        """
+        if snapshot is None:
+            return delta
+
+        keys = Snapshot.get_keys(snapshot, columns)
+        delta_keys = Snapshot.get_keys(delta, columns)
+        return pd.concat([snapshot[~keys.isin(delta_keys)], delta], ignore_index=True, sort=False)
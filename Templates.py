@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+File name: Templates.py
+Package: resq
+Version comment: The templates of the presentations and the json settings read once per process.
+"""
+
+import os
+import copy
+import json
+from pptx import Presentation
+
+# The parsed files, {path: (modification time, object)}
+_presentations = {}
+_jsons = {}
+
+
+def _get_cached(cache, path, read):
+    """ The function returning the object read from the file, the file is read again only if it has been modified.
+
+    :param cache: the cache of the files
+    :type cache: dict
+    :param path: the path to the file
+    :type path: str
+    :param read: the function reading the file
+    :type read: function
+    :returns: the object read from the file
+    """
+    path = os.path.normpath(path)
+    mtime = os.path.getmtime(path)
+    if path not in cache or cache[path][0] != mtime:
+        cache[path] = (mtime, read(path))
+    return cache[path][1]
+
+
+def get_presentation(path):
+    """ The function returning the presentation created from the template. The template is parsed only once, each presentation is the deep copy of the parsed template, so the changes in the presentation don't change the template.
+
+    :param path: the path to the template
+    :type path: str
+    :returns: the new presentation
+    :rtype: Presentation
+    """
+    return copy.deepcopy(_get_cached(_presentations, path, Presentation))
+
+
+def get_json(path):
+    """ The function returning the content of the json file (eg. the titles of the graphs). The file is read only once, the returned object is shared and mustn't be changed.
+
+    :param path: the path to the json file
+    :type path: str
+    :returns: the content of the file
+    :rtype: dict
+    """
+    def read(path):
+        with open(path, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+
+    return _get_cached(_jsons, path, read)
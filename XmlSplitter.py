@@ -1,10 +1,11 @@
 import xml.etree.ElementTree as ET
 import sys, os
+import re
+import mmap
 import logging
 import pandas as pd
 import time
-from multiprocessing import Process
-from threading import Thread
+from concurrent.futures import ProcessPoolExecutor
 import itertools
 
 class XmlSplitter:
@@ -25,99 +26,142 @@ class XmlSplitter:
 
         self.skiped_study_oids = ['S_RESQ', 'S_DEMO_SIT', 'S_UA_DEMO', 'S_UA_DEMO_5834', 'S_CZ_DEMO', 'S_QASC_DEM']
 
-        self.root, self.xmlns, self.openclinica, self.date = self.get_root(self.xml_file)
+        self.xmlns = "{http://www.cdisc.org/ns/odm/v1.3}"
+        self.openclinica = "{http://www.openclinica.org/ns/odm_ext_v130/v3.1}"
+        self.date = None
+        self.studies = {}
+        self.items = {}
+        self.column_names = ['Subject ID', 'Protocol ID', 'Site Name', 'StartDate', 'EndDate', 'FormOID']
 
-        self.studies = self.get_studies(self.root, self.xmlns)
-        study_ids = self.get_study_oids(self.root, self.xmlns)
-
-        self.items, self.column_names = self.get_items(self.root, self.xmlns, self.openclinica)
-
-        sort_pts, total_patients = self.get_number_of_patient_per_site(self.root, self.xmlns, study_ids)
-
-        # Create number of lists with sites based on number of processes
+        # The metadata are read during the conversion in the serial mode, in the parallel mode they are read from the beginning of the file and sent to the processes together with the byte ranges of their sites
         if nprocess != 1:
-            lstudies = self.split_list(sort_pts, total_patients, parts=nprocess)
-            names = list(lstudies.keys())
+            offsets, metadata_range = self.get_offsets(self.xml_file)
+            for study_oid, subject_data in self.iterparse(_RangeReader(self.xml_file, self.header, [metadata_range], self.footer)):
+                pass
+            parts = self.split_offsets(offsets, parts=nprocess)
         else:
-            lstudies = study_ids
-              
+            parts = [None]
         
-        # Create empty dataframe with column names
-        if nprocess > 0:
-            self.df1 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 1:
-            self.df2 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 2:
-            self.df3 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 3:
-            self.df4 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 4:
-            self.df5 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 5:
-            self.df6 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 6:
-            self.df7 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 7:
-            self.df8 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 8:
-            self.df9 = pd.DataFrame(columns=self.column_names)
-        if nprocess > 9:
-            self.df10 = pd.DataFrame(columns=self.column_names)
+        # The converted dataframe of each worker
+        self.dfs = [None] * len(parts)
 
-        
         # Run subprocesses
-        threads = []
         if nprocess == 1:
-            self.convert_xml_to_df(self.root, self.xmlns, self.openclinica, study_ids, 'Process') 
+            self.convert_xml_to_df(self.xml_file, None, 0)
         else:
-            for i in range(0, nprocess):
-                process = Thread(target=self.convert_xml_to_df, args=(self.root, self.xmlns, self.openclinica, lstudies[names[i]], i))
-                process.start()
-                threads.append(process)
-            
-            for process in threads:
-                process.join()
+            with ProcessPoolExecutor(max_workers=nprocess) as executor:
+                futures = [executor.submit(self.convert_xml_to_df, self.xml_file, ranges, i) for i, ranges in enumerate(parts)]
+                for i, future in enumerate(futures):
+                    self.dfs[i] = future.result()
             
         
-        logging.info("All threads completed.")
-        print("All thread completed")
+        logging.info("All processes completed.")
+        print("All processes completed")
         
-        # Create one dataframe by appending all dataframes to one
-        if nprocess == 1:
-            self.df = self.df1
-        if nprocess > 1:
-            self.df = self.df1.append(self.df2, sort=False)
-        if nprocess > 2:
-            self.df = self.df.append(self.df3, sort=False)
-        if nprocess > 3:
-            self.df = self.df.append(self.df4, sort=False)
-        if nprocess > 4:
-            self.df = self.df.append(self.df5, sort=False)
-        if nprocess > 5:
-            self.df = self.df.append(self.df6, sort=False)
-        if nprocess > 6:
-            self.df = self.df.append(self.df7, sort=False)
-        if nprocess > 7:
-            self.df = self.df.append(self.df8, sort=False)
-        if nprocess > 8:
-            self.df = self.df.append(self.df9, sort=False)
-        if nprocess > 9:
-            self.df = self.df.append(self.df10, sort=False)
+        # Create one dataframe from the dataframes of all workers
+        self.df = pd.concat(self.dfs, sort=False)
         self.df.reset_index(inplace=True)
         
-    def get_root(self, xml_file):
-        """ Get root of xml file and additional necessary values (schema and openclinica link). """
-        file = open(xml_file, 'r')
-        tree = ET.parse(file)
+    def iterparse(self, source, read_metadata=True):
+        """ Stream the xml file and yield subjects one by one. The whole tree is never loaded into memory, each subject is removed from the tree after it has been processed, so the memory is bounded by the largest subject. The metadata (element Study) are stored before the clinical data are read because they precede them in the ODM file.
+
+        Params:
+            source: The path to the xml file or the file object.
+            read_metadata: True if the studies and items should be read from the Study elements.
+        Returns:
+            Generator of tuples (study OID, element SubjectData).
+        """
+        context = ET.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+        self.date = root.get('CreationDateTime')
+        logging.info('Date: {0}, xmlns: {1}, openclinica: {2}'.format(self.date, self.xmlns, self.openclinica))
+
+        depth = 1
+        clinical_data = None
+        study_oid = None
+        for event, elem in context:
+            if event == 'start':
+                depth += 1
+                if elem.tag == self.xmlns + 'ClinicalData':
+                    clinical_data = elem
+                    study_oid = elem.get('StudyOID')
+                continue
+
+            depth -= 1
+            if elem.tag == self.xmlns + 'Study' and read_metadata:
+                self.studies[elem.get('OID')] = self.get_study(elem)
+                if elem.get('OID') == "S_RESQ":
+                    self.items.update(self.get_items(elem))
+            elif elem.tag == self.xmlns + 'SubjectData':
+                yield study_oid, elem
+                clinical_data.remove(elem)
+
+            # Remove the processed top level elements (Study, ClinicalData, ...)
+            if depth == 1:
+                root.clear()
+
+        if read_metadata:
+            logging.info('Study names and Protocol IDs were shorten.')
+
+    def get_offsets(self, xml_file):
+        """ Scan the xml file without parsing it and find the byte ranges of the elements ClinicalData for each site. The file is memory mapped, so it is not loaded into memory. The start tag of the root (with the namespaces) and the end tag of the root are stored in `self.header` and `self.footer` and they are used to parse the ranges as standalone documents. 
+
+        Params:
+            xml_file: The path to the xml file.
+        Returns:
+            New dictionary with study OIDs as keyword and list of tuples (start, end, number of patients) as value and the byte range with the metadata (the part of the file before the first ClinicalData).
+        """
+        offsets = {}
+        with open(xml_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Skip the xml declaration and comments and find the start tag of the root
+            pos = mm.find(b'<')
+            while mm[pos + 1:pos + 2] in (b'?', b'!'):
+                pos = mm.find(b'<', mm.find(b'>', pos))
+            header_end = mm.find(b'>', pos) + 1
+            root_name = re.match(rb'<([^\s>/]+)', mm[pos:header_end]).group(1)
+            self.header = mm[0:header_end]
+            self.footer = b'</' + root_name + b'>'
+            metadata_end = mm.rfind(self.footer)
+
+            start = None
+            for pos, closing in _iter_tags(mm, b'ClinicalData', header_end):
+                if not closing:
+                    tag = mm[pos:mm.find(b'>', pos) + 1]
+                    study_oid = re.search(rb'StudyOID\s*=\s*["\']([^"\']*)["\']', tag).group(1).decode('utf-8')
+                    metadata_end = min(metadata_end, pos)
+                    start = None if tag.endswith(b'/>') else pos
+                elif start is not None:
+                    end = mm.find(b'>', pos) + 1
+                    patients = sum(1 for x, subject_closing in _iter_tags(mm, b'SubjectData', start, end) if not subject_closing)
+                    offsets.setdefault(study_oid, []).append((start, end, patients))
+                    start = None
+
+        logging.info('{0} sites were found in the xml file.'.format(len(offsets)))
+        return offsets, (header_end, metadata_end)
+
+    def split_offsets(self, offsets, parts=2):
+        """ Split the sites into the lists of byte ranges, one list per process. All ranges of the site are in the same list and the lists are balanced by the number of patients (the largest sites are assigned first to the list with the least patients). The demo sites are skipped. 
 
-        root = tree.getroot()
-        date = root.get('CreationDateTime')
-        xmlns = "{http://www.cdisc.org/ns/odm/v1.3}"
-        openclinica = "{http://www.openclinica.org/ns/odm_ext_v130/v3.1}"
+        Params:
+            offsets: The dictionary returned by `get_offsets`.
+            parts: The number of processes.
+        Returns:
+            List of non-empty lists of byte ranges sorted by the position in the file.
+        """
+        pts = {}
+        for study_oid, ranges in offsets.items():
+            if study_oid not in self.skiped_study_oids:
+                pts[study_oid] = sum(x[2] for x in ranges)
+        sort_pts = sorted(pts.items(), key=lambda x: x[1], reverse=True)
 
-        logging.info('Date: {0}, xmlns: {1}, openclinica: {2}'.format(date, xmlns, openclinica))
+        loads = [0] * parts
+        res = [[] for i in range(0, parts)]
+        for study_oid, total_patients in sort_pts:
+            index = loads.index(min(loads))
+            loads[index] += total_patients
+            res[index].extend(offsets[study_oid])
 
-        return root, xmlns, openclinica, date
+        return [sorted(ranges) for ranges in res if ranges]
 
     def trim_name(self, val):
         """ Remove RES-Q from text if present. 
@@ -141,114 +185,41 @@ class XmlSplitter:
         else:
             return var
 
-    def get_studies(self, root, xmlns):
-        """ Get all studies in xml file, to each study also assign study name and protocol ID. 
+    def get_study(self, study):
+        """ Get study name and protocol ID of the study. 
 
         Params:
-            root: The root of xml file.
-            xmlns: The base schema.
+            study: The element Study.
         Returns:
-            New dictionary with all studies as keyword. 
+            New dictionary with study name and protocol name. 
         """
-        studies = {}
-        for study in root.findall(xmlns + 'Study'):
-            study_item = {}
-            for global_variables in study.iter(xmlns + 'GlobalVariables'):
-                for study_name in global_variables.iter(xmlns + 'StudyName'):
-                    study_item['study_name'] = self.trim_name(study_name.text)
-                for protocol_name in global_variables.iter(xmlns + 'ProtocolName'):
-                    study_item['protocol_name'] = self.trim_name(protocol_name.text)
-            studies[study.get('OID')] = study_item
+        study_item = {}
+        for global_variables in study.iter(self.xmlns + 'GlobalVariables'):
+            for study_name in global_variables.iter(self.xmlns + 'StudyName'):
+                study_item['study_name'] = self.trim_name(study_name.text)
+            for protocol_name in global_variables.iter(self.xmlns + 'ProtocolName'):
+                study_item['protocol_name'] = self.trim_name(protocol_name.text)
         
-        logging.info('Study names and Protocol IDs were shorten.')
-        return studies
+        return study_item
 
-    def get_number_of_patient_per_site(self, root, xmlns, study_ids):
-        """ Get list of sites sorted by number of sites. """
-        pts = {}
-        total_patients = 0
-        for clinical_data in root.findall(xmlns + 'ClinicalData'):
-            if clinical_data.get('StudyOID') in study_ids:
-                total_patients += len(clinical_data.findall(xmlns + 'SubjectData'))
-                pts[clinical_data.get('StudyOID')] = len(clinical_data.findall(xmlns + 'SubjectData'))
-        
-        sort_pts = sorted(pts.items(), key=lambda x: x[1], reverse=True)
-        return sort_pts, total_patients
-        
-    def get_study_oids(self, root, xmlns):
-        """ Get all Study OIDs present in data. 
-
-        Params: 
-            root: The root of xml file.
-            xmlns: The base schema.
-        Returns: 
-            List of available IDs.
-        """
-        study_oids = []
-        for clinical_data in root.findall(xmlns + 'ClinicalData'):
-            study_oid = clinical_data.get('StudyOID')
-            if study_oid not in self.skiped_study_oids:
-                study_oids.append(study_oid)
-
-        return study_oids
-    
-    def split_list(self, data, total_patients, parts=2):
-        """ Return number of lists equaled to processes and site ids in the list. Each process will get some sites. """
-        pts_per_parts = []
-        for i in range(1, parts + 1):
-            pts_per_parts.append(total_patients//parts*i)
-        
-        count = 0
-        index = 0
-        p_ix = 0
-        res = {}
-
-        site_ids = list(list(zip(*data))[0])
-        total_patients = list(list(zip(*data))[1])
-
-        for i in range(0, len(total_patients)):
-            count += total_patients[i]
-            if count > pts_per_parts[index]:
-                name = "list" + str(index)
-                index += 1
-                res[name] = site_ids[p_ix:i+1]
-                p_ix = i+1
-            if i == (len(total_patients) - 1):
-                name = "list" + str(index)
-                res[name] = site_ids[p_ix:]
-            else:
-                continue
-        
-        return res
-
-    def get_items(self, root, xmlns, openclinica):
-        """ Get all columns names in the xml file, to each column name get shorten name, version of form and comment. 
+    def get_items(self, study):
+        """ Get all columns names in the study, to each column name get shorten name, version of form and comment. 
         
         Params:
-            root: The root of xml file.
-            xmlns: The base schema.
-            openclinica: The base schema for openclinica.
+            study: The element Study.
         Returns:
             New dictionary with all columns as keyword.     
         """
         items = {}
-        column_names = ['Subject ID', 'Protocol ID', 'Site Name', 'StartDate', 'EndDate', 'FormOID']
-        for study in root.findall(xmlns + 'Study'):
-            if study.get('OID') == "S_RESQ":
-                for metadata in study.iter(xmlns + 'MetaDataVersion'):
-                    for item_def in metadata.iter(xmlns + 'ItemDef'):
-                        item = {}
-                        item['name'] = item_def.get('Name')
-                        shorten_name = self.trim_var_name(item_def.get('Name'))
-                        item['shorten_name'] = shorten_name
-                       # form_oids = item_def.get(openclinica + 'FormOID')
-                       # print(form_oids)
-                        #item['form_oid'] = item_def.get(openclinica + 'FormOIDs')
-                        #if shorten_name not in column_names and "RESQV12" not in form_oids and "ATALAIA" not in form_oids:
-                          #  column_names.append(shorten_name)
-                        item['comment'] = item_def.get('Comment')
-                        items[item_def.get('OID')] = item
-        return items, column_names
+        for metadata in study.iter(self.xmlns + 'MetaDataVersion'):
+            for item_def in metadata.iter(self.xmlns + 'ItemDef'):
+                item = {}
+                item['name'] = item_def.get('Name')
+                shorten_name = self.trim_var_name(item_def.get('Name'))
+                item['shorten_name'] = shorten_name
+                item['comment'] = item_def.get('Comment')
+                items[item_def.get('OID')] = item
+        return items
 
     
     def refactor_values(self, row):
@@ -411,121 +382,182 @@ class XmlSplitter:
             
 
 
-    def convert_xml_to_df(self, root, xmlns, openclinica, lstudy, n):
-        """ Find each element "ClinicalData" in xml file and converted each subject to the row in the dataframe. If two versions of the form was filled, select IVT_TBY instead of RESQv2.0, and select RESQv2.0 instead of RESQv1.2. 
+    def get_row(self, subject_data, study_oid):
+        """ Convert the subject to the row. If two versions of the form was filled, select IVT_TBY instead of RESQv2.0, and select RESQv2.0 instead of RESQv1.2. 
+
+        Params:
+            subject_data: The element SubjectData.
+            study_oid: The OID of the study of the subject.
+        Returns:
+            New dictionary with the values of the subject.
+        """
+        xmlns = self.xmlns
+        openclinica = self.openclinica
+
+        # Get study name and protocol ID
+        study = self.studies[study_oid]
+        study_name = study["study_name"]
+        protocol_id = study["protocol_name"]
+
+        subject_id = subject_data.get(openclinica + 'StudySubjectID')
+        row = {'Subject ID' : subject_id, 'Protocol ID': protocol_id, 'Site Name': study_name}
+        # Get StartDate and EndData
+        for study_event in subject_data.iter(xmlns + 'StudyEventData'):
+            start_date = study_event.get(openclinica + 'StartDate')
+            row['StartDate'] = start_date
+            end_date = study_event.get(openclinica + 'EndDate')
+            row['EndDate'] = end_date
+        # Get all forms, if both v1.2 and v2.0 are filled, select v2.0
+        form_oids = []
+        for form_data in subject_data.iter(xmlns + 'FormData'):
+            form_oids.append(form_data.get('FormOID'))
+        
+        # If more than one form is filled in, select v2.0
+        if len(form_oids) > 1:
+            for form_data in subject_data.iter(xmlns + 'FormData'):
+                form_oid = form_data.get('FormOID')
+                if "RESQV20" in form_oid and any("IVT_TBY" in val for val in form_oids) == False:
+                    row['FormOID'] = form_oid
+                    for item_data in form_data.iter(xmlns + 'ItemData'):
+                        shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
+                        row[shorten_name] = item_data.get('Value')
+                elif "IVT_TBY" in form_oid:
+                    row['FormOID'] = form_oid
+                    for item_data in form_data.iter(xmlns + 'ItemData'):
+                        shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
+                        row[shorten_name] = item_data.get('Value')
+        else:
+            row['FormOID'] = form_oids[0]
+            if "RESQV12" in form_oids[0]:
+                for item_data in subject_data.iter(xmlns + 'ItemData'):
+                    shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
+                    row[shorten_name] = item_data.get('Value')
+                row = self.refactor_values(row)
+            else:
+                for item_data in subject_data.iter(xmlns + 'ItemData'):
+                    shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
+                    row[shorten_name] = item_data.get('Value')
+
+        return row
+
+    def convert_xml_to_df(self, xml_file, ranges, n):
+        """ Stream the xml file and convert each subject to the row in the dataframe. 
 
         Params: 
-            root: The root of xml file.
-            xmlns: The base schema.
-            openclinica: The base schema for openclinica.
+            xml_file: The path to the xml file.
+            ranges: The list of byte ranges (start, end, number of patients) to be converted, if None, the whole file is converted and the metadata are read.
+            n: The number of the process.
         Returns:
             A new converted dataframe. 
         """
         process ='Process' + str(n)
 
-        # Total number of patients
-        total_patients = 0
-        for clinical_data in root.findall(xmlns + 'ClinicalData'):
-            if clinical_data.get('StudyOID') in lstudy:
-                total_patients += len(clinical_data.findall(xmlns + 'SubjectData'))
+        # Total number of patients, unknown if the metadata are read during the conversion
+        if ranges is None:
+            total_patients = None
+            source = xml_file
+        else:
+            total_patients = sum(x[2] for x in ranges)
+            source = _RangeReader(xml_file, self.header, [x[:2] for x in ranges], self.footer)
 
+        rows = []
         count = 0
         LOG_EVERY_N = 100
-        for clinical_data in root.findall(xmlns + 'ClinicalData'):
-            study_oid = clinical_data.get('StudyOID')
-            """
+        last_study_oid = None
+        for study_oid, subject_data in self.iterparse(source, read_metadata=ranges is None):
             if study_oid in self.skiped_study_oids:
-                study_pts = len(clinical_data.findall(xmlns + 'SubjectData'))
-                count += study_pts
-                logging.info('{0}: {1} patients were skipped due to belonging to the demo site - {2}'.format(process, study_pts, study_oid))
-            """
-            if study_oid in lstudy:
-                logging.info('{0}: Adding patients for study: {1}'.format(process, study_oid))
-                # Get study name and protocol ID
-                study = self.studies[clinical_data.get('StudyOID')]
-                study_name = study["study_name"]
-                protocol_id = study["protocol_name"]
-                # Go through each subject in study
-                for subject_data in clinical_data.iter(xmlns + 'SubjectData'):
-                    subject_id = subject_data.get(openclinica + 'StudySubjectID')
-                    row = {'Subject ID' : subject_id, 'Protocol ID': protocol_id, 'Site Name': study_name}
-                    # Get StartDate and EndData
-                    for study_event in subject_data.iter(xmlns + 'StudyEventData'):
-                        start_date = study_event.get(openclinica + 'StartDate')
-                        row['StartDate'] = start_date
-                        end_date = study_event.get(openclinica + 'EndDate')
-                        row['EndDate'] = end_date
-                    # Get all forms, if both v1.2 and v2.0 are filled, select v2.0
-                    form_oids = []
-                    for form_data in subject_data.iter(xmlns + 'FormData'):
-                        form_oids.append(form_data.get('FormOID'))
-                    
-                    # If more than one form is filled in, select v2.0
-                    if len(form_oids) > 1:
-                        for form_data in subject_data.iter(xmlns + 'FormData'):
-                            form_oid = form_data.get('FormOID')
-                            if "RESQV20" in form_oid and any("IVT_TBY" in val for val in form_oids) == False:
-                                row['FormOID'] = form_oid
-                                for item_data in form_data.iter(xmlns + 'ItemData'):
-                                    shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
-                                    row[shorten_name] = item_data.get('Value')
-                            elif "IVT_TBY" in form_oid:
-                                row['FormOID'] = form_oid
-                                for item_data in form_data.iter(xmlns + 'ItemData'):
-                                    shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
-                                    row[shorten_name] = item_data.get('Value')
-                    else:
-                        row['FormOID'] = form_oids[0]
-                        if "RESQV12" in form_oids[0]:
-                            for item_data in subject_data.iter(xmlns + 'ItemData'):
-                                shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
-                                row[shorten_name] = item_data.get('Value')
-                            row = self.refactor_values(row)
-                        else:
-                            for item_data in subject_data.iter(xmlns + 'ItemData'):
-                                shorten_name = self.items[item_data.get('ItemOID')]['shorten_name']
-                                row[shorten_name] = item_data.get('Value')
-                        
-                    
-                    if n == 0:
-                        self.df1 = self.df1.append(row, ignore_index=True)
-                    elif n == 1:
-                        self.df2 = self.df2.append(row, ignore_index=True)
-                    elif n == 2:
-                        self.df3 = self.df3.append(row, ignore_index=True)
-                    elif n == 3:
-                        self.df4 = self.df4.append(row, ignore_index=True)
-                    elif n == 4:
-                        self.df5 = self.df5.append(row, ignore_index=True)
-                    elif n == 5:
-                        self.df6 = self.df6.append(row, ignore_index=True)
-                    elif n == 6:
-                        self.df7 = self.df7.append(row, ignore_index=True)
-                    elif n == 7:
-                        self.df8 = self.df8.append(row, ignore_index=True)
-                    elif n == 8:
-                        self.df9 = self.df9.append(row, ignore_index=True)
-                    elif n == 9:
-                        self.df10 = self.df10.append(row, ignore_index=True)
-                    
-                    count += 1
-
-                    if (count % LOG_EVERY_N) == 0:
-                        percentage = round(count/total_patients*100, 2)
-                        logging.info('{0}: Number of already converted patients: {1}/{2} - {3}%'.format(process,count, total_patients, percentage))
-                    if count == total_patients:
-                        percentage = count/total_patients*100
-                        logging.info('{0}: The conversion has been finished: {1}/{2} - {3}%'.format(process, count, total_patients, percentage))
-                    
-                else:
-                    pass
-            
-        return True
+                continue
 
-    
+            if study_oid != last_study_oid:
+                logging.info('{0}: Adding patients for study: {1}'.format(process, study_oid))
+                last_study_oid = study_oid
 
+            rows.append(self.get_row(subject_data, study_oid))
+            
+            count += 1
 
+            if total_patients is None:
+                if (count % LOG_EVERY_N) == 0:
+                    logging.info('{0}: Number of already converted patients: {1}'.format(process, count))
+                continue
 
+            if (count % LOG_EVERY_N) == 0:
+                percentage = round(count/total_patients*100, 2)
+                logging.info('{0}: Number of already converted patients: {1}/{2} - {3}%'.format(process,count, total_patients, percentage))
+            if count == total_patients:
+                percentage = count/total_patients*100
+                logging.info('{0}: The conversion has been finished: {1}/{2} - {3}%'.format(process, count, total_patients, percentage))
 
+        if total_patients is None:
+            logging.info('{0}: The conversion has been finished: {1} patients'.format(process, count))
 
+        # Build the dataframe at once, the columns which are not in the column names are appended in order of appearance
+        df = pd.DataFrame(rows)
+        column_names = self.column_names + [x for x in df.columns if x not in self.column_names]
+        self.dfs[n] = df.reindex(columns=column_names)
+            
+        return self.dfs[n]
+
+
+def _iter_tags(mm, name, start=0, end=None):
+    """ Find the start and end tags of the element in the memory mapped file. The tags can have the namespace prefix. 
+
+    Params:
+        mm: The memory mapped file.
+        name: The name of the element in bytes.
+        start: The position where the search starts.
+        end: The position where the search ends.
+    Returns:
+        Generator of tuples (position of the tag, True if it is the end tag).
+    """
+    end = len(mm) if end is None else end
+    i = mm.find(name, start, end)
+    while i != -1:
+        j = mm.rfind(b'<', max(start, i - 64), i)
+        if j != -1 and mm[i + len(name):i + len(name) + 1] in (b' ', b'\t', b'\n', b'\r', b'>', b'/') and re.match(rb'</?(?:[\w.-]+:)?$', mm[j:i]):
+            yield j, mm[j + 1:j + 2] == b'/'
+        i = mm.find(name, i + len(name), end)
+
+
+class _RangeReader:
+    """ File object reading the selected byte ranges of the xml file wrapped in the start and end tag of the root, so the ranges can be parsed as one document. 
+
+    Params:
+        xml_file: The path to the xml file.
+        header: The beginning of the file with the start tag of the root.
+        ranges: The list of byte ranges (start, end).
+        footer: The end tag of the root.
+    """
+
+    def __init__(self, xml_file, header, ranges, footer):
+        self.xml_file = xml_file
+        self.parts = [header] + list(ranges) + [footer]
+        self.file = None
+
+    def read(self, size=-1):
+        """ Read the next part of the document, at most size bytes of the range are read at once. """
+        while self.parts:
+            part = self.parts[0]
+            if isinstance(part, bytes):
+                self.parts.pop(0)
+                if part:
+                    return part
+                continue
 
+            start, end = part
+            length = end - start if size is None or size < 0 else min(size, end - start)
+            if self.file is None:
+                self.file = open(self.xml_file, 'rb')
+            self.file.seek(start)
+            data = self.file.read(length)
+            if start + length >= end or not data:
+                self.parts.pop(0)
+            else:
+                self.parts[0] = (start + length, end)
+            if data:
+                return data
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return b''
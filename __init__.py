@@ -15,3 +15,13 @@ from resqdb import Reports
 from resqdb import Atalaia
 from resqdb import Qasc
 from resqdb import AfricaReport
+from resqdb import Harmonization
+from resqdb import Snapshot
+from resqdb import Cache
+from resqdb import Metrics
+from resqdb import Awards
+from resqdb import Rollup
+from resqdb import Cube
+from resqdb import Schema
+from resqdb import Fanout
+from resqdb import Templates
@@ -35,16 +35,37 @@ def save_file(name, data=None, index=False):
             data.to_csv(path, sep=",", encoding='utf-8', index=index)
 
 
-def read_file(path=None):
-    ''' Read file and return dataframe. If csv is True, read data from preprocessed data, otherwise, get data from the database. 
+def read_file(path=None, cache=None, columns=None):
+    ''' Read file and return dataframe. If csv is True, read data from preprocessed data, otherwise, get data from the database. If the cache folder is provided, the preprocessed data are loaded from the cache if they were exported today, otherwise the exported data are saved into the cache instead of csv files. The path can point also to the cached parquet or feather file.
 
     :param path: path to the csv if provided (defualt: None)
     :type path: string
+    :param cache: path to the cache folder (default: None)
+    :type cache: string
+    :param columns: the list of columns to be loaded from the cache or from the parquet or feather file, 'Protocol ID' is always loaded (default: all columns)
+    :type columns: list
     :returns: DataFrame, list of countries
     '''
     from resqdb.Connection import Connection
+    from resqdb.Cache import Cache
+    from resqdb.Schema import apply_schema
 
-    if path is None:
+    # The countries are obtained from the protocol ID, so it must be always loaded
+    if columns is not None and 'Protocol ID' not in columns:
+        columns = ['Protocol ID'] + list(columns)
+
+    if path is None and cache is not None:
+        cache = Cache(path=cache)
+        raw_df = cache.load('preprocessed_data', export_date=date.today(), columns=columns)
+        if raw_df is None:
+            c = Connection(nprocess=2)
+            cache.save_connection(c)
+            raw_df = c.preprocessed_data if columns is None else c.preprocessed_data[columns]
+
+        country_ids = raw_df['Protocol ID'].apply(lambda x: pd.Series(str(x).split("_")))
+        countries = list(set(country_ids[0]))
+
+    elif path is None:
         c = Connection(nprocess=2)
         dictdb_df = c.dictdb_df
         # Database dataframe
@@ -77,6 +98,14 @@ def read_file(path=None):
                 raw_df['HOSPITAL_DATE'] = pd.to_datetime(raw_df['HOSPITAL_DATE'], format=dateForm)
                 raw_df['DISCHARGE_DATE'] = pd.to_datetime(raw_df['DISCHARGE_DATE'], format=dateForm)
 
+                country_ids = raw_df['Protocol ID'].apply(lambda x: pd.Series(str(x).split("_")))
+                countries = list(set(country_ids[0]))
+            elif file_extension == '.parquet':
+                raw_df = pd.read_parquet(path, columns=columns)
+                country_ids = raw_df['Protocol ID'].apply(lambda x: pd.Series(str(x).split("_")))
+                countries = list(set(country_ids[0]))
+            elif file_extension == '.feather':
+                raw_df = pd.read_feather(path, columns=columns)
                 country_ids = raw_df['Protocol ID'].apply(lambda x: pd.Series(str(x).split("_")))
                 countries = list(set(country_ids[0]))
             else:
@@ -86,6 +115,9 @@ def read_file(path=None):
             print(f'Invalid input file. Detected {file_extension.upper()} instead of .CSV file.')
             sys.exit()
 
+    # The coded answers are typed the same way regardless of the source of the data
+    apply_schema(raw_df)
+
     return raw_df, countries
 
 def repeat_answer():
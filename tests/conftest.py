@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import types
+
+# The repository is the resqdb package, if the package is not installed the repository is imported under its name
+try:
+    import resqdb
+except ImportError:
+    resqdb = types.ModuleType('resqdb')
+    resqdb.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))]
+    sys.modules['resqdb'] = resqdb
+
+
+import numpy as np
+import pandas as pd
+import pytest
+
+CODED_COLUMNS = ['AFIB_FLUTTER', 'AFIB_OTHER_RECS', 'ANTIHYPERTENSIVE', 'ANTITHROMBOTICS', 'ASSESSED_FOR_REHAB', 'BLEEDING_SOURCE', 'CAROTID_ARTERIES_IMAGING', 'CAROTID_STENOSIS', 'CAROTID_STENOSIS_FOLLOWUP', 'CEREBROVASCULAR_EXPERT', 'CONSCIOUSNESS_LEVEL', 'CT_MRI', 'CT_TIME', 'DEPARTMENT_TYPE', 'DISCHARGE_DESTINATION', 'DISCHARGE_OTHER_FACILITY', 'DISCHARGE_OTHER_FACILITY_O1', 'DISCHARGE_OTHER_FACILITY_O2', 'DISCHARGE_OTHER_FACILITY_O3', 'DISCHARGE_SAME_FACILITY', 'DYSPHAGIA_SCREENING', 'DYSPHAGIA_SCREENING_TIME', 'GCS', 'GENDER', 'HEMICRANIECTOMY', 'HOSPITALIZED_IN', 'HOSPITAL_STROKE', 'IVT_DONE', 'NEUROSURGERY', 'NEUROSURGERY_TYPE', 'NIHSS', 'RECANALIZATION_PROCEDURES', 'RECURRENT_STROKE', 'REFERRED_DONE', 'SMOKING_CESSATION', 'STATIN', 'STROKE_TYPE', 'TBY_DONE', 'VENTILATOR', 'HOSPITAL_STROKE_IVT_TIMESTAMPS', 'HOSPITAL_STROKE_TBY_TIMESTAMPS', 'PRENOTIFICATION', 'MRS_PRIOR_STROKE', 'DISCHARGE_MRS']
+CHECKBOX_COLUMNS = ['BLEEDING_REASON', 'INTERVENTION', 'VT_TREATMENT', 'AFIB_DETECTION_METHOD', 'CTA_MRA_DSA']
+VALUE_COLUMNS = ['AGE', 'NIHSS_SCORE', 'IVTPA', 'TBY', 'DIDO', 'HOSPITAL_DAYS', 'LAST_SEEN_NORMAL', 'ADJUSTED_MRS_PRIOR_STROKE', 'D_MRS_SCORE']
+
+
+def get_preprocessed_data(n=600, seed=5):
+    """ The function generating the random preprocessed data of the RES-Q registry with the columns used by the statistics. """
+    rng = np.random.default_rng(seed)
+    sites = ['CZ_{0:03d}'.format(i) for i in range(1, 7)]
+    data = {'Protocol ID': rng.choice(sites, n), 'Country': 'CZ'}
+    data['Site Name'] = ['Site ' + x for x in data['Protocol ID']]
+    for column in CODED_COLUMNS:
+        values = rng.integers(1, {'STROKE_TYPE': 5, 'DISCHARGE_MRS': 8, 'MRS_PRIOR_STROKE': 7}.get(column, 6) + 1, n).astype(float)
+        values[rng.random(n) < 0.08] = np.nan
+        values[rng.random(n) < 0.03] = -999
+        data[column] = values
+    for column in CHECKBOX_COLUMNS:
+        data[column] = rng.choice(np.array(['1', '2', '3', '4', '5', '6', '1,2', '1,3', '2,3', '5,6', '-999', None], dtype=object), n)
+    for column in VALUE_COLUMNS:
+        data[column] = rng.integers(0, 500, n).astype(float)
+    data['crf_parent_name'] = rng.choice(['F_RESQV20DEV_PT_3', 'F_RESQ_IVT_TBY_CZ_4', 'F_RESQV20DEV'], n)
+    data['HOSPITAL_DATE'] = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 360, n), unit='D')
+    data['DISCHARGE_DATE'] = data['HOSPITAL_DATE'] + pd.to_timedelta(rng.integers(0, 20, n), unit='D')
+    df = pd.DataFrame(data)
+    for column in ['HOSPITAL_DATE', 'DISCHARGE_DATE']:
+        df[column] = df[column].dt.date
+    return df
+
+
+@pytest.fixture
+def preprocessed_data():
+    return get_preprocessed_data()
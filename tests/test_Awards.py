@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+from resqdb.Awards import get_awards, ANGELS_AWARDS_INDICATORS, OLD_ANGELS_AWARDS_INDICATORS
+
+# The sites get DIAMOND in all indicators except the changed ones
+CHANGES = [
+    {},
+    {'% patients treated with door to thrombolysis < 60 minutes': 60},
+    {'% patients treated with door to thrombolysis < 45 minutes': 40},
+    {'# patients eligible thrombectomy': 2, '% patients treated with door to thrombectomy < 120 minutes': 10},
+    {'% patients treated with door to thrombectomy < 120 minutes': 10},
+    {'% recanalization rate out of total ischemic incidence': 20},
+    {'% suspected stroke patients undergoing CT/MRI': 84.99},
+    {'% stroke patients treated in a dedicated stroke unit / ICU': 0},
+    {'% all stroke patients undergoing dysphagia screening': 79.99},
+    {'Total Patients': False},
+    {'% patients treated with door to thrombolysis < 60 minutes': 74.995, '% patients treated with door to recanalization therapy < 60 minutes': 74.995},
+    {'% patients treated with door to recanalization therapy < 45 minutes': 40},
+]
+
+# The awards returned by the previous row-wise _get_final_award of ComputeStats
+EXPECTED = {
+    'new': ['DIAMOND', 'GOLD', 'PLATINUM', 'DIAMOND', 'STROKEREADY', 'PLATINUM', 'GOLD', 'PLATINUM', 'STROKEREADY', 'STROKEREADY', 'STROKEREADY', 'DIAMOND'],
+    'old': ['DIAMOND', 'DIAMOND', 'DIAMOND', 'DIAMOND', 'DIAMOND', 'PLATINUM', 'GOLD', 'PLATINUM', 'STROKEREADY', 'STROKEREADY', 'STROKEREADY', 'PLATINUM'],
+}
+
+
+@pytest.fixture
+def stats():
+    columns = set(x.column for x in ANGELS_AWARDS_INDICATORS + OLD_ANGELS_AWARDS_INDICATORS)
+    rows = []
+    for changes in CHANGES:
+        row = dict.fromkeys(columns, 100.0)
+        row.update({'# patients eligible thrombectomy': 5, 'Total Patients': True})
+        row.update(changes)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('calculation, indicators', [('new', ANGELS_AWARDS_INDICATORS), ('old', OLD_ANGELS_AWARDS_INDICATORS)])
+def test_awards_match_row_wise(stats, calculation, indicators):
+    awards, capped_by = get_awards(stats, indicators, 'Total Patients')
+
+    assert awards.tolist() == EXPECTED[calculation]
+    assert (capped_by == '').tolist() == [x == 'DIAMOND' for x in EXPECTED[calculation]]
+
+
+def test_awards_capped_by(stats):
+    awards, capped_by = get_awards(stats, ANGELS_AWARDS_INDICATORS, 'Total Patients')
+
+    assert capped_by[4] == '% patients treated with door to thrombectomy < 120 minutes'
+    assert capped_by[9] == 'Total Patients'
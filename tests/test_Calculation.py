@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import pytest
+import pandas as pd
+
+try:
+    from resqdb.Calculation import ComputeStats
+except ImportError as error:
+    pytest.skip('Calculation cannot be imported: {0}'.format(error), allow_module_level=True)
+
+
+def get_stats(values):
+    stats = object.__new__(ComputeStats)
+    stats.statsDf = pd.DataFrame({'Protocol ID': ['CZ_001', 'CZ_002']})
+    stats._crosstab = None
+    stats.tmp = pd.DataFrame({
+        'Protocol ID': ['CZ_001', 'CZ_001', 'CZ_002'],
+        'STROKE_TYPE': values,
+        'count': [3, 2, 4],
+    })
+    return stats
+
+
+@pytest.mark.parametrize('values', [[1.0, 2.0, 1.0], ['1', '2', '1']], ids=['typed', 'untyped'])
+def test_get_values_for_factors_counts_code(values):
+    # The column which could not be typed by the schema keeps the codes as strings
+    stats = get_stats(values)
+    stats_df = stats._get_values_for_factors(column_name='STROKE_TYPE', value=1, new_column_name='# ischemic stroke')
+
+    assert stats_df['# ischemic stroke'].tolist() == [3, 4]
+
+
+def merge_counts(stats_df, tmp_df, new_column_name):
+    # The previous implementation merging the counts into the statistics
+    tmp_df = tmp_df.reset_index()[['Protocol ID', 'count']].groupby('Protocol ID').sum().reset_index()
+    factor_df = stats_df.merge(tmp_df, how='outer')
+    factor_df.rename(columns={'count': new_column_name}, inplace=True)
+    return factor_df.fillna(0)
+
+
+@pytest.fixture
+def stats():
+    stats = object.__new__(ComputeStats)
+    stats.statsDf = pd.DataFrame({'Protocol ID': ['CZ_001', 'CZ_002', 'CZ_003'], 'Total Patients': [10, 6, 0]})
+    stats._crosstab = None
+    stats.tmp = pd.DataFrame({
+        'Protocol ID': ['CZ_001', 'CZ_001', 'CZ_001', 'CZ_002', 'CZ_002'],
+        'INTERVENTION': ['1', '2', '1,2', '2', '-999'],
+        'count': [4, 3, 3, 5, 1],
+    })
+    return stats
+
+
+@pytest.mark.parametrize('value', ['1', '2', '-999', '3'])
+def test_crosstab_counts_match_merge(stats, value):
+    stats_df, tmp = stats.statsDf.copy(), stats.tmp
+
+    expected = merge_counts(stats_df, tmp[tmp['INTERVENTION'] == value], 'equal')['equal'].tolist()
+    assert stats._get_values_for_factors(column_name='INTERVENTION', value=value, new_column_name='equal')['equal'].tolist() == expected
+
+    expected = merge_counts(stats_df, tmp[tmp['INTERVENTION'].isin([value, '-999'])], 'isin')['isin'].tolist()
+    assert stats._get_values_for_factors_more_values(column_name='INTERVENTION', value=[value, '-999'], new_column_name='isin')['isin'].tolist() == expected
+
+    expected = merge_counts(stats_df, tmp[tmp['INTERVENTION'].str.contains(value)], 'contains')['contains'].tolist()
+    assert stats._get_values_for_factors_containing(column_name='INTERVENTION', value=value, new_column_name='contains')['contains'].tolist() == expected
+
+
+def test_percentage_matches_row_wise(stats):
+    stats.statsDf['# patients'] = [1, 5, 0]
+    expected = stats.statsDf.apply(lambda x: round(((x['# patients']/x['Total Patients']) * 100), 2) if x['Total Patients'] > 0 else 0, axis=1)
+
+    assert stats._get_percentage(stats.statsDf['# patients'], stats.statsDf['Total Patients']).tolist() == expected.tolist()
+    assert expected.tolist() == [10.0, 83.33, 0]
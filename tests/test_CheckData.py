@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resqdb.CheckData import CheckData
+
+
+@pytest.fixture
+def check():
+    return object.__new__(CheckData)
+
+
+@pytest.fixture
+def dates():
+    return pd.DataFrame({
+        'VISIT_DATE': [date(2020, 1, 1), date(2020, 1, 2), None, date(2020, 3, 1), date(2020, 4, 1)],
+        'VISIT_TIME': [time(8, 0), time(23, 30), time(1, 0), None, time(10, 0)],
+        'HOSPITAL_DATE': [date(2020, 1, 1), date(2020, 1, 3), date(2020, 2, 1), date(2020, 3, 1), date(2020, 3, 1)],
+        'HOSPITAL_TIME': [time(9, 15, 30), time(0, 45), time(2, 0), time(12, 0), time(11, 0)],
+        'DISCHARGE_DATE': [date(2020, 1, 1), date(2020, 1, 13), date(2020, 2, 10), None, date(1900, 1, 1)],
+    })
+
+
+def row_wise_time_diff(visit_timestamp, hosp_timestamp):
+    # The previous row-wise implementation of the last seen normal
+    if type(visit_timestamp) is pd.Timestamp and type(hosp_timestamp) is pd.Timestamp:
+        total_minutes = (hosp_timestamp - visit_timestamp).total_seconds() / 60.0
+    else:
+        total_minutes = 0
+    if total_minutes < 0 or total_minutes > 40000:
+        total_minutes = 0
+    return total_minutes
+
+
+def row_wise_times_in_minutes(admission_time, bolus_time, hosp_time):
+    # The previous row-wise implementation without the never applied correction by hospital time
+    timeformat = '%H:%M:%S'
+    admission_bool, bolus_bool, hosp_bool = [x is not None for x in (admission_time, bolus_time, hosp_time)]
+    if not bolus_bool:
+        return 0, True
+    if admission_bool:
+        start, fixed = admission_time, False
+    elif hosp_bool:
+        start, fixed = hosp_time, True
+    else:
+        return 0, True
+    tdelta = datetime.strptime(bolus_time, timeformat) - datetime.strptime(start, timeformat)
+    if tdelta.total_seconds() < 0:
+        tdelta += timedelta(days=1)
+    return tdelta.total_seconds() / 60.0, fixed
+
+
+def test_hospital_days_match_row_wise(check, dates):
+    expected = [check._get_hospital_days(x, y) if x is not None and y is not None else np.nan for x, y in zip(dates['HOSPITAL_DATE'], dates['DISCHARGE_DATE'])]
+    result = check._get_hospital_days_column(dates['HOSPITAL_DATE'], dates['DISCHARGE_DATE'])
+
+    assert np.allclose(result, expected, equal_nan=True)
+    assert result.tolist()[:3] == [1, 10, 9]
+
+
+def test_timestamps_and_last_seen_normal_match_row_wise(check, dates):
+    visit_timestamps = check._get_timestamps(dates['VISIT_DATE'], dates['VISIT_TIME'])
+    hosp_timestamps = check._get_timestamps(dates['HOSPITAL_DATE'], dates['HOSPITAL_TIME'])
+
+    for timestamps, date_column, time_column in [(visit_timestamps, 'VISIT_DATE', 'VISIT_TIME'), (hosp_timestamps, 'HOSPITAL_DATE', 'HOSPITAL_TIME')]:
+        expected = [pd.Timestamp(datetime.combine(x, y)) if x is not None and y is not None else pd.NaT for x, y in zip(dates[date_column], dates[time_column])]
+        assert timestamps.tolist() == expected
+
+    expected = [row_wise_time_diff(x, y) for x, y in zip(visit_timestamps, hosp_timestamps)]
+    assert check._get_last_seen_normal(visit_timestamps, hosp_timestamps).tolist() == expected
+    assert expected == [75.5, 75.0, 0, 0, 0]
+
+
+def test_times_in_minutes_match_row_wise(check):
+    admission = [None, None, None, '10:00:00', '23:50:00', '10:00:00', None]
+    bolus = [None, '10:30:00', '10:30:00', '10:45:30', '00:20:00', None, None]
+    hosp = ['09:00:00', '10:00:00', None, '09:00:00', '23:00:00', '09:00:00', None]
+
+    minutes, fixed = check._get_times_in_minutes(pd.Series(admission, dtype=object), pd.Series(bolus, dtype=object), pd.Series(hosp, dtype=object), max_time=400)
+    expected = [row_wise_times_in_minutes(*x) for x in zip(admission, bolus, hosp)]
+
+    assert minutes.tolist() == [x[0] for x in expected]
+    assert fixed.tolist() == [x[1] for x in expected]
+
+
+def test_fix_dates_column_matches_row_wise(check, dates):
+    df = dates.dropna(subset=['DISCHARGE_DATE']).rename(columns={'VISIT_DATE': 'VISIT_DATE_OLD', 'HOSPITAL_DATE': 'HOSPITAL_DATE_OLD', 'DISCHARGE_DATE': 'DISCHARGE_DATE_OLD'})
+    df = df.dropna(subset=['VISIT_DATE_OLD']).reset_index(drop=True)
+    df['HOSPITAL_DAYS_OLD'] = check._get_hospital_days_column(df['HOSPITAL_DATE_OLD'], df['DISCHARGE_DATE_OLD'])
+    expected = [check._fix_dates(visit_date=x['VISIT_DATE_OLD'], hosp_date=x['HOSPITAL_DATE_OLD'], disc_date=x['DISCHARGE_DATE_OLD']) if (x['HOSPITAL_DAYS_OLD'] < 0 or x['HOSPITAL_DAYS_OLD'] > 300) else (x['VISIT_DATE_OLD'], x['HOSPITAL_DATE_OLD'], x['DISCHARGE_DATE_OLD'], x['HOSPITAL_DAYS_OLD'], False) for _, x in df.iterrows()]
+
+    result = check._fix_dates_column(df.copy())
+
+    assert list(zip(result['VISIT_DATE'], result['HOSPITAL_DATE'], result['DISCHARGE_DATE'], result['HOSPITAL_DAYS'], result['HOSPITAL_DAYS_FIXED'])) == expected
+    assert result['HOSPITAL_DAYS_FIXED'].tolist() == [False, False, True]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import types
+from datetime import date
+import pytest
+import numpy as np
+import pandas as pd
+
+pytest.importorskip('pyarrow')
+
+from resqdb.Cache import Cache
+from resqdb.Cube import Cube
+from resqdb.Metrics import METRICS
+
+
+def assert_stats_equal(a, b):
+    assert list(a.columns) == list(b.columns)
+    assert len(a) == len(b)
+    for column in a.columns:
+        x, y = a[column].reset_index(drop=True), b[column].reset_index(drop=True)
+        if not (pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y)) or x.dtype == bool:
+            assert x.astype(str).tolist() == y.astype(str).tolist(), column
+        else:
+            assert np.allclose(x.astype(float), y.astype(float), equal_nan=True, rtol=0, atol=1e-9), column
+
+
+def test_save_connection_builds_cube_for_country_code(tmp_path, preprocessed_data):
+    connection = types.SimpleNamespace(dictdb_df={}, preprocessed_data=preprocessed_data)
+    cache = Cache(path=str(tmp_path))
+    cache.save_connection(connection, cube=True, country_code='CZ')
+
+    cube = Cube()
+    assert cube.load(cache, country_code='CZ')
+    assert cube.country_code == 'CZ'
+    assert_stats_equal(cube.get_stats(country=True), Cube(preprocessed_data, country_code='CZ').get_stats(country=True))
+
+
+def test_load_refuses_cube_of_other_country_code(tmp_path, preprocessed_data):
+    connection = types.SimpleNamespace(dictdb_df={}, preprocessed_data=preprocessed_data)
+    cache = Cache(path=str(tmp_path))
+    cache.save_connection(connection, cube=True)
+
+    with pytest.raises(ValueError):
+        Cube().load(cache, country_code='CZ')
+
+
+@pytest.mark.parametrize('date1, date2, site_ids, country', [(None, None, None, True), (date(2020, 3, 1), date(2020, 5, 31), ['CZ_001', 'CZ_003'], False)])
+def test_get_stats_matches_compute_stats(preprocessed_data, date1, date2, site_ids, country):
+    try:
+        from resqdb.Calculation import ComputeStats, FilterDataset
+    except ImportError as error:
+        pytest.skip('Calculation cannot be imported: {0}'.format(error))
+    metrics = [metric.name for metric in METRICS] + ['Proposed Award', 'Proposed Award (old calculation)', 'Proposed Award capped by']
+
+    df = preprocessed_data if date1 is None else FilterDataset(preprocessed_data, date1=date1, date2=date2).fdf
+    if site_ids is not None:
+        df = df[df['Protocol ID'].isin(site_ids)]
+    expected = ComputeStats(df, metrics=metrics, country=country, country_code='CZ').statsDf
+
+    assert_stats_equal(Cube(preprocessed_data, country_code='CZ').get_stats(date1, date2, site_ids, metrics=metrics, country=country), expected)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resqdb.FormatData import GeneratePreprocessedData
+
+NAMESPACE = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def read_sheet(path, sheet):
+    """ The function reading the values of the cells of the sheet of the xlsx file, the dates and times are returned as the serial numbers. """
+    with zipfile.ZipFile(path) as archive:
+        strings = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            strings = [''.join(x.text or '' for x in si.iter(NAMESPACE + 't')) for si in ElementTree.fromstring(archive.read('xl/sharedStrings.xml')).iter(NAMESPACE + 'si')]
+        root = ElementTree.fromstring(archive.read('xl/worksheets/sheet{0}.xml'.format(sheet)))
+
+    rows = []
+    for row in root.iter(NAMESPACE + 'row'):
+        cells = {}
+        for cell in row.iter(NAMESPACE + 'c'):
+            column = ''.join(x for x in cell.get('r') if x.isalpha())
+            value = cell.find(NAMESPACE + 'v')
+            if cell.get('t') == 's':
+                cells[column] = strings[int(value.text)]
+            elif cell.get('t') in ('inlineStr', 'str'):
+                cells[column] = ''.join(x.text or '' for x in cell.iter(NAMESPACE + 't'))
+            elif cell.get('t') == 'b':
+                cells[column] = bool(int(value.text))
+            else:
+                cells[column] = float(value.text)
+        rows.append(cells)
+    return rows
+
+
+def get_previous_values(df):
+    """ The function converting the dataframe as the previous implementation, the dates and times to strings and the missing values to empty strings. """
+    df = df.copy()
+    for column in ['VISIT_DATE', 'HOSPITAL_DATE', 'DISCHARGE_DATE']:
+        df[column] = [x.strftime('%m/%d/%Y') if x is not None else None for x in df[column]]
+    df['HOSPITAL_TIME'] = [x.strftime('%H:%M') if isinstance(x, time) else None for x in df['HOSPITAL_TIME']]
+    return df.astype(object).where(df.notnull(), '').values.tolist()
+
+
+def to_string(value, column):
+    # The dates and times are written as serial numbers with the format
+    if column in ('B', 'C', 'D'):
+        return (datetime(1899, 12, 30) + timedelta(days=value)).strftime('%m/%d/%Y')
+    if column == 'E':
+        return (datetime(1899, 12, 30) + timedelta(days=value)).strftime('%H:%M')
+    return value
+
+
+def test_streamed_sheet_matches_previous_values(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame({
+        'Protocol ID': ['CZ_001', 'CZ_002', 'CZ_003'],
+        'VISIT_DATE': [date(2020, 1, 1), date(2020, 2, 29), None],
+        'HOSPITAL_DATE': [date(2020, 1, 1), date(2020, 3, 1), date(2020, 12, 31)],
+        'DISCHARGE_DATE': [date(2020, 1, 5), None, date(2021, 1, 2)],
+        'HOSPITAL_TIME': [time(8, 5), np.nan, time(23, 59)],
+        'NAME': ['Site <1> & "A"', None, ''],
+        'AGE': [65, 70, 81],
+        'NIHSS_SCORE': [4.5, np.nan, 0.0],
+        'HOSPITAL_DAYS_FIXED': [True, False, True],
+    })
+
+    GeneratePreprocessedData(df, report='test', quarter='Q1_2020')
+    rows = read_sheet(str(tmp_path / 'test_Q1_2020_preprocessed_data.xlsx'), 1)
+
+    assert list(rows[0].values()) == list(df.columns)
+    columns = list(rows[0].keys())
+    for cells, expected in zip(rows[1:], get_previous_values(df)):
+        assert [to_string(cells[column], column) if column in cells else '' for column in columns] == expected
+
+
+def get_cell_rules(path):
+    """ The function returning the conditional formatting rules of each cell of the first sheet in the order of their priority. The relative references in the formulas are shifted from the first cell of the range to the cell. """
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+
+    rules = {}
+    for formatting in root.iter(NAMESPACE + 'conditionalFormatting'):
+        cells = []
+        anchor = int(re.match(r'[A-Z]+(\d+)', formatting.get('sqref')).group(1))
+        for reference in formatting.get('sqref').split():
+            first, _, last = reference.partition(':')
+            column, first_row, last_row = first[0], int(first[1:]), int((last or first)[1:])
+            cells += [column + str(row) for row in range(first_row, last_row + 1)]
+        for rule in formatting.iter(NAMESPACE + 'cfRule'):
+            for cell in cells:
+                shift = lambda x: x.group(1) + str(int(x.group(2)) + int(cell[1:]) - anchor)
+                formulas = tuple(re.sub(r'\b([A-Z]+)(\d+)\b', shift, x.text) for x in rule.iter(NAMESPACE + 'formula'))
+                rules.setdefault(cell, []).append((int(rule.get('priority')), (rule.get('type'), rule.get('operator'), rule.get('text'), rule.get('dxfId'), formulas)))
+    return {cell: [description for priority, description in sorted(x)] for cell, x in rules.items()}
+
+
+def test_range_conditional_formats_match_cell_formats(tmp_path):
+    import xlsxwriter
+    from resqdb.FormatData import GenerateFormattedStats
+
+    paths = [str(tmp_path / 'cells.xlsx'), str(tmp_path / 'ranges.xlsx')]
+    no_thrombectomy_rows = [4, 5, 7, 9]
+    for path in paths:
+        workbook = xlsxwriter.Workbook(path)
+        worksheet = workbook.add_worksheet()
+        gold, black = workbook.add_format({'bg_color': '#FFD700'}), workbook.add_format({'bg_color': '#000000'})
+        rules = [{'type': 'cell', 'criteria': 'between', 'minimum': 50, 'maximum': 74.99, 'format': gold}, {'type': 'cell', 'criteria': '>=', 'value': 75, 'format': black}]
+        thrombectomy_rules = [{'type': 'cell', 'criteria': '==', 'value': 0.0, 'format': black}]
+        green_rules = [{'type': 'text', 'criteria': 'containing', 'value': 'TRUE', 'format': gold}]
+
+        if path == paths[0]:
+            # The previous implementation adding the rules cell by cell
+            for row in range(4, 10):
+                worksheet.conditional_format('D' + str(row), dict(green_rules[0]))
+            for column in ('E', 'F'):
+                for row in range(4, 10):
+                    for rule in rules:
+                        worksheet.conditional_format(column + str(row), dict(rule))
+                for row in no_thrombectomy_rows:
+                    worksheet.conditional_format(column + str(row), dict(thrombectomy_rules[0]))
+        else:
+            stats = object.__new__(GenerateFormattedStats)
+            stats._add_conditional_formats(worksheet, 'D', 4, 9, green_rules)
+            for column in ('E', 'F'):
+                stats._add_conditional_formats(worksheet, column, 4, 9, rules)
+                stats._add_conditional_formats(worksheet, column, 4, 9, thrombectomy_rules, rows=no_thrombectomy_rows)
+        workbook.close()
+
+    cells, ranges = [get_cell_rules(path) for path in paths]
+    assert ranges == cells
+    assert len(cells['E4']) == 3 and len(cells['E6']) == 2
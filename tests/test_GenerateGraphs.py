@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+pytest.importorskip('pptx')
+
+from pptx import Presentation
+from pptx.chart.data import ChartData
+from pptx.dml.color import RGBColor
+from pptx.enum.chart import XL_CHART_TYPE, XL_TICK_MARK
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.util import Cm, Pt
+
+from resqdb.GenerateGraphs import BarChartData
+
+BLUE = RGBColor(43, 88, 173)
+RED = RGBColor(128, 0, 0)
+
+
+def add_chart(chart_data):
+    slide = Presentation().slides.add_slide(Presentation().slide_layouts[6])
+    return slide.shapes.add_chart(XL_CHART_TYPE.BAR_CLUSTERED, Cm(0.7), Cm(2), Cm(32), Cm(16.5), chart_data).chart
+
+
+def get_formatted_chart(categories, values, name, point_colors, value_axis, maximum):
+    # The previous implementation formatting the chart through the chart object
+    chart_data = ChartData()
+    chart_data.categories = categories
+    chart_data.add_series(name, values)
+    chart = add_chart(chart_data)
+
+    series = chart.series[0]
+    if point_colors is not None:
+        for point, color in zip(series.points, point_colors):
+            point.format.fill.solid()
+            point.format.fill.fore_color.rgb = color
+    else:
+        series.format.fill.solid()
+        series.format.fill.fore_color.rgb = BLUE
+
+    plot = chart.plots[0]
+    plot.vary_by_categories = False
+    plot.has_data_labels = True
+    plot.gap_width = 100
+    plot.data_labels.font.size = Pt(8)
+    plot.data_labels.font.bold = True
+    plot.data_labels.font.name = 'Century Gothic'
+
+    if not value_axis:
+        chart.value_axis.visible = False
+        chart.value_axis.has_major_gridlines = False
+    else:
+        chart.value_axis.tick_labels.font.size = Pt(8)
+        chart.value_axis.tick_labels.font.name = 'Century Gothic'
+        chart.value_axis.major_tick_mark = XL_TICK_MARK.OUTSIDE
+        chart.value_axis.has_major_gridlines = False
+        chart.value_axis.maximum_scale = maximum
+        chart.value_axis.minimum_scale = 0
+
+    category_axis = chart.category_axis
+    category_axis.format.line.color.rgb = RGBColor(0, 0, 0)
+    alpha = OxmlElement('a:alpha')
+    alpha.set('val', '0196')
+    category_axis.format.line.color._xFill.srgbClr.append(alpha)
+    category_axis.major_tick_mark = XL_TICK_MARK.NONE
+    category_axis.major_unit = 1
+    category_axis.tick_labels.font.size = Pt(8)
+    category_axis.tick_labels.font.name = 'Century Gothic'
+
+    return chart
+
+
+def get_xml(chart):
+    return re.sub(rb'>\s+<', b'><', chart.part.blob)
+
+
+@pytest.mark.parametrize('value_axis, maximum', [(True, 100), (False, 250)])
+@pytest.mark.parametrize('country', [True, False])
+def test_bar_chart_matches_formatted_chart(country, value_axis, maximum):
+    categories = ['Site <1> & "A"', 'Czech Republic', 'Site 3', 'Site 4']
+    values = [12.5, 250, 0, 99.99]
+    point_colors = [RED if x == 'Czech Republic' else BLUE for x in categories] if country else None
+
+    chart_data = BarChartData(color=BLUE, point_colors=point_colors, value_axis=value_axis, maximum=maximum)
+    chart_data.categories = categories
+    chart_data.add_series('% patients', values)
+    chart = add_chart(chart_data)
+
+    assert get_xml(chart) == get_xml(get_formatted_chart(categories, values, '% patients', point_colors, value_axis, maximum))
+    assert list(chart.plots[0].categories) == categories
+    assert chart.series[0].values == tuple(values)
+
+
+def test_bar_chart_refuses_more_series():
+    chart_data = BarChartData(color=BLUE)
+    chart_data.categories = ['Site 1']
+    chart_data.add_series('a', [1])
+    chart_data.add_series('b', [2])
+
+    with pytest.raises(ValueError):
+        add_chart(chart_data)
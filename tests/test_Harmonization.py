@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import os
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+_spec = importlib.util.spec_from_file_location('Harmonization', os.path.join(os.path.dirname(__file__), '..', 'Harmonization.py'))
+Harmonization = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(Harmonization)
+
+Rule = Harmonization.Rule
+Copy = Harmonization.Copy
+
+
+def test_rule_sets_numbers_in_string_column():
+    df = pd.DataFrame({
+        'CRF': pd.array(['v1', 'v2', 'v1'], dtype='string'),
+        'GENDER': pd.array(['a', 'b', 'c'], dtype='string')})
+    Harmonization.harmonize(df, [Rule((('CRF', '==', 'v1'),), 'GENDER', 2)])
+    assert df['GENDER'].tolist() == [2, 'b', 2]
+
+
+def test_rule_copies_values_into_string_column():
+    df = pd.DataFrame({
+        'CRF': pd.array(['v1', 'v2'], dtype='string'),
+        'TIME': pd.array(['x', 'y'], dtype='string'),
+        'OTHER': [1.5, 2.5]})
+    Harmonization.harmonize(df, [Rule((('CRF', '==', 'v1'),), 'TIME', Copy('OTHER'))])
+    assert df['TIME'].tolist() == [1.5, 'y']
+
+
+def test_rule_keeps_numeric_column_numeric():
+    df = pd.DataFrame({'CRF': ['v1', 'v2'], 'AGE': [np.nan, 50.0]})
+    Harmonization.harmonize(df, [Rule((('CRF', '==', 'v1'),), 'AGE', 40.0)])
+    assert df['AGE'].dtype == np.float64
+    assert df['AGE'].tolist() == [40.0, 50.0]
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import pytest
+import pandas as pd
+
+try:
+    from resqdb import Reports
+except ImportError as error:
+    pytest.skip('Reports cannot be imported: {0}'.format(error), allow_module_level=True)
+
+
+@pytest.fixture
+def reports():
+    # Three thrombectomy patients, the patient of CZ_025 in DEVCZ10 is reassigned to the second hospital
+    df = pd.DataFrame({
+        'Protocol ID': ['CZ_025', 'CZ_034', 'CZ_034'],
+        'Site Name': ['Plzen', 'Brno', 'Brno'],
+        'crf_parent_name': ['F_RESQ_IVT_TBY_1565_DEVCZ10', 'F_RESQ_IVT_TBY_CZ_2', 'F_RESQ_IVT_TBY_CZ_2'],
+        'FIRST_ARRIVAL_HOSP': ['unknown', 'unknown', 'unknown'],
+        'FIRST_HOSPITAL': [1, 1, 2],
+        'TBY': [100.0, 50.0, 30.0],
+        'RECANALIZATION_PROCEDURES': [4, 4, 4],
+    })
+    for column in ['STROKE_TYPE', 'TBY_DONE']:
+        df[column] = 1
+    for column in ['HOSPITAL_STROKE_TBY_TIMESTAMPS', 'IVT_TBY', 'TBY_ONLY', 'TBY_REFER_ALL', 'TBY_REFER_LIM']:
+        df[column] = 3
+    for column in ['IVT_TBY_ADMISSION_TIME', 'IVT_TBY_GROIN_PUNCTURE_TIME', 'TBY_ONLY_ADMISSION_TIME', 'TBY_ONLY_PUNCTURE_TIME', 'TBY_REFER_ALL_ADMISSION_TIME', 'TBY_REFER_ALL_BOLUS_TIME', 'TBY_REFER_LIM_ADMISSION_TIME', 'TBY_REFER_LIM_BOLUS_TIME']:
+        df[column] = None
+
+    reports = object.__new__(Reports.Reports)
+    reports.country_name = 'Česká republika'
+    reports.hospitals_mt = ['CZ_034', 'CZ_025', 'CZ']
+    reports.site_id_mapped_to_site_name = pd.DataFrame({'Protocol ID': ['CZ_025', 'CZ_034', 'CZ'], 'Site Name': ['Plzen', 'Brno', reports.country_name]})
+    reports.filtered_dfs = {'2020': df}
+    reports.incorrect_tby = {}
+    return reports
+
+
+def test_country_first_hospital_medians_use_reassigned_first_hospital(reports, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    statistic = reports.calculate_thrombectomy()['2020'].set_index('Protocol ID')
+
+    assert statistic.loc['CZ_025', 'Median DTG (minutes) - second hospital'] == 100.0
+    assert statistic.loc['CZ_034', 'Median DTG (minutes) - first hospital'] == 50.0
+    assert statistic.loc['CZ', 'Median DTG (minutes) - first hospital'] == 50.0
+    assert statistic.loc['CZ', 'Median DTG (minutes) - second hospital'] == 65.0
+
+
+def test_included_in_median_contains_only_sites(reports, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reports.calculate_thrombectomy()
+
+    included_in_median = pd.read_csv(tmp_path / 'included_in_median.csv', index_col=0)
+    assert sorted(included_in_median['Protocol ID'].tolist()) == ['CZ_025', 'CZ_034', 'CZ_034']
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from resqdb.Rollup import get_runs, rollup_counts, rollup_runs, get_medians, get_quantiles
+
+REGIONS = {'CZ_001': 'South', 'CZ_002': 'South', 'CZ_003': 'North', 'CZ_004': 'North', 'CZ_005': None}
+
+
+@pytest.fixture
+def rows(preprocessed_data):
+    rows = preprocessed_data[['Protocol ID', 'AGE']].copy()
+    rows.loc[rows.index[::17], 'AGE'] = np.nan
+    # The site without values
+    rows.loc[rows['Protocol ID'] == 'CZ_004', 'AGE'] = np.nan
+    return rows
+
+
+def get_copies(rows, mapping):
+    # The previous implementation appending the copies of the patients relabelled by the group
+    copies = rows.copy()
+    copies['Protocol ID'] = copies['Protocol ID'].map(mapping)
+    return copies.dropna(subset=['Protocol ID'])
+
+
+@pytest.mark.parametrize('mapping', [REGIONS, lambda x: 'CZ'], ids=['region', 'country'])
+def test_rollup_matches_copies(rows, mapping):
+    copies = get_copies(rows, mapping)
+    runs = rollup_runs(get_runs(rows, ['Protocol ID'], 'AGE'), mapping)
+    groups = copies.groupby('Protocol ID', sort=False)['AGE']
+
+    counts = rollup_counts(rows.groupby('Protocol ID').size(), mapping)
+    pd.testing.assert_series_equal(counts.sort_index(), groups.size().sort_index(), check_names=False)
+
+    medians = get_medians(runs)
+    pd.testing.assert_series_equal(medians.sort_index(), groups.median().sort_index(), check_names=False, check_index_type=False)
+
+    # The groups with the missing values get NaN as numpy.percentile
+    for data in (rows, rows.dropna(subset=['AGE'])):
+        runs = rollup_runs(get_runs(data, ['Protocol ID'], 'AGE'), mapping)
+        groups = get_copies(data, mapping).groupby('Protocol ID', sort=False)['AGE']
+        for q in (0.25, 0.75):
+            expected = groups.apply(lambda x: np.percentile(x, q * 100))
+            pd.testing.assert_series_equal(get_quantiles(runs, q).sort_index(), expected.sort_index(), check_names=False, check_index_type=False)
+
+
+def test_runs_match_groupby(rows):
+    runs = get_runs(rows, ['Protocol ID'], 'AGE')
+    groups = rows.groupby('Protocol ID')['AGE']
+
+    assert get_medians(runs).sort_index().equals(groups.median())
+    assert pd.Series(runs.nulls, index=runs.index).sort_index().tolist() == groups.apply(lambda x: x.isnull().sum()).tolist()
+    assert np.isnan(get_medians(runs)['CZ_004'])
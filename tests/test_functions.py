@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pytest
+import pandas as pd
+
+pytest.importorskip('pyarrow')
+
+from resqdb.functions import read_file
+
+
+@pytest.fixture
+def preprocessed_data():
+    return pd.DataFrame({
+        'Protocol ID': ['CZ_001', 'CZ_002', 'SK_001'],
+        'Site Name': ['Brno', 'Praha', 'Bratislava'],
+        'AGE': [70, 65, 80]})
+
+
+@pytest.mark.parametrize('extension', ['.parquet', '.feather'])
+def test_read_file_with_columns_loads_protocol_id(tmp_path, preprocessed_data, extension):
+    path = str(tmp_path / ('preprocessed_data' + extension))
+    if extension == '.parquet':
+        preprocessed_data.to_parquet(path)
+    else:
+        preprocessed_data.to_feather(path)
+
+    df, countries = read_file(path=path, columns=['AGE'])
+    assert df.columns.tolist() == ['Protocol ID', 'AGE']
+    assert df['AGE'].tolist() == [70, 65, 80]
+    assert sorted(countries) == ['CZ', 'SK']